@@ -10,6 +10,7 @@ INPUT_INFO_CHANNEL = 'axiomLowLevelCommunication:info:state'
 CREATE_JOB_CHANNEL = 'axiomWebserver:schedule:create'
 DELETE_JOB_CHANNEL = 'axiomWebserver:schedule:delete'
 UPDATE_JOB_CHANNEL = 'axiomWebserver:schedule:update'
+SUBSCRIBER_TIMEOUT = 1
 JOBS_DB_NAME = 'jobs.sqlite'
 LOG_FILE_NAME = '_axiomLogic.log'
 LOG_FILE_DIRECTORY = '/var/log/axiom'
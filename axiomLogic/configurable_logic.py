@@ -42,9 +42,8 @@ class ConfigurableLogic(BaseLogic):
         # в том же потоке, в котором будет использоваться (особенности реализации библиотеки sqlite3).
 
         while self.isRunning:
-            message = redis_subscriber.get_message()
+            message = redis_subscriber.get_message(timeout=SUBSCRIBER_TIMEOUT)
             if message is None:
-                time.sleep(0.01)
                 continue
             logger.write_log(log_msg='получено сообщение {}'.format(message['data']), log_level='INFO')
             if message['channel'] == CREATE_JOB_CHANNEL:
@@ -56,7 +55,6 @@ class ConfigurableLogic(BaseLogic):
             elif message['channel'] == UPDATE_JOB_CHANNEL:
                 job_kwargs = ujson.loads(message['data'])
                 threading.Thread(target=self.update_job_in_schedule, args=(job_kwargs,)).start()
-            time.sleep(0.01)
 
     def create_jobs_table_if_not_exists(self):
         """
@@ -255,10 +253,9 @@ class ConfigurableLogic(BaseLogic):
             prctl.set_name('web_handler')
             while self.isRunning:
 
-                message = p_web.get_message()
+                message = p_web.get_message(timeout=SUBSCRIBER_TIMEOUT)
 
                 if not message:
-                    time.sleep(0.01)
                     continue
 
                 try:
@@ -280,8 +277,6 @@ class ConfigurableLogic(BaseLogic):
                     log_msg = 'Отправлена команда на модуль "Взаимодействие с низким уровнем": "{}"'.format(cmd)
                     logger.write_log(log_msg=log_msg, log_level='INFO')
 
-                time.sleep(0.01)
-
         def web_updater_target():
             """
             Запускается в потоке и обновляет состояние веб элемента
@@ -295,10 +290,9 @@ class ConfigurableLogic(BaseLogic):
             cursor = connection.cursor()
 
             while self.isRunning:
-                message = p_low.get_message()
+                message = p_low.get_message(timeout=SUBSCRIBER_TIMEOUT)
 
                 if not message:
-                    time.sleep(0.01)
                     continue
 
                 try:
@@ -331,8 +325,6 @@ class ConfigurableLogic(BaseLogic):
                         cursor.execute(
                             'INSERT INTO log_entries (timestamp, event) VALUES ({}, "{}")'.format(time.time(), event))
 
-                time.sleep(0.01)
-
         web_messages_handler = threading.Thread(target=web_messages_handler_target)
         web_updater = threading.Thread(target=web_updater_target)
 
@@ -1,13 +1,12 @@
 import hashlib
 import os
 import sqlite3
-import time
 import ujson
 import redis
 from pubsub import pub
 from axiomLib.loggers import create_logger
 from axiomLogic.config import (LOG_FILE_DIRECTORY, LOG_FILE_NAME, CONFIGURATION_FILES_PATH,
-                               CONFIGURATION_FILE_NAME, INPUT_INFO_CHANNEL, INPUT_CMD_CHANNEL)
+                               CONFIGURATION_FILE_NAME, INPUT_INFO_CHANNEL, INPUT_CMD_CHANNEL, SUBSCRIBER_TIMEOUT)
 from axiomLogic.configurable_nodes import Simple220Device, Simple220Widget
 from axiomLogic.logic_scheduler import LogicScheduler
 
@@ -171,10 +170,9 @@ class NodeLogic:
 
         # Слушаем и распределяем сообщения
         while self.isRunning:
-            msg = redis_subscriber.get_message()
+            msg = redis_subscriber.get_message(timeout=SUBSCRIBER_TIMEOUT)
 
             if not msg:
-                time.sleep(0.01)
                 continue
 
             if msg['channel'] == INPUT_INFO_CHANNEL:
@@ -196,8 +194,6 @@ class NodeLogic:
                     continue
                 pub.sendMessage(data['id'], state=data['state'])
 
-            time.sleep(0.01)
-
     def run(self):
         """
         Запускает основной цикл работы
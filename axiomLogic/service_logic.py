@@ -75,7 +75,7 @@ class ServiceLogic(BaseLogic):
             """
             prctl.set_name('bufferizator')
             while self.isRunning:
-                message = p.get_message()
+                message = p.get_message(timeout=SUBSCRIBER_TIMEOUT)
                 if message:
                     channel = message['channel']
                     characteristic = channel.split(':')[-1]
@@ -90,7 +90,6 @@ class ServiceLogic(BaseLogic):
                     #                                 'ch2': float(ch2_value) / (3600 * 1000),
                     #                                 'timestamp': float(timestamp)})
                     messages_buffer[characteristic][data['addr']].append(data)
-                time.sleep(0.01)
 
         def active_power_and_consumption_and_cost_table_updater_target():
             """
@@ -432,10 +431,9 @@ class ServiceLogic(BaseLogic):
         subscriber.subscribe('axiomLowLevelCommunication:info:metrics_data')
 
         while self.isRunning:
-            message = subscriber.get_message()
+            message = subscriber.get_message(timeout=SUBSCRIBER_TIMEOUT)
 
             if not message:
-                time.sleep(0.01)
                 continue
 
             data = ujson.loads(message['data'])
@@ -461,8 +459,6 @@ class ServiceLogic(BaseLogic):
                         'frequency': data['F']}
                 self.r.publish(channel='axiomLogic:info:characteristics', message=ujson.dumps(msg2))
 
-            time.sleep(0.01)
-
     def service_metrics_messages_handler(self, *args, **kwargs):
         """
         Обрабатывает сообщения с текущими показаниями датчиков силовых модулей.
@@ -525,10 +521,9 @@ class ServiceLogic(BaseLogic):
         #     power_units += list(params['power units'].keys())
 
         while self.isRunning:
-            message = subscriber.get_message()
+            message = subscriber.get_message(timeout=SUBSCRIBER_TIMEOUT)
 
             if not message:
-                time.sleep(0.01)
                 continue
 
             data = ujson.loads(message['data'])
@@ -662,8 +657,6 @@ class ServiceLogic(BaseLogic):
 
                 client.write_points(points)
 
-            time.sleep(0.01)
-
     def service_journal_updater(self, *args, **kwargs):
         """
         Заносит в БД записи для журнала веб-интерфейса
@@ -686,10 +679,9 @@ class ServiceLogic(BaseLogic):
         month_ago_timestamp = month_ago.timestamp()
 
         while self.isRunning:
-            message = p.get_message()
+            message = p.get_message(timeout=SUBSCRIBER_TIMEOUT)
 
             if not message:
-                time.sleep(0.01)
                 continue
 
             with connection:
@@ -700,8 +692,6 @@ class ServiceLogic(BaseLogic):
                 del_cmd = 'DELETE FROM log_entries WHERE timestamp < {}'.format(month_ago_timestamp)
                 cursor.execute(del_cmd)
 
-            time.sleep(0.01)
-
     def service_insulation_massages_translator(self, *args, **kwargs):
         """
         Транслирует запросы на измерение сопротивление изоляции
@@ -714,10 +704,9 @@ class ServiceLogic(BaseLogic):
 
         while self.isRunning:
 
-            message = subscriber.get_message()
+            message = subscriber.get_message(timeout=SUBSCRIBER_TIMEOUT)
 
             if not message:
-                time.sleep(0.01)
                 continue
 
             channel = message['channel']
@@ -726,5 +715,3 @@ class ServiceLogic(BaseLogic):
                 self.r.publish('axiomLogic:request:insulation', message['data'])
             elif channel == 'axiomLowLevelCommunication:response:insulation':
                 self.r.publish('axiomLogic:response:insulation', message['data'])
-
-            time.sleep(0.01)
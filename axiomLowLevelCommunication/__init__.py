@@ -1,2 +1,3 @@
 from .highLowTransceiver import HighLowTransceiver
-hlt = HighLowTransceiver()
+from .asyncHighLowTransceiver import AsyncHighLowTransceiver
+from .shardSupervisor import ShardSupervisor
@@ -0,0 +1,814 @@
+import asyncio
+import sys
+import threading
+from axiomLowLevelCommunication.asyncSerialTransceiver import AsyncSerialTransceiver
+from axiomLowLevelCommunication.config import POWER_UNIT_STATES_TABLE, POWER_UNIT_SIGNALS_TABLE, \
+    INPUT_CMD_STATE_CHANNEL, INPUT_REQUEST_INSULATION_CHANNEL, COMMAND_WAIT_TIMEOUT, \
+    COMMAND_LISTEN_TIMEOUT, INSULATION_MAX_PARALLEL_PORTS, INIT_WAIT_TIMEOUT, CONFIGURE_WAIT_TIMEOUT, \
+    INSULATION_QUEUE_DEPTH
+from axiomLowLevelCommunication.highLowTransceiver import HighLowTransceiver
+
+
+class AsyncHighLowTransceiver(HighLowTransceiver):
+    """
+    Режим работы :class:`~axiomLowLevelCommunication.highLowTransceiver.HighLowTransceiver`,
+    в котором опрос модулей и выполнение команд реализованы корутинами одного цикла событий asyncio
+
+    Вместо потока на каждую команду создается задача цикла событий, а ожидание результата
+    исполнения команды выполняется по событию изменения состояния модуля, без активного опроса
+    структуры состояния
+    """
+
+    transceiver_class = AsyncSerialTransceiver
+
+    def __init__(self, settings=None, shard=None, redis_client=None):
+        """
+        Инициализирует экземпляр класса
+
+        Параметры аналогичны :meth:`HighLowTransceiver.__init__`
+
+        :ivar loop: цикл событий
+        :ivar async_ch_locks: объекты блокировки управления каналами силовых модулей для корутин
+        :ivar unit_state_events: события получения новой посылки от каждого силового модуля
+        :ivar commands: очередь сообщений от модуля "Логика"
+        :ivar command_ready: события поступления команд в очереди отправки каждого порта
+        :ivar command_writers: задачи отправки команд каждого порта
+        :ivar pending_states: ожидающие выполнения команды установки состояния по адресам каналов
+        :ivar state_workers: задачи выполнения команд установки состояния по адресам каналов
+        :ivar insulation_queues: очереди силовых модулей, ожидающих измерения сопротивления изоляции,
+         на каждом порту
+        :ivar insulation_workers: задачи измерения сопротивления изоляции на каждом порту
+        :ivar insulation_ports: ограничение количества портов, на которых одновременно выполняется измерение
+         сопротивления изоляции
+        """
+        super().__init__(settings, shard, redis_client)
+        # Цикл событий создается явно: получение цикла вне работающего цикла не поддерживается
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.async_ch_locks = {ch_addr: asyncio.Lock() for ch_addr in self.ch_locks}
+        self.unit_state_events = {unit_addr: asyncio.Event() for unit_addr in self.power_unit_addrs}
+        self.commands = asyncio.Queue()
+        self.command_ready = {port: asyncio.Event() for port in self.port_transceivers}
+        self.command_writers = {}
+        self.pending_states = {}
+        self.state_workers = {}
+        self.insulation_queues = {port: asyncio.Queue(maxsize=INSULATION_QUEUE_DEPTH)
+                                  for port in self.port_transceivers}
+        self.insulation_workers = {}
+        self.insulation_ports = asyncio.Semaphore(INSULATION_MAX_PARALLEL_PORTS)
+        # Координатор инициализации запускает корутины инициализации в цикле событий
+        self.init_coordinator.init_unit = self.run_init_power_unit
+
+    def run_init_power_unit(self, unit_addr):
+        """
+        Выполняет инициализацию силового модуля :meth:`init_power_unit` в цикле событий и ожидает ее завершения
+
+        Вызывается из потока координатора инициализации :attr:`init_coordinator`
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :rtype: bool
+        :return: True - инициализация прошла успешно, False - возникли ошибки
+        """
+        return asyncio.run_coroutine_threadsafe(self.init_power_unit(unit_addr), self.loop).result()
+
+    def notify_unit_state(self, unit_addr):
+        """
+        Будит корутины, ожидающие изменения состояния силового модуля
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        """
+        event = self.unit_state_events[unit_addr]
+        self.unit_state_events[unit_addr] = asyncio.Event()
+        event.set()
+
+    async def wait_for_unit_state(self, unit_addr, predicate, timeout, record='st'):
+        """
+        Ожидает, пока состояние силового модуля не будет удовлетворять условию
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :type predicate: callable
+        :param predicate: условие, принимает запись состояния модуля
+         (:class:`~axiomLowLevelCommunication.unitState.StateRecord`)
+        :type timeout: float
+        :param timeout: максимальное время ожидания [с]
+        :type record: str
+        :param record: имя записи состояния ('st' - состояние каналов, 'isol' - сопротивление изоляции и т.д.)
+        :rtype: bool
+        :return: True - условие выполнено, False - истек таймаут
+        """
+        deadline = self.loop.time() + timeout
+        while not predicate(self.power_units_state[unit_addr][record]):
+            remaining = deadline - self.loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self.unit_state_events[unit_addr].wait(), remaining)
+            except asyncio.TimeoutError:
+                return predicate(self.power_units_state[unit_addr][record])
+        return True
+
+    async def await_state(self, channel_addr, predicate, timeout):
+        """
+        Ожидает, пока состояние канала силового модуля не будет удовлетворять условию
+
+        Работает аналогично :meth:`HighLowTransceiver.await_state`
+
+        :type channel_addr: str
+        :param channel_addr: адрес канала силового модуля (например, "ch:m2:1")
+        :type predicate: callable
+        :param predicate: условие, принимает код состояния и код сигнала перехода канала
+        :type timeout: float
+        :param timeout: максимальное время ожидания [с]
+        :rtype: bool
+        :return: True - условие выполнено, False - истек таймаут
+        """
+        _, unit_addr, channel_position = channel_addr.split(':')
+        state_key = 'state{}'.format(channel_position)
+        signal_key = 'signal{}'.format(channel_position)
+        return await self.wait_for_unit_state(unit_addr, lambda st: predicate(st[state_key], st[signal_key]),
+                                              timeout)
+
+    async def acquire_lock(self, lock, timeout=3):
+        """
+        Захватывает блокировку с таймаутом
+
+        :type lock: asyncio.Lock
+        :param lock: блокировка
+        :type timeout: float
+        :param timeout: максимальное время ожидания [с]
+        :rtype: bool
+        :return: True - блокировка захвачена, False - истек таймаут
+        """
+        try:
+            await asyncio.wait_for(lock.acquire(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def submit_command(self, unit_addr, data, supersede=True):
+        """
+        Ставит команду модулю в очередь команд его последовательного порта
+
+        Работает аналогично :meth:`HighLowTransceiver.submit_command`; команды из очереди
+        записываются в порт задачей :meth:`command_writer_target`
+
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type data: str
+        :param data: команда
+        :type supersede: bool
+        :param supersede: False - команда не замещает ожидающую отправки команду для того же канала
+        :rtype: :class:`~axiomLowLevelCommunication.commandScheduler.Command`
+        :return: команда
+        """
+        port = self.unit_addrs_to_transceivers_map[unit_addr].port
+        command = self.command_schedulers[port].queue.push(data, supersede)
+        self.command_ready[port].set()
+        writer = self.command_writers.get(port)
+        if writer is None or writer.done():
+            self.command_writers[port] = self.loop.create_task(self.command_writer_target(port))
+        return command
+
+    async def wait_command(self, command):
+        """
+        Ожидает записи команды в порт (для замещенной команды - записи замещающей команды)
+
+        :type command: :class:`~axiomLowLevelCommunication.commandScheduler.Command`
+        :rtype: bool
+        :return: True - команда записана в порт, False - команда не записана или истек таймаут
+        """
+        future = self.loop.create_future()
+        command.add_result_callback(lambda ok: future.done() or future.set_result(ok))
+        try:
+            return await asyncio.wait_for(future, COMMAND_WAIT_TIMEOUT)
+        except asyncio.TimeoutError:
+            return False
+
+    async def send_command(self, unit_addr, data, wait=True, supersede=True):
+        """
+        Отправляет команду модулю через очередь команд его последовательного порта (см. :meth:`submit_command`)
+
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type data: str
+        :param data: команда
+        :type wait: bool
+        :param wait: ожидать записи команды в порт
+        :type supersede: bool
+        :param supersede: замещать ожидающую отправки команду для того же канала
+        :rtype: bool
+        :return: True - команда (или замещающая ее команда) записана в порт (или команда поставлена в очередь,
+         если wait=False), False - команда не записана
+        """
+        command = self.submit_command(unit_addr, data, supersede)
+        if not wait:
+            return command.status not in ('rejected', 'superseded')
+        return await self.wait_command(command)
+
+    async def command_writer_target(self, port):
+        """
+        Записывает команды из очереди отправки в последовательный порт в порядке приоритета
+
+        :type port: str
+        :param port: имя файла последовательного порта в ОС
+        """
+        queue = self.command_schedulers[port].queue
+        transceiver = self.port_transceivers[port]
+        while True:
+            command = queue.pop()
+            if command is None:
+                self.command_ready[port].clear()
+                await self.command_ready[port].wait()
+                continue
+            try:
+                ok = await transceiver.write_frame(command.data)
+            except Exception as e:
+                self.logger.error('Ошибка при записи команды "{}" в порт {}: {}'.format(command.data, port, e))
+                ok = False
+            queue.complete(command, ok)
+
+    async def update_port_state(self, port):
+        """
+        Обрабатывает посылки от модулей, подключенных к последовательному порту, по мере их поступления
+
+        :type port: str
+        :param port: имя файла последовательного порта в ОС
+        """
+        transceiver = self.port_transceivers[port]
+        demultiplexer = self.port_demultiplexers[port]
+        while self.isRunning:
+            raw_data = await transceiver.read_frame()
+            try:
+                unit_addr = demultiplexer.dispatch(raw_data)
+            except Exception as e:
+                self.logger.error('Ошибка при обработке посылки {}: {}'.format(raw_data, e))
+                continue
+            if unit_addr in self.unit_state_events:
+                self.notify_unit_state(unit_addr)
+
+    async def reader_target(self):
+        """
+        Подключает открытые последовательные порты модулей к циклу событий и запускает их опрос
+
+        Порты, открытые позже (см. :attr:`port_bring_up`), подключаются после открытия. Порт, отключенный
+        от цикла событий из-за ошибки чтения, закрывается и открывается повторно в фоне
+        """
+        tasks = {}
+        try:
+            while self.isRunning:
+                for port, transceiver in self.port_transceivers.items():
+                    if port in tasks and transceiver.loop is None:
+                        tasks.pop(port).cancel()
+                        self.logger.warning('Чтение из порта {} прервано, порт будет открыт повторно'.format(port))
+                        self.port_bring_up.reopen(port)
+                    elif port not in tasks and self.port_bring_up.is_open(port) and transceiver.attach(self.loop):
+                        tasks[port] = self.loop.create_task(self.update_port_state(port))
+                await asyncio.sleep(1)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            for transceiver in self.port_transceivers.values():
+                transceiver.detach()
+
+    async def init_power_unit(self, unit_addr):
+        """
+        Инициализирует силовой модуль
+
+        Работает аналогично :meth:`HighLowTransceiver.init_power_unit`
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :rtype: bool
+        :return: True - инициализация прошла успешно, False - возникли ошибки
+        """
+        await asyncio.sleep(0.1)
+
+        # Смотрим в каком состоянии были каналы до перезагрузки
+        raw_prev_states = self.redis.mget(['ch:{}:{}'.format(unit_addr, ch_position) for ch_position in ('1', '2')])
+
+        ch1_lock = self.async_ch_locks['ch:{}:1'.format(unit_addr)]
+        ch2_lock = self.async_ch_locks['ch:{}:2'.format(unit_addr)]
+
+        def is_initialized(st):
+            return st['state1'] not in ('0', '3') and st['state2'] not in ('0', '3')
+
+        if not await self.acquire_lock(ch1_lock):
+            # Возможно инициализация уже выполняется другой задачей
+            if await self.wait_for_unit_state(unit_addr, is_initialized, timeout=3):
+                return True
+            log_msg = 'Ошибка при инициализации модуля "{}":' \
+                      ' не удается заблокировать управление первым каналом'.format(unit_addr)
+            self.logger.error(log_msg)
+            return False
+
+        if not await self.acquire_lock(ch2_lock):
+            ch1_lock.release()
+            if await self.wait_for_unit_state(unit_addr, is_initialized, timeout=3):
+                return True
+            log_msg = 'Ошибка при инициализации модуля "{}":' \
+                      ' не удается заблокировать управление вторым каналом'.format(unit_addr)
+            self.logger.error(log_msg)
+            return False
+
+        try:
+            st = self.power_units_state[unit_addr]['st']
+            if st['state1'] == '0' or st['state2'] == '0':
+                if not await self.run_power_unit(unit_addr=unit_addr):
+                    return False
+
+            st = self.power_units_state[unit_addr]['st']
+            if st['state1'] == '3' or st['state2'] == '3':
+                if not await self.configure_power_unit(unit_addr=unit_addr):
+                    return False
+        finally:
+            ch1_lock.release()
+            ch2_lock.release()
+
+        # Восстанавливаем состояние выходов, сохраненное в БД: команды обоих каналов выполняются одновременно
+        restores = []
+        for ch_position, raw_prev_ch_state in zip(('1', '2'), raw_prev_states):
+            try:
+                prev_ch_state = self.load_saved_ch_state(raw_prev_ch_state)
+                if prev_ch_state['status'] == '5':
+                    restores.append(self.set_ch_state(channel_addr='ch:{}:{}'.format(unit_addr, ch_position),
+                                                      new_state_dict=prev_ch_state, supersede=False))
+            # Если в БД было сохранено некорректное значение (или не записано никакое) - ничего не делаем
+            except (TypeError, ValueError, SyntaxError, KeyError):
+                pass
+        if restores:
+            await asyncio.gather(*restores)
+
+        return True
+
+    def log_unit_result(self, template, unit_addr, is_error):
+        """
+        Записывает в лог результат выполнения команды с текущим состоянием выходов модуля
+
+        :type template: str
+        :param template: начало сообщения, содержит место для адреса модуля
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :type is_error: bool
+        :param is_error: True - записать сообщение с уровнем ERROR, иначе INFO
+        """
+        st = self.power_units_state[unit_addr]['st']
+        log_msg = (template + ' Текущее состояние выходов: "{}" - "{}", "{}" - "{}"').format(
+            unit_addr, 'ch:{}:1'.format(unit_addr), POWER_UNIT_STATES_TABLE.get(st['state1']),
+            'ch:{}:2'.format(unit_addr), POWER_UNIT_STATES_TABLE.get(st['state2']))
+        if is_error:
+            self.logger.error(log_msg)
+        else:
+            self.logger.info(log_msg)
+
+    async def run_power_unit(self, unit_addr, retries=3):
+        """
+        Запускает ПО силового модуля
+
+        Работает аналогично :meth:`HighLowTransceiver.run_power_unit`
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :type retries: int
+        :param retries: количество возможных повторых попыток
+        :rtype: bool
+        :return: True - успешное исполнение команды, False - неуспешное
+        """
+        run_cmd = 'run start {}'.format(unit_addr)
+
+        def is_run(st):
+            return st['state1'] not in ('0', '1') and st['state2'] not in ('0', '1')
+
+        for _ in range(retries + 1):
+            if await self.send_command(unit_addr, run_cmd) and \
+                    await self.wait_for_unit_state(unit_addr, is_run, timeout=10):
+                self.log_unit_result('Запуск модуля "{}" выполнен.', unit_addr, is_error=False)
+                return True
+
+        self.log_unit_result('Ошибка при выполнении запуска модуля "{}".', unit_addr, is_error=True)
+        return False
+
+    async def configure_power_unit(self, unit_addr, retries=3):
+        """
+        Конфигурирует ПО силового модуля
+
+        Работает аналогично :meth:`HighLowTransceiver.configure_power_unit`
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :type retries: int
+        :param retries: количество возможных повторых попыток
+        :rtype: bool
+        :return: True - успешное исполнение команды, False - неуспешное
+        """
+        consumption_current_cmd, leak_current_cmd = self.build_configuration_cmds(unit_addr)
+
+        def is_configured(st):
+            return st['state1'] != '3' and st['state2'] != '3'
+
+        for _ in range(retries + 1):
+            # Время ожидания конфигурации отсчитывается от отправки первой команды
+            send_time = self.loop.time()
+            if not await self.send_command(unit_addr, consumption_current_cmd):
+                continue
+            await asyncio.sleep(0.5)
+            if not await self.send_command(unit_addr, leak_current_cmd):
+                continue
+            await asyncio.sleep(0.5)
+            if await self.wait_for_unit_state(unit_addr, is_configured,
+                                              timeout=CONFIGURE_WAIT_TIMEOUT - (self.loop.time() - send_time)):
+                self.log_unit_result('Конфигурация модуля "{}" выполнена.', unit_addr, is_error=False)
+                return True
+
+        self.log_unit_result('Ошибка при выполнении конфигурации модуля "{}".', unit_addr, is_error=True)
+        return False
+
+    def before_return_with_error(self, channel_addr, unit_addr, channel_position, new_state, template):
+        """
+        Формирует сообщение об ошибке установки состояния канала и вызывает :meth:`before_return_from_set_ch_state`
+
+        :type channel_addr: str
+        :param channel_addr: адрес канала силового модуля
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :type channel_position: str
+        :param channel_position: номер канала
+        :type new_state: str
+        :param new_state: состояние, которое требовалось установить
+        :type template: str
+        :param template: шаблон сообщения с местами для адреса канала, нового состояния, текущего состояния
+         и сигнала перехода
+        """
+        current_state = self.power_units_state[unit_addr]['st']['state{}'.format(channel_position)]
+        current_signal = self.power_units_state[unit_addr]['st']['signal{}'.format(channel_position)]
+        log_msg = template.format(channel_addr=channel_addr,
+                                  new_state=POWER_UNIT_STATES_TABLE[new_state],
+                                  current_state=POWER_UNIT_STATES_TABLE.get(current_state),
+                                  current_signal=POWER_UNIT_SIGNALS_TABLE.get(current_signal))
+        self.before_return_from_set_ch_state(channel_addr=channel_addr,
+                                             current_state=current_state,
+                                             log_msg=log_msg,
+                                             redis_error_msg=log_msg)
+
+    async def set_ch_state(self, channel_addr, new_state_dict, supersede=True):
+        """
+        Выполняет команду установки нового состояния выхода силового модуля
+
+        Работает аналогично :meth:`HighLowTransceiver.set_ch_state`
+
+        :type channel_addr: str
+        :param channel_addr: адрес канала силового модуля
+        :type new_state_dict: dict
+        :param new_state_dict: состояние канала силового модуля, которое нужно установить.
+        Формат: ``{'status': '4'|'5'}``
+        :type supersede: bool
+        :param supersede: False - команда не замещает ожидающую отправки команду для того же канала
+        :rtype: bool
+        :return: True - команда выполнена, False - возникли ошибки
+        """
+        ch_cmd = self.validate_ch_cmd(channel_addr, new_state_dict)
+        if not ch_cmd:
+            return False
+        unit_addr, channel_position, new_state = ch_cmd
+        state_key = 'state{}'.format(channel_position)
+        impossible_template = 'Невозможно установить в канале "{channel_addr}" состояние "{new_state}".' \
+                              ' Канал находится в состоянии: "{current_state}", сигнал перехода: "{current_signal}"'
+        failed_template = 'Ошибка при установке состояния "{new_state}" на выходе "{channel_addr}".' \
+                          ' Текущее состояние: "{current_state}", сигнал перехода в состояние: "{current_signal}"'
+
+        log_msg = 'Получена команда на установку состояния "{}" на выходе "{}"'.format(
+            POWER_UNIT_STATES_TABLE[new_state], channel_addr)
+        self.logger.info(log_msg)
+
+        current_state = self.power_units_state[unit_addr]['st'][state_key]
+
+        # Проверяем проинициализирован ли модуль
+        if current_state in ['0', '3']:
+            log_msg = 'Силовой выход {} находится в состоянии {}. Требуется инициализация модуля'.format(
+                channel_addr, current_state)
+            self.logger.warning(log_msg)
+            # Модуль ставится в очередь инициализации, ждем, пока канал не выйдет из состояний "0" и "3"
+            self.start_power_unit_init(unit_addr)
+            if not await self.await_state(channel_addr, lambda state, signal: state not in ('0', '3'),
+                                          timeout=INIT_WAIT_TIMEOUT):
+                self.before_return_with_error(channel_addr, unit_addr, channel_position, new_state,
+                                              impossible_template)
+                return False
+
+        current_state = self.power_units_state[unit_addr]['st'][state_key]
+
+        # Проверяем, что силовой выход не находится в состоянии fault, poff или lock
+        if current_state in ['2', '6', '7']:
+            self.before_return_with_error(channel_addr, unit_addr, channel_position, new_state, impossible_template)
+            return False
+
+        # Если состояние, которое требуется установить и так уже установлено - выходим
+        if current_state == new_state:
+            log_msg = 'Выполнение команды не требуется. Выход "{}" уже находится в состоянии "{}"'.format(
+                channel_addr, POWER_UNIT_STATES_TABLE[current_state])
+            self.before_return_from_set_ch_state(log_msg=log_msg, channel_addr=channel_addr,
+                                                 current_state=current_state)
+            return True
+
+        ch_lock = self.async_ch_locks[channel_addr]
+        if not await self.acquire_lock(ch_lock):
+            log_msg = 'Невозможно установить состояние "{}" на выходе "{}":' \
+                      ' управление заблокировано другим потоком'.format(POWER_UNIT_STATES_TABLE[new_state],
+                                                                        channel_addr)
+            self.before_return_from_set_ch_state(channel_addr=channel_addr,
+                                                 current_state=current_state,
+                                                 log_msg=log_msg,
+                                                 redis_error_msg=log_msg)
+            return False
+
+        switch = 'on' if new_state == '5' else 'off'
+        try:
+            command = self.submit_command(unit_addr, 'ch {} {} {}'.format(channel_position, switch, unit_addr),
+                                          supersede)
+            if command.status == 'superseded':
+                log_msg = 'Состояние "{}" на выходе "{}" не устанавливается: ожидает отправки команда "{}"'.format(
+                    POWER_UNIT_STATES_TABLE[new_state], channel_addr, command.replaced_by.data)
+                self.before_return_from_set_ch_state(log_msg=log_msg, channel_addr=channel_addr,
+                                                     current_state=current_state)
+                return False
+
+            if not await self.wait_command(command):
+                log_msg = 'Произошла ошибка записи в последовательный порт' \
+                          ' при установке состояния "{}" на выходе "{}". Команда не выполнена.'.format(
+                           POWER_UNIT_STATES_TABLE[new_state], channel_addr)
+                self.before_return_from_set_ch_state(channel_addr=channel_addr,
+                                                     current_state=current_state,
+                                                     log_msg=log_msg,
+                                                     redis_error_msg=log_msg)
+                return False
+
+            await self.await_state(channel_addr, lambda state, signal: state in (new_state, '2', '6', '7'), timeout=2)
+            current_state = self.power_units_state[unit_addr]['st'][state_key]
+
+            # Канал перешел в требуемое состояние - включаем/выключаем светодиод
+            if current_state == new_state:
+                await self.send_command(unit_addr, 'led inst {} {} {}'.format(channel_position, switch, unit_addr),
+                                        wait=False, supersede=supersede)
+                return True
+
+            # Канал перешел в нерабочее состояние - выключаем светодиод
+            if current_state in ['2', '6', '7']:
+                await self.send_command(unit_addr, 'led inst {} off {}'.format(channel_position, unit_addr),
+                                        wait=False, supersede=supersede)
+        finally:
+            ch_lock.release()
+
+        self.before_return_with_error(channel_addr, unit_addr, channel_position, new_state, failed_template)
+        return False
+
+    async def measure_insulation_resistance(self, channel_addr):
+        """
+        Выполняет команду измерения сопротивления изоляции канала силового модуля
+
+        Работает аналогично :meth:`HighLowTransceiver.measure_insulation_resistance`
+
+        :type channel_addr: str
+        :param channel_addr: адрес канала силового модуля
+        :rtype: bool
+        :return: True - сопротивление изоляции измерено, False - возникли ошибки
+        """
+        _, unit_addr, channel_position = channel_addr.split(':')
+        return await self.measure_unit_insulation(unit_addr, [channel_position])
+
+    async def measure_unit_insulation(self, unit_addr, channel_positions):
+        """
+        Измеряет сопротивление изоляции каналов силового модуля в одном окне обслуживания
+
+        Работает аналогично :meth:`HighLowTransceiver.measure_unit_insulation`
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :type channel_positions: list
+        :param channel_positions: номера каналов ('1', '2')
+        :rtype: bool
+        :return: True - сопротивление изоляции всех каналов измерено, False - возникли ошибки
+        """
+        self.power_units_maintenance[unit_addr] = True
+        for channel_position in channel_positions:
+            self.power_units_state[unit_addr]['isol']['isol{}'.format(channel_position)] = None
+        try:
+            # Сбрасываем модуль
+            if not await self.send_command(unit_addr, 'rst {}'.format(unit_addr)):
+                log_msg = 'Не удалось выполнить измерение сопротивления изоляции силового модуля {}' \
+                          ' из-за ошибки записи  в последовательный порт команды сброса'.format(unit_addr)
+                self.logger.error(log_msg)
+                return False
+            if not await self.wait_for_unit_state(unit_addr, lambda st: st['state1'] == '0' and st['state2'] == '0',
+                                                  timeout=10):
+                log_msg = 'Ошибка при измерении сопротивления изоляции силового модуля {}:' \
+                          ' не удается осуществить сброс модуля'.format(unit_addr)
+                self.logger.error(log_msg)
+                return False
+
+            # Каналы измеряются после одного сброса модуля
+            measured = True
+            for channel_position in channel_positions:
+                if not await self.measure_channel_insulation(unit_addr, channel_position):
+                    measured = False
+            return measured
+        finally:
+            self.power_units_maintenance[unit_addr] = False
+
+    async def measure_channel_insulation(self, unit_addr, channel_position):
+        """
+        Измеряет сопротивление изоляции канала силового модуля, переведенного в состояние "обслуживание"
+        и сброшенного
+
+        Работает аналогично :meth:`HighLowTransceiver.measure_channel_insulation`
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :type channel_position: str
+        :param channel_position: номер канала
+        :rtype: bool
+        :return: True - сопротивление изоляции измерено, False - возникли ошибки
+        """
+        isol_key = 'isol{}'.format(channel_position)
+        ch_lock = self.async_ch_locks['ch:{}:{}'.format(unit_addr, channel_position)]
+        if not await self.acquire_lock(ch_lock):
+            log_msg = 'Не удалось выполнить измерение сопротивления изоляции в {} канале силового модуля {}:' \
+                      ' управление каналом заблокировано в другом потоке'.format(channel_position, unit_addr)
+            self.logger.error(log_msg)
+            return False
+        try:
+            if not await self.send_command(unit_addr, 'resist start {} {}'.format(channel_position, unit_addr)):
+                log_msg = 'Не удалось выполнить измерение сопротивления изоляции в {} канале силового модуля {}' \
+                          ' из-за ошибки записи команды в последовательный порт'.format(channel_position,
+                                                                                        unit_addr)
+                self.logger.error(log_msg)
+                return False
+            # Результат проверяется при получении каждой посылки от модуля
+            if await self.wait_for_unit_state(unit_addr, lambda isol: isol[isol_key] is not None, 3,
+                                              record='isol'):
+                return True
+            log_msg = 'Не удалось выполнить измерение сопротивления изоляции в {} канале силового модуля {}' \
+                      ' нет ответа от ПО низкого уровня'.format(channel_position, unit_addr)
+            self.logger.error(log_msg)
+            return False
+        finally:
+            ch_lock.release()
+
+    def submit_insulation(self, port, unit_addr, channel_positions):
+        """
+        Ставит измерение сопротивления изоляции каналов силового модуля в очередь порта
+
+        Модули из очереди порта измеряются по одному задачей :meth:`run_port_insulation`
+
+        :type port: str
+        :param port: имя файла последовательного порта модуля в ОС
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :type channel_positions: list
+        :param channel_positions: номера каналов ('1', '2')
+        :rtype: bool
+        :return: True - измерение поставлено в очередь, False - очередь порта переполнена
+        """
+        try:
+            self.insulation_queues[port].put_nowait((unit_addr, channel_positions))
+        except asyncio.QueueFull:
+            return False
+        if port not in self.insulation_workers:
+            self.insulation_workers[port] = self.loop.create_task(self.run_port_insulation(port))
+        return True
+
+    async def run_port_insulation(self, port):
+        """
+        Выполняет :meth:`measure_unit_insulation` для модулей из очереди порта, пока она не опустеет
+
+        Одновременно измерения выполняются не более чем на ``INSULATION_MAX_PARALLEL_PORTS`` портах
+
+        :type port: str
+        :param port: имя файла последовательного порта в ОС
+        """
+        queue = self.insulation_queues[port]
+        try:
+            while not queue.empty():
+                unit_addr, channel_positions = queue.get_nowait()
+                try:
+                    async with self.insulation_ports:
+                        await self.measure_unit_insulation(unit_addr, channel_positions)
+                except Exception as e:
+                    self.logger.error('Ошибка при измерении сопротивления изоляции силового модуля {}: {}'.format(
+                        unit_addr, e))
+        finally:
+            del self.insulation_workers[port]
+
+    def listen_commands(self):
+        """
+        Принимает сообщения от модуля "Логика" и передает их в очередь :attr:`commands` цикла событий
+
+        Выполняется в отдельном потоке, так как клиент Redis работает в блокирующем режиме
+        """
+        subscriber = self.redis.pubsub(ignore_subscribe_messages=True)
+        subscriber.subscribe(self.command_channel(INPUT_CMD_STATE_CHANNEL),
+                             self.command_channel(INPUT_REQUEST_INSULATION_CHANNEL))
+        while self.isRunning:
+            message = subscriber.get_message(timeout=COMMAND_LISTEN_TIMEOUT)
+            if message:
+                self.loop.call_soon_threadsafe(self.commands.put_nowait, message)
+        subscriber.close()
+
+    def submit_state_command(self, channel_addr, new_state_dict):
+        """
+        Ставит команду установки состояния выхода силового модуля в очередь канала
+
+        Команды одного канала выполняются по одной задачей :meth:`run_state_commands`. Команда замещает
+        ожидающую выполнения команду для того же канала (как в
+        :meth:`HighLowTransceiver.handle_state_command`): при серии переключений канала после выполняемой
+        команды выполняется только последняя
+
+        :type channel_addr: str
+        :param channel_addr: адрес канала силового модуля
+        :type new_state_dict: dict
+        :param new_state_dict: состояние канала силового модуля, которое нужно установить
+        """
+        if channel_addr in self.pending_states:
+            self.logger.info('Команда установки состояния {} на выходе "{}" замещена командой {}'.format(
+                self.pending_states[channel_addr], channel_addr, new_state_dict))
+        self.pending_states[channel_addr] = new_state_dict
+        if channel_addr not in self.state_workers:
+            self.state_workers[channel_addr] = self.loop.create_task(self.run_state_commands(channel_addr))
+
+    async def run_state_commands(self, channel_addr):
+        """
+        Выполняет ожидающие команды установки состояния канала, пока они есть
+
+        :type channel_addr: str
+        :param channel_addr: адрес канала силового модуля
+        """
+        try:
+            while channel_addr in self.pending_states:
+                new_state_dict = self.pending_states.pop(channel_addr)
+                try:
+                    await self.set_ch_state(channel_addr, new_state_dict)
+                except Exception as e:
+                    self.logger.error('Ошибка при выполнении команды "state" для {}: {}'.format(channel_addr, e))
+        finally:
+            del self.state_workers[channel_addr]
+
+    async def writer_target(self):
+        """
+        Обрабатывает команды от функционального модуля "Логика"
+
+        Команды установки состояния передает в :meth:`submit_state_command`, каждый модуль
+        из команды измерения сопротивления изоляции ставит в очередь его порта (:meth:`submit_insulation`).
+        При переполнении очереди команда отклоняется (:meth:`HighLowTransceiver.reject_command`)
+        """
+        listener = threading.Thread(target=self.listen_commands, daemon=True)
+        listener.start()
+        while self.isRunning:
+            message = await self.commands.get()
+            if message['channel'] == self.command_channel(INPUT_CMD_STATE_CHANNEL):
+                state_cmd = self.parse_state_cmd_message(message)
+                if state_cmd:
+                    self.submit_state_command(*state_cmd)
+            elif message['channel'] == self.command_channel(INPUT_REQUEST_INSULATION_CHANNEL):
+                self.logger.info('Получена команда на измерение сопротивления изоляции: {}'.format(message['data']))
+                for port, unit_addr, channel_positions in self.plan_insulation_campaign(message['data']):
+                    if not self.submit_insulation(port, unit_addr, channel_positions):
+                        for channel_position in channel_positions:
+                            self.reject_command('ch:{}:{}'.format(unit_addr, channel_position),
+                                                'измерения сопротивления изоляции')
+
+    async def main(self):
+        """
+        Запускает опрос модулей и обработку команд и ожидает остановки программы
+        """
+        reader = self.loop.create_task(self.reader_target())
+        writer = self.loop.create_task(self.writer_target())
+        while self.isRunning:
+            await asyncio.sleep(1)
+        reader.cancel()
+        writer.cancel()
+        await asyncio.gather(reader, writer, return_exceptions=True)
+
+    def run(self):
+        """
+        Запускает основной цикл работы функционального модуля в цикле событий asyncio
+        """
+        self.logger.info('Программа запущена')
+
+        self.isRunning = True
+        self.scheduler.start()
+        try:
+            self.loop.run_until_complete(self.main())
+        except KeyboardInterrupt:
+            self.scheduler.shutdown()
+            self.isRunning = False
+        finally:
+            self.close()
+            sys.exit(0)
+
+    def close(self):
+        """
+        Освобождает ресурсы функционального модуля (см. :meth:`HighLowTransceiver.close`) и закрывает цикл событий
+        """
+        super().close()
+        self.loop.close()
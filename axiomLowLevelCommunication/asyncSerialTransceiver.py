@@ -0,0 +1,183 @@
+import asyncio
+import os
+import time
+import serial
+from axiomLowLevelCommunication.config import ASYNC_FRAME_QUEUE_SIZE
+from axiomLowLevelCommunication.frameBuffer import FrameBuffer
+from axiomLowLevelCommunication.serialTransceiver import SerialTransceiver
+from axiomLowLevelCommunication.trafficCapture import DIRECTION_OUT
+
+
+class AsyncSerialTransceiver(SerialTransceiver):
+    """
+    Вариант :class:`~axiomLowLevelCommunication.serialTransceiver.SerialTransceiver` для работы в цикле asyncio
+
+    Чтение выполняется по готовности дескриптора порта (``loop.add_reader``): принятые посылки
+    складываются в очередь и выдаются корутиной :meth:`read_frame`. Запись выполняется корутиной
+    :meth:`write_frame` без блокировки цикла событий. Синхронные методы базового класса
+    остаются доступными
+    """
+
+    def __init__(self, port, **kwargs):
+        """
+        Инициализирует экземпляр класса
+
+        :type port: str
+        :param port: имя файла последовательного порта в ОС
+        :param kwargs: параметры :class:`~axiomLowLevelCommunication.serialTransceiver.SerialTransceiver`
+
+        :ivar loop: цикл событий, к которому подключен порт (None - порт не подключен)
+        :ivar frames: очередь принятых посылок
+        :ivar frame_buffer: буфер приема
+        :ivar write_lock: блокировка записи в порт из разных корутин
+        :ivar dropped_frames: количество посылок, отброшенных из-за переполнения очереди
+        """
+        super().__init__(port, **kwargs)
+        self.loop = None
+        self.frames = None
+        self.frame_buffer = FrameBuffer()
+        self.write_lock = None
+        self.dropped_frames = 0
+
+    def attach(self, loop):
+        """
+        Подключает порт к циклу событий
+
+        :type loop: asyncio.AbstractEventLoop
+        :param loop: цикл событий
+        :rtype: bool
+        :return: True - порт подключен, False - порт не открыт
+        """
+        fd = self.fileno()
+        if fd is None:
+            self.logger.error('Последовательный порт {} не открыт и не будет опрашиваться'.format(self.port))
+            return False
+        self.loop = loop
+        self.frames = asyncio.Queue(maxsize=ASYNC_FRAME_QUEUE_SIZE)
+        self.write_lock = asyncio.Lock()
+        loop.add_reader(fd, self.on_readable)
+        return True
+
+    def detach(self):
+        """
+        Отключает порт от цикла событий
+        """
+        if self.loop is None:
+            return
+        fd = self.fileno()
+        if fd is not None:
+            self.loop.remove_reader(fd)
+        self.loop = None
+
+    def on_readable(self):
+        """
+        Читает принятые данные и помещает полные посылки в очередь :attr:`frames`
+
+        Вызывается циклом событий при готовности дескриптора порта к чтению
+        """
+        if self.read_into(self.frame_buffer) is None:
+            self.detach()
+            return
+        for frame in self.frame_buffer.frames():
+            # При переполнении очереди отбрасываем самую старую посылку
+            if self.frames.full():
+                self.frames.get_nowait()
+                self.dropped_frames += 1
+            # Посылка обрабатывается позже, поэтому копируется из буфера приема
+            self.frames.put_nowait(bytes(frame))
+
+    async def read_frame(self):
+        """
+        Возвращает следующую принятую посылку
+
+        :rtype: bytes
+        :return: посылка без терминальной последовательности
+        """
+        return await self.frames.get()
+
+    async def write_frame(self, data):
+        """
+        Записывает команду в последовательный порт, не блокируя цикл событий
+
+        Запись начинается после освобождения линии от принимаемой посылки (см.
+        :meth:`~axiomLowLevelCommunication.halfDuplexScheduler.HalfDuplexScheduler.idle_delay`).
+        Если буфер порта заполнен, ожидает готовности дескриптора к записи. При заданных паузах
+        между байтами (:attr:`pacer`) время отправки каждого байта отсчитывается от начала
+        посылки по часам цикла событий, поэтому ошибка таймера не накапливается
+
+        :type data: str
+        :param data: строка для записи
+        :rtype: bool
+        :return: True - нет ошибок при записи, False - возникли ошибки
+        """
+        frame = '{}\n'.format(data).encode()
+        start_time = time.perf_counter()
+        async with self.write_lock:
+            idle_delay = self.scheduler.idle_delay()
+            while idle_delay:
+                await asyncio.sleep(idle_delay)
+                idle_delay = self.scheduler.idle_delay()
+            try:
+                if self.pacer:
+                    start = self.loop.time()
+                    for i in range(len(frame)):
+                        await self.wait_until(start + i * self.pacer.byte_period)
+                        await self.write_bytes(frame[i:i + 1])
+                else:
+                    await self.write_bytes(frame)
+            except (OSError, serial.SerialException) as e:
+                log_msg = 'Ошибка при записи команды {} в последовательный порт: {}'.format(data, e)
+                self.logger.error(log_msg)
+                self.write_errors += 1
+                return False
+        self.write_latency.add(time.perf_counter() - start_time)
+        self.record(DIRECTION_OUT, frame)
+        return True
+
+    async def wait_until(self, deadline):
+        """
+        Ожидает наступления момента времени deadline (по часам цикла событий :meth:`loop.time`)
+
+        :type deadline: float
+        :param deadline: момент времени, до которого нужно ждать
+        """
+        if deadline <= self.loop.time():
+            return
+        future = self.loop.create_future()
+        handle = self.loop.call_at(deadline, future.set_result, None)
+        try:
+            await future
+        finally:
+            handle.cancel()
+
+    async def write_bytes(self, data):
+        """
+        Записывает данные в дескриптор порта, ожидая его готовности к записи при заполненном буфере
+
+        :type data: bytes
+        :param data: данные для записи
+        """
+        fd = self.ser.fileno()
+        view = memoryview(data)
+        while view:
+            try:
+                written = os.write(fd, view)
+            except BlockingIOError:
+                written = 0
+            view = view[written:]
+            if view:
+                await self.wait_writable(fd)
+
+    async def wait_writable(self, fd):
+        """
+        Ожидает готовности дескриптора к записи
+
+        :type fd: int
+        :param fd: файловый дескриптор порта
+        """
+        future = self.loop.create_future()
+        self.loop.add_writer(fd, future.set_result, None)
+        try:
+            await future
+        finally:
+            self.loop.remove_writer(fd)
@@ -0,0 +1,136 @@
+"""
+Сравнение скорости приема и разбора посылок
+
+Старый способ: ``serial.Serial.read_until`` для каждой посылки и поиск регулярным выражением в bytes.
+Новый способ: чтение по готовности дескриптора в :class:`~axiomLowLevelCommunication.frameBuffer.FrameBuffer`
+и поиск регулярным выражением в срезе memoryview.
+
+Данные - запись реального обмена (axiomLib/serial_dump.txt), передаваемая через псевдотерминал.
+
+Запуск::
+
+    python -m axiomLowLevelCommunication.benchmarks.bench_frame_splitter [количество повторов]
+"""
+import os
+import pty
+import re
+import selectors
+import sys
+import threading
+import time
+import tty
+import serial
+from axiomLowLevelCommunication.frameBuffer import FrameBuffer
+from axiomLowLevelCommunication.parcelParser import POWER_UNIT_PARCEL_REGEX
+
+DUMP_FILE = os.path.join(os.path.dirname(__file__), '..', '..', 'axiomLib', 'serial_dump.txt')
+
+
+def load_stream(repeats):
+    """
+    Формирует поток данных из записи обмена
+
+    :type repeats: int
+    :param repeats: количество повторов записи
+    :rtype: tuple
+    :return: (данные, количество посылок)
+    """
+    with open(DUMP_FILE, 'rb') as f:
+        lines = [line.rstrip(b'\r\n') for line in f.read().split(b'\n')]
+    chunk = b''.join(line + b'\r\n' for line in lines if line)
+    return chunk * repeats, chunk.count(b'\r\n') * repeats
+
+
+def open_pty():
+    """
+    Открывает псевдотерминал
+
+    :rtype: tuple
+    :return: (дескриптор ведущей стороны, имя файла ведомой стороны)
+    """
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    name = os.ttyname(slave)
+    os.close(slave)
+    return master, name
+
+
+def send(master, data):
+    """
+    Передает данные в псевдотерминал частями
+
+    :type master: int
+    :param master: дескриптор ведущей стороны
+    :type data: bytes
+    :param data: данные
+    """
+    view = memoryview(data)
+    while view:
+        view = view[os.write(master, view[:1024]):]
+
+
+def bench_read_until(data, frames_count, regex):
+    """
+    Прием посылок старым способом
+
+    :rtype: float
+    :return: время приема и разбора всех посылок [с]
+    """
+    master, name = open_pty()
+    ser = serial.Serial(port=name, baudrate=115200, timeout=1)
+    writer = threading.Thread(target=send, args=(master, data), daemon=True)
+    start_time = time.perf_counter()
+    writer.start()
+    for _ in range(frames_count):
+        regex.search(ser.read_until(b'\r\n'))
+    elapsed = time.perf_counter() - start_time
+    writer.join()
+    ser.close()
+    os.close(master)
+    return elapsed
+
+
+def bench_frame_buffer(data, frames_count, regex):
+    """
+    Прием посылок через :class:`~axiomLowLevelCommunication.frameBuffer.FrameBuffer`
+
+    :rtype: float
+    :return: время приема и разбора всех посылок [с]
+    """
+    master, name = open_pty()
+    ser = serial.Serial(port=name, baudrate=115200, timeout=1)
+    selector = selectors.DefaultSelector()
+    selector.register(ser.fileno(), selectors.EVENT_READ)
+    frame_buffer = FrameBuffer()
+    writer = threading.Thread(target=send, args=(master, data), daemon=True)
+    received = 0
+    start_time = time.perf_counter()
+    writer.start()
+    while received < frames_count:
+        selector.select(1)
+        frame_buffer.fill(ser.fileno())
+        for frame in frame_buffer.frames():
+            regex.search(frame)
+            received += 1
+    elapsed = time.perf_counter() - start_time
+    writer.join()
+    selector.close()
+    ser.close()
+    os.close(master)
+    return elapsed
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    data, frames_count = load_stream(repeats)
+    regex = re.compile((POWER_UNIT_PARCEL_REGEX % 'm2').encode())
+
+    for name, bench in (('read_until', bench_read_until), ('FrameBuffer', bench_frame_buffer)):
+        elapsed = bench(data, frames_count, regex)
+        print('{:<12} {:>8} посылок за {:.3f} с: {:>10.0f} посылок/с'.format(name, frames_count, elapsed,
+                                                                          frames_count / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Измерение задержки записи команд при одновременном чтении из последовательного порта (режим приема 'threads')
+
+Старый способ: чтение ``read_until`` с таймаутом 0.1 с под блокировкой ``ser_lock``, приоритет записи
+через ``write_event``. Новый способ: окна чтения и слоты записи
+:class:`~axiomLowLevelCommunication.halfDuplexScheduler.HalfDuplexScheduler`.
+
+Для каждого способа измеряется время вызова записи команды при молчащей линии и при непрерывном
+потоке посылок от модулей (через псевдотерминал), а также количество принятых посылок в секунду.
+
+Запуск::
+
+    python -m axiomLowLevelCommunication.benchmarks.bench_half_duplex [количество команд]
+"""
+import os
+import pty
+import random
+import sys
+import threading
+import time
+import tty
+import serial
+from axiomLowLevelCommunication.ioStatistics import LatencyStatistics
+from axiomLowLevelCommunication.serialTransceiver import SerialTransceiver
+
+FRAME = b'st 5 4 12 13 1119m2\r\n'
+
+
+class LockHandoffTransceiver:
+    """
+    Прежняя схема разделения порта между чтением и записью
+    """
+
+    def __init__(self, port):
+        self.ser = serial.Serial(port=port, baudrate=115200, timeout=0.1)
+        self.ser_lock = threading.Lock()
+        self.write_event = threading.Event()
+        self.write_event.set()
+
+    def write(self, data):
+        self.write_event.clear()
+        if self.ser_lock.acquire(timeout=3):
+            self.write_event.set()
+            try:
+                self.ser.write('{}\n'.format(data).encode())
+                self.ser.flush()
+            finally:
+                self.ser_lock.release()
+            return True
+        self.write_event.set()
+        return False
+
+    def read_generator(self):
+        while True:
+            self.write_event.wait(timeout=3)
+            if self.ser_lock.acquire(timeout=3):
+                try:
+                    data = self.ser.read_until(b'\r\n')
+                finally:
+                    self.ser_lock.release()
+                if data:
+                    yield data
+            time.sleep(0.01)
+
+    def close(self):
+        self.ser.close()
+
+
+def open_pty():
+    """
+    Открывает псевдотерминал
+
+    :rtype: tuple
+    :return: (дескриптор ведущей стороны, имя файла ведомой стороны)
+    """
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    name = os.ttyname(slave)
+    os.close(slave)
+    return master, name
+
+
+def bench(transceiver_class, commands_count, busy):
+    """
+    Записывает команды через случайные интервалы, пока поток чтения читает посылки
+
+    :type transceiver_class: type
+    :param transceiver_class: класс трансивера
+    :type commands_count: int
+    :param commands_count: количество команд
+    :type busy: bool
+    :param busy: True - модуль непрерывно передает посылки, False - линия молчит
+    :rtype: tuple
+    :return: (статистика времени записи команд
+     :class:`~axiomLowLevelCommunication.ioStatistics.LatencyStatistics`, принято посылок в секунду)
+    """
+    master, name = open_pty()
+    transceiver = transceiver_class(port=name)
+    stop = threading.Event()
+    received = [0]
+
+    def feed():
+        while not stop.is_set():
+            # Если поток чтения не успевает, буфер псевдотерминала заполняется и посылки теряются
+            try:
+                if busy:
+                    os.write(master, FRAME)
+            except BlockingIOError:
+                pass
+            # Вычитываем команды, чтобы не переполнить буфер псевдотерминала
+            try:
+                os.read(master, 4096)
+            except BlockingIOError:
+                pass
+            time.sleep(0.002)
+
+    def read():
+        for _ in transceiver.read_generator():
+            received[0] += 1
+            if stop.is_set():
+                break
+
+    os.set_blocking(master, False)
+    threads = [threading.Thread(target=feed, daemon=True), threading.Thread(target=read, daemon=True)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+
+    statistics = LatencyStatistics()
+    rnd = random.Random(0)
+    received[0] = 0
+    start_time = time.perf_counter()
+    for i in range(commands_count):
+        time.sleep(rnd.uniform(0.005, 0.03))
+        write_time = time.perf_counter()
+        transceiver.write('ch {} on m2'.format(i % 2 + 1))
+        statistics.add(time.perf_counter() - write_time)
+
+    frames_rate = received[0] / (time.perf_counter() - start_time)
+    stop.set()
+    threads[0].join()
+    return statistics, frames_rate
+
+
+def main():
+    commands_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    for busy in (False, True):
+        print('Линия {}:'.format('занята посылками' if busy else 'молчит'))
+        for name, transceiver_class in (('ser_lock', LockHandoffTransceiver),
+                                        ('HalfDuplexScheduler', SerialTransceiver)):
+            statistics, frames_rate = bench(transceiver_class, commands_count, busy)
+            print('  {:<20} команд: {}, среднее: {:6.2f} мс, наибольшее: {:6.2f} мс, принято: {:5.0f} посылок/с'.format(
+                name, statistics.count, statistics.mean * 1000, statistics.max * 1000, frames_rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Сравнение скорости и выделения памяти при разборе посылок
+
+Старый способ: поиск регулярным выражением с альтернативой всех типов посылок, словарь групп
+с декодированием каждого значения и определение типа посылки по группам ``type_*``.
+Новый способ: :class:`~axiomLowLevelCommunication.parcelParser.ParcelParser` - выбор типа посылки
+по первому слову и проверка полей только этого типа.
+
+Данные - посылки силовых модулей из записи реального обмена (axiomLib/serial_dump.txt).
+Выделение памяти измеряется с помощью :mod:`tracemalloc`: пиковый объем временных выделений
+при разборе одной посылки и количество блоков памяти, занятых результатом разбора.
+
+Запуск::
+
+    python -m axiomLowLevelCommunication.benchmarks.bench_parcel_parser [количество повторов]
+"""
+import os
+import re
+import sys
+import time
+import tracemalloc
+from axiomLowLevelCommunication.parcelParser import ParcelParser, POWER_UNIT_PARCELS, POWER_UNIT_PARCEL_REGEX
+
+DUMP_FILE = os.path.join(os.path.dirname(__file__), '..', '..', 'axiomLib', 'serial_dump.txt')
+UNIT_ADDR_REGEX = re.compile(rb'\d(m\d+)$')
+
+
+def load_frames():
+    """
+    Читает посылки из записи обмена
+
+    :rtype: list
+    :return: список (адрес модуля, посылка) для посылок с адресом модуля в конце
+    """
+    frames = []
+    with open(DUMP_FILE, 'rb') as f:
+        for line in f.read().split(b'\n'):
+            line = line.rstrip(b'\r\n')
+            match = UNIT_ADDR_REGEX.search(line)
+            if match:
+                frames.append((match.group(1).decode(), line))
+    return frames
+
+
+class RegexParser:
+    """
+    Прежний разбор посылок силового модуля регулярным выражением
+    """
+
+    def __init__(self, unit_addr):
+        self.regex = re.compile((POWER_UNIT_PARCEL_REGEX % unit_addr).encode())
+
+    def parse(self, frame):
+        byte_parcel = self.regex.search(frame)
+        if not byte_parcel:
+            return None
+        parcel = {key: value.decode() for key, value in byte_parcel.groupdict().items() if value}
+        parcel['type'] = parcel.get('type_st') or \
+                         parcel.get('type_adc') or \
+                         parcel.get('type_ld') or \
+                         parcel.get('type_tmpr') or \
+                         parcel.get('type_rply')
+        return parcel
+
+
+def bench_speed(parsers, frames, repeats):
+    """
+    :rtype: float
+    :return: разобрано посылок в секунду
+    """
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        for unit_addr, frame in frames:
+            parsers[unit_addr].parse(frame)
+    return len(frames) * repeats / (time.perf_counter() - start_time)
+
+
+def bench_memory(parsers, frames):
+    """
+    :rtype: tuple
+    :return: (средний пиковый объем временных выделений на посылку [байт],
+     среднее количество блоков памяти, занятых результатом разбора)
+    """
+    peak_total = 0
+    blocks_total = 0
+    results = []
+    tracemalloc.start()
+    for unit_addr, frame in frames:
+        parser = parsers[unit_addr]
+        # Сбрасывает учтенные блоки и пиковое значение
+        tracemalloc.clear_traces()
+        parcel = parser.parse(frame)
+        _, peak = tracemalloc.get_traced_memory()
+        blocks = len(tracemalloc.take_snapshot().traces)
+        peak_total += peak
+        blocks_total += blocks
+        # Результаты сохраняются, чтобы занятая ими память не освобождалась до конца измерения
+        results.append(parcel)
+    tracemalloc.stop()
+    return peak_total / len(frames), blocks_total / len(frames)
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    frames = load_frames()
+    unit_addrs = {unit_addr for unit_addr, _ in frames}
+    print('Посылок в записи обмена: {}'.format(len(frames)))
+
+    for name, parser_class in (('regex', RegexParser),
+                               ('ParcelParser', lambda unit_addr: ParcelParser(unit_addr, POWER_UNIT_PARCELS))):
+        parsers = {unit_addr: parser_class(unit_addr) for unit_addr in unit_addrs}
+        rate = bench_speed(parsers, frames, repeats)
+        peak, blocks = bench_memory(parsers, frames)
+        print('{:<14} {:>10.0f} посылок/с, временные выделения: {:6.0f} байт/посылку, '
+              'блоков в результате: {:4.1f} на посылку'.format(name, rate, peak, blocks))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Сравнение скорости обработки потока посылок, большая часть которых повторяет предыдущую посылку того же типа
+
+Старый способ: каждая посылка разбирается :meth:`~axiomLowLevelCommunication.parcelParser.ParcelParser.parse`
+и все поля записываются в структуру состояния модуля. Новый способ:
+:meth:`~axiomLowLevelCommunication.parcelParser.ParcelParser.parse_changed` - для посылки, совпадающей
+с предыдущей до счетчика, обновляется только счетчик.
+
+Поток посылок силовых модулей ("st", "adc", "ld", "tmpr" по очереди) генерируется так, что заданная доля
+посылок (по умолчанию 95%) отличается от предыдущей посылки того же типа только счетчиком.
+
+Запуск::
+
+    python -m axiomLowLevelCommunication.benchmarks.bench_repeated_parcels [доля повторов] [количество посылок]
+"""
+import random
+import sys
+import time
+from axiomLowLevelCommunication.parcelParser import ParcelParser, POWER_UNIT_PARCELS
+from axiomLowLevelCommunication.unitState import UnitState, POWER_UNIT_STATE_RECORDS
+
+UNIT_ADDRS = ['m{}'.format(i) for i in range(1, 9)]
+
+
+def random_payload(rnd, parcel_type):
+    """
+    :rtype: str
+    :return: посылка заданного типа со случайными значениями полей без счетчика и адреса
+    """
+    if parcel_type == 'st':
+        return 'st {} {} {} {}'.format(rnd.choice('4567'), rnd.choice('4567'), rnd.randint(0, 20), rnd.randint(0, 20))
+    if parcel_type == 'adc':
+        return 'adc {:.3f} {:.3f}'.format(rnd.uniform(0, 10), rnd.uniform(0, 10))
+    if parcel_type == 'ld':
+        return 'ld {} {} {} {}'.format(rnd.randint(0, 999), rnd.randint(0, 999), rnd.randint(0, 40), rnd.randint(0, 40))
+    return 'tmpr {} {}'.format(rnd.randint(20, 60), rnd.randint(20, 60))
+
+
+def generate_frames(repeat_share, count):
+    """
+    :rtype: list
+    :return: список (адрес модуля, посылка)
+    """
+    rnd = random.Random(0)
+    payloads = {}
+    counters = dict.fromkeys(UNIT_ADDRS, 0)
+    frames = []
+    while len(frames) < count:
+        for unit_addr in UNIT_ADDRS:
+            for parcel_type in ('st', 'adc', 'ld', 'tmpr'):
+                key = (unit_addr, parcel_type)
+                if key not in payloads or rnd.random() >= repeat_share:
+                    payloads[key] = random_payload(rnd, parcel_type)
+                counters[unit_addr] += 1
+                frames.append((unit_addr, '{} {}{}'.format(payloads[key], counters[unit_addr], unit_addr).encode()))
+    return frames[:count]
+
+
+def handle_full(parsers, states, frames):
+    for unit_addr, frame in frames:
+        parcel = parsers[unit_addr].parse(frame)
+        int(parcel.cnt)
+        states[unit_addr].update_from_parcel(parcel)
+
+
+def handle_changed(parsers, states, frames):
+    for unit_addr, frame in frames:
+        parcel = parsers[unit_addr].parse_changed(frame)
+        counter = int(parcel.cnt)
+        if parcel.repeated:
+            states[unit_addr][parcel.type].update(cnt=counter)
+        else:
+            states[unit_addr].update_from_parcel(parcel)
+
+
+def main():
+    repeat_share = float(sys.argv[1]) if len(sys.argv) > 1 else 0.95
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    frames = generate_frames(repeat_share, count)
+    print('Посылок: {}, доля повторов: {:.0%}'.format(len(frames), repeat_share))
+
+    for name, handle in (('parse', handle_full), ('parse_changed', handle_changed)):
+        parsers = {unit_addr: ParcelParser(unit_addr, POWER_UNIT_PARCELS) for unit_addr in UNIT_ADDRS}
+        states = {unit_addr: UnitState(unit_addr, POWER_UNIT_STATE_RECORDS) for unit_addr in UNIT_ADDRS}
+        start_time = time.perf_counter()
+        handle(parsers, states, frames)
+        elapsed = time.perf_counter() - start_time
+        print('{:<14} {:>10.0f} посылок/с, {:5.2f} мкс/посылку'.format(
+            name, len(frames) / elapsed, elapsed / len(frames) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
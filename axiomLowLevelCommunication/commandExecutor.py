@@ -0,0 +1,213 @@
+import threading
+import time
+from collections import deque
+from axiomLib.loggers import create_logger
+from axiomLowLevelCommunication.config import LOG_FILE_DIRECTORY, LOG_FILE_NAME, EXECUTOR_WORKERS, \
+    EXECUTOR_QUEUE_DEPTH
+from axiomLowLevelCommunication.ioStatistics import LatencyStatistics
+
+# Верхние границы корзин гистограмм времени выполнения команд [с]
+COMMAND_LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+
+class CommandTypeStatistics:
+    """
+    Статистика выполнения команд одного типа в :class:`CommandExecutor`
+    """
+
+    def __init__(self):
+        """
+        Инициализирует экземпляр класса
+
+        :ivar counters: счетчики принятых, выполненных, неуспешных (обработчик вернул False или
+         возникло исключение), отклоненных и замещенных более новой командой команд
+        :ivar wait_time: статистика времени ожидания команды в очереди
+        :ivar latency: статистика времени от поступления команды до окончания ее выполнения
+        """
+        self.counters = dict.fromkeys(('submitted', 'completed', 'failed', 'rejected', 'superseded'), 0)
+        self.wait_time = LatencyStatistics(COMMAND_LATENCY_BUCKETS)
+        self.latency = LatencyStatistics(COMMAND_LATENCY_BUCKETS)
+
+    def as_dict(self):
+        """
+        :rtype: dict
+        :return: счетчики и статистика времени ожидания и выполнения
+        """
+        return dict(self.counters, wait=self.wait_time.as_dict(), latency=self.latency.as_dict())
+
+
+class CommandExecutor:
+    """
+    Выполняет команды модуля "Логика" ограниченным количеством потоков
+
+    Команды с одним ключом (адресом канала) выполняются по одной в порядке поступления,
+    команды с разными ключами - параллельно. Каналы, ожидающие выполнения, обслуживаются
+    по очереди: после выполнения команды канал становится в конец очереди готовых каналов.
+
+    Количество команд, ожидающих выполнения, ограничено: при переполнении команда отклоняется
+    (:meth:`submit` возвращает False)
+
+    Команда, поставленная в очередь с ``replace=True``, замещает ожидающую выполнения последнюю команду
+    того же типа с тем же ключом: из серии команд установки состояния канала, поступивших во время
+    выполнения предыдущей команды, выполняется только последняя
+    """
+
+    # Лог общий для исполнителя команд и исполнителя измерений сопротивления изоляции
+    logger = create_logger(logger_name=__name__,
+                           logfile_directory=LOG_FILE_DIRECTORY,
+                           logfile_name=LOG_FILE_NAME)
+
+    def __init__(self, max_workers=EXECUTOR_WORKERS, max_pending=EXECUTOR_QUEUE_DEPTH):
+        """
+        Инициализирует экземпляр класса
+
+        :type max_workers: int
+        :param max_workers: максимальное количество потоков выполнения
+        :type max_pending: int
+        :param max_pending: максимальное количество команд, ожидающих выполнения
+
+        :ivar queues: очереди команд, ожидающих выполнения, по ключам
+        :ivar statistics: статистика выполнения команд по типам (:class:`CommandTypeStatistics`)
+        :ivar max_pending_seen: наибольшее количество команд, ожидавших выполнения
+        :ivar stopped: True - исполнитель остановлен (:meth:`shutdown`), новые команды отклоняются
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.condition = threading.Condition()
+        self.queues = {}
+        self.ready = deque()
+        self.running = set()
+        self.pending = 0
+        self.workers = []
+        self.idle_workers = 0
+        self.statistics = {}
+        self.max_pending_seen = 0
+        self.stopped = False
+
+    def type_statistics(self, command_type):
+        """
+        Возвращает статистику команд типа (вызывается при захваченной блокировке)
+
+        :type command_type: str
+        :rtype: :class:`CommandTypeStatistics`
+        """
+        statistics = self.statistics.get(command_type)
+        if statistics is None:
+            statistics = self.statistics[command_type] = CommandTypeStatistics()
+        return statistics
+
+    def submit(self, key, command_type, function, *args, replace=False):
+        """
+        Ставит команду в очередь выполнения
+
+        :type key: str
+        :param key: ключ очереди (адрес канала силового модуля)
+        :type command_type: str
+        :param command_type: тип команды для статистики (например, 'state', 'insulation')
+        :type function: callable
+        :param function: обработчик команды; возвращаемое значение False считается неуспешным выполнением
+        :param args: аргументы обработчика
+        :type replace: bool
+        :param replace: True - команда замещает ожидающую выполнения последнюю команду того же типа с тем же ключом
+        :rtype: bool
+        :return: True - команда поставлена в очередь, False - команда отклонена из-за переполнения очереди
+         или остановки исполнителя
+        """
+        with self.condition:
+            statistics = self.type_statistics(command_type)
+            if self.stopped:
+                statistics.counters['rejected'] += 1
+                return False
+            queue = self.queues.get(key)
+
+            # Замещаемая команда еще не выполнялась: новая команда занимает ее место в очереди
+            if replace and queue and queue[-1][0] == command_type:
+                statistics.counters['submitted'] += 1
+                statistics.counters['superseded'] += 1
+                queue[-1] = (command_type, function, args, time.monotonic())
+                return True
+
+            if self.pending >= self.max_pending:
+                statistics.counters['rejected'] += 1
+                return False
+            statistics.counters['submitted'] += 1
+
+            if queue is None:
+                queue = self.queues[key] = deque()
+            queue.append((command_type, function, args, time.monotonic()))
+            self.pending += 1
+            self.max_pending_seen = max(self.max_pending_seen, self.pending)
+
+            # Если по ключу сейчас выполняется команда, ключ вернется в очередь готовых после ее выполнения
+            if len(queue) == 1 and key not in self.running:
+                self.ready.append(key)
+                if self.idle_workers == 0 and len(self.workers) < self.max_workers:
+                    worker = threading.Thread(target=self.worker_target, daemon=True)
+                    self.workers.append(worker)
+                    worker.start()
+                else:
+                    self.condition.notify()
+        return True
+
+    def worker_target(self):
+        """
+        Выполняет команды из очередей готовых ключей
+        """
+        while True:
+            with self.condition:
+                self.idle_workers += 1
+                while not self.ready and not self.stopped:
+                    self.condition.wait()
+                self.idle_workers -= 1
+                if self.stopped:
+                    return
+                key = self.ready.popleft()
+                queue = self.queues[key]
+                command_type, function, args, submit_time = queue.popleft()
+                self.pending -= 1
+                self.running.add(key)
+
+            start_time = time.monotonic()
+            try:
+                ok = function(*args) is not False
+            except Exception as e:
+                self.logger.error('Ошибка при выполнении команды "{}" для {}: {}'.format(command_type, key, e))
+                ok = False
+            end_time = time.monotonic()
+
+            with self.condition:
+                self.running.discard(key)
+                if queue:
+                    self.ready.append(key)
+                    self.condition.notify()
+                else:
+                    del self.queues[key]
+                statistics = self.type_statistics(command_type)
+                statistics.counters['completed' if ok else 'failed'] += 1
+            statistics.wait_time.add(start_time - submit_time)
+            statistics.latency.add(end_time - submit_time)
+
+    def shutdown(self, timeout=None):
+        """
+        Останавливает потоки выполнения: выполняемые команды завершаются, команды, ожидающие выполнения,
+        не выполняются
+
+        :type timeout: float
+        :param timeout: максимальное время ожидания завершения каждого потока [с] (None - без ограничения)
+        """
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        for worker in self.workers:
+            if worker is not threading.current_thread():
+                worker.join(timeout)
+
+    def stats(self):
+        """
+        Возвращает метрики исполнителя
+
+        :rtype: dict
+        :return: {тип команды: счетчики и статистика времени ожидания и выполнения}
+        """
+        with self.condition:
+            return {command_type: statistics.as_dict() for command_type, statistics in self.statistics.items()}
@@ -0,0 +1,376 @@
+import heapq
+import itertools
+import threading
+import time
+from axiomLib.loggers import create_logger
+from axiomLowLevelCommunication.config import LOG_FILE_DIRECTORY, LOG_FILE_NAME, COMMAND_QUEUE_DEPTH
+from axiomLowLevelCommunication.ioStatistics import LatencyStatistics
+
+# Приоритеты команд (меньшее значение - более высокий приоритет)
+PRIORITY_SAFETY = 0
+PRIORITY_STATE = 1
+PRIORITY_LED = 2
+
+
+def classify_command(data):
+    """
+    Определяет приоритет команды и ключ, по которому команда замещает ожидающие отправки команды
+
+    * "ch <канал> off" и "rst" - :data:`PRIORITY_SAFETY`;
+    * "led inst" - :data:`PRIORITY_LED`;
+    * остальные команды - :data:`PRIORITY_STATE`.
+
+    Команды "ch" и "led inst" для одного канала замещают друг друга независимо от аргумента
+    (on/off), остальные команды замещают только такие же команды
+
+    :type data: str
+    :param data: команда (например, "ch 1 on m2")
+    :rtype: tuple
+    :return: (приоритет, ключ)
+    """
+    words = data.split()
+    if len(words) == 4 and words[0] == 'ch':
+        priority = PRIORITY_SAFETY if words[2] == 'off' else PRIORITY_STATE
+        return priority, ('ch', words[3], words[1])
+    if len(words) == 5 and words[:2] == ['led', 'inst']:
+        return PRIORITY_LED, ('led', words[4], words[2])
+    if words[:1] == ['rst']:
+        return PRIORITY_SAFETY, data
+    return PRIORITY_STATE, data
+
+
+class Command:
+    """
+    Команда в очереди :class:`CommandQueue`
+
+    Статус команды: 'pending' - ожидает отправки, 'written' - записана в порт, 'failed' - ошибка записи,
+    'superseded' - замещена другой командой для того же канала (:attr:`replaced_by`),
+    'rejected' - отклонена из-за переполнения очереди. Результатом замещенной команды считается
+    результат замещающей команды
+    """
+
+    def __init__(self, data, priority, key):
+        """
+        Инициализирует экземпляр класса
+
+        :type data: str
+        :param data: команда
+        :type priority: int
+        :param priority: приоритет
+        :param key: ключ замещения
+
+        :ivar submit_time: время постановки в очередь (по часам :func:`time.monotonic`)
+        :ivar status: статус команды
+        :ivar replaced_by: команда, которой замещена команда (None - команда не замещена)
+        """
+        self.data = data
+        self.priority = priority
+        self.key = key
+        self.submit_time = time.monotonic()
+        self.status = 'pending'
+        self.replaced_by = None
+        self.event = threading.Event()
+        self.callbacks = []
+
+    def finish(self, status):
+        """
+        Устанавливает итоговый статус команды и оповещает ожидающих
+
+        :type status: str
+        :param status: статус
+        """
+        self.status = status
+        self.event.set()
+        for callback in self.callbacks:
+            callback(self)
+
+    def add_done_callback(self, callback):
+        """
+        Добавляет функцию, вызываемую с командой после установки итогового статуса
+
+        :type callback: callable
+        :param callback: функция
+        """
+        if self.status == 'pending':
+            self.callbacks.append(callback)
+        else:
+            callback(self)
+
+    def add_result_callback(self, callback):
+        """
+        Добавляет функцию, вызываемую с результатом записи команды (для замещенной команды -
+        с результатом замещающей команды)
+
+        :type callback: callable
+        :param callback: функция, принимает True - команда записана в порт, False - не записана
+        """
+        def on_done(command):
+            if command.status == 'superseded':
+                command.replaced_by.add_result_callback(callback)
+            else:
+                callback(command.status == 'written')
+        self.add_done_callback(on_done)
+
+    def wait(self, timeout=None):
+        """
+        Ожидает завершения обработки команды; для замещенной команды ожидает завершения замещающей команды
+
+        :type timeout: float
+        :param timeout: максимальное время ожидания [с]
+        :rtype: bool
+        :return: True - команда (или замещающая ее команда) записана в порт, False - ошибка, отклонение
+         или таймаут
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        command = self
+        while True:
+            if not command.event.wait(None if deadline is None else max(0, deadline - time.monotonic())):
+                return False
+            if command.status != 'superseded':
+                return command.status == 'written'
+            command = command.replaced_by
+
+
+class CommandQueue:
+    """
+    Очередь команд одного последовательного порта с приоритетами и замещением
+
+    Команды выдаются в порядке приоритета, при равном приоритете - в порядке поступления.
+    Новая команда замещает ожидающую отправки команду с тем же ключом (см. :func:`classify_command`),
+    поэтому при серии переключений канала в порт уходит только последняя команда. Служебная команда,
+    поставленная без замещения (восстановление состояния канала), не замещает ожидающую команду,
+    а сама считается замещенной ею.
+    Глубина очереди ограничена: при переполнении отклоняется команда с наименьшим приоритетом
+    """
+
+    # Лог общий для очередей всех портов
+    logger = create_logger(logger_name=__name__,
+                           logfile_directory=LOG_FILE_DIRECTORY,
+                           logfile_name=LOG_FILE_NAME)
+
+    def __init__(self, port, max_depth=COMMAND_QUEUE_DEPTH):
+        """
+        Инициализирует экземпляр класса
+
+        :type port: str
+        :param port: имя файла последовательного порта в ОС
+        :type max_depth: int
+        :param max_depth: максимальное количество команд, ожидающих отправки
+
+        :ivar pending: команды, ожидающие отправки, по ключам замещения
+        :ivar wait_time: статистика времени ожидания команд в очереди
+        :ivar counters: счетчики поставленных в очередь, записанных, ошибочных, замещенных и отклоненных команд
+        :ivar max_depth_seen: наибольшая глубина очереди
+        :ivar closed: True - очередь закрыта (:meth:`close`), новые команды отклоняются
+        """
+        self.port = port
+        self.max_depth = max_depth
+        self.condition = threading.Condition()
+        self.heap = []
+        self.sequence = itertools.count()
+        self.pending = {}
+        self.wait_time = LatencyStatistics()
+        self.counters = dict.fromkeys(('submitted', 'written', 'failed', 'superseded', 'rejected'), 0)
+        self.max_depth_seen = 0
+        self.closed = False
+
+    def __len__(self):
+        """
+        :rtype: int
+        :return: количество команд, ожидающих отправки
+        """
+        return len(self.pending)
+
+    def finish(self, command, status):
+        """
+        Устанавливает итоговый статус команды с учетом его в счетчиках (вызывается при захваченной блокировке)
+
+        :type command: :class:`Command`
+        :type status: str
+        """
+        self.counters[status] += 1
+        command.finish(status)
+
+    def push(self, data, supersede=True):
+        """
+        Ставит команду в очередь
+
+        :type data: str
+        :param data: команда
+        :type supersede: bool
+        :param supersede: True - команда замещает ожидающую отправки команду с тем же ключом,
+         False - команда не ставится в очередь, если такая команда есть
+        :rtype: :class:`Command`
+        :return: команда; если очередь переполнена или закрыта, команда возвращается со статусом 'rejected',
+         если команда не замещает ожидающую команду - со статусом 'superseded'
+        """
+        priority, key = classify_command(data)
+        command = Command(data, priority, key)
+        with self.condition:
+            self.counters['submitted'] += 1
+            if self.closed:
+                self.finish(command, 'rejected')
+                return command
+
+            superseded = self.pending.get(key)
+            if superseded is not None and not supersede:
+                command.replaced_by = superseded
+                self.finish(command, 'superseded')
+                return command
+
+            if superseded is not None:
+                del self.pending[key]
+                superseded.replaced_by = command
+                self.finish(superseded, 'superseded')
+                # Замещающая команда не должна отправляться позже замещенной
+                command.priority = min(command.priority, superseded.priority)
+
+            elif len(self.pending) >= self.max_depth:
+                victim = max(self.pending.values(), key=lambda c: (c.priority, c.submit_time))
+                if victim.priority <= command.priority:
+                    self.logger.error('Команда "{}" не поставлена в очередь порта {}: очередь переполнена'.format(
+                        data, self.port))
+                    self.finish(command, 'rejected')
+                    return command
+                del self.pending[victim.key]
+                self.logger.error('Команда "{}" удалена из переполненной очереди порта {}'.format(
+                    victim.data, self.port))
+                self.finish(victim, 'rejected')
+
+            self.pending[key] = command
+            heapq.heappush(self.heap, (command.priority, next(self.sequence), command))
+            self.max_depth_seen = max(self.max_depth_seen, len(self.pending))
+            self.condition.notify()
+        return command
+
+    def pop(self, timeout=0):
+        """
+        Извлекает команду с наивысшим приоритетом
+
+        :type timeout: float
+        :param timeout: максимальное время ожидания команды [с] (None - без ограничения)
+        :rtype: :class:`Command`
+        :return: команда или None, если очередь пуста или закрыта
+        """
+        with self.condition:
+            while not self.closed:
+                while self.heap:
+                    _, _, command = heapq.heappop(self.heap)
+                    # Замещенные и отклоненные команды остаются в куче и пропускаются
+                    if self.pending.get(command.key) is command:
+                        del self.pending[command.key]
+                        self.wait_time.add(time.monotonic() - command.submit_time)
+                        return command
+                if timeout is not None and timeout <= 0:
+                    return None
+                if not self.condition.wait(timeout):
+                    timeout = 0
+            return None
+
+    def close(self):
+        """
+        Закрывает очередь: команды, ожидающие отправки, отклоняются, ожидание в :meth:`pop` прерывается
+        """
+        with self.condition:
+            self.closed = True
+            for command in self.pending.values():
+                self.finish(command, 'rejected')
+            self.pending.clear()
+            self.heap.clear()
+            self.condition.notify_all()
+
+    def complete(self, command, ok):
+        """
+        Отмечает результат записи команды в порт
+
+        :type command: :class:`Command`
+        :param command: команда, полученная из :meth:`pop`
+        :type ok: bool
+        :param ok: True - команда записана, False - ошибка записи
+        """
+        with self.condition:
+            self.finish(command, 'written' if ok else 'failed')
+
+    def stats(self):
+        """
+        Возвращает метрики очереди
+
+        :rtype: dict
+        :return: глубина очереди, счетчики команд и статистика времени ожидания
+        """
+        with self.condition:
+            stats = dict(self.counters, depth=len(self.pending), max_depth=self.max_depth_seen)
+        stats['wait'] = self.wait_time.as_dict()
+        return stats
+
+
+class CommandScheduler:
+    """
+    Отправляет команды в последовательный порт в одном потоке в порядке приоритета
+    (см. :class:`CommandQueue`)
+
+    Поток отправки запускается при поступлении первой команды
+    """
+
+    def __init__(self, transceiver, max_depth=COMMAND_QUEUE_DEPTH):
+        """
+        Инициализирует экземпляр класса
+
+        :type transceiver: :class:`~axiomLowLevelCommunication.serialTransceiver.SerialTransceiver`
+        :param transceiver: трансивер последовательного порта
+        :type max_depth: int
+        :param max_depth: максимальное количество команд, ожидающих отправки
+
+        :ivar queue: очередь команд
+        """
+        self.transceiver = transceiver
+        self.queue = CommandQueue(transceiver.port, max_depth)
+        self.thread = None
+        self.thread_lock = threading.Lock()
+
+    def submit(self, data, supersede=True):
+        """
+        Ставит команду в очередь отправки
+
+        :type data: str
+        :param data: команда
+        :type supersede: bool
+        :param supersede: замещать ожидающую отправки команду с тем же ключом (см. :meth:`CommandQueue.push`)
+        :rtype: :class:`Command`
+        :return: команда (результат отправки - :meth:`Command.wait`)
+        """
+        command = self.queue.push(data, supersede)
+        with self.thread_lock:
+            if not self.queue.closed and (self.thread is None or not self.thread.is_alive()):
+                self.thread = threading.Thread(target=self.writer_target, daemon=True)
+                self.thread.start()
+        return command
+
+    def writer_target(self):
+        """
+        Записывает команды из очереди в порт
+        """
+        while True:
+            command = self.queue.pop(timeout=None)
+            if command is None:
+                return
+            try:
+                ok = self.transceiver.write(command.data)
+            except Exception as e:
+                self.queue.logger.error('Ошибка при записи команды "{}" в порт {}: {}'.format(
+                    command.data, self.transceiver.port, e))
+                ok = False
+            self.queue.complete(command, ok)
+
+    def close(self, timeout=None):
+        """
+        Закрывает очередь команд (см. :meth:`CommandQueue.close`) и ожидает остановки потока отправки
+
+        :type timeout: float
+        :param timeout: максимальное время ожидания записи команды, которая отправляется в момент закрытия [с]
+        """
+        self.queue.close()
+        with self.thread_lock:
+            thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
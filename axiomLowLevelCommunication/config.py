@@ -73,7 +73,135 @@ INPUT_CMD_STATE_CHANNEL = 'axiomLogic:cmd:state'
 INPUT_REQUEST_INSULATION_CHANNEL = 'axiomLogic:request:insulation'
 OUTPUT_INFO_STATE_CHANNEL = 'axiomLowLevelCommunication:info:state'
 OUTPUT_INFO_METRICS_CHANNEL = 'axiomLowLevelCommunication:info:metrics_data'
+OUTPUT_INFO_LINK_CHANNEL = 'axiomLowLevelCommunication:info:link'
+
+# Префикс ключей Redis со статистикой обмена по последовательным портам
+STATS_KEY_PREFIX = 'axiomLowLevelCommunication:stats'
+
+# Интервал записи статистики обмена в Redis [с]
+STATS_PUBLISH_INTERVAL = 5
+
+# Интервал публикации энергетических характеристик силовых модулей [с] (не менее 1)
+METRICS_PUBLISH_INTERVAL = 10
+
+# Время без посылок от модуля, после которого связь с модулем считается потерянной [с]
+LINK_TIMEOUT = 3
+
+# Такт колеса таймеров контроля связи с модулями [с]
+LINK_WHEEL_TICK = 0.5
+
+# Длительность скользящего окна статистики пропущенных циклов отправки посылок [с]
+LINK_LOSS_WINDOW = 60
+
+# Напряжение электросети для расчета мощности в каналах силовых модулей [В]
+MAINS_VOLTAGE = 220
 
 # логирование
 LOG_FILE_NAME = '_axiomLowLevelCommunication.log'
 LOG_FILE_DIRECTORY = '/var/log/axiom'
+
+# Параметры последовательного порта
+SERIAL_BAUDRATE = 115200
+
+# Режим записи команд в последовательный порт:
+# 'framed' - команда целиком записывается одним вызовом write(),
+# 'bytewise' - посимвольная запись с паузой 1 мс после каждого символа
+SERIAL_WRITE_MODE = 'framed'
+
+# Пауза между байтами команды в режиме 'framed', выраженная в длительностях передачи одного символа
+# (0 - команда передается без пауз)
+SERIAL_INTER_BYTE_GAP = 0
+
+# Ожидаемая длина посылки [байт]. Определяет длительность окна чтения в режиме приема 'threads':
+# ожидающая запись задерживается не более чем на время передачи посылки этой длины
+SERIAL_FRAME_LENGTH = 64
+
+# Максимальное время ожидания слота записи в последовательный порт [с]
+SERIAL_WRITE_TIMEOUT = 3
+
+# Максимальное время ожидания открытия последовательных портов при запуске [с]. Порты открываются
+# одновременно; порты, не открытые за это время, работают в ограниченном режиме
+PORT_OPEN_DEADLINE = 2
+
+# Интервал между попытками открыть последовательный порт, работающий в ограниченном режиме [с]
+PORT_RETRY_INTERVAL = 5
+
+# Режим приема данных от низкоуровневого ПО:
+# 'selector' - все последовательные порты опрашиваются в одном потоке по готовности дескрипторов,
+# 'threads' - для каждого последовательного порта запускается отдельный поток чтения
+READER_MODE = 'selector'
+
+# Максимальная длина посылки от низкоуровневого ПО [байт]. Данные без терминальной
+# последовательности сверх этой длины отбрасываются как шум на линии
+MAX_FRAME_LENGTH = 512
+
+# Режим с контрольной суммой: посылки от низкоуровневого ПО оканчиваются контрольной суммой CRC8
+# (``<посылка>*<CRC8>``), посылки с неверной или отсутствующей контрольной суммой отбрасываются
+PARCEL_CRC_SUFFIX = False
+
+# Режим работы функционального модуля:
+# 'threads' - команды и опрос модулей выполняются в потоках,
+# 'asyncio' - команды и опрос модулей выполняются корутинами в одном цикле событий,
+# 'sharded' - порты распределяются между несколькими процессами, каждый работает в режиме 'threads'
+RUN_MODE = 'threads'
+
+# Количество процессов в режиме 'sharded' (None - по количеству ядер процессора)
+SHARD_COUNT = None
+
+# Префикс каналов Redis, из которых процессы в режиме 'sharded' принимают команды модуля "Логика"
+SHARD_CHANNEL_PREFIX = 'axiomLowLevelCommunication:shard'
+
+# Максимальное количество принятых, но не обработанных посылок для одного порта в режиме 'asyncio'
+ASYNC_FRAME_QUEUE_SIZE = 1024
+
+# Файл записи обмена по последовательным портам (None - запись не ведется)
+CAPTURE_FILE = None
+# Интервал сброса буферизованных записей обмена в файл записи [с]
+CAPTURE_FLUSH_INTERVAL = 1
+
+# БД Redis, в которую записываются ключи при воспроизведении записи обмена
+REPLAY_REDIS_DB = 15
+
+# Префикс каналов Redis, в которые публикуются сообщения при воспроизведении записи обмена
+REPLAY_CHANNEL_PREFIX = 'axiomLowLevelCommunication:replay'
+
+# Максимальное количество команд, ожидающих отправки в один последовательный порт
+COMMAND_QUEUE_DEPTH = 64
+
+# Максимальное время ожидания записи команды в последовательный порт с учетом очереди [с]
+COMMAND_WAIT_TIMEOUT = 5
+
+# Максимальное время ожидания сообщения от модуля "Логика", после которого проверяется признак остановки [с]
+COMMAND_LISTEN_TIMEOUT = 1
+
+# Максимальное время накопления пакета команд записи в Redis [с]
+REDIS_WRITE_WINDOW = 0.002
+
+# Количество команд записи в Redis, при котором пакет отправляется, не дожидаясь окончания REDIS_WRITE_WINDOW
+REDIS_WRITE_BATCH = 64
+
+# Максимальное количество потоков выполнения команд модуля "Логика"
+EXECUTOR_WORKERS = 8
+
+# Максимальное количество команд модуля "Логика", ожидающих выполнения
+EXECUTOR_QUEUE_DEPTH = 256
+
+# Максимальное количество последовательных портов, на которых одновременно выполняется инициализация
+# силовых модулей (на одном порту модули инициализируются по одному)
+INIT_MAX_PARALLEL_PORTS = 4
+
+# Время ожидания выхода каналов силового модуля из состояния "3" (nuse) при конфигурации модуля [с]
+# (отсчитывается от отправки первой команды конфигурации)
+CONFIGURE_WAIT_TIMEOUT = 3
+
+# Время ожидания инициализации силового модуля при установке состояния неинициализированного канала [с]
+# (с учетом ожидания в очереди инициализации модулей того же порта)
+INIT_WAIT_TIMEOUT = 20
+
+# Максимальное количество последовательных портов, на которых одновременно выполняется измерение
+# сопротивления изоляции (на одном порту модули измеряются по одному)
+INSULATION_MAX_PARALLEL_PORTS = 4
+
+# Максимальное количество силовых модулей, ожидающих измерения сопротивления изоляции на одном
+# последовательном порту (режим asyncio)
+INSULATION_QUEUE_DEPTH = 32
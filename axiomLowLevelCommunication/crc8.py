@@ -0,0 +1,72 @@
+"""
+Контрольная сумма CRC8 (полином 0x31) табличным способом
+
+Используется в командах установки порогов силовых модулей и для проверки посылок от модулей
+в режиме с контрольной суммой (``PARCEL_CRC_SUFFIX``): посылка имеет вид ``<посылка>*<CRC8>``,
+где ``<CRC8>`` - две шестнадцатеричные цифры контрольной суммы байтов посылки до символа ``*``
+с начальным значением :data:`CRC8_INIT`
+"""
+from axiomLowLevelCommunication.config import CRC8TABLE
+
+# Таблица для расчета контрольных сумм (байт - индекс, значение - результат для crc ^ байт)
+CRC8_TABLE = bytes(CRC8TABLE.tolist())
+
+# Начальное значение контрольной суммы
+CRC8_INIT = 0xff
+
+# Разделитель посылки и контрольной суммы
+CRC_SEPARATOR = b'*'
+
+
+def crc8(data, crc=CRC8_INIT):
+    """
+    Рассчитывает контрольную сумму
+
+    :type data: bytes or memoryview
+    :param data: данные
+    :type crc: int
+    :param crc: начальное значение
+    :rtype: int
+    :return: контрольная сумма
+    """
+    table = CRC8_TABLE
+    for byte in data:
+        crc = table[crc ^ byte]
+    return crc
+
+
+def append_crc(data):
+    """
+    Добавляет к посылке контрольную сумму
+
+    :type data: bytes
+    :param data: посылка без терминальной последовательности
+    :rtype: bytes
+    :return: ``<посылка>*<CRC8>``
+    """
+    return data + CRC_SEPARATOR + '{:02X}'.format(crc8(data)).encode()
+
+
+def strip_crc(frame):
+    """
+    Проверяет контрольную сумму посылки и отделяет ее от посылки
+
+    :type frame: bytes or memoryview
+    :param frame: посылка ``<посылка>*<CRC8>`` без терминальной последовательности
+    :rtype: tuple
+    :return: (посылка без контрольной суммы, True) - контрольная сумма верна;
+     (посылка, False) - контрольная сумма неверна или отсутствует
+    """
+    frame = memoryview(frame)
+    # Разделитель ищется в последних 4 байтах: "*", 2 цифры и, возможно, пробел
+    tail = bytes(frame[-4:])
+    stripped = tail.rstrip()
+    position = stripped.rfind(CRC_SEPARATOR)
+    if position == -1 or len(stripped) - position != 3:
+        return frame, False
+    try:
+        expected = int(stripped[position + 1:], 16)
+    except ValueError:
+        return frame, False
+    payload = frame[:len(frame) - len(tail) + position]
+    return payload, crc8(payload) == expected
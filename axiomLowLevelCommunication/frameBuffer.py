@@ -0,0 +1,141 @@
+import os
+from axiomLowLevelCommunication.config import MAX_FRAME_LENGTH
+
+
+class FrameBuffer:
+    """
+    Буфер приема данных последовательного порта с выделением посылок без копирования
+
+    Данные читаются из дескриптора сразу в заранее выделенный ``bytearray`` (:meth:`fill`).
+    Посылки выделяются поиском терминальной последовательности и выдаются как срезы
+    ``memoryview`` (:meth:`frames`), поэтому ни чтение, ни разбор не создают новых объектов bytes.
+    Когда запись доходит до конца буфера, в его начало переносится только остаток
+    неполной посылки.
+
+    Срез, выданный :meth:`frames`, действителен до следующего вызова :meth:`fill`.
+    Если посылку требуется сохранить, ее нужно скопировать (``bytes(frame)``)
+    """
+
+    TERMINATOR = b'\r\n'
+
+    def __init__(self, size=4096, max_frame_length=MAX_FRAME_LENGTH):
+        """
+        Инициализирует экземпляр класса
+
+        :type size: int
+        :param size: размер буфера [байт]
+        :type max_frame_length: int
+        :param max_frame_length: максимальная длина посылки; данные без терминальной
+         последовательности сверх этой длины отбрасываются
+
+        :ivar buffer: буфер приема
+        :ivar view: представление буфера для чтения и выдачи посылок без копирования
+        :ivar start: позиция начала неразобранных данных
+        :ivar end: позиция конца принятых данных
+        :ivar overflows: количество случаев отбрасывания данных без терминальной последовательности
+        """
+        self.buffer = bytearray(max(size, max_frame_length * 2))
+        self.view = memoryview(self.buffer)
+        self.max_frame_length = max_frame_length
+        self.start = 0
+        self.end = 0
+        self.overflows = 0
+
+    def __len__(self):
+        """
+        :rtype: int
+        :return: количество принятых, но еще не разобранных байт
+        """
+        return self.end - self.start
+
+    def compact(self):
+        """
+        Переносит неразобранные данные в начало буфера
+        """
+        length = self.end - self.start
+        if length and self.start:
+            self.buffer[:length] = self.view[self.start:self.end]
+        self.start = 0
+        self.end = length
+
+    def writable(self):
+        """
+        Возвращает свободную часть буфера для записи принятых данных
+
+        :rtype: memoryview
+        :return: срез буфера после последних принятых данных
+        """
+        if self.end == len(self.buffer):
+            self.compact()
+        return self.view[self.end:]
+
+    def commit(self, size):
+        """
+        Отмечает size байт, записанных в :meth:`writable`, как принятые
+
+        :type size: int
+        :param size: количество записанных байт
+        """
+        self.end += size
+
+    def fill(self, fd):
+        """
+        Читает доступные данные из дескриптора непосредственно в буфер
+
+        :type fd: int
+        :param fd: файловый дескриптор
+        :rtype: int
+        :return: количество прочитанных байт (0 - дескриптор закрыт)
+        :raises BlockingIOError: если данных нет
+        """
+        size = os.readv(fd, [self.writable()])
+        self.commit(size)
+        return size
+
+    def feed(self, data):
+        """
+        Копирует в буфер данные, прочитанные другим способом
+
+        :type data: bytes
+        :param data: принятые данные
+        """
+        data = memoryview(data)
+        while data:
+            target = self.writable()
+            size = min(len(target), len(data))
+            target[:size] = data[:size]
+            self.commit(size)
+            data = data[size:]
+            if size == 0:
+                self.drop()
+
+    def drop(self):
+        """
+        Отбрасывает все неразобранные данные
+        """
+        self.overflows += 1
+        self.start = 0
+        self.end = 0
+
+    def frames(self):
+        """
+        Выдает все полные посылки, находящиеся в буфере
+
+        :rtype: generator
+        :return: посылки без терминальной последовательности (срезы :class:`memoryview`)
+        """
+        buffer = self.buffer
+        terminator_length = len(self.TERMINATOR)
+        while True:
+            end = buffer.find(self.TERMINATOR, self.start, self.end)
+            if end == -1:
+                break
+            frame_start = self.start
+            self.start = end + terminator_length
+            if end > frame_start:
+                yield self.view[frame_start:end]
+
+        if self.start == self.end:
+            self.start = self.end = 0
+        elif self.end - self.start > self.max_frame_length:
+            self.drop()
@@ -0,0 +1,161 @@
+import threading
+import time
+from axiomLowLevelCommunication.config import SERIAL_BAUDRATE, SERIAL_FRAME_LENGTH
+from axiomLowLevelCommunication.ioStatistics import LatencyStatistics
+
+
+class HalfDuplexScheduler:
+    """
+    Разделяет время работы полудуплексной линии последовательного порта между чтением и записью
+
+    Чтение выполняется окнами длительностью :attr:`read_window` - временем передачи посылки
+    ожидаемой длины на скорости порта. Запись выполняется в слоте между окнами чтения: ожидающая
+    запись начинается сразу после окончания текущего окна, поэтому задерживается не более чем на
+    время передачи одной посылки. Если поток чтения ожидал во время записи, перед следующей записью
+    ему предоставляется одно окно чтения - в нем принимается ответ модуля на записанную команду.
+
+    При чтении по готовности дескриптора (режимы приема ``'selector'`` и ``'asyncio'``) окна чтения
+    не используются: поток чтения сообщает о принятых данных (:meth:`on_receive`), и запись начинается
+    только после того, как линия простояла без приема время передачи посылки (:meth:`idle_delay`),
+    поэтому запись не начинается посреди принимаемой посылки.
+
+    Задержка начала каждой записи сохраняется в :attr:`write_delay`
+    """
+
+    def __init__(self, port, baudrate=SERIAL_BAUDRATE, frame_length=SERIAL_FRAME_LENGTH, bits_per_char=10):
+        """
+        Инициализирует экземпляр класса
+
+        :type port: str
+        :param port: имя файла последовательного порта в ОС
+        :type baudrate: int
+        :param baudrate: скорость последовательного порта [бод]
+        :type frame_length: int
+        :param frame_length: ожидаемая длина посылки [байт]
+        :type bits_per_char: int
+        :param bits_per_char: количество бит на символ с учетом старт- и стоп-битов
+
+        :ivar frame_time: время передачи посылки ожидаемой длины [с]
+        :ivar read_window: длительность окна чтения [с]
+        :ivar write_delay: статистика задержки начала записи
+        :ivar write_timeouts: количество записей, не получивших слот до истечения таймаута
+        """
+        self.port = port
+        self.frame_time = frame_length * bits_per_char / float(baudrate)
+        self.read_window = self.frame_time
+        self.condition = threading.Condition()
+        self.reading = False
+        self.writing = False
+        self.readers_waiting = 0
+        self.writers_waiting = 0
+        self.reader_turn = False
+        self.last_receive = None
+        self.write_delay = LatencyStatistics()
+        self.write_timeouts = 0
+
+    def begin_read(self, timeout=None):
+        """
+        Ожидает начала окна чтения
+
+        Окно чтения не начинается, пока выполняется запись или ожидает записи другой поток
+        (кроме окна, предоставляемого потоку чтения после записи)
+
+        :type timeout: float
+        :param timeout: максимальное время ожидания [с] (None - без ограничения)
+        :rtype: bool
+        :return: True - окно чтения начато, False - истек таймаут
+        """
+        with self.condition:
+            self.readers_waiting += 1
+            started = self.condition.wait_for(
+                lambda: not self.writing and (self.reader_turn or not self.writers_waiting), timeout)
+            self.readers_waiting -= 1
+            if started:
+                self.reading = True
+            # Окно чтения после записи предоставляется один раз, даже если поток чтения перестал ждать
+            if started or not self.readers_waiting:
+                self.reader_turn = False
+                self.condition.notify_all()
+            return started
+
+    def end_read(self):
+        """
+        Завершает окно чтения
+        """
+        with self.condition:
+            self.reading = False
+            self.condition.notify_all()
+
+    def on_receive(self):
+        """
+        Отмечает время приема данных из линии
+        """
+        self.last_receive = time.monotonic()
+
+    def idle_delay(self):
+        """
+        :rtype: float
+        :return: время, оставшееся до освобождения линии после последнего приема данных [с] (0 - линия свободна)
+        """
+        if self.last_receive is None:
+            return 0
+        return max(0, self.last_receive + self.frame_time - time.monotonic())
+
+    def begin_write(self, timeout=None):
+        """
+        Ожидает слота записи: окончания окна чтения и освобождения линии после последнего приема данных
+
+        :type timeout: float
+        :param timeout: максимальное время ожидания [с] (None - без ограничения)
+        :rtype: bool
+        :return: True - слот записи получен, False - истек таймаут
+        """
+        start_time = time.perf_counter()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            self.writers_waiting += 1
+            started = False
+            while True:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if not self.condition.wait_for(
+                        lambda: not self.reading and not self.writing and not self.reader_turn, remaining):
+                    break
+                idle_delay = self.idle_delay()
+                if not idle_delay:
+                    started = True
+                    break
+                if remaining is not None and remaining <= idle_delay:
+                    break
+                self.condition.wait(idle_delay)
+            self.writers_waiting -= 1
+            if started:
+                self.writing = True
+            else:
+                self.write_timeouts += 1
+                self.condition.notify_all()
+        if started:
+            self.write_delay.add(time.perf_counter() - start_time)
+        return started
+
+    def end_write(self):
+        """
+        Завершает слот записи
+        """
+        with self.condition:
+            self.writing = False
+            self.reader_turn = self.readers_waiting > 0
+            self.condition.notify_all()
+
+    def stats(self):
+        """
+        Возвращает метрики планировщика
+
+        :rtype: dict
+        :return: время передачи посылки, длительность окна чтения, количество таймаутов записи
+         и статистика задержки начала записи (max - наибольшая измеренная задержка)
+        """
+        with self.condition:
+            stats = {'frame_time': self.frame_time, 'read_window': self.read_window,
+                     'write_timeouts': self.write_timeouts}
+        stats['write_delay'] = self.write_delay.as_dict()
+        return stats
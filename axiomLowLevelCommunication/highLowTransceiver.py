@@ -1,37 +1,85 @@
+import ast
 import json
-import ujson
 import math
 import os
 import re
 import sys
 import threading
 import time
+from functools import partial
 import numpy as np
 import redis
 from axiomLib.loggers import create_logger
 from axiomLowLevelCommunication.serialTransceiver import SerialTransceiver
-from axiomLowLevelCommunication.config import CRC8TABLE, POWER_UNIT_STATES_TABLE, POWER_UNIT_SIGNALS_TABLE, \
+from axiomLowLevelCommunication.selectorReader import SelectorReader
+from axiomLowLevelCommunication.portDemultiplexer import PortDemultiplexer
+from axiomLowLevelCommunication.trafficCapture import CaptureWriter
+from axiomLowLevelCommunication.commandScheduler import CommandScheduler
+from axiomLowLevelCommunication.commandExecutor import CommandExecutor
+from axiomLowLevelCommunication.redisWriter import RedisWriter
+from axiomLowLevelCommunication.ioStatistics import UnitStatistics, publish_statistics
+from axiomLowLevelCommunication.readingAggregates import PowerUnitAggregates
+from axiomLowLevelCommunication.crc8 import crc8
+from axiomLowLevelCommunication.initCoordinator import InitCoordinator
+from axiomLowLevelCommunication.portBringUp import PortBringUp
+from axiomLowLevelCommunication.linkWatchdog import LinkWatchdog
+from axiomLowLevelCommunication.insulationCampaign import parse_insulation_request
+from axiomLowLevelCommunication.shardRouter import shard_channel
+from axiomLowLevelCommunication.unitState import UnitState, POWER_UNIT_STATE_RECORDS, INPUT_UNIT_STATE_RECORDS
+from axiomLowLevelCommunication.parcelParser import ParcelParser, POWER_UNIT_PARCELS, INPUT_UNIT_PARCELS, \
+    POWER_UNIT_PARCEL_REGEX, INPUT_UNIT_PARCEL_REGEX
+from axiomLowLevelCommunication.config import POWER_UNIT_STATES_TABLE, POWER_UNIT_SIGNALS_TABLE, \
     INPUT_CMD_STATE_CHANNEL, OUTPUT_INFO_STATE_CHANNEL, INPUT_REQUEST_INSULATION_CHANNEL, OUTPUT_INFO_METRICS_CHANNEL, \
-    LOG_FILE_DIRECTORY, LOG_FILE_NAME
+    LOG_FILE_DIRECTORY, LOG_FILE_NAME, READER_MODE, CAPTURE_FILE, COMMAND_WAIT_TIMEOUT, STATS_PUBLISH_INTERVAL, \
+    COMMAND_LISTEN_TIMEOUT, METRICS_PUBLISH_INTERVAL, MAINS_VOLTAGE, OUTPUT_INFO_LINK_CHANNEL, LINK_WHEEL_TICK, \
+    INSULATION_MAX_PARALLEL_PORTS, INIT_WAIT_TIMEOUT, CONFIGURE_WAIT_TIMEOUT, CAPTURE_FLUSH_INTERVAL
 from apscheduler.schedulers.background import BackgroundScheduler
 
 
 class HighLowTransceiver:
 
-    def __init__(self):
+    # Класс трансивера, создаваемого для последовательного порта каждого модуля
+    transceiver_class = SerialTransceiver
+
+    def __init__(self, settings=None, shard=None, redis_client=None):
         """
         Инициализирует экземпляр класса
 
+        :type settings: dict
+        :param settings: конфигурация аппаратных модулей системы (None - загружается из файла настроек)
+        :type shard: int
+        :param shard: номер сегмента в режиме работы несколькими процессами
+         (см. :mod:`~axiomLowLevelCommunication.shardSupervisor`, None - работа одним процессом)
+        :type redis_client: redis.StrictRedis
+        :param redis_client: объект подключения к БД Redis (None - подключение к БД по умолчанию)
+
         :ivar settings: конфигурация аппаратных модулей системы
+        :ivar shard: номер сегмента (None - работа одним процессом)
         :ivar redis: объект подключения к БД Redis
+        :ivar redis_writer: отложенная запись в Redis пакетами команд (публикация состояния, характеристик и ошибок)
         :ivar isRunning: флаг работы/остановки
         :ivar power_unit_addrs: список адресов силовых модулей
         :ivar input_unit_addrs: список адресов модулей ввода
+        :ivar capture: файл записи обмена по последовательным портам (None - запись не ведется)
+        :ivar port_transceivers: трансиверы физических портов
+        :ivar port_bring_up: открытие последовательных портов и повторные попытки открыть недоступные порты
+        :ivar port_demultiplexers: распределители посылок по модулям для каждого физического порта
+        :ivar command_schedulers: очереди отправки команд с приоритетами для каждого физического порта
+        :ivar command_executor: исполнитель команд модуля "Логика" с очередью для каждого канала
+        :ivar insulation_executor: исполнитель измерений сопротивления изоляции с очередью для каждого порта
+        :ivar init_coordinator: координатор инициализации силовых модулей
         :ivar unit_addrs_to_transceivers_map: таблица соответствия адресов модулей объектам
          :class:`~axiomLowLevelCommunication.serialTransceiver.SerialTransceiver`,
          подключенным к COM портам, соответствующего модуля
-        :ivar power_units_state_dicts: структура состояния силовых модулей
-        :ivar input_units_state_dicts: структура состояния модулей ввода
+        :ivar unit_statistics: статистика посылок каждого модуля
+        :ivar start_time: время запуска (по часам :func:`time.monotonic`)
+        :ivar units_offline: модули, от которых еще не получено ни одной посылки
+        :ivar link_watchdog: контроль связи с модулями
+        :ivar power_units_state: структура состояния силовых модулей
+         (:class:`~axiomLowLevelCommunication.unitState.UnitState` по адресам модулей)
+        :ivar power_unit_aggregates: агрегаты показаний каналов силовых модулей между публикациями характеристик
+        :ivar input_units_state: структура состояния модулей ввода
+         (:class:`~axiomLowLevelCommunication.unitState.UnitState` по адресам модулей)
         :ivar power_units_maintenance: флаги силовых модулей обслуживание/штатная работа
         :ivar humanreadable_states: таблица соответствия цифровых кодов состояний
         силовых модулей и их словесного описания
@@ -42,6 +90,9 @@ class HighLowTransceiver:
         :ivar Crc8Table: таблица для рассчета контрольных сумм CRC8 табличным способом
         :ivar pu_regex: шаблон регулярного выражения для парсинга посылок от силовых модулей
         :ivar iu_regex: шаблон регулярного выражения для парсинга посылок от модулей ввода
+        :ivar power_unit_parcel_parsers: объекты разбора посылок от каждого силового модуля
+        :ivar input_unit_parcel_parsers: объекты разбора посылок от каждого модуля ввода
+        :ivar reader_mode: режим приема данных от низкоуровневого ПО ('selector' или 'threads')
         :ivar P_passive: мощность потребляемая системой без учета подключенных к ней потребителей
         """
         self.logger = create_logger(logger_name=__name__,
@@ -49,16 +100,22 @@ class HighLowTransceiver:
                                     logfile_name=LOG_FILE_NAME)
 
         # Загружаем настройки
-        self.settings = self.load_settings()
+        self.settings = self.load_settings() if settings is None else settings
+        self.shard = shard
         if not self.settings:
             sys.exit(0)
 
         # Подключаемся к брокеру
-        self.redis = redis.StrictRedis(decode_responses=True)
+        self.redis = redis.StrictRedis(decode_responses=True) if redis_client is None else redis_client
+        # Публикация состояния и запись в БД выполняются пакетами
+        self.redis_writer = self.create_redis_writer()
 
         # Флаг для остановки потоков чтения/записи
         self.isRunning = False
 
+        # Время запуска, от которого отсчитывается время получения первой посылки от каждого модуля
+        self.start_time = time.monotonic()
+
         # Привязка адресов модулей ввода к адресам силовых модулей
         self.hardware_units = self.settings['hardware units']
 
@@ -71,42 +128,58 @@ class HighLowTransceiver:
         # таблица соответствия адресов модулей и объектов трансиверов
         self.unit_addrs_to_transceivers_map = {}
 
-        # Подключаемся к com порту каждого силового модуля
-        for power_unit_addr, params in self.settings['power units'].items():
-            self.unit_addrs_to_transceivers_map[power_unit_addr] = SerialTransceiver(port=params['port'])
-            self.unit_addrs_to_transceivers_map[power_unit_addr].close()
-            self.unit_addrs_to_transceivers_map[power_unit_addr].open()
-
-        # Подключаемся к com порту каждого модуля ввода
-        for input_unit_addr, params in self.settings['input units'].items():
-            self.unit_addrs_to_transceivers_map[input_unit_addr] = SerialTransceiver(port=params['port'])
-            self.unit_addrs_to_transceivers_map[input_unit_addr].close()
-            self.unit_addrs_to_transceivers_map[input_unit_addr].open()
+        # Запись обмена по последовательным портам
+        self.capture = self.create_capture()
+
+        # трансиверы и распределители посылок физических портов
+        self.port_transceivers = {}
+        self.port_demultiplexers = {}
+
+        # очереди отправки команд физических портов
+        self.command_schedulers = {}
+
+        # Создаем трансивер для com порта каждого силового модуля и модуля ввода (порты открываются позже).
+        # Модули, подключенные к одному порту, используют общий трансивер
+        units = [(unit_addr, params['port'], self.handle_power_unit_frame)
+                 for unit_addr, params in self.settings['power units'].items()]
+        units += [(unit_addr, params['port'], self.handle_input_unit_frame)
+                  for unit_addr, params in self.settings['input units'].items()]
+        for unit_addr, port, handler in units:
+            if port not in self.port_transceivers:
+                self.port_transceivers[port] = self.transceiver_class(port=port, capture=self.capture, connect=False)
+                self.port_demultiplexers[port] = PortDemultiplexer(port)
+                self.command_schedulers[port] = CommandScheduler(self.port_transceivers[port])
+            self.unit_addrs_to_transceivers_map[unit_addr] = self.port_transceivers[port]
+            self.port_demultiplexers[port].add_unit(unit_addr, partial(handler, unit_addr))
+
+        # Открываем порты одновременно; недоступные порты открываются повторно в фоне
+        self.port_bring_up = PortBringUp(self.port_transceivers)
+        degraded_ports = self.bring_up_ports()
+        for unit_addr, port, _ in units:
+            if port in degraded_ports:
+                self.logger.warning('Модуль {} работает в ограниченном режиме: порт {} не открыт'.format(unit_addr,
+                                                                                                      port))
+
+        # Статистика посылок модулей
+        self.unit_statistics = {unit_addr: UnitStatistics(unit_addr, self.start_time) for unit_addr, _, _ in units}
+        self.units_offline = {unit_addr for unit_addr, _, _ in units}
+        self.units_offline_lock = threading.Lock()
+
+        # Контроль связи с модулями: события потери и восстановления связи
+        self.link_watchdog = LinkWatchdog([unit_addr for unit_addr, _, _ in units], self.on_link_lost,
+                                          self.on_link_restored)
 
         # Создаем структуру состояния для каждого силового модуля
-        self.power_units_state_dicts = dict()
-        for power_unit_addr in self.power_unit_addrs:
-            self.power_units_state_dicts[power_unit_addr] = {
-                'link': False,
-                'st': {key: value for key, value in zip(('state1', 'state2', 'signal1', 'signal2', 'addr', 'cnt'),
-                                                        (None, None, None, None, '{}'.format(power_unit_addr), None))},
-                'adc': {key: value for key, value in zip(('sample1', 'sample2', 'addr', 'cnt'),
-                                                         (None, None, '{}'.format(power_unit_addr), None))},
-                'ld': {key: value for key, value in zip(('load1', 'load2', 'angle1', 'angle2', 'addr', 'cnt'),
-                                                        (None, None, None, None, '{}'.format(power_unit_addr), None))},
-                'tmpr': {key: value for key, value in zip(('temp1', 'temp2', 'addr', 'cnt'),
-                                                          (None, None, '{}'.format(power_unit_addr), None))},
-                'isol': {key: value for key, value in zip(('isol1', 'isol2'), (None, None))}
-            }
+        self.power_units_state = {power_unit_addr: UnitState(power_unit_addr, POWER_UNIT_STATE_RECORDS)
+                                  for power_unit_addr in self.power_unit_addrs}
+
+        # Агрегаты показаний каналов силовых модулей между публикациями характеристик
+        self.power_unit_aggregates = {power_unit_addr: PowerUnitAggregates()
+                                      for power_unit_addr in self.power_unit_addrs}
 
         # Создаем структуру состояния для каждого модуля ввода
-        self.input_units_state_dicts = dict()
-        for input_unit_addr in self.input_unit_addrs:
-            self.input_units_state_dicts[input_unit_addr] = {
-                'st': {'state': None, 'signal': None, 'addr': '{}'.format(input_unit_addr), 'cnt': None},
-                'volt': {'Vin': None, 'freq': None, 'addr': '{}'.format(input_unit_addr), 'cnt': None},
-                'cur': {'Iin': None, 'Iout': None, 'Iypr': None, 'addr': '{}'.format(input_unit_addr), 'cnt': None}
-            }
+        self.input_units_state = {input_unit_addr: UnitState(input_unit_addr, INPUT_UNIT_STATE_RECORDS)
+                                  for input_unit_addr in self.input_unit_addrs}
 
         # Флаг, показывающий, что модуль находится в режиме обслуживания/монтажа
         self.power_units_maintenance = {power_unit_addr: False for power_unit_addr in self.power_unit_addrs}
@@ -121,45 +194,66 @@ class HighLowTransceiver:
         # Счетчики команд силовых модулей
         self.power_units_counters = {}.fromkeys(self.power_unit_addrs, 0)
 
+        # Координатор инициализации силовых модулей: не более одной инициализации на порт
+        power_unit_ports = {unit_addr: params['port'] for unit_addr, params in self.settings['power units'].items()}
+        self.init_coordinator = InitCoordinator(self.init_power_unit, power_unit_ports)
+
+        # Исполнитель команд модуля "Логика"
+        self.command_executor = CommandExecutor()
+        # и исполнитель измерений сопротивления изоляции: очередь на каждый порт, не более
+        # INSULATION_MAX_PARALLEL_PORTS портов одновременно, чтобы измерения не занимали потоки команд
+        self.insulation_executor = CommandExecutor(max_workers=INSULATION_MAX_PARALLEL_PORTS)
+
         # Планировщик для отправки на модуль "Логика" текущих значений потребляемой мощности в каналах
         self.scheduler = BackgroundScheduler()
-        self.scheduler.add_job(self.publish_current_characteristics, 'interval', seconds=10)
-
-        # Регулярные выражения для посылок от модулей ввода и силовых модулей
-        pu_st_regex = r'(?P<type_st>st) (?P<state1>\d{1,4}) (?P<state2>\d{1,4}) ' \
-                      r'(?P<signal1>\d{1,4}) (?P<signal2>\d{1,4})'
-        # pu_adc_regex = r'(?P<type_adc>adc) (?P<sample1>\d{1,2}\.\d{0,100}) ' \
-        #                r'(?P<sample2>\d{1,2}\.\d{0,100}) (?P<freq>\d{0,2})'
-        pu_adc_regex = r'(?P<type_adc>adc) (?P<sample1>\d{1,2}\.\d{0,100}) (?P<sample2>\d{1,2}\.\d{0,100})'
-        pu_tmpr_regex = r'(?P<type_tmpr>tmpr) (?P<temp1>\d{1,3}) (?P<temp2>\d{1,3})'
-        iu_st_regex = r'(?P<type_st>st) (?P<state>\d{1,4}) (?P<signal>\d{1,4})'
-        volt_regex = r'(?P<type_volt>volt) (?P<Vin>\d{1,3}\.\d{0,100}) (?P<freq>\d{0,2})'
-        cur_regex = r'(?P<type_cur>cur) (?P<Iin>\d{1,2}\.\d{0,100}) (?P<Iout>\d{1,2}\.\d{0,100}) ' \
-                    r'(?P<Iypr>\d{1,2}\.\d{0,100})'
-        # iu_adc_regex = r'(?P<type_adc>adc) (?P<sample>\d{1,4}) \d{1,4}'
-        ld_regex = r'(?P<type_ld>ld) (?P<load1>\d{1,4}) (?P<load2>\d{1,4}) (?P<angle1>\d{1,4}) (?P<angle2>\d{1,4})'
-        rply_regex = r'(?P<reply>(?P<type_rply>rply) .+)'
-        counter_regex = r'(?P<cnt>\d{1,10})'
-        unit_addr_regex = r'(?P<addr>%s)'
-
-        self.pu_regex = r'(({st}|{adc}|{ld}|{tmpr}) {cnt}{addr})|{rply}'.format(st=pu_st_regex,
-                                                                                adc=pu_adc_regex,
-                                                                                ld=ld_regex,
-                                                                                tmpr=pu_tmpr_regex,
-                                                                                cnt=counter_regex,
-                                                                                addr=unit_addr_regex,
-                                                                                rply=rply_regex)
-
-        self.iu_regex = r'(({st}|{volt}|{cur}) {cnt}{addr})|{rply}'.format(st=iu_st_regex,
-                                                                           volt=volt_regex,
-                                                                           cur=cur_regex,
-                                                                           cnt=counter_regex,
-                                                                           addr=unit_addr_regex,
-                                                                           rply=rply_regex)
+        self.scheduler.add_job(self.publish_current_characteristics, 'interval', seconds=METRICS_PUBLISH_INTERVAL)
+        # и статистики обмена по последовательным портам
+        self.scheduler.add_job(self.publish_io_statistics, 'interval', seconds=STATS_PUBLISH_INTERVAL)
+        # Продвижение колеса таймеров контроля связи с модулями
+        self.scheduler.add_job(self.link_watchdog.advance, 'interval', seconds=LINK_WHEEL_TICK)
+        # Сброс записей обмена в файл записи
+        if self.capture:
+            self.scheduler.add_job(self.capture.flush, 'interval', seconds=CAPTURE_FLUSH_INTERVAL)
+
+        # Шаблоны регулярных выражений посылок (формат посылок, разбор выполняет ParcelParser)
+        self.pu_regex = POWER_UNIT_PARCEL_REGEX
+        self.iu_regex = INPUT_UNIT_PARCEL_REGEX
+
+        # Разбор посылок от каждого модуля
+        self.power_unit_parcel_parsers = {unit_addr: ParcelParser(unit_addr, POWER_UNIT_PARCELS)
+                                          for unit_addr in self.power_unit_addrs}
+        self.input_unit_parcel_parsers = {unit_addr: ParcelParser(unit_addr, INPUT_UNIT_PARCELS)
+                                          for unit_addr in self.input_unit_addrs}
+
+        # Режим приема данных от низкоуровневого ПО
+        self.reader_mode = READER_MODE
 
         # Пассивная потреблямая схемой мощность
         self.P_passive = self.calc_passive_consumption()
 
+    def create_redis_writer(self):
+        """
+        :rtype: :class:`~axiomLowLevelCommunication.redisWriter.RedisWriter`
+        :return: отложенная запись в Redis через :attr:`redis`
+        """
+        return RedisWriter(self.redis)
+
+    def create_capture(self):
+        """
+        :rtype: :class:`~axiomLowLevelCommunication.trafficCapture.CaptureWriter`
+        :return: файл записи обмена по последовательным портам (None - запись не ведется)
+        """
+        return CaptureWriter(CAPTURE_FILE) if CAPTURE_FILE else None
+
+    def bring_up_ports(self):
+        """
+        Открывает последовательные порты (см. :class:`~axiomLowLevelCommunication.portBringUp.PortBringUp`)
+
+        :rtype: set
+        :return: порты, которые не удалось открыть (работают в ограниченном режиме)
+        """
+        return self.port_bring_up.start()
+
     def calc_crc8(self, buff, crc):
         """
         Рассчитывает контрольную сумму по алгоритму CRC8
@@ -168,15 +262,10 @@ class HighLowTransceiver:
         :param buff: массив с байтами числа
         :type crc: int
         :param crc: инициализирующее значение
-        :rtype: numpy.int64
+        :rtype: int
         :return: рассчитанная контрольная сумма
         """
-        i = 0
-        while i < len(buff):
-            crc = CRC8TABLE[int(crc ^ (buff[i]))]
-            i += 1
-
-        return crc
+        return crc8(bytes(buff), crc)
 
     def split_to_bytes(self, number, num_byte):
         """
@@ -235,7 +324,7 @@ class HighLowTransceiver:
         """
         Контролирует корректность счетчика в посылке от ПО силового модуля
 
-        :type counter: str
+        :type counter: int
         :param counter: значение счетчика
         :type unit_addr: str
         :param unit_addr: адрес силового модуля, от которого пришла посылка
@@ -248,36 +337,71 @@ class HighLowTransceiver:
         """
 
         # Если счетчик None, значит модуль до этого не был инициализирован
-        if self.power_units_state_dicts[unit_addr][type_cmd]['cnt'] is None:
+        if self.power_units_state[unit_addr][type_cmd]['cnt'] is None:
             self.logger.info('Модуль {} впервые зафиксирован с системе'.format(unit_addr))
 
-            threading.Thread(target=self.init_power_unit, args=(unit_addr,)).start()
+            self.start_power_unit_init(unit_addr)
 
             # Для всех посылок устанавливается максимально возможное значение счетчика,
             # чтобы избежать повторного запуска инициализации при получении других типов посылок
-            self.power_units_state_dicts[unit_addr]['st']['cnt'] = str(2 ** 32 - 1)
-            self.power_units_state_dicts[unit_addr]['adc']['cnt'] = str(2 ** 32 - 1)
-            self.power_units_state_dicts[unit_addr]['ld']['cnt'] = str(2 ** 32 - 1)
-            self.power_units_state_dicts[unit_addr]['tmpr']['cnt'] = str(2 ** 32 - 1)
+            self.power_units_state[unit_addr]['st']['cnt'] = 2 ** 32 - 1
+            self.power_units_state[unit_addr]['adc']['cnt'] = 2 ** 32 - 1
+            self.power_units_state[unit_addr]['ld']['cnt'] = 2 ** 32 - 1
+            self.power_units_state[unit_addr]['tmpr']['cnt'] = 2 ** 32 - 1
 
         # Если получен нулевой счетчик, а предыдущее значение счетчика не было максимально возможным -
         # значит модуль перезагрузился и требуется выполнить его инициализацию
 
-        elif counter == '0' and self.power_units_state_dicts[unit_addr][type_cmd]['cnt'] != str(2 ** 32 - 1) \
+        elif counter == 0 and self.power_units_state[unit_addr][type_cmd]['cnt'] != 2 ** 32 - 1 \
                 and not self.power_units_maintenance[unit_addr]:
             log_msg = 'От модуля {} получена посылка со значением счетчика 0. Текущее значение счетчика {}.' \
                       ' ПО модуля перезагружалось'.format(
-                       unit_addr, self.power_units_state_dicts[unit_addr][type_cmd]['cnt'])
+                       unit_addr, self.power_units_state[unit_addr][type_cmd]['cnt'])
             self.logger.error(log_msg)
 
-            threading.Thread(target=self.init_power_unit, args=(unit_addr,)).start()
+            self.start_power_unit_init(unit_addr)
+
+            self.power_units_state[unit_addr]['st']['cnt'] = 2 ** 32 - 1
+            self.power_units_state[unit_addr]['adc']['cnt'] = 2 ** 32 - 1
+            self.power_units_state[unit_addr]['ld']['cnt'] = 2 ** 32 - 1
+
+    def start_power_unit_init(self, unit_addr):
+        """
+        Ставит силовой модуль в очередь инициализации :meth:`init_power_unit`
+
+        Повторные запросы для модуля, который уже ожидает инициализации или инициализируется, отбрасываются
+        (см. :class:`~axiomLowLevelCommunication.initCoordinator.InitCoordinator`)
 
-            self.power_units_state_dicts[unit_addr]['st']['cnt'] = str(2 ** 32 - 1)
-            self.power_units_state_dicts[unit_addr]['adc']['cnt'] = str(2 ** 32 - 1)
-            self.power_units_state_dicts[unit_addr]['ld']['cnt'] = str(2 ** 32 - 1)
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        """
+        self.init_coordinator.request(unit_addr)
 
     def check_input_unit_counter(self, counter, unit_addr, type_cmd):
-        pass
+        """
+        Контролирует корректность счетчика в посылке от ПО модуля ввода
+
+        Модуль ввода не требует инициализации: первая посылка и перезагрузка ПО модуля (нулевой счетчик
+        после ненулевого) записываются в лог. Пропуски значений счетчика учитываются в :attr:`link_watchdog`
+
+        :type counter: int
+        :param counter: значение счетчика
+        :type unit_addr: str
+        :param unit_addr: адрес модуля ввода, от которого пришла посылка
+        :type type_cmd: str
+        :param type_cmd: тип посылки
+        """
+        unit_state = self.input_units_state[unit_addr]
+        prev_counter = unit_state[type_cmd]['cnt']
+
+        # Если счетчики всех посылок None, значит от модуля еще не было посылок
+        if prev_counter is None:
+            if all(record['cnt'] is None for record in unit_state.records.values()):
+                self.logger.info('Модуль ввода {} впервые зафиксирован в системе'.format(unit_addr))
+
+        elif counter == 0 and int(prev_counter) != 0:
+            self.logger.error('От модуля ввода {} получена посылка со значением счетчика 0. Текущее значение '
+                              'счетчика {}. ПО модуля перезагружалось'.format(unit_addr, prev_counter))
 
     def on_new_state_parcel(self, parcel):
         """
@@ -289,7 +413,7 @@ class HighLowTransceiver:
         #. если канал перешел в одно из состояний ('2', '4', '5', '6', '7'), то новое состояние сохраняется в Redis
         #. сообщение о переходе канала в новое состояние пишется в лог
 
-        :type parcel: dict
+        :type parcel: :class:`~axiomLowLevelCommunication.parcelParser.PowerStateParcel`
         :param parcel: разобранная посылка от низкого уровня
 
         Если состояние одного из каналов '0' и модуль не находится в режиме "обслуживание",
@@ -311,21 +435,21 @@ class HighLowTransceiver:
                       'Требуется выполнить инициализацию модуля'.format(power_unit_addr)
             self.logger.info(log_msg)
 
-            threading.Thread(target=self.init_power_unit, args=(power_unit_addr,)).start()
+            self.start_power_unit_init(power_unit_addr)
 
         for i in ('1', '2'):
             # предыдущее и новое состояния
-            prev_state = self.power_units_state_dicts[power_unit_addr]['st']['state{}'.format(i)]
+            prev_state = self.power_units_state[power_unit_addr]['st']['state{}'.format(i)]
             new_state = parcel['state{}'.format(i)]
 
             # если состояние изменилось
             if prev_state != new_state:
-                self.redis.publish(channel=OUTPUT_INFO_STATE_CHANNEL,
-                                   message=ujson.dumps({'addr': 'ch:{}:{}'.format(power_unit_addr, i),
-                                                        'state': {'status': new_state}}))
+                self.redis_writer.publish(channel=OUTPUT_INFO_STATE_CHANNEL,
+                                          message={'addr': 'ch:{}:{}'.format(power_unit_addr, i),
+                                                   'state': {'status': new_state}})
                 # Сохраняем в БД только стабильные состояния
                 if new_state in ('2', '4', '5', '6', '7'):
-                    self.redis.set(name='ch:{}:{}'.format(power_unit_addr, i), value={'status': new_state})
+                    self.redis_writer.set(name='ch:{}:{}'.format(power_unit_addr, i), value={'status': new_state})
                 # Логируем изменение
                 humanreadable_state = POWER_UNIT_STATES_TABLE[new_state]
                 new_signal = parcel['signal{}'.format(i)]
@@ -342,7 +466,7 @@ class HighLowTransceiver:
         Отправляет ответы на запросы измерения сопротивления изоляции в канал Redis
         ``axiomLowLevelCommunication:response:insulation`` в формате
         ``<адрес выхода силового модуля> <измеренное значение>``. Записывает измеренное значение
-        в структуру состояния силовых модулей :attr:`power_units_state_dicts`
+        в структуру состояния силовых модулей :attr:`power_units_state`
 
         :type reply: str
         :param reply: посылка типа "rply" от ПО низкого уровня
@@ -355,172 +479,390 @@ class HighLowTransceiver:
                 channel_position = channel[-1]
                 unit_addr = reply[reply.find('m'):]
 
-                self.power_units_state_dicts[unit_addr]['isol']['isol{}'.format(channel_position)] = isol_value
+                self.power_units_state[unit_addr]['isol']['isol{}'.format(channel_position)] = float(isol_value)
 
-                self.redis.publish('axiomLowLevelCommunication:response:insulation', 'ch:{}:{} {}'.format(
+                self.redis_writer.publish('axiomLowLevelCommunication:response:insulation', 'ch:{}:{} {}'.format(
                     unit_addr, channel_position, isol_value))
             except Exception as e:
                 print(e)
 
-    def update_power_unit_state(self, unit_addr):
+    def update_port_state(self, port):
         """
-        Обрабатывает посылки от ПО силовых модулей
+        Обрабатывает посылки от модулей, подключенных к последовательному порту, читая их в цикле
+
+        Используется в режиме приема ``'threads'``. Каждая прочитанная посылка передается
+        распределителю посылок порта (:attr:`port_demultiplexers`), который вызывает
+        :func:`handle_power_unit_frame` или :func:`handle_input_unit_frame` для модуля-адресата
+
+        :type port: str
+        :param port: имя файла последовательного порта в ОС
+        """
+        demultiplexer = self.port_demultiplexers[port]
+        for raw_data in self.port_transceivers[port].read_generator():
+            if not self.isRunning:
+                break
+            demultiplexer.dispatch(raw_data)
+
+    def handle_power_unit_frame(self, unit_addr, raw_data):
+        """
+        Обрабатывает посылку от ПО силового модуля
 
         * для посылок типа "rply" вызывается функция :func:`handle_reply`
+        * для посылок, отличающихся от предыдущей посылки того же типа только счетчиком, обновляется только
+          счетчик в структуре :attr:`power_units_state`;
         * для посылок типа "st" вызывается функция :func:`on_new_state_parcel`;
         * для посылок тика "st", "adc", "ld", "tmpr" обновляются соответстующие поля структуры
-        :attr:`power_units_state_dicts`;
+        :attr:`power_units_state`;
+        * посылки "adc", "ld", "tmpr" учитываются в агрегатах :attr:`power_unit_aggregates`;
         * для всех посылок вызываетс функция :func:`check_power_unit_counter`.
 
         :type unit_addr: str
         :param unit_addr: адрес силового модуля
-
-        .. figure:: _static/update_power_unit_state.png
-           :scale: 50%
-           :align: center
+        :type raw_data: bytes
+        :param raw_data: посылка, прочитанная из последовательного порта
         """
+        # Разбираем считанные данные (посылки, отличающиеся от предыдущей только счетчиком, не разбираются)
+        parser = self.power_unit_parcel_parsers[unit_addr]
+        parcel = parser.parse_changed(raw_data)
+        if parcel is None:
+            self.unit_statistics[unit_addr].on_regex_miss()
+            return
+        if self.unit_statistics[unit_addr].on_parcel(parcel.get('cnt')):
+            self.on_first_parcel(unit_addr)
 
-        # Компилируем регулярное выражение для парсинга посылок
-        binary_pu_regex = (self.pu_regex % unit_addr).encode()
-        power_unit_parcel_regex = re.compile(binary_pu_regex)
+        # Тип посылки
+        parcel_type = parcel.type
+        self.link_watchdog.on_parcel(unit_addr, parcel_type, parcel.get('cnt'))
 
-        for raw_data in self.unit_addrs_to_transceivers_map[unit_addr].read_generator():
-            if not self.isRunning:
-                break
-            # Разбираем считанные данные с помощью регулярного выражения
-            byte_parcel = power_unit_parcel_regex.search(raw_data)
-            # print('byte_parcel', byte_parcel)
-            if not byte_parcel:
-                continue
-
-            # декодируем посылку
-            parcel = {key: value.decode() for key, value in byte_parcel.groupdict().items() if value}
+        unit_state = self.power_units_state[unit_addr]
+        unit_state.link = True
 
-            # Определяем тип посылки
-            parcel_type = parcel.get('type_st') or \
-                          parcel.get('type_adc') or \
-                          parcel.get('type_ld') or \
-                          parcel.get('type_tmpr') or \
-                          parcel.get('type_rply')
+        # Посылка "st" с каналом в состоянии "0" обрабатывается полностью, чтобы запустить инициализацию
+        if parcel.repeated and parcel_type == 'st' and '0' in (unit_state['st'].state1, unit_state['st'].state2):
+            parcel = parser.parse(raw_data)
 
-            self.power_units_state_dicts[unit_addr]['link'] = True
+        # <editor-fold desc="ответ на ранее отправленную команду">
+        if parcel_type == 'rply':
+            self.handle_reply(parcel.reply)
+            return
+        # </editor-fold>
 
-            # <editor-fold desc="ответ на ранее отправленную команду">
-            if parcel_type == 'rply':
-                reply = parcel['reply'].strip()
-                self.handle_reply(reply)
-                continue
-            # </editor-fold>
+        # Счетчик посылки
+        counter = int(parcel.cnt)
 
-            # Счетчик посылки
-            counter = parcel['cnt']
+        # Проверка счетчика посылок
+        self.check_power_unit_counter(counter, unit_addr, parcel_type)
 
-            # Проверка счетчика посылок
-            self.check_power_unit_counter(counter, unit_addr, parcel_type)
+        # Для повторной посылки обновляются только счетчик и время его обновления
+        if parcel.repeated:
+            unit_state[parcel_type].update(cnt=counter)
+            self.power_unit_aggregates[unit_addr].update(parcel_type, unit_state)
+            return
 
-            # В случае изменения состояния силовых выходов
-            if parcel_type == 'st':
-                # print(raw_data)
-                self.on_new_state_parcel(parcel)
+        # В случае изменения состояния силовых выходов
+        if parcel_type == 'st':
+            self.on_new_state_parcel(parcel)
 
-            # Обновление структуры состояния модуля
-            for key in self.power_units_state_dicts[unit_addr][parcel_type]:
-                self.power_units_state_dicts[unit_addr][parcel_type][key] = parcel[key]
+        # Обновление структуры состояния модуля и агрегатов показаний
+        unit_state.update_from_parcel(parcel)
+        self.power_unit_aggregates[unit_addr].update(parcel_type, unit_state)
 
-    def update_input_unit_state(self, unit_addr):
+    def handle_input_unit_frame(self, unit_addr, raw_data):
         """
-        Обрабатывает посылки от ПО модулей ввода
+        Обрабатывает посылку от ПО модуля ввода
 
-        * для посылок типа "rply" вызывается функция :func:`handle_reply`
+        * для посылок типа "rply" ответ записывается в лог
         * для посылок тика "st", "volt", "cur" обновляются соответстующие поля структуры
-        :attr:`input_units_state_dicts`;
+        :attr:`input_units_state`;
         * для всех посылок вызываетс функция :func:`check_input_unit_counter`.
 
         :type unit_addr: str
         :param unit_addr: адрес модуля ввода
+        :type raw_data: bytes
+        :param raw_data: посылка, прочитанная из последовательного порта
+        """
+        # Разбираем считанные данные
+        parcel = self.input_unit_parcel_parsers[unit_addr].parse(raw_data)
+        if parcel is None:
+            self.unit_statistics[unit_addr].on_regex_miss()
+            return
+        if self.unit_statistics[unit_addr].on_parcel(parcel.get('cnt')):
+            self.on_first_parcel(unit_addr)
 
-        .. figure:: _static/update_input_unit_state.png
-           :scale: 50%
-           :align: center
+        # Тип посылки
+        parcel_type = parcel.type
+        self.link_watchdog.on_parcel(unit_addr, parcel_type, parcel.get('cnt'))
+        self.input_units_state[unit_addr].link = True
+
+        # <editor-fold desc="ответ на ранее отправленную команду">
+        if parcel_type == 'rply':
+            self.logger.info('Сообщение от низкого уровня: {}'.format(parcel.reply))
+            return
+        # </editor-fold>
+
+        # Счетчик посылки
+        counter = int(parcel.cnt)
+
+        # Проверка счетчика посылок
+        self.check_input_unit_counter(counter, unit_addr, parcel_type)
+
+        # Обновление структуры состояния модуля
+        self.input_units_state[unit_addr].update_from_parcel(parcel)
+
+    def on_first_parcel(self, unit_addr):
         """
+        Записывает в лог время получения первой посылки от модуля после запуска и, после получения посылок
+        от всех модулей, время выхода на связь всех модулей
 
-        binary_iu_regex = (self.iu_regex % unit_addr).encode()
-        input_unit_parcel_regex = re.compile(binary_iu_regex)
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        """
+        self.logger.info('Первая посылка от модуля {} получена через {:.2f} с после запуска'.format(
+            unit_addr, self.unit_statistics[unit_addr].first_parcel_delay))
+        with self.units_offline_lock:
+            self.units_offline.discard(unit_addr)
+            if self.units_offline:
+                return
+        self.logger.info('Все модули ({}) на связи через {:.2f} с после запуска'.format(
+            len(self.unit_statistics), time.monotonic() - self.start_time))
 
-        for raw_data in self.unit_addrs_to_transceivers_map[unit_addr].read_generator():
-            if not self.isRunning:
-                break
+    def unit_state(self, unit_addr):
+        """
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля или модуля ввода
+        :rtype: :class:`~axiomLowLevelCommunication.unitState.UnitState`
+        :return: структура состояния модуля
+        """
+        if unit_addr in self.power_units_state:
+            return self.power_units_state[unit_addr]
+        return self.input_units_state[unit_addr]
 
-            # Разбираем считанные данные с помощью регулярного выражения
-            byte_parcel = input_unit_parcel_regex.search(raw_data)
-            if not byte_parcel:
-                continue
+    def on_link_lost(self, unit_addr, silence):
+        """
+        Обрабатывает потерю связи с модулем: сбрасывает признак связи в структуре состояния модуля
+        и публикует событие в канал ``OUTPUT_INFO_LINK_CHANNEL``
 
-            # декодируем посылку
-            parcel = {key: value.decode() for key, value in byte_parcel.groupdict().items() if value}
+        Вызывается из :attr:`link_watchdog`
 
-            # Определяем тип посылки
-            parcel_type = parcel.get('type_st') or \
-                          parcel.get('type_volt') or \
-                          parcel.get('type_cur') or \
-                          parcel.get('type_rply')
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type silence: float
+        :param silence: время без посылок от модуля [с]
+        """
+        self.unit_state(unit_addr).link = False
+        self.logger.error('Потеряна связь с модулем {}: нет посылок {:.1f} с'.format(unit_addr, silence))
+        self.redis_writer.publish(OUTPUT_INFO_LINK_CHANNEL, {'addr': unit_addr, 'link': False,
+                                                             'silence': round(silence, 1)})
 
-            # <editor-fold desc="ответ на ранее отправленную команду">
-            if parcel_type == 'rply':
-                reply = parcel['reply'].replace('\n', '')
-                self.logger.info('Сообщение от низкого уровня: {}'.format(reply))
-                continue
-            # </editor-fold>
+    def on_link_restored(self, unit_addr, downtime):
+        """
+        Обрабатывает восстановление связи с модулем: публикует событие в канал ``OUTPUT_INFO_LINK_CHANNEL``
 
-            # Счетчик посылки
-            counter = parcel['cnt']
+        Вызывается из :attr:`link_watchdog` при получении первой посылки после потери связи
 
-            # Проверка счетчика посылок
-            self.check_input_unit_counter(counter, unit_addr, parcel_type)
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type downtime: float
+        :param downtime: время без посылок от модуля [с]
+        """
+        self.unit_state(unit_addr).link = True
+        self.logger.info('Связь с модулем {} восстановлена через {:.1f} с'.format(unit_addr, downtime))
+        self.redis_writer.publish(OUTPUT_INFO_LINK_CHANNEL, {'addr': unit_addr, 'link': True,
+                                                             'downtime': round(downtime, 1)})
 
-            # Обновление структуры состояния модуля
-            for key in self.input_units_state_dicts[unit_addr][parcel_type]:
-                self.input_units_state_dicts[unit_addr][parcel_type][key] = parcel[key]
+    def port_statistics(self, port):
+        """
+        Возвращает статистику обмена по последовательному порту
 
-            # pprint(self.input_units_state_dicts)
+        :type port: str
+        :param port: имя файла последовательного порта в ОС
+        :rtype: dict
+        :return: статистика трансивера порта, количество распределенных и нераспределенных по модулям
+         посылок, количество посылок, отброшенных из-за неверной (crc_errors) и отсутствующей (crc_missing)
+         контрольной суммы, метрики очереди команд порта (commands) и признак открытия порта (open)
+        """
+        stats = self.port_transceivers[port].stats()
+        stats['open'] = self.port_bring_up.is_open(port)
+        stats['frames_routed'] = sum(self.port_demultiplexers[port].routed.values())
+        stats['frames_unrouted'] = self.port_demultiplexers[port].unrouted
+        stats['crc_errors'] = self.port_demultiplexers[port].crc_errors
+        stats['crc_missing'] = self.port_demultiplexers[port].crc_missing
+        stats['commands'] = self.command_schedulers[port].queue.stats()
+        return stats
+
+    def shard_names(self, entries):
+        """
+        Добавляет номер сегмента к именам статистики, общей для всего процесса (команды, инициализация),
+        чтобы сегменты не перезаписывали статистику друг друга
+
+        :type entries: dict
+        :param entries: статистика по именам
+        :rtype: dict
+        :return: статистика по именам ``<имя>:<номер сегмента>`` (при работе одним процессом - без изменений)
+        """
+        if self.shard is None:
+            return entries
+        return {'{}:{}'.format(name, self.shard): stats for name, stats in entries.items()}
+
+    def publish_io_statistics(self):
+        """
+        Записывает статистику обмена по последовательным портам и посылок модулей в Redis
+        одним пакетом команд (см. :func:`~axiomLowLevelCommunication.ioStatistics.publish_statistics`)
+
+        Вызывается планировщиком :attr:`scheduler` с интервалом ``STATS_PUBLISH_INTERVAL``
+        """
+        ports = {port: self.port_statistics(port) for port in self.port_transceivers}
+        units = {unit_addr: dict(statistics.as_dict(), **self.link_watchdog.unit_stats(unit_addr))
+                 for unit_addr, statistics in self.unit_statistics.items()}
+        try:
+            commands = dict(self.command_executor.stats(), **self.insulation_executor.stats())
+            publish_statistics(self.redis, ports, units, self.shard_names(commands),
+                               self.shard_names({'power_units': self.init_coordinator.stats()}))
+        except redis.RedisError as e:
+            self.logger.error('Ошибка при записи статистики обмена в Redis: {}'.format(e))
 
     def reader_target(self):
         """
         Осуществляет прием данных от низкоуровневого ПО
 
-        Для каждого силового и вводного модуля запускает в отдельном потоке функцию
-        :func:`update_power_unit_state` или :func:`update_input_unit_state` соответственно
-        и контролирует работу запущенных потоков
+        В режиме ``'selector'`` (см. :attr:`reader_mode`) вызывает :meth:`selector_reader_target`.
+        В режиме ``'threads'`` для каждого открытого последовательного порта запускает в отдельном потоке функцию
+        :func:`update_port_state` и контролирует работу запущенных потоков. Для портов, открытых позже
+        (см. :attr:`port_bring_up`), потоки запускаются после открытия
 
         .. figure:: _static/reader_target.png
            :scale: 50%
            :align: center
         """
-        # Создаем потоки для обновления структуры состояния для каждого модуля
-        updaters = {}
-
-        for unit_addr in self.power_unit_addrs:
-            updaters[unit_addr] = threading.Thread(target=self.update_power_unit_state, args=(unit_addr,))
-            updaters[unit_addr].start()
+        if self.reader_mode == 'selector':
+            self.selector_reader_target()
+            return
 
-        for unit_addr in self.input_unit_addrs:
-            updaters[unit_addr] = threading.Thread(target=self.update_input_unit_state, args=(unit_addr,))
-            updaters[unit_addr].start()
+        # Потоки для приема посылок из каждого открытого последовательного порта
+        updaters = {}
 
-        # Контролируем, чтобы все потоки были в рабочем состоянии
+        # Запускаем потоки и контролируем, чтобы все потоки были в рабочем состоянии
         while self.isRunning:
-            # self.event.wait()
-            # self.collect_units_state()
-            for unit_addr in self.power_unit_addrs:
-                if not updaters[unit_addr].isAlive():
-                    updaters[unit_addr] = threading.Thread(target=self.update_power_unit_state, args=(unit_addr,))
-                    updaters[unit_addr].start()
-            for unit_addr in self.input_unit_addrs:
-                if not updaters[unit_addr].isAlive():
-                    updaters[unit_addr] = threading.Thread(target=self.update_input_unit_state, args=(unit_addr,))
-                    updaters[unit_addr].start()
+            for port in self.port_transceivers:
+                if not self.port_bring_up.is_open(port):
+                    continue
+                if port not in updaters or not updaters[port].is_alive():
+                    updaters[port] = threading.Thread(target=self.update_port_state, args=(port,))
+                    updaters[port].start()
             time.sleep(1)
 
+    def selector_reader_target(self):
+        """
+        Принимает данные от всех модулей в одном потоке
+
+        Регистрирует каждый открытый последовательный порт в
+        :class:`~axiomLowLevelCommunication.selectorReader.SelectorReader` один раз и передает
+        принятые посылки распределителю посылок порта (:attr:`port_demultiplexers`). Порты, открытые позже
+        (см. :attr:`port_bring_up`), регистрируются после открытия. Порт, чтение из которого прервалось
+        из-за ошибки, закрывается и открывается повторно в фоне
+        """
+        reader = SelectorReader()
+        # Дескрипторы зарегистрированных портов
+        registered = {}
+        try:
+            while self.isRunning:
+                for port, fd in list(registered.items()):
+                    # SelectorReader удаляет дескриптор порта при ошибке чтения
+                    if fd not in reader.buffers:
+                        del registered[port]
+                        self.logger.warning('Чтение из порта {} прервано, порт будет открыт повторно'.format(port))
+                        self.port_bring_up.reopen(port)
+
+                for port, transceiver in self.port_transceivers.items():
+                    if port not in registered and self.port_bring_up.is_open(port) and \
+                            reader.register(transceiver, self.port_demultiplexers[port].dispatch):
+                        registered[port] = transceiver.fileno()
+
+                if registered:
+                    reader.poll(0.5)
+                else:
+                    time.sleep(0.5)
+        finally:
+            reader.close()
+
+    def submit_command(self, unit_addr, data, supersede=True):
+        """
+        Ставит команду модулю в очередь команд его последовательного порта
+
+        Команды отправляются в порядке приоритета; ожидающая отправки команда замещается
+        более новой командой для того же канала (см.
+        :class:`~axiomLowLevelCommunication.commandScheduler.CommandQueue`)
+
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type data: str
+        :param data: команда
+        :type supersede: bool
+        :param supersede: False - команда не замещает ожидающую отправки команду для того же канала
+         (служебные команды восстановления состояния каналов)
+        :rtype: :class:`~axiomLowLevelCommunication.commandScheduler.Command`
+        :return: команда
+        """
+        port = self.unit_addrs_to_transceivers_map[unit_addr].port
+        return self.command_schedulers[port].submit(data, supersede)
+
+    def send_command(self, unit_addr, data, wait=True, supersede=True):
+        """
+        Отправляет команду модулю через очередь команд его последовательного порта (см. :meth:`submit_command`)
+
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type data: str
+        :param data: команда
+        :type wait: bool
+        :param wait: ожидать записи команды в порт
+        :type supersede: bool
+        :param supersede: замещать ожидающую отправки команду для того же канала
+        :rtype: bool
+        :return: True - команда (или замещающая ее команда) записана в порт (или команда поставлена в очередь,
+         если wait=False), False - команда не записана
+        """
+        command = self.submit_command(unit_addr, data, supersede)
+        if not wait:
+            return command.status not in ('rejected', 'superseded')
+        return command.wait(timeout=COMMAND_WAIT_TIMEOUT)
+
+    def wait_for_unit_state(self, unit_addr, predicate, timeout):
+        """
+        Ожидает, пока состояние каналов силового модуля не будет удовлетворять условию
+
+        Условие проверяется при получении каждой посылки "st" от модуля
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :type predicate: callable
+        :param predicate: условие, принимает запись состояния каналов модуля
+         (:class:`~axiomLowLevelCommunication.unitState.PowerState`)
+        :type timeout: float
+        :param timeout: максимальное время ожидания [с]
+        :rtype: bool
+        :return: True - условие выполнено, False - истек таймаут
+        """
+        return self.power_units_state[unit_addr]['st'].wait_for(predicate, timeout)
+
+    def await_state(self, channel_addr, predicate, timeout):
+        """
+        Ожидает, пока состояние канала силового модуля не будет удовлетворять условию
+
+        :type channel_addr: str
+        :param channel_addr: адрес канала силового модуля (например, "ch:m2:1")
+        :type predicate: callable
+        :param predicate: условие, принимает код состояния и код сигнала перехода канала
+        :type timeout: float
+        :param timeout: максимальное время ожидания [с]
+        :rtype: bool
+        :return: True - условие выполнено, False - истек таймаут
+        """
+        _, unit_addr, channel_position = channel_addr.split(':')
+        state_key = 'state{}'.format(channel_position)
+        signal_key = 'signal{}'.format(channel_position)
+        return self.wait_for_unit_state(unit_addr, lambda st: predicate(st[state_key], st[signal_key]), timeout)
+
     def init_power_unit(self, unit_addr):
         """
         Инициализирует силовой модуль
@@ -541,13 +883,15 @@ class HighLowTransceiver:
         time.sleep(0.1)
 
         # Смотрим в каком состоянии были каналы до перезагрузки
-        raw_ch1_prev_state = self.redis.get('ch:{}:1'.format(unit_addr))
-        raw_ch2_prev_state = self.redis.get('ch:{}:2'.format(unit_addr))
+        raw_prev_states = self.redis.mget(['ch:{}:1'.format(unit_addr), 'ch:{}:2'.format(unit_addr)])
 
         # блокировщики управления в каналах модуля
         ch1_lock = self.ch_locks['ch:{}:1'.format(unit_addr)]
         ch2_lock = self.ch_locks['ch:{}:2'.format(unit_addr)]
 
+        def is_initialized(st):
+            return st['state1'] not in ('0', '3') and st['state2'] not in ('0', '3')
+
         # Если удалось установить блокировку управления первым каналом -
         # пытаемся установить блокировку управления вторым каналом
         if ch1_lock.acquire(timeout=3):
@@ -556,14 +900,8 @@ class HighLowTransceiver:
                 # 0. снимаем блокировку управления первым каналом
                 ch1_lock.release()
                 # 1. Проверяем, возможно инициализация уже выполнена в другом потоке
-                check_time = time.time()
-                while time.time() - check_time < 3:
-                    ch1_current_state = self.power_units_state_dicts[unit_addr]['st']['state1']
-                    ch2_current_state = self.power_units_state_dicts[unit_addr]['st']['state2']
-                    if ch1_current_state not in ('0', '3') and ch2_current_state not in ('0', '3'):
-                        return True
-                    else:
-                        time.sleep(0.1)
+                if self.wait_for_unit_state(unit_addr, is_initialized, timeout=3):
+                    return True
 
                 # Если модуль не переходит в инициализированное состояние
                 # 2. логируем ошибку
@@ -576,14 +914,8 @@ class HighLowTransceiver:
         # Если блокировку управления первым каналом установить не удалось:
         else:
             # 0. Проверяем, возможно инициализация уже выполнена в другом потоке
-            check_time = time.time()
-            while time.time() - check_time < 3:
-                ch1_current_state = self.power_units_state_dicts[unit_addr]['st']['state1']
-                ch2_current_state = self.power_units_state_dicts[unit_addr]['st']['state2']
-                if ch1_current_state not in ('0', '3') and ch2_current_state not in ('0', '3'):
-                    return True
-                else:
-                    time.sleep(0.1)
+            if self.wait_for_unit_state(unit_addr, is_initialized, timeout=3):
+                return True
             # 1. Если модуль не переходит в инициализированное состояние - логируем ошибку, возвращаем False
             log_msg = 'Ошибка при инициализации модуля "{}":' \
                       ' не удается заблокировать управление первым каналом'.format(unit_addr)
@@ -591,8 +923,8 @@ class HighLowTransceiver:
             return False
 
         # После блокировки управления в обоих каналах модуля, смотрим состояние каналов
-        ch1_current_state = self.power_units_state_dicts[unit_addr]['st']['state1']
-        ch2_current_state = self.power_units_state_dicts[unit_addr]['st']['state2']
+        ch1_current_state = self.power_units_state[unit_addr]['st']['state1']
+        ch2_current_state = self.power_units_state[unit_addr]['st']['state2']
 
         # Если хотя бы один из каналов в состоянии 1 (idle) - вызываем функцию запуска модуля
         if ch1_current_state == '0' or ch2_current_state == '0':
@@ -601,8 +933,8 @@ class HighLowTransceiver:
                 return False
 
         # Если функция запуска завершилась успешно - снова смотрим состояние каналов
-        ch1_current_state = self.power_units_state_dicts[unit_addr]['st']['state1']
-        ch2_current_state = self.power_units_state_dicts[unit_addr]['st']['state2']
+        ch1_current_state = self.power_units_state[unit_addr]['st']['state1']
+        ch2_current_state = self.power_units_state[unit_addr]['st']['state2']
 
         # Если хотя бы один из каналов в состоянии 3 (nuse) - вызываем функцию конфигурации модуля
         if ch1_current_state == '3' or ch2_current_state == '3':
@@ -615,19 +947,81 @@ class HighLowTransceiver:
         ch1_lock.release() or ch2_lock.release()
 
         # 2. восстанавливаем состояние выходов сохраненное в БД (если это возможно)
-        for ch_position in ('1', '2'):
-            raw_prev_ch_state = eval('raw_ch{}_prev_state'.format(ch_position))
+        self.restore_channel_states(unit_addr, raw_prev_states)
+
+        # 3. возвращаем True
+        return True
+
+    def load_saved_ch_state(self, raw_ch_state):
+        """
+        Разбирает сохраненное в БД состояние канала
+
+        Состояние сохраняется в формате JSON; значения, сохраненные прежними версиями программы
+        в виде литерала Python (``{'status': '5'}``), разбираются :func:`ast.literal_eval` и не выполняются
+
+        :type raw_ch_state: str
+        :param raw_ch_state: сохраненное в БД состояние канала
+        :rtype: dict
+        :return: состояние канала
+        :raises TypeError, ValueError, SyntaxError: если состояние не сохранено или сохранено некорректно
+        """
+        try:
+            return json.loads(raw_ch_state)
+        except ValueError:
+            return ast.literal_eval(raw_ch_state)
+
+    def restore_channel_states(self, unit_addr, raw_prev_states):
+        """
+        Включает выходы силового модуля, которые были включены до перезагрузки модуля
+
+        Команды включения выходов отправляются в порт одна за другой, после чего исполнение всех
+        команд ожидается одновременно. Выходы, которые не удалось включить таким образом (или которые
+        не находятся в состоянии '4' (off)), включаются по одному :meth:`set_ch_state`
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :type raw_prev_states: list
+        :param raw_prev_states: сохраненные в БД состояния первого и второго каналов (None - состояние не сохранено)
+        """
+        positions = []
+        for ch_position, raw_prev_ch_state in zip(('1', '2'), raw_prev_states):
             try:
-                prev_ch_state = eval(raw_prev_ch_state)
-                if prev_ch_state['status'] == '5':
-                    self.set_ch_state(channel_addr='ch:{}:{}'.format(unit_addr, ch_position),
-                                      new_state_dict=prev_ch_state)
+                if self.load_saved_ch_state(raw_prev_ch_state)['status'] == '5':
+                    positions.append(ch_position)
             # Если в БД было сохранено некорректное значение (или не записано никакое) - ничего не делаем
-            except Exception:
+            except (TypeError, ValueError, SyntaxError, KeyError):
                 pass
 
-        # 3. возвращаем True
-        return True
+        st = self.power_units_state[unit_addr]['st']
+        locked = [ch_position for ch_position in positions if st['state{}'.format(ch_position)] == '4'
+                  and self.ch_locks['ch:{}:{}'.format(unit_addr, ch_position)].acquire(timeout=3)]
+
+        if locked:
+            sending_time = time.time()
+            sent = []
+            for ch_position in locked:
+                command = self.submit_command(unit_addr, 'ch {} on {}'.format(ch_position, unit_addr), supersede=False)
+                # Если для канала ожидает отправки команда модуля "Логика", состояние канала не восстанавливается
+                if command.status == 'superseded':
+                    self.logger.info('Состояние выхода "ch:{}:{}" не восстанавливается: ожидает отправки команда'
+                                     ' "{}"'.format(unit_addr, ch_position, command.replaced_by.data))
+                    positions.remove(ch_position)
+                elif command.status != 'rejected':
+                    sent.append(ch_position)
+            self.wait_for_unit_state(
+                unit_addr, lambda st: all(st['state{}'.format(ch_position)] in ('5', '2', '6', '7')
+                                          for ch_position in sent),
+                timeout=2 - (time.time() - sending_time))
+            for ch_position in locked:
+                if ch_position in positions and st['state{}'.format(ch_position)] == '5':
+                    self.send_command(unit_addr, 'led inst {} on {}'.format(ch_position, unit_addr), wait=False,
+                                      supersede=False)
+                    positions.remove(ch_position)
+                self.ch_locks['ch:{}:{}'.format(unit_addr, ch_position)].release()
+
+        for ch_position in positions:
+            self.set_ch_state(channel_addr='ch:{}:{}'.format(unit_addr, ch_position), new_state_dict={'status': '5'},
+                              supersede=False)
 
     def run_power_unit(self, unit_addr, retries=3):
         """
@@ -650,6 +1044,9 @@ class HighLowTransceiver:
         # Команда запуска модуля:
         run_cmd = 'run start {}'.format(unit_addr)
 
+        def is_run(st):
+            return st['state1'] not in ('0', '1') and st['state2'] not in ('0', '1')
+
         while retries + 1:
             # Фиксируем время отправки
             send_time = time.time()
@@ -657,35 +1054,27 @@ class HighLowTransceiver:
             # Если команда записана в последовательный порт успешно:
             # self.event.clear()
             time.sleep(0.01)
-            if self.unit_addrs_to_transceivers_map[unit_addr].write(run_cmd):
+            if self.send_command(unit_addr, run_cmd):
                 # self.event.set()
-                # Пока не истек таймаут, смотрим на состояние выходов
-                while time.time() - send_time < 10:
-                    ch1_state = self.power_units_state_dicts[unit_addr]['st']['state1']
-                    ch2_state = self.power_units_state_dicts[unit_addr]['st']['state2']
-
-                    # Если состояние хотя бы одного остается '0' - ждем дальше
-                    if ch1_state in ('0', '1') or ch2_state in ('0', '1'):
-                        time.sleep(0.01)
-                        continue
-                    # Если состояние обоих выходов не '0' - запуск модуля завершен. Логируем успех, возвращаем True
-                    else:
-                        ch1_state = self.power_units_state_dicts[unit_addr]['st']['state1']
-                        ch2_state = self.power_units_state_dicts[unit_addr]['st']['state2']
-
-                        ch1_humanreadable_state = POWER_UNIT_STATES_TABLE[ch1_state]
-                        ch2_humanreadable_state = POWER_UNIT_STATES_TABLE[ch2_state]
-
-                        channel1_addr = 'ch:{}:1'.format(unit_addr)
-                        channel2_addr = 'ch:{}:2'.format(unit_addr)
-
-                        log_msg = 'Запуск модуля "{}" выполнен.' \
-                                  ' Текущее состояние выходов: "{}" - "{}", "{}" - "{}"'.format(
-                                   unit_addr, channel1_addr, ch1_humanreadable_state,
-                                   channel2_addr, ch2_humanreadable_state)
-                        self.logger.error(log_msg)
+                # Пока не истек таймаут, ждем выхода обоих выходов из состояний '0' и '1'.
+                # Если дождались - запуск модуля завершен. Логируем успех, возвращаем True
+                if self.wait_for_unit_state(unit_addr, is_run, timeout=10 - (time.time() - send_time)):
+                    ch1_state = self.power_units_state[unit_addr]['st']['state1']
+                    ch2_state = self.power_units_state[unit_addr]['st']['state2']
+
+                    ch1_humanreadable_state = POWER_UNIT_STATES_TABLE[ch1_state]
+                    ch2_humanreadable_state = POWER_UNIT_STATES_TABLE[ch2_state]
+
+                    channel1_addr = 'ch:{}:1'.format(unit_addr)
+                    channel2_addr = 'ch:{}:2'.format(unit_addr)
+
+                    log_msg = 'Запуск модуля "{}" выполнен.' \
+                              ' Текущее состояние выходов: "{}" - "{}", "{}" - "{}"'.format(
+                               unit_addr, channel1_addr, ch1_humanreadable_state,
+                               channel2_addr, ch2_humanreadable_state)
+                    self.logger.error(log_msg)
 
-                        return True
+                    return True
                 retries -= 1
             # Если при записи команды возникли ошибки - пробуем еще
             else:
@@ -693,8 +1082,8 @@ class HighLowTransceiver:
                 retries -= 1
 
         # Если дошли до сюда, значит, запуск выполнить не удалось. Логируем ошибку, возвращаем False
-        ch1_state = self.power_units_state_dicts[unit_addr]['st']['state1']
-        ch2_state = self.power_units_state_dicts[unit_addr]['st']['state2']
+        ch1_state = self.power_units_state[unit_addr]['st']['state1']
+        ch2_state = self.power_units_state[unit_addr]['st']['state2']
 
         ch1_humanreadable_state = POWER_UNIT_STATES_TABLE[ch1_state]
         ch2_humanreadable_state = POWER_UNIT_STATES_TABLE[ch2_state]
@@ -710,27 +1099,14 @@ class HighLowTransceiver:
 
         return False
 
-    def configure_power_unit(self, unit_addr, retries=3):
+    def build_configuration_cmds(self, unit_addr):
         """
-        Конфигурирует ПО силового модуля:
-
-        Отправляет на силовой модуль команды конфигурации:
-
-        * установка порогов по току потребления : ``adc hgrp <Imax1> <Imax2> <crc8-1> <crc8-2> <unit_addr>``;
-        * установка порогов по току утечки: ``adc hlgrp <Imax1> <Imax2> <crc8-1> <crc8-2> <unit_addr>``.
-
-        Контролирует исполнение команд. Команды считается выполненными успешно,
-        если ни один из каналов не остался в состоянии '3' (nuse)
+        Формирует команды конфигурации силового модуля по его настройкам
 
         :type unit_addr: str
         :param unit_addr: адрес силового модуля
-        :type retries: int
-        :param retries: количество возможных повторых попыток
-        :rtype: bool
-        :return: True - успешное исполнение команды), False - неуспешное
-
-        .. figure:: _static/configure_power_unit.png
-           :align: center
+        :rtype: tuple
+        :return: команда установки порогов по току потребления и команда установки порогов по току утечки
         """
         # Команда установки порогов по току потребления:
         max_consumption_current_1 = self.settings['power units'][unit_addr]['max consumption current'][0]
@@ -747,8 +1123,6 @@ class HighLowTransceiver:
 
         consumption_current_cmd = 'adc hgrp {} {} {} {} {}'.format(
             Iconsumption1, Iconsumption2, crc1_consumption, crc2_consumption, unit_addr)
-        # consumption_current_cmd = 'adc h 255 all 1 {}'.format(unit_addr)
-        # print(consumption_current_cmd)
 
         # Команда установки порогов по току утечки:
         max_leak_current_1 = self.settings['power units'][unit_addr]['max leak current'][0]
@@ -764,7 +1138,35 @@ class HighLowTransceiver:
         crc2_leak = self.calc_crc8(buff2_leak, 0xff)
 
         leak_current_cmd = 'adc hlgrp {} {} {} {} {}'.format(Ileak1, Ileak2, crc1_leak, crc2_leak, unit_addr)
-        print(leak_current_cmd)
+
+        return consumption_current_cmd, leak_current_cmd
+
+    def configure_power_unit(self, unit_addr, retries=3):
+        """
+        Конфигурирует ПО силового модуля:
+
+        Отправляет на силовой модуль команды конфигурации:
+
+        * установка порогов по току потребления : ``adc hgrp <Imax1> <Imax2> <crc8-1> <crc8-2> <unit_addr>``;
+        * установка порогов по току утечки: ``adc hlgrp <Imax1> <Imax2> <crc8-1> <crc8-2> <unit_addr>``.
+
+        Контролирует исполнение команд. Команды считается выполненными успешно,
+        если ни один из каналов не остался в состоянии '3' (nuse)
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :type retries: int
+        :param retries: количество возможных повторых попыток
+        :rtype: bool
+        :return: True - успешное исполнение команды), False - неуспешное
+
+        .. figure:: _static/configure_power_unit.png
+           :align: center
+        """
+        consumption_current_cmd, leak_current_cmd = self.build_configuration_cmds(unit_addr)
+
+        def is_configured(st):
+            return st['state1'] != '3' and st['state2'] != '3'
 
         while retries + 1:
             # Фиксируем время отправки
@@ -773,37 +1175,29 @@ class HighLowTransceiver:
             # self.event.clear()
             time.sleep(0.01)
             # Если команда записана в последовательный порт успешно:
-            if self.unit_addrs_to_transceivers_map[unit_addr].write(consumption_current_cmd):
+            if self.send_command(unit_addr, consumption_current_cmd):
                 time.sleep(0.5)
-                if self.unit_addrs_to_transceivers_map[unit_addr].write(leak_current_cmd):
+                if self.send_command(unit_addr, leak_current_cmd):
                     time.sleep(0.5)
-                    # Пока не истек таймаут, смотрим на состояние выходов
-                    while time.time() - send_time < 3:
-                        ch1_state = self.power_units_state_dicts[unit_addr]['st']['state1']
-                        ch2_state = self.power_units_state_dicts[unit_addr]['st']['state2']
-
-                        # Если состояние хотя бы одного остается '3' - ждем дальше
-                        if ch1_state == '3' or ch2_state == '3':
-                            time.sleep(0.01)
-                            continue
-                        # Если состояние обоих выходов не '3' - запуск модуля завершен. Логируем успех, возвращаем True
-                        else:
-                            ch1_state = self.power_units_state_dicts[unit_addr]['st']['state1']
-                            ch2_state = self.power_units_state_dicts[unit_addr]['st']['state2']
-
-                            ch1_humanreadable_state = POWER_UNIT_STATES_TABLE[ch1_state]
-                            ch2_humanreadable_state = POWER_UNIT_STATES_TABLE[ch2_state]
-
-                            channel1_addr = 'ch:{}:1'.format(unit_addr)
-                            channel2_addr = 'ch:{}:2'.format(unit_addr)
-
-                            log_msg = 'Конфигурация модуля "{}" выполнена.' \
-                                      ' Текущее состояние выходов: "{}" - "{}", "{}" - "{}"'.format(
-                                       unit_addr, channel1_addr, ch1_humanreadable_state,
-                                       channel2_addr, ch2_humanreadable_state)
-                            self.logger.info(log_msg)
-
-                            return True
+                    # Пока не истек таймаут, ждем выхода обоих выходов из состояния '3'.
+                    # Если дождались - конфигурация модуля завершена. Логируем успех, возвращаем True
+                    if self.wait_for_unit_state(unit_addr, is_configured, timeout=CONFIGURE_WAIT_TIMEOUT - (time.time() - send_time)):
+                        ch1_state = self.power_units_state[unit_addr]['st']['state1']
+                        ch2_state = self.power_units_state[unit_addr]['st']['state2']
+
+                        ch1_humanreadable_state = POWER_UNIT_STATES_TABLE[ch1_state]
+                        ch2_humanreadable_state = POWER_UNIT_STATES_TABLE[ch2_state]
+
+                        channel1_addr = 'ch:{}:1'.format(unit_addr)
+                        channel2_addr = 'ch:{}:2'.format(unit_addr)
+
+                        log_msg = 'Конфигурация модуля "{}" выполнена.' \
+                                  ' Текущее состояние выходов: "{}" - "{}", "{}" - "{}"'.format(
+                                   unit_addr, channel1_addr, ch1_humanreadable_state,
+                                   channel2_addr, ch2_humanreadable_state)
+                        self.logger.info(log_msg)
+
+                        return True
                     retries -= 1
                 # Если при записи команды возникли ошибки - пробуем еще
                 else:
@@ -812,8 +1206,8 @@ class HighLowTransceiver:
                 retries -= 1
 
         # Если дошли до сюда, значит, конфигурацию выполнить не удалось. Логируем ошибку, возвращаем False
-        ch1_state = self.power_units_state_dicts[unit_addr]['st']['state1']
-        ch2_state = self.power_units_state_dicts[unit_addr]['st']['state2']
+        ch1_state = self.power_units_state[unit_addr]['st']['state1']
+        ch2_state = self.power_units_state[unit_addr]['st']['state2']
 
         ch1_humanreadable_state = POWER_UNIT_STATES_TABLE[ch1_state]
         ch2_humanreadable_state = POWER_UNIT_STATES_TABLE[ch2_state]
@@ -854,7 +1248,7 @@ class HighLowTransceiver:
         log_level = 'ERROR' if redis_error_msg else 'INFO'
 
         state_to_publish = {'addr': channel_addr, 'state': {'status': current_state}}
-        self.redis.publish(channel=OUTPUT_INFO_STATE_CHANNEL, message=ujson.dumps(state_to_publish))
+        self.redis_writer.publish(channel=OUTPUT_INFO_STATE_CHANNEL, message=state_to_publish)
 
         if log_level == 'ERROR':
             self.logger.error(log_msg)
@@ -862,28 +1256,19 @@ class HighLowTransceiver:
             self.logger.info(log_msg)
 
         if redis_error_msg:
-            self.redis.publish(channel='axiomLowLevelCommunication:info:error', message=redis_error_msg)
+            self.redis_writer.publish(channel='axiomLowLevelCommunication:info:error', message=redis_error_msg)
 
-    def set_ch_state(self, channel_addr, new_state_dict):
+    def validate_ch_cmd(self, channel_addr, new_state_dict):
         """
-        Выполняет команду установки нового состояния выхода силового модуля
-
-        Отправляет на низкий уровень команду ``ch 1|2 on|off <unit_addr>``.
-        Контролирует исполнение команды. Перед выходом вызывает метод :meth:`before_return_from_set_ch_state`.
+        Проверяет корректность команды установки нового состояния выхода силового модуля
 
         :type channel_addr: str
         :param channel_addr: адрес канала силового модуля
         :type new_state_dict: dict
-        :param new_state_dict: состояние канала силового модуля, которое нужно установить.
-        Формат: ``{'status': '4'|'5'}``
-        :rtype: bool
-        :return: True - команда выполнена, False - возникли ошибки
-
-        .. figure:: _static/set_ch_state.png
-           :scale: 50%
-           :align: center
+        :param new_state_dict: состояние канала силового модуля, которое нужно установить
+        :rtype: tuple
+        :return: адрес силового модуля, номер канала и новое состояние или None, если команда некорректна
         """
-        # Валидация команды
         invalid_cmd_log_msg = 'Получены некорректные данные для установки нового состояния силового выхода:' \
                               ' адрес канала: {}, новое состояние: {}'.format(channel_addr, new_state_dict)
 
@@ -892,23 +1277,55 @@ class HighLowTransceiver:
             channel_position = channel_addr.split(':')[2]
         except (IndexError, AttributeError):
             self.logger.error(invalid_cmd_log_msg)
-            return False
+            return None
 
         try:
             new_state = new_state_dict['status']
-        except KeyError:
+        except (KeyError, TypeError):
             self.logger.error(invalid_cmd_log_msg)
-            return False
+            return None
 
         if unit_addr not in self.power_unit_addrs:
             self.logger.error(invalid_cmd_log_msg)
-            return False
+            return None
         if channel_position not in ['1', '2']:
             self.logger.error(invalid_cmd_log_msg)
-            return False
+            return None
         if new_state not in ['4', '5']:
             self.logger.error(invalid_cmd_log_msg)
+            return None
+
+        return unit_addr, channel_position, new_state
+
+    def set_ch_state(self, channel_addr, new_state_dict, supersede=True):
+        """
+        Выполняет команду установки нового состояния выхода силового модуля
+
+        Отправляет на низкий уровень команду ``ch 1|2 on|off <unit_addr>``.
+        Контролирует исполнение команды. Перед выходом вызывает метод :meth:`before_return_from_set_ch_state`.
+        Если канал находится в состоянии '0' или '3', модуль ставится в очередь инициализации
+        (:meth:`start_power_unit_init`) и команда выполняется после выхода канала из этих состояний
+
+        :type channel_addr: str
+        :param channel_addr: адрес канала силового модуля
+        :type new_state_dict: dict
+        :param new_state_dict: состояние канала силового модуля, которое нужно установить.
+        Формат: ``{'status': '4'|'5'}``
+        :type supersede: bool
+        :param supersede: False - команда не замещает ожидающую отправки команду для того же канала
+         (восстановление состояния после перезагрузки модуля); если такая команда есть, состояние не устанавливается
+        :rtype: bool
+        :return: True - команда выполнена, False - возникли ошибки
+
+        .. figure:: _static/set_ch_state.png
+           :scale: 50%
+           :align: center
+        """
+        # Валидация команды
+        ch_cmd = self.validate_ch_cmd(channel_addr, new_state_dict)
+        if not ch_cmd:
             return False
+        unit_addr, channel_position, new_state = ch_cmd
 
         # Если команда прошла валидацию, пишем в лог сообщение, что получена команда
         log_msg = 'Получена команда на установку состояния "{}" на выходе "{}"'.format(
@@ -919,19 +1336,22 @@ class HighLowTransceiver:
         # проверяем можно ли управлять данным каналом #
         ###############################################
 
-        current_state = self.power_units_state_dicts[unit_addr]['st']['state{}'.format(channel_position)]
+        current_state = self.power_units_state[unit_addr]['st']['state{}'.format(channel_position)]
 
         # Проверяем проинициализирован ли модуль
         if current_state in ['0', '3']:
-            # Если не проинициализирован - пишем об этом в лог и вызываем функцию инициализации
+            # Если не проинициализирован - пишем об этом в лог, ставим модуль в очередь инициализации
+            # и ждем, пока канал не выйдет из состояний "0" и "3"
             log_msg = 'Силовой выход {} находится в состоянии {}. Требуется инициализация модуля'.format(
                 channel_addr, current_state)
             self.logger.warning(log_msg)
+            self.start_power_unit_init(unit_addr)
 
-            # Если инициализация не удалась - снимаем блокировку управления,
-            # вызываем before_return_from_set_ch_state и выходим
-            if not self.init_power_unit(unit_addr):
-                current_signal = self.power_units_state_dicts[unit_addr]['st']['signal{}'.format(channel_position)]
+            # Если инициализация не удалась - вызываем before_return_from_set_ch_state и выходим
+            if not self.await_state(channel_addr, lambda state, signal: state not in ('0', '3'),
+                                    timeout=INIT_WAIT_TIMEOUT):
+                current_state = self.power_units_state[unit_addr]['st']['state{}'.format(channel_position)]
+                current_signal = self.power_units_state[unit_addr]['st']['signal{}'.format(channel_position)]
 
                 humanreadable_current_state = POWER_UNIT_STATES_TABLE[current_state]
                 humanreadable_new_state = POWER_UNIT_STATES_TABLE[new_state]
@@ -950,13 +1370,13 @@ class HighLowTransceiver:
                 return False
 
         # Заново записываем состояние в переменную, потому что оно могло измениться
-        # после вызова init_power_unit
-        current_state = self.power_units_state_dicts[unit_addr]['st']['state{}'.format(channel_position)]
+        # после инициализации модуля
+        current_state = self.power_units_state[unit_addr]['st']['state{}'.format(channel_position)]
 
         # Проверяем, что силовой выход не находится в состоянии fault, poff или lock
         # Если в одном из этих состояний, то выходим:
-        if self.power_units_state_dicts[unit_addr]['st']['state{}'.format(channel_position)] in ['2', '6', '7']:
-            current_signal = self.power_units_state_dicts[unit_addr]['st']['signal{}'.format(channel_position)]
+        if self.power_units_state[unit_addr]['st']['state{}'.format(channel_position)] in ['2', '6', '7']:
+            current_signal = self.power_units_state[unit_addr]['st']['signal{}'.format(channel_position)]
             humanreadable_current_state = POWER_UNIT_STATES_TABLE[current_state]
             humanreadable_new_state = POWER_UNIT_STATES_TABLE[new_state]
             humanreadable_current_signal = POWER_UNIT_SIGNALS_TABLE[current_signal]
@@ -1000,52 +1420,61 @@ class HighLowTransceiver:
                 return False
 
             sending_time = time.time()
+            command = self.submit_command(unit_addr, ch_cmd, supersede)
 
-            # Если команда записана в последовательный порт успешно -
-            # начинаем мониторить структуру состояния пока не истечет таймаут
-            if self.unit_addrs_to_transceivers_map[unit_addr].write(ch_cmd):
-                while time.time() - sending_time < 2:
-                    current_state = self.power_units_state_dicts[unit_addr]['st']['state{}'.format(channel_position)]
-
-                    # 1. Если текущее состояние стало таким, каким его хотели сделать -
-                    # включаем/выключаем светодиод, снимаем блокировку и выходим
-                    if current_state == new_state:
-                        self.unit_addrs_to_transceivers_map[unit_addr].write(led_cmd)
-                        self.ch_locks[channel_addr].release()
-                        return True
+            # Если для канала ожидает отправки другая команда, а замещать ее нельзя - выходим без ошибки
+            if command.status == 'superseded':
+                self.ch_locks[channel_addr].release()
+                log_msg = 'Состояние "{}" на выходе "{}" не устанавливается: ожидает отправки команда "{}"'.format(
+                    POWER_UNIT_STATES_TABLE[new_state], channel_addr, command.replaced_by.data)
+                self.before_return_from_set_ch_state(log_msg=log_msg, channel_addr=channel_addr,
+                                                     current_state=current_state)
+                return False
 
-                    # 2. Канал перешел в нерабочее состояние
-                    elif current_state in ['2', '6', '7']:
-                        # Выключаем светодиод
-                        led_cmd = 'led inst {} off {}'.format(channel_position, unit_addr)
-                        self.unit_addrs_to_transceivers_map[unit_addr].write(led_cmd)
+            # Если команда записана в последовательный порт успешно -
+            # ждем перехода канала в требуемое или нерабочее состояние, пока не истечет таймаут
+            if command.wait(timeout=COMMAND_WAIT_TIMEOUT):
+                self.await_state(channel_addr, lambda state, signal: state in (new_state, '2', '6', '7'),
+                                 timeout=2 - (time.time() - sending_time))
+                current_state = self.power_units_state[unit_addr]['st']['state{}'.format(channel_position)]
+
+                # 1. Если текущее состояние стало таким, каким его хотели сделать -
+                # включаем/выключаем светодиод, снимаем блокировку и выходим
+                if current_state == new_state:
+                    self.send_command(unit_addr, led_cmd, wait=False, supersede=supersede)
+                    self.ch_locks[channel_addr].release()
+                    return True
 
-                        self.ch_locks[channel_addr].release()
+                # 2. Канал перешел в нерабочее состояние
+                elif current_state in ['2', '6', '7']:
+                    # Выключаем светодиод
+                    led_cmd = 'led inst {} off {}'.format(channel_position, unit_addr)
+                    self.send_command(unit_addr, led_cmd, wait=False, supersede=supersede)
 
-                        current_signal = self.power_units_state_dicts[unit_addr]['st'][
-                            'signal{}'.format(channel_position)]
+                    self.ch_locks[channel_addr].release()
 
-                        humanreadable_new_state = POWER_UNIT_STATES_TABLE[new_state]
-                        humanreadable_result_state = POWER_UNIT_STATES_TABLE[current_state]
-                        humanreadable_result_signal = POWER_UNIT_SIGNALS_TABLE[current_signal]
+                    current_signal = self.power_units_state[unit_addr]['st'][
+                        'signal{}'.format(channel_position)]
 
-                        redis_msg = 'Ошибка при установке состояния "{}" на выходе "{}".' \
-                                    ' Текущее состояние: "{}", сигнал перехода в состояние: "{}"'.format(
-                                     humanreadable_new_state, channel_addr,
-                                     humanreadable_result_state, humanreadable_result_signal)
-                        log_msg = redis_msg
+                    humanreadable_new_state = POWER_UNIT_STATES_TABLE[new_state]
+                    humanreadable_result_state = POWER_UNIT_STATES_TABLE[current_state]
+                    humanreadable_result_signal = POWER_UNIT_SIGNALS_TABLE[current_signal]
 
-                        self.before_return_from_set_ch_state(channel_addr=channel_addr,
-                                                             current_state=current_state,
-                                                             redis_error_msg=redis_msg,
-                                                             log_msg=log_msg)
-                        return False
+                    redis_msg = 'Ошибка при установке состояния "{}" на выходе "{}".' \
+                                ' Текущее состояние: "{}", сигнал перехода в состояние: "{}"'.format(
+                                 humanreadable_new_state, channel_addr,
+                                 humanreadable_result_state, humanreadable_result_signal)
+                    log_msg = redis_msg
 
-                    time.sleep(0.001)
+                    self.before_return_from_set_ch_state(channel_addr=channel_addr,
+                                                         current_state=current_state,
+                                                         redis_error_msg=redis_msg,
+                                                         log_msg=log_msg)
+                    return False
 
                 # Если до истечения таймаута состояние не изменилось
 
-                current_signal = self.power_units_state_dicts[unit_addr]['st'][
+                current_signal = self.power_units_state[unit_addr]['st'][
                     'signal{}'.format(channel_position)]
 
                 self.ch_locks[channel_addr].release()
@@ -1102,164 +1531,287 @@ class HighLowTransceiver:
         """
         Выполняет команду измерения сопротивления изоляции канала силового модуля
 
-        Переводит силовой модуль в состояния "обслуживание". Отправляет на низкий уровень
-        команду сброса: ``rst <unit_addr>``. Отравляет на низкий уровень команду
-        на измерение сопротивления изоляции: ``resist start 1|2 <unit_addr>``.
-        Контролирует выполнение команды
+        Выполняет :meth:`measure_unit_insulation` для одного канала
 
         :type channel_addr: str
         :param channel_addr: адрес канала силового модуля
+        :rtype: bool
+        :return: True - сопротивление изоляции измерено, False - возникли ошибки
 
         .. figure:: _static/measure_insulation_resistance.png
            :scale: 50%
            :align: center
         """
-
         _, unit_addr, channel_position = channel_addr.split(':')
+        return self.measure_unit_insulation(unit_addr, [channel_position])
+
+    def measure_unit_insulation(self, unit_addr, channel_positions):
+        """
+        Измеряет сопротивление изоляции каналов силового модуля в одном окне обслуживания
+
+        Переводит силовой модуль в состояние "обслуживание". Отправляет на низкий уровень
+        команду сброса: ``rst <unit_addr>``. После сброса для каждого канала вызывает
+        :meth:`measure_channel_insulation`, затем возвращает модуль в штатную работу
 
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :type channel_positions: list
+        :param channel_positions: номера каналов ('1', '2')
+        :rtype: bool
+        :return: True - сопротивление изоляции всех каналов измерено, False - возникли ошибки
+        """
         # Переводим модуль в режим обслуживания
         self.power_units_maintenance[unit_addr] = True
+        try:
+            # затираем предыдущие измеренные значения
+            for channel_position in channel_positions:
+                self.power_units_state[unit_addr]['isol']['isol{}'.format(channel_position)] = None
 
-        # затираем предыдущее измеренное значение
-        self.power_units_state_dicts[unit_addr]['isol']['isol{}'.format(channel_position)] = None
-        # self.power_units_state_dicts[unit_addr]['isol']['isol2'] = None
-
-        # блокировщики управления в каналах модуля
-        ch_lock = self.ch_locks['ch:{}:{}'.format(unit_addr, channel_position)]
-        # ch2_lock = self.ch_locks['ch:{}:2'.format(channel_position)]
-
-        # Сбрасываем модуль
-        rst_timeout = 10
-        check_time = time.time()
-        if self.unit_addrs_to_transceivers_map[unit_addr].write('rst {}'.format(unit_addr)):
-            while time.time() - check_time < rst_timeout:
-                if self.power_units_state_dicts[unit_addr]['st']['state1'] == '0' and \
-                        self.power_units_state_dicts[unit_addr]['st']['state2'] == '0':
-                    break
-                else:
-                    time.sleep(0.1)
-            if self.power_units_state_dicts[unit_addr]['st']['state1'] != '0' or \
-                    self.power_units_state_dicts[unit_addr]['st']['state2'] != '0':
+            # Сбрасываем модуль
+            rst_timeout = 10
+            check_time = time.time()
+            if not self.send_command(unit_addr, 'rst {}'.format(unit_addr)):
+                log_msg = 'Не удалось выполнить измерение сопротивления изоляции силового модуля {}' \
+                          ' из-за ошибки записи  в последовательный порт команды сброса'.format(unit_addr)
+                self.logger.error(log_msg)
+                return False
+            if not self.wait_for_unit_state(unit_addr, lambda st: st['state1'] == '0' and st['state2'] == '0',
+                                            timeout=rst_timeout - (time.time() - check_time)):
                 log_msg = 'Ошибка при измерении сопротивления изоляции силового модуля {}:' \
                           ' не удается осуществить сброс модуля'.format(unit_addr)
                 self.logger.error(log_msg)
-                self.power_units_maintenance[unit_addr] = False
-                return
-        else:
-            log_msg = 'Не удалось выполнить измерение сопротивления изоляции силового модуля {}' \
-                      ' из-за ошибки записи  в последовательный порт команды сброса'.format(unit_addr)
-            self.logger.error(log_msg)
+                return False
+
+            # Каналы измеряются после одного сброса модуля
+            measured = [self.measure_channel_insulation(unit_addr, channel_position)
+                        for channel_position in channel_positions]
+            return all(measured)
+        finally:
             self.power_units_maintenance[unit_addr] = False
-            return
+
+    def measure_channel_insulation(self, unit_addr, channel_position):
+        """
+        Измеряет сопротивление изоляции канала силового модуля, переведенного в состояние "обслуживание"
+        и сброшенного (см. :meth:`measure_unit_insulation`)
+
+        Отравляет на низкий уровень команду на измерение сопротивления изоляции:
+        ``resist start 1|2 <unit_addr>`` и ожидает результата. Результат публикуется в канал
+        ``axiomLowLevelCommunication:response:insulation`` при получении ответа (см. :meth:`handle_reply`)
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :type channel_position: str
+        :param channel_position: номер канала
+        :rtype: bool
+        :return: True - сопротивление изоляции измерено, False - возникли ошибки
+        """
+        # блокировщик управления каналом
+        ch_lock = self.ch_locks['ch:{}:{}'.format(unit_addr, channel_position)]
 
         # Блокируем управление каналом
-        if ch_lock.acquire(timeout=3):
+        if not ch_lock.acquire(timeout=3):
+            log_msg = 'Не удалось выполнить измерение сопротивления изоляции в {} канале силового модуля {}:' \
+                      ' управление каналом заблокировано в другом потоке'.format(channel_position, unit_addr)
+            self.logger.error(log_msg)
+            return False
+
+        try:
             # Отправляем команду
             isol_cmd = 'resist start {} {}'.format(channel_position, unit_addr)
             isol_timeout = 3
             check_time = time.time()
 
-            if self.unit_addrs_to_transceivers_map[unit_addr].write(isol_cmd):
-                # Ждем результата выполнения команды
-                while time.time() - check_time < isol_timeout:
-                    if self.power_units_state_dicts[unit_addr]['isol']['isol{}'.format(channel_position)]:
-                        break
-                    else:
-                        time.sleep(0.1)
-                ch_lock.release()
-                if not self.power_units_state_dicts[unit_addr]['isol']['isol{}'.format(channel_position)]:
-                    log_msg = 'Не удалось выполнить измерение сопротивления изоляции в {} канале силового модуля {}' \
-                              ' нет ответа от ПО низкого уровня'.format(channel_position, unit_addr)
-                    self.logger.error(log_msg)
             # Если не удалось отправить команду
-            else:
-                ch_lock.release()
+            if not self.send_command(unit_addr, isol_cmd):
                 log_msg = 'Не удалось выполнить измерение сопротивления изоляции в {} канале силового модуля {}' \
                           ' из-за ошибки записи команды в последовательный порт'.format(channel_position, unit_addr)
                 self.logger.error(log_msg)
-        # Если не удалось заблокировать управление каналом
-        else:
-            log_msg = 'Не удалось выполнить измерение сопротивления изоляции в {} канале силового модуля {}:' \
-                      ' управление каналом заблокировано в другом потоке'.format(channel_position, unit_addr)
+                return False
+
+            # Ждем результата выполнения команды
+            isol_key = 'isol{}'.format(channel_position)
+            measured = self.power_units_state[unit_addr]['isol'].wait_for(
+                lambda isol: isol[isol_key] is not None, timeout=isol_timeout - (time.time() - check_time))
+        finally:
+            ch_lock.release()
+
+        if not measured:
+            log_msg = 'Не удалось выполнить измерение сопротивления изоляции в {} канале силового модуля {}' \
+                      ' нет ответа от ПО низкого уровня'.format(channel_position, unit_addr)
             self.logger.error(log_msg)
+        return measured
+
+    def plan_insulation_campaign(self, data):
+        """
+        Разбирает команду измерения сопротивления изоляции и группирует каналы по модулям
+        (см. :mod:`~axiomLowLevelCommunication.insulationCampaign`)
+
+        Некорректные адреса и адреса модулей, не являющихся силовыми, записываются в лог и пропускаются
+
+        :type data: str
+        :param data: команда из канала ``axiomLogic:request:insulation``
+        :rtype: list
+        :return: список (последовательный порт, адрес силового модуля, номера каналов)
+        """
+        units, invalid = parse_insulation_request(data)
+        for target in invalid:
+            self.logger.error('Некорректный адрес "{}" в команде измерения сопротивления изоляции'.format(target))
+
+        campaign = []
+        for unit_addr, channel_positions in units.items():
+            if unit_addr not in self.power_units_state:
+                self.logger.error('Модуль {} в команде измерения сопротивления изоляции не является '
+                                  'силовым модулем'.format(unit_addr))
+                continue
+            campaign.append((self.unit_addrs_to_transceivers_map[unit_addr].port, unit_addr, channel_positions))
+
+        if len(campaign) > 1:
+            self.logger.info('Измерение сопротивления изоляции: каналов {}, модулей {}, портов {}'.format(
+                sum(len(channel_positions) for _, _, channel_positions in campaign), len(campaign),
+                len({port for port, _, _ in campaign})))
+        return campaign
 
-        self.power_units_maintenance[unit_addr] = False
+    def parse_state_cmd_message(self, message):
+        """
+        Разбирает сообщение с командой изменения состояния выхода силового модуля
+
+        :type message: dict
+        :param message: сообщение, полученное из канала Redis ``axiomLogic:cmd:state``
+        :rtype: tuple
+        :return: адрес канала и словарь нового состояния или None, если сообщение некорректно
+        """
+        try:
+            cmd_str = message['data']
+        except KeyError:
+            log_msg = 'redis KeyError'
+            self.logger.debug(log_msg)
+            return None
+        try:
+            cmd_dict = json.loads(cmd_str)
+        except (TypeError, ValueError) as e:
+            log_msg = 'redis dict "{}" "{}"'.format(e, cmd_str)
+            self.logger.debug(log_msg)
+            return None
+
+        try:
+            channel_addr = cmd_dict['addr']
+            new_state_dict = cmd_dict['state']
+        except (KeyError, TypeError) as e:
+            log_msg = 'redis cmd "{}" "{}"'.format(e, cmd_str)
+            self.logger.debug(log_msg)
+            return None
+
+        if not isinstance(channel_addr, str) or not re.match(r'^ch:(m[1-9]):([1-2])$', channel_addr):
+            log_msg = 'redis not match'
+            self.logger.debug(log_msg)
+            return None
+
+        log_msg = 'redis rcv run thread'
+        self.logger.debug(log_msg)
+        return channel_addr, new_state_dict
 
     def writer_target(self):
         """
         Обрабатывает команды от функционального модуля "Логика"
 
-        При получении команды вызывает соответствующий метод для ее обработки.
+        Команды из обоих каналов принимаются одним подписчиком Redis в порядке поступления; поток ожидает
+        сообщения в блокирующем режиме. При получении команды ставит соответствующий метод для ее обработки
+        в очередь канала исполнителя :attr:`command_executor`. Если очередь исполнителя переполнена,
+        команда не выполняется, сообщение об ошибке публикуется в канал ``axiomLowLevelCommunication:info:error``.
         Поддерживаемые команды:
 
         #. Установка нового состояния выхода силового модуля:
             * канал Redis: ``axiomLogic:cmd:state``;
             * формат команды: ``{'addr': <channel_addr>, 'state': {'status': '4'|'5'}}``;
             * метод для обработки: :meth:`set_ch_state`.
-        #. Измерение сопротивления изоляции канала силового модуля:
+        #. Измерение сопротивления изоляции каналов силовых модулей:
             * канал Redis: ``axiomLogic:request:insulation``;
-            * формат команды: ``<channel_addr>``;
-            * метод для обработки: :meth:`measure_insulation_resistance`.
+            * формат команды: ``<channel_addr>|<unit_addr> ...`` (один или несколько адресов каналов
+              или модулей через пробел или запятую);
+            * метод для обработки: :meth:`measure_unit_insulation` (в очереди порта исполнителя
+              :attr:`insulation_executor`).
 
         .. figure:: _static/writer_target.png
            :scale: 50%
            :align: center
         """
-        # Подписываемся на команды изменения состояния от модуля "Логика"
-        subscriber_state_cmd = self.redis.pubsub(ignore_subscribe_messages=True)
-        subscriber_state_cmd.subscribe(INPUT_CMD_STATE_CHANNEL)
+        # Подписываемся одним подписчиком на команды изменения состояния и измерения сопротивления изоляции
+        handlers = {
+            self.command_channel(INPUT_CMD_STATE_CHANNEL): self.handle_state_command,
+            self.command_channel(INPUT_REQUEST_INSULATION_CHANNEL): self.handle_insulation_command,
+        }
+        subscriber = self.redis.pubsub(ignore_subscribe_messages=True)
+        subscriber.subscribe(*handlers)
 
-        # Подписываемся на команды измерения сопротивления изоляции
-        subscriber_isol_cmd = self.redis.pubsub(ignore_subscribe_messages=True)
-        subscriber_isol_cmd.subscribe(INPUT_REQUEST_INSULATION_CHANNEL)
+        while self.isRunning:
+            # Ожидание сообщения ограничено, чтобы периодически проверять признак остановки
+            message = subscriber.get_message(timeout=COMMAND_LISTEN_TIMEOUT)
+            if message:
+                handler = handlers.get(message['channel'])
+                if handler:
+                    handler(message)
+        subscriber.close()
+
+    def command_channel(self, channel):
+        """
+        :type channel: str
+        :param channel: канал Redis, из которого модуль "Логика" отправляет команды
+        :rtype: str
+        :return: канал, из которого принимаются команды; в режиме работы несколькими процессами - канал
+         сегмента, в который команды пересылает :class:`~axiomLowLevelCommunication.shardRouter.ShardRouter`
+        """
+        return channel if self.shard is None else shard_channel(channel, self.shard)
 
-        ch_template = r'^ch:(m[1-9]):([1-2])$'
+    def handle_state_command(self, message):
+        """
+        Ставит команду установки нового состояния выхода силового модуля в очередь исполнителя
 
-        while self.isRunning:
-            # <editor-fold desc="Обработка команд на изменение состояния выходов">
-            message_state = subscriber_state_cmd.get_message()
-            if message_state:
-                try:
-                    cmd_str = message_state['data']
-                except KeyError:
-                    log_msg = 'redis KeyError'
-                    self.logger.debug(log_msg)
-                    continue
-                try:
-                    cmd_dict = json.loads(cmd_str)
-                except (TypeError, ValueError) as e:
-                    log_msg = 'redis dict "{}" "{}"'.format(e, cmd_str)
-                    self.logger.debug(log_msg)
-                    continue
+        Команда замещает ожидающую выполнения команду для того же канала: при серии переключений канала
+        после выполняемой команды выполняется только последняя
 
-                try:
-                    channel_addr = cmd_dict['addr']
-                    new_state_dict = cmd_dict['state']
-                except (KeyError, UnboundLocalError) as e:
-                    self.logger.debug(log_msg)
-                    continue
+        :type message: dict
+        :param message: сообщение из канала ``axiomLogic:cmd:state``
+        """
+        state_cmd = self.parse_state_cmd_message(message)
+        if state_cmd:
+            channel_addr, new_state_dict = state_cmd
+            if not self.command_executor.submit(channel_addr, 'state', self.set_ch_state,
+                                                channel_addr, new_state_dict, replace=True):
+                self.reject_command(channel_addr, 'установки состояния {}'.format(new_state_dict))
+
+    def handle_insulation_command(self, message):
+        """
+        Ставит измерение сопротивления изоляции каналов силовых модулей в очередь исполнителя
+        :attr:`insulation_executor`
 
-                if re.match(ch_template, channel_addr):
-                    log_msg = 'redis rcv run thread'
-                    self.logger.debug(log_msg)
+        Каналы одного модуля измеряются одной задачей :meth:`measure_unit_insulation` (см.
+        :meth:`plan_insulation_campaign`). Ключ очереди - последовательный порт модуля, поэтому модули
+        одного порта измеряются по очереди, модули разных портов - параллельно
 
-                    threading.Thread(target=self.set_ch_state, kwargs={
-                        'channel_addr': channel_addr, 'new_state_dict': new_state_dict}).start()
-                else:
-                    log_msg = 'redis not match'
-                    self.logger.debug(log_msg)
-
-            # </editor-fold>
-
-            # <editor-fold desc="Обработка команд на измерение сопротивления изоляции">
-            message_isol = subscriber_isol_cmd.get_message()
-            if message_isol:
-                self.logger.info(
-                    'Получена команда на измерение сопротивления изоляции: {}'.format(message_isol['data']))
-                channel_addr = message_isol['data']
-                threading.Thread(target=self.measure_insulation_resistance, args=(channel_addr,)).start()
-            time.sleep(0.01)
-            # </editor-fold>
+        :type message: dict
+        :param message: сообщение из канала ``axiomLogic:request:insulation``
+        """
+        self.logger.info('Получена команда на измерение сопротивления изоляции: {}'.format(message['data']))
+        for port, unit_addr, channel_positions in self.plan_insulation_campaign(message['data']):
+            if not self.insulation_executor.submit(port, 'insulation', self.measure_unit_insulation,
+                                                   unit_addr, channel_positions):
+                for channel_position in channel_positions:
+                    self.reject_command('ch:{}:{}'.format(unit_addr, channel_position),
+                                        'измерения сопротивления изоляции')
+
+    def reject_command(self, channel_addr, description):
+        """
+        Сообщает об отклонении команды из-за переполнения очереди исполнителя :attr:`command_executor`
+        или :attr:`insulation_executor`
+
+        :type channel_addr: str
+        :param channel_addr: адрес канала силового модуля
+        :type description: str
+        :param description: описание команды для сообщения
+        """
+        log_msg = 'Команда {} на выходе "{}" отклонена: очередь команд переполнена'.format(description, channel_addr)
+        self.logger.error(log_msg)
+        self.redis_writer.publish(channel='axiomLowLevelCommunication:info:error', message=log_msg)
 
     def sigterm_handler(self, signum, frame):
         """
@@ -1277,22 +1829,25 @@ class HighLowTransceiver:
         """
         Публикует на брокер текущие значения энергетических характеристик аппаратных модулей
 
-        Запускается как задача планировщика :attr:`scheduler`. Выполняется каждые 10 секунд. Отправляет
-        следующие характеристики:
+        Запускается как задача планировщика :attr:`scheduler` с периодом ``METRICS_PUBLISH_INTERVAL`` секунд.
+        Мощности рассчитываются сразу для всех каналов всех силовых модулей, сообщения отправляются
+        в Redis одним пакетом команд. Отправляет следующие характеристики:
 
         * Напряжение электросети на модулях ввода;
         * Частота электросети на модулях ввода;
         * Активная потребляемая мощность в каналах силовых модулей;
         * Реактивная потребляемая мощность в каналах силовых модулей;
         * Ток, потребляемый в каналах силовых модулей;
-        * Температура каналов силовых модулей.
+        * Температура каналов силовых модулей;
+        * Агрегаты тока, мощности и температуры каналов за время с предыдущей публикации (поле ``window``,
+          :meth:`~axiomLowLevelCommunication.readingAggregates.PowerUnitAggregates.collect`).
 
         Канал Redis для отправки сообщений: ``axiomLowLevelCommunication:info:metrics_data``.
         """
         # for input_unit_addr in self.hardware_units:
         #
         #     # Считаем напряжение на модуле ввода
-        #     voltage_sample = int(self.input_units_state_dicts[input_unit_addr]['adc']['sample'])
+        #     voltage_sample = int(self.input_units_state[input_unit_addr]['adc']['sample'])
         #
         #     Um = abs(voltage_sample * (3/4096) - 1.5) * 253.557     # амплитудное значение напряжения
         #     U = Um * 0.707                                          # действующее значение напряжения
@@ -1304,8 +1859,8 @@ class HighLowTransceiver:
         #                    message=json.dumps(voltage_message))
 
         # for input_unit_addr in self.input_unit_addrs:
-        #     U = self.input_units_state_dicts[input_unit_addr]['volt']['Vin']
-        #     F = self.input_units_state_dicts[input_unit_addr]['volt']['freq']
+        #     U = self.input_units_state[input_unit_addr]['volt']['Vin']
+        #     F = self.input_units_state[input_unit_addr]['volt']['freq']
         #     P_own = self.calc_system_own_power(input_unit_addr)
         #
         #     metrics_data = {'U': U, 'F': F, 'P_own': P_own, 'addr': input_unit_addr}
@@ -1313,76 +1868,68 @@ class HighLowTransceiver:
         #     self.r.publish(channel='axiomLowLevelCommunication:info:metrics_data',
         #                    message=ujson.dumps(metrics_data))
 
-        U = 220
-
-        for power_unit_addr in self.power_unit_addrs:
-            # Значения температур каналов силовых модулей
-            T1 = int(self.power_units_state_dicts[power_unit_addr]['tmpr']['temp1'])
-            T2 = int(self.power_units_state_dicts[power_unit_addr]['tmpr']['temp2'])
-
-            # Действующее значение тока
-            I1 = float(self.power_units_state_dicts[power_unit_addr]['adc']['sample1'])
-            I2 = float(self.power_units_state_dicts[power_unit_addr]['adc']['sample2'])
-
-            angle1 = int(self.power_units_state_dicts[power_unit_addr]['ld']['angle1'])
-            angle2 = int(self.power_units_state_dicts[power_unit_addr]['ld']['angle2'])
-
-            # # Амплитудное значение тока в первом и втором каналах
-            # Im1 = (abs(1.5 - (3 * current_sample1 / 4096)) / 0.066)
-            # Im2 = (abs(1.5 - (3 * current_sample2 / 4096)) / 0.066)
-            #
-            # # Действующее значение тока в первом и втором каналах
-            # I1 = Im1 * 0.707
-            # I2 = Im2 * 0.707
-
-            # Фазовый сдвиг в первом и втором каналах
-            phi1 = (angle1 * math.pi) / 80
-            phi2 = (angle2 * math.pi) / 80
-
-            # Активная мощность потребляемая мощность в первом и втором каналах
-            Pa1 = U * I1 * math.cos(phi1)
-            Pa2 = U * I2 * math.cos(phi2)
-            # print('Мощность1: {}, Фи1: {}, Ток1: {}, Косинус1: {}'.format(Pa1, phi1, I1, math.cos(phi1)))
-            # print('Мощность2: {}, Фи2: {}, Ток2: {}, Косинус2: {}'.format(Pa2, phi2, I2, math.cos(phi2)))
-            # print()
-
-            # Реактивная потребляемая мощность в первом и втором каналах
-            Pr1 = U * I1 * math.sin(phi1)
-            Pr2 = U * I2 * math.sin(phi2)
-
-            # Полная потребляемая мощности в первом и втором каналах
-            # P1 = U * I1
-            # P2 = U * I2
-
-            # Частота на модуле
-            # F = int(self.power_units_state_dicts[power_unit_addr]['adc']['freq'])
-            F = 0
-
-            # Публикуем рассчитанные значения потребления и тока
-            active_power_message = {'P1': Pa1, 'P2': Pa2, 'addr': power_unit_addr, 'timestamp': time.time()}
+        U = MAINS_VOLTAGE
 
-            reactive_power_message = {'P1': Pr1, 'P2': Pr2, 'addr': power_unit_addr, 'timestamp': time.time()}
+        # Частота на модуле
+        # F = int(self.power_units_state[power_unit_addr]['adc']['freq'])
+        F = 0
 
-            current_message = {'I1': I1, 'I2': I2, 'addr': power_unit_addr, 'timestamp': time.time()}
-
-            frequency_message = {'F': F, 'addr': power_unit_addr, 'timestamp': time.time()}
-
-            self.redis.publish(channel='axiomLowLevelCommunication:info:active_power',
-                               message=json.dumps(active_power_message))
-
-            self.redis.publish(channel='axiomLowLevelCommunication:info:reactive_power',
-                               message=json.dumps(reactive_power_message))
+        # Собираем токи, фазовые сдвиги и температуры каналов всех силовых модулей
+        unit_addrs = []
+        samples = []
+        temperatures = []
+        windows = []
+        for power_unit_addr in self.power_unit_addrs:
+            unit_state = self.power_units_state[power_unit_addr]
+            temperature = unit_state['tmpr'].snapshot().values
+            adc = unit_state['adc'].snapshot().values
+            load = unit_state['ld'].snapshot().values
+
+            # Пока от модуля не получены все посылки, характеристики не рассчитываются (счетчики посылок
+            # заполняются при первой посылке любого типа, см. check_power_unit_counter)
+            if temperature['temp1'] is None or adc['sample1'] is None or load['angle1'] is None:
+                continue
 
-            self.redis.publish(channel='axiomLowLevelCommunication:info:current',
-                               message=json.dumps(current_message))
+            unit_addrs.append(power_unit_addr)
+            samples.append((adc['sample1'], adc['sample2'], load['angle1'], load['angle2']))
+            temperatures.append((temperature['temp1'], temperature['temp2']))
+            windows.append(self.power_unit_aggregates[power_unit_addr].collect())
 
-            self.redis.publish(channel='axiomLowLevelCommunication:info:frequency',
-                               message=json.dumps(frequency_message))
+        if not unit_addrs:
+            return
 
-            characteristics_dict = {'Pa1': Pa1, 'Pa2': Pa2, 'Pr1': Pr1, 'Pr2': Pr2, 'I1': I1, 'I2': I2,
-                                    'T1': T1, 'T2': T2, 'U': U, 'F': F, 'addr': power_unit_addr}
-            self.redis.publish(channel=OUTPUT_INFO_METRICS_CHANNEL,
-                               message=ujson.dumps(characteristics_dict))
+        # Строка массива - силовой модуль, столбец - канал
+        samples = np.array(samples, dtype=float)
+
+        # Действующее значение тока
+        I = samples[:, 0:2]
+
+        # Фазовый сдвиг
+        phi = samples[:, 2:4] * math.pi / 80
+
+        # Активная и реактивная потребляемая мощность
+        Pa = U * I * np.cos(phi)
+        Pr = U * I * np.sin(phi)
+
+        # Публикуем рассчитанные значения потребления и тока одним пакетом
+        timestamp = time.time()
+        messages = []
+        for power_unit_addr, (Pa1, Pa2), (Pr1, Pr2), (I1, I2), (T1, T2), window in zip(
+                unit_addrs, Pa.tolist(), Pr.tolist(), I.tolist(), temperatures, windows):
+            messages += [
+                ('axiomLowLevelCommunication:info:active_power',
+                 {'P1': Pa1, 'P2': Pa2, 'addr': power_unit_addr, 'timestamp': timestamp}),
+                ('axiomLowLevelCommunication:info:reactive_power',
+                 {'P1': Pr1, 'P2': Pr2, 'addr': power_unit_addr, 'timestamp': timestamp}),
+                ('axiomLowLevelCommunication:info:current',
+                 {'I1': I1, 'I2': I2, 'addr': power_unit_addr, 'timestamp': timestamp}),
+                ('axiomLowLevelCommunication:info:frequency',
+                 {'F': F, 'addr': power_unit_addr, 'timestamp': timestamp}),
+                (OUTPUT_INFO_METRICS_CHANNEL,
+                 {'Pa1': Pa1, 'Pa2': Pa2, 'Pr1': Pr1, 'Pr2': Pr2, 'I1': I1, 'I2': I2,
+                  'T1': T1, 'T2': T2, 'U': U, 'F': F, 'addr': power_unit_addr, 'window': window}),
+            ]
+        self.redis_writer.publish_many(messages)
 
     def calc_passive_consumption(self):
         """
@@ -1427,10 +1974,9 @@ class HighLowTransceiver:
         :return: рассчитанная мощность [Вт]
         """
 
-        Vin = float(self.input_units_state_dicts[input_unit_addr]['volt']['Vin'])
-        Iin = float(self.input_units_state_dicts[input_unit_addr]['cur']['Iin'])
-        Iout = float(self.input_units_state_dicts[input_unit_addr]['cur']['Iout'])
-        Iypr = float(self.input_units_state_dicts[input_unit_addr]['cur']['Iypr'])
+        Vin = self.input_units_state[input_unit_addr]['volt'].Vin
+        current = self.input_units_state[input_unit_addr]['cur'].snapshot().values
+        Iin, Iout, Iypr = current['Iin'], current['Iout'], current['Iypr']
 
         Pin = Vin * Iin
         Pout = Vin * Iout
@@ -1479,6 +2025,25 @@ class HighLowTransceiver:
             self.scheduler.shutdown()
             self.isRunning = False
         finally:
-            for transceiver in self.unit_addrs_to_transceivers_map.values():
-                transceiver.close()
+            self.close()
             sys.exit(0)
+
+    def close(self):
+        """
+        Освобождает ресурсы функционального модуля
+
+        Останавливает планировщик, исполнители и очереди команд, записывает в Redis отложенные данные,
+        закрывает последовательные порты и файл записи обмена
+        """
+        if self.scheduler.running:
+            self.scheduler.shutdown()
+        self.command_executor.shutdown(timeout=1)
+        self.insulation_executor.shutdown(timeout=1)
+        for command_scheduler in self.command_schedulers.values():
+            command_scheduler.close(timeout=1)
+        self.port_bring_up.stop()
+        self.redis_writer.flush(timeout=1)
+        for transceiver in self.port_transceivers.values():
+            transceiver.close()
+        if self.capture:
+            self.capture.close()
@@ -0,0 +1,172 @@
+import collections
+import threading
+import time
+from axiomLib.loggers import create_logger
+from axiomLowLevelCommunication.config import LOG_FILE_DIRECTORY, LOG_FILE_NAME, INIT_MAX_PARALLEL_PORTS
+
+
+class InitCoordinator:
+    """
+    Координатор инициализации силовых модулей
+
+    После пропадания питания все силовые модули перезагружаются одновременно, и инициализация каждого
+    модуля запрашивается несколько раз (по счетчику посылок каждого типа и по состоянию каналов). Координатор:
+
+    * ставит модуль в очередь один раз: запросы для модуля, который ожидает инициализации или
+      инициализируется, отбрасываются;
+    * инициализирует на одном последовательном порту не более одного модуля одновременно - команды
+      модулей одного порта все равно передаются по одной линии;
+    * одновременно обслуживает не более :attr:`max_parallel` портов.
+
+    Время восстановления - время от первого запроса до завершения инициализации всех модулей,
+    запрошенных за это время, - сохраняется в :attr:`last_restore`
+    """
+
+    def __init__(self, init_unit, unit_ports, max_parallel=INIT_MAX_PARALLEL_PORTS):
+        """
+        Инициализирует экземпляр класса
+
+        :type init_unit: callable
+        :param init_unit: функция инициализации модуля, принимает адрес модуля, возвращает True при успехе
+        :type unit_ports: dict
+        :param unit_ports: последовательные порты модулей по адресам модулей
+        :type max_parallel: int
+        :param max_parallel: максимальное количество портов, на которых одновременно выполняется инициализация
+
+        :ivar queues: модули, ожидающие инициализации, по портам
+        :ivar requested: модули, ожидающие инициализации или инициализируемые
+        :ivar busy_ports: порты, на которых выполняется инициализация
+        :ivar workers: количество потоков инициализации
+        :ivar counters: счетчики запросов, отброшенных повторных запросов, успешных и неудачных инициализаций
+        :ivar restore: количество модулей, количество ошибок и время начала текущей серии инициализаций
+        :ivar last_restore: количество модулей, количество ошибок и время восстановления [с]
+         для последней серии инициализаций (None - инициализаций не было)
+        """
+        self.logger = create_logger(logger_name=__name__,
+                                    logfile_directory=LOG_FILE_DIRECTORY,
+                                    logfile_name=LOG_FILE_NAME)
+        self.init_unit = init_unit
+        self.unit_ports = unit_ports
+        self.max_parallel = max_parallel
+        self.condition = threading.Condition()
+        self.queues = collections.OrderedDict()
+        self.requested = set()
+        self.busy_ports = set()
+        self.workers = 0
+        self.counters = dict.fromkeys(('requests', 'deduplicated', 'completed', 'failed'), 0)
+        self.restore = None
+        self.last_restore = None
+
+    def request(self, unit_addr):
+        """
+        Ставит модуль в очередь инициализации
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        :rtype: bool
+        :return: True - модуль поставлен в очередь, False - модуль уже ожидает инициализации или инициализируется
+        """
+        port = self.unit_ports[unit_addr]
+        with self.condition:
+            self.counters['requests'] += 1
+            if unit_addr in self.requested:
+                self.counters['deduplicated'] += 1
+                return False
+
+            if not self.requested:
+                self.restore = {'units': 0, 'failed': 0, 'start_time': time.monotonic()}
+            self.restore['units'] += 1
+            self.requested.add(unit_addr)
+            self.queues.setdefault(port, collections.deque()).append(unit_addr)
+
+            if port not in self.busy_ports and self.workers < self.max_parallel:
+                self.workers += 1
+                threading.Thread(target=self.worker_target, daemon=True).start()
+            return True
+
+    def next_unit(self):
+        """
+        Выбирает модуль для инициализации на порту, где инициализация не выполняется
+
+        Вызывается при захваченной блокировке :attr:`condition`
+
+        :rtype: tuple
+        :return: (порт, адрес модуля) или None, если свободных портов с ожидающими модулями нет
+        """
+        for port, queue in self.queues.items():
+            if port not in self.busy_ports:
+                unit_addr = queue.popleft()
+                if queue:
+                    # Порт переносится в конец, чтобы порты обслуживались по очереди
+                    self.queues.move_to_end(port)
+                else:
+                    del self.queues[port]
+                self.busy_ports.add(port)
+                return port, unit_addr
+        return None
+
+    def worker_target(self):
+        """
+        Инициализирует модули, пока есть модули на свободных портах
+        """
+        while True:
+            with self.condition:
+                task = self.next_unit()
+                if task is None:
+                    self.workers -= 1
+                    return
+            port, unit_addr = task
+
+            try:
+                success = self.init_unit(unit_addr)
+            except Exception as e:
+                self.logger.error('Ошибка при инициализации модуля {}: {}'.format(unit_addr, e))
+                success = False
+
+            with self.condition:
+                self.busy_ports.discard(port)
+                self.requested.discard(unit_addr)
+                self.counters['completed' if success else 'failed'] += 1
+                if not success:
+                    self.restore['failed'] += 1
+                if not self.requested:
+                    self.finish_restore()
+                self.condition.notify_all()
+
+    def finish_restore(self):
+        """
+        Сохраняет время восстановления после завершения инициализации всех запрошенных модулей
+
+        Вызывается при захваченной блокировке :attr:`condition`
+        """
+        restore, self.restore = self.restore, None
+        duration = time.monotonic() - restore['start_time']
+        self.last_restore = {'units': restore['units'], 'failed': restore['failed'], 'duration': duration,
+                             'timestamp': time.time()}
+        self.logger.info('Инициализация модулей ({}) завершена за {:.1f} с, ошибок: {}'.format(
+            restore['units'], duration, restore['failed']))
+
+    def wait_idle(self, timeout=None):
+        """
+        Ожидает завершения инициализации всех запрошенных модулей
+
+        :type timeout: float
+        :param timeout: максимальное время ожидания [с] (None - без ограничения)
+        :rtype: bool
+        :return: True - инициализация завершена, False - истек таймаут
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.requested, timeout)
+
+    def stats(self):
+        """
+        Возвращает снимок статистики инициализации
+
+        :rtype: dict
+        :return: счетчики :attr:`counters`, количество модулей в очереди (queued) и инициализируемых (running),
+         время последнего восстановления (last_restore)
+        """
+        with self.condition:
+            queued = sum(len(queue) for queue in self.queues.values())
+            return dict(self.counters, queued=queued, running=len(self.requested) - queued,
+                        last_restore=self.last_restore)
@@ -0,0 +1,71 @@
+"""
+Кампании измерения сопротивления изоляции
+
+Команда из канала ``axiomLogic:request:insulation`` содержит один или несколько адресов, разделенных
+пробелами или запятыми: адрес канала ``ch:<адрес модуля>:<номер канала>`` или адрес силового модуля
+``<адрес модуля>`` (измеряются оба канала модуля). Адреса группируются по модулям
+(:func:`parse_insulation_request`): каналы одного модуля измеряются в одном окне обслуживания, после
+одного сброса модуля. Модули на разных последовательных портах измеряются параллельно, на одном порту -
+по очереди. Результат измерения каждого канала публикуется в канал
+``axiomLowLevelCommunication:response:insulation`` по мере получения
+"""
+import re
+from collections import OrderedDict
+
+# Адрес канала силового модуля или адрес силового модуля
+TARGET_REGEX = re.compile(r'^(?:ch:(m\d+):([12])|(m\d+))$')
+
+# Разделители адресов в команде
+TARGET_SEPARATOR_REGEX = re.compile(r'[\s,]+')
+
+# Номера каналов силового модуля
+CHANNEL_POSITIONS = ('1', '2')
+
+
+def target_unit_addr(target):
+    """
+    :type target: str
+    :param target: адрес канала или адрес силового модуля
+    :rtype: str
+    :return: адрес силового модуля или None, если адрес некорректен
+    """
+    match = TARGET_REGEX.match(target)
+    if match is None:
+        return None
+    return match.group(1) or match.group(3)
+
+
+def split_targets(data):
+    """
+    :type data: str
+    :param data: команда измерения сопротивления изоляции
+    :rtype: list
+    :return: адреса каналов и модулей в порядке следования в команде
+    """
+    return [target for target in TARGET_SEPARATOR_REGEX.split(data.strip()) if target]
+
+
+def parse_insulation_request(data):
+    """
+    Группирует адреса из команды измерения сопротивления изоляции по силовым модулям
+
+    :type data: str
+    :param data: команда измерения сопротивления изоляции
+    :rtype: tuple
+    :return: (номера каналов по адресам модулей в порядке первого упоминания модуля в команде,
+     некорректные адреса)
+    """
+    units = OrderedDict()
+    invalid = []
+    for target in split_targets(data):
+        match = TARGET_REGEX.match(target)
+        if match is None:
+            invalid.append(target)
+            continue
+        positions = units.setdefault(match.group(1) or match.group(3), [])
+        for position in (match.group(2),) if match.group(2) else CHANNEL_POSITIONS:
+            if position not in positions:
+                positions.append(position)
+    for positions in units.values():
+        positions.sort()
+    return units, invalid
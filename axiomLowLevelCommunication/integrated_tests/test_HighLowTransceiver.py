@@ -74,9 +74,9 @@ class TestRead(TestHighLowTransceiver):
             time.sleep(0.01)
 
         for unit_addr in self.settings['power units']:
-            self.assertNotEqual(hlTransceiver.power_units_state_dicts[unit_addr]['st']['cnt'], '0')
-            self.assertNotEqual(hlTransceiver.power_units_state_dicts[unit_addr]['adc']['cnt'], '0')
-            self.assertNotEqual(hlTransceiver.power_units_state_dicts[unit_addr]['ld']['cnt'], '0')
+            self.assertNotEqual(hlTransceiver.power_units_state[unit_addr]['st']['cnt'], '0')
+            self.assertNotEqual(hlTransceiver.power_units_state[unit_addr]['adc']['cnt'], '0')
+            self.assertNotEqual(hlTransceiver.power_units_state[unit_addr]['ld']['cnt'], '0')
 
     def test_reader_target_constantly_updates_state_struct_for_every_power_unit(self):
         """
@@ -91,11 +91,11 @@ class TestRead(TestHighLowTransceiver):
 
         time.sleep(1)
 
-        state1 = copy.deepcopy(hlTransceiver.power_units_state_dicts)
+        state1 = copy.deepcopy(hlTransceiver.power_units_state)
 
         time.sleep(1)
 
-        state2 = copy.deepcopy(hlTransceiver.power_units_state_dicts)
+        state2 = copy.deepcopy(hlTransceiver.power_units_state)
 
         try:
             self.assertTrue(state1 != state2)
@@ -136,8 +136,8 @@ class TestInitPowerUnit(TestHighLowTransceiver):
 
                 while True:
                     try:
-                        self.assertEqual(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-                        self.assertEqual(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+                        self.assertEqual(hlTransceiver.power_units_state[unit_addr]['st']['state1'], '0')
+                        self.assertEqual(hlTransceiver.power_units_state[unit_addr]['st']['state2'], '0')
                         tries = 1
                         break
                     except AssertionError:
@@ -157,8 +157,8 @@ class TestInitPowerUnit(TestHighLowTransceiver):
 
             hlTransceiver.isRunning = False
 
-            self.assertNotEqual(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-            self.assertNotEqual(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+            self.assertNotEqual(hlTransceiver.power_units_state[unit_addr]['st']['state1'], '0')
+            self.assertNotEqual(hlTransceiver.power_units_state[unit_addr]['st']['state2'], '0')
 
     def test_configure_power_unit(self):
         """
@@ -186,8 +186,8 @@ class TestInitPowerUnit(TestHighLowTransceiver):
 
                 while True:
                     try:
-                        self.assertEqual(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-                        self.assertEqual(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+                        self.assertEqual(hlTransceiver.power_units_state[unit_addr]['st']['state1'], '0')
+                        self.assertEqual(hlTransceiver.power_units_state[unit_addr]['st']['state2'], '0')
                         tries = 1
                         break
                     except AssertionError:
@@ -206,15 +206,15 @@ class TestInitPowerUnit(TestHighLowTransceiver):
 
             time.sleep(1)
 
-            self.assertNotEqual(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-            self.assertNotEqual(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+            self.assertNotEqual(hlTransceiver.power_units_state[unit_addr]['st']['state1'], '0')
+            self.assertNotEqual(hlTransceiver.power_units_state[unit_addr]['st']['state2'], '0')
 
             # Проверяем, что хотя бы один из выходов находится в состоянии 3
             check_state_time = time.time()
             while True:
                 try:
-                    self.assertTrue(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] == '3' or
-                                    hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] == '3')
+                    self.assertTrue(hlTransceiver.power_units_state[unit_addr]['st']['state1'] == '3' or
+                                    hlTransceiver.power_units_state[unit_addr]['st']['state2'] == '3')
                     break
                 except AssertionError:
                     if time.time() - check_state_time < 5:
@@ -231,8 +231,8 @@ class TestInitPowerUnit(TestHighLowTransceiver):
             check_state_time = time.time()
             while True:
                 try:
-                    self.assertTrue(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] != '3' and
-                                    hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] != '3')
+                    self.assertTrue(hlTransceiver.power_units_state[unit_addr]['st']['state1'] != '3' and
+                                    hlTransceiver.power_units_state[unit_addr]['st']['state2'] != '3')
                     break
                 except AssertionError:
                     if time.time() - check_state_time < 3:
@@ -271,8 +271,8 @@ class TestInitPowerUnit(TestHighLowTransceiver):
 
                 while True:
                     try:
-                        self.assertEqual(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-                        self.assertEqual(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+                        self.assertEqual(hlTransceiver.power_units_state[unit_addr]['st']['state1'], '0')
+                        self.assertEqual(hlTransceiver.power_units_state[unit_addr]['st']['state2'], '0')
                         tries = 1
                         break
                     except AssertionError:
@@ -294,11 +294,11 @@ class TestInitPowerUnit(TestHighLowTransceiver):
             check_state_time = time.time()
             while True:
                 try:
-                    self.assertTrue(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] != '0' and
-                                    hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] != '0')
+                    self.assertTrue(hlTransceiver.power_units_state[unit_addr]['st']['state1'] != '0' and
+                                    hlTransceiver.power_units_state[unit_addr]['st']['state2'] != '0')
 
-                    self.assertTrue(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] != '3' and
-                                    hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] != '3')
+                    self.assertTrue(hlTransceiver.power_units_state[unit_addr]['st']['state1'] != '3' and
+                                    hlTransceiver.power_units_state[unit_addr]['st']['state2'] != '3')
                     break
                 except AssertionError:
                     if time.time() - check_state_time < 5:
@@ -337,8 +337,8 @@ class TestInitPowerUnit(TestHighLowTransceiver):
 
                 while True:
                     try:
-                        self.assertEqual(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-                        self.assertEqual(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+                        self.assertEqual(hlTransceiver.power_units_state[unit_addr]['st']['state1'], '0')
+                        self.assertEqual(hlTransceiver.power_units_state[unit_addr]['st']['state2'], '0')
                         tries = 1
                         break
                     except AssertionError:
@@ -361,8 +361,8 @@ class TestInitPowerUnit(TestHighLowTransceiver):
             check_state_time = time.time()
             while True:
                 try:
-                    self.assertTrue(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] == '3' or
-                                    hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] == '3')
+                    self.assertTrue(hlTransceiver.power_units_state[unit_addr]['st']['state1'] == '3' or
+                                    hlTransceiver.power_units_state[unit_addr]['st']['state2'] == '3')
                     break
                 except AssertionError:
                     if time.time() - check_state_time < 5:
@@ -379,8 +379,8 @@ class TestInitPowerUnit(TestHighLowTransceiver):
             check_state_time = time.time()
             while True:
                 try:
-                    self.assertTrue(hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] != '3' and
-                                    hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] != '3')
+                    self.assertTrue(hlTransceiver.power_units_state[unit_addr]['st']['state1'] != '3' and
+                                    hlTransceiver.power_units_state[unit_addr]['st']['state2'] != '3')
                     break
                 except AssertionError:
                     if time.time() - check_state_time < 3:
@@ -429,8 +429,8 @@ class TestWrite(TestHighLowTransceiver):
 
                 while True:
                     try:
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '0')
                         tries = 1
                         break
                     except AssertionError:
@@ -451,11 +451,11 @@ class TestWrite(TestHighLowTransceiver):
             check_state_time = time.time()
             while True:
                 try:
-                    self.assertTrue(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'] != '0' and
-                                    self.hlt.power_units_state_dicts[unit_addr]['st']['state2'] != '0')
+                    self.assertTrue(self.hlt.power_units_state[unit_addr]['st']['state1'] != '0' and
+                                    self.hlt.power_units_state[unit_addr]['st']['state2'] != '0')
 
-                    self.assertTrue(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'] != '3' and
-                                    self.hlt.power_units_state_dicts[unit_addr]['st']['state2'] != '3')
+                    self.assertTrue(self.hlt.power_units_state[unit_addr]['st']['state1'] != '3' and
+                                    self.hlt.power_units_state[unit_addr]['st']['state2'] != '3')
                     break
                 except AssertionError:
                     if time.time() - check_state_time < 5:
@@ -476,10 +476,10 @@ class TestWrite(TestHighLowTransceiver):
             check_state_time = time.time()
             while True:
                 try:
-                    self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '5',
+                    self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '5',
                                      msg='Первый канал модуля {} не включился'.format(unit_addr))
 
-                    self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '5',
+                    self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '5',
                                      msg='Второй канал модуля {} не включился'.format(unit_addr))
                     break
                 except AssertionError:
@@ -524,8 +524,8 @@ class TestWrite(TestHighLowTransceiver):
 
                 while True:
                     try:
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '0')
                         tries = 1
                         break
                     except AssertionError:
@@ -549,10 +549,10 @@ class TestWrite(TestHighLowTransceiver):
             check_state_time = time.time()
             while True:
                 try:
-                    self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '5',
+                    self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '5',
                                      msg='Первый канал модуля {} не включился'.format(unit_addr))
 
-                    self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '5',
+                    self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '5',
                                      msg='Первый канал модуля {} не включился'.format(unit_addr))
                     break
                 except AssertionError:
@@ -593,8 +593,8 @@ class TestWrite(TestHighLowTransceiver):
 
                 while True:
                     try:
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '0')
                         tries = 1
                         break
                     except AssertionError:
@@ -620,8 +620,8 @@ class TestWrite(TestHighLowTransceiver):
             check_state_time = time.time()
             while True:
                 try:
-                    self.assertTrue(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'] == '5' or
-                                    self.hlt.power_units_state_dicts[unit_addr]['st']['state2'] == '5')
+                    self.assertTrue(self.hlt.power_units_state[unit_addr]['st']['state1'] == '5' or
+                                    self.hlt.power_units_state[unit_addr]['st']['state2'] == '5')
                     break
                 except AssertionError:
                     if time.time() - check_state_time < 2:
@@ -632,8 +632,8 @@ class TestWrite(TestHighLowTransceiver):
                         raise
 
             # Результаты выполенения команд включения каналов
-            result1 = self.hlt.power_units_state_dicts[unit_addr]['st']['state1'] == '5'
-            result2 = self.hlt.power_units_state_dicts[unit_addr]['st']['state2'] == '5'
+            result1 = self.hlt.power_units_state[unit_addr]['st']['state1'] == '5'
+            result2 = self.hlt.power_units_state[unit_addr]['st']['state2'] == '5'
 
             if result1:
                 cmd = str({'addr': 'ch:{}:1'.format(unit_addr), 'state': {'status': '4'}})
@@ -652,10 +652,10 @@ class TestWrite(TestHighLowTransceiver):
             while True:
                 try:
                     if result1:
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '4',
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '4',
                                          msg='Первый канал модуля {} не выключился'.format(unit_addr))
                     if result2:
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '4',
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '4',
                                          msg='Второй канал модуля {} не выключился'.format(unit_addr))
                     break
                 except AssertionError:
@@ -700,8 +700,8 @@ class TestWrite(TestHighLowTransceiver):
 
                 while True:
                     try:
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '0')
                         tries = 1
                         break
                     except AssertionError:
@@ -726,10 +726,10 @@ class TestWrite(TestHighLowTransceiver):
             check_state_time = time.time()
             while True:
                 try:
-                    self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '4',
+                    self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '4',
                                      msg='Первый канал модуля {} не перешел в состояние "Выключен"'.format(unit_addr))
 
-                    self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '4',
+                    self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '4',
                                      msg='Второй канал модуля {} не перешел в состояние "Выключен"'.format(unit_addr))
                     break
                 except AssertionError:
@@ -773,8 +773,8 @@ class TestWrite(TestHighLowTransceiver):
 
                 while True:
                     try:
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '0')
                         tries = 1
                         break
                     except AssertionError:
@@ -795,11 +795,11 @@ class TestWrite(TestHighLowTransceiver):
             check_state_time = time.time()
             while True:
                 try:
-                    self.assertTrue(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'] != '0' and
-                                    self.hlt.power_units_state_dicts[unit_addr]['st']['state2'] != '0')
+                    self.assertTrue(self.hlt.power_units_state[unit_addr]['st']['state1'] != '0' and
+                                    self.hlt.power_units_state[unit_addr]['st']['state2'] != '0')
 
-                    self.assertTrue(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'] != '3' and
-                                    self.hlt.power_units_state_dicts[unit_addr]['st']['state2'] != '3')
+                    self.assertTrue(self.hlt.power_units_state[unit_addr]['st']['state1'] != '3' and
+                                    self.hlt.power_units_state[unit_addr]['st']['state2'] != '3')
                     break
                 except AssertionError:
                     if time.time() - check_state_time < 5:
@@ -813,7 +813,7 @@ class TestWrite(TestHighLowTransceiver):
             for i in range(25):
                 print(i)
                 # Первый канал
-                if self.hlt.power_units_state_dicts[unit_addr]['st']['state1'] == '4':
+                if self.hlt.power_units_state[unit_addr]['st']['state1'] == '4':
                     # self.hlt.event.clear()
                     if self.hlt.set_ch_state(channel_addr='ch:{}:1'.format(unit_addr),
                                              new_state_dict={'status': '5'}):
@@ -822,7 +822,7 @@ class TestWrite(TestHighLowTransceiver):
                         failure += 1
                     # self.hlt.event.set()
 
-                if self.hlt.power_units_state_dicts[unit_addr]['st']['state1'] == '5':
+                if self.hlt.power_units_state[unit_addr]['st']['state1'] == '5':
                     # self.hlt.event.clear()
                     if self.hlt.set_ch_state(channel_addr='ch:{}:1'.format(unit_addr),
                                              new_state_dict={'status': '4'}):
@@ -832,12 +832,12 @@ class TestWrite(TestHighLowTransceiver):
                     # self.hlt.event.set()
 
                 # Второй канал
-                if self.hlt.power_units_state_dicts[unit_addr]['st']['state2'] == '4':
+                if self.hlt.power_units_state[unit_addr]['st']['state2'] == '4':
                     send_time = time.time()
                     self.r.publish("axiomLogic:cmd:state", json.dumps({'addr': 'ch:m2:2', 'state': {'status': '5'}}))
                     while True:
                         try:
-                            self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '5')
+                            self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '5')
                             success += 1
                             break
                         except AssertionError:
@@ -848,12 +848,12 @@ class TestWrite(TestHighLowTransceiver):
                                 failure += 1
                                 break
 
-                if self.hlt.power_units_state_dicts[unit_addr]['st']['state2'] == '5':
+                if self.hlt.power_units_state[unit_addr]['st']['state2'] == '5':
                     send_time = time.time()
                     self.r.publish("axiomLogic:cmd:state", json.dumps({'addr': 'ch:m2:2', 'state': {'status': '4'}}))
                     while True:
                         try:
-                            self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '4')
+                            self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '4')
                             success += 1
                             break
                         except AssertionError:
@@ -911,11 +911,11 @@ class TestRun(TestHighLowTransceiver):
 
         time.sleep(1)
 
-        state1 = copy.deepcopy(self.hlt.power_units_state_dicts)
+        state1 = copy.deepcopy(self.hlt.power_units_state)
 
         time.sleep(1)
 
-        state2 = copy.deepcopy(self.hlt.power_units_state_dicts)
+        state2 = copy.deepcopy(self.hlt.power_units_state)
 
         try:
             self.assertTrue(state1 != state2)
@@ -933,8 +933,8 @@ class TestRun(TestHighLowTransceiver):
         # Сбрасываем состояние модуля (не всегда работает с первого раза)
         for unit_addr in self.settings['power units']:
 
-            self.hlt.power_units_state_dicts[unit_addr]['st']['state1'] = None
-            self.hlt.power_units_state_dicts[unit_addr]['st']['state2'] = None
+            self.hlt.power_units_state[unit_addr]['st']['state1'] = None
+            self.hlt.power_units_state[unit_addr]['st']['state2'] = None
 
             tries = 3
             rst_cmd = 'rst {}'.format(unit_addr)
@@ -945,8 +945,8 @@ class TestRun(TestHighLowTransceiver):
                 while True:
                     self.hlt.collect_units_state()
                     try:
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '0')
                         tries = 1
                         break
                     except AssertionError:
@@ -971,8 +971,8 @@ class TestRun(TestHighLowTransceiver):
         while time.time() - check_time < delay:
             try:
                 for unit_addr in self.settings['power units']:
-                    ch1_state = self.hlt.power_units_state_dicts[unit_addr]['st']['state1']
-                    ch2_state = self.hlt.power_units_state_dicts[unit_addr]['st']['state2']
+                    ch1_state = self.hlt.power_units_state[unit_addr]['st']['state1']
+                    ch2_state = self.hlt.power_units_state[unit_addr]['st']['state2']
 
                     self.assertTrue(ch1_state not in ('0', '1', '3'),
                                     msg='Первый канал модуля {} не был проинициализирован, текущее состояние: {}'.format(
@@ -1008,8 +1008,8 @@ class TestRun(TestHighLowTransceiver):
             self.hlt.redis.set(name='ch:{}:1'.format(unit_addr), value={'status': '4'})
             self.hlt.redis.set(name='ch:{}:2'.format(unit_addr), value={'status': '4'})
 
-            self.hlt.power_units_state_dicts[unit_addr]['st']['state1'] = None
-            self.hlt.power_units_state_dicts[unit_addr]['st']['state2'] = None
+            self.hlt.power_units_state[unit_addr]['st']['state1'] = None
+            self.hlt.power_units_state[unit_addr]['st']['state2'] = None
 
             tries = 3
             rst_cmd = 'rst {}'.format(unit_addr)
@@ -1020,8 +1020,8 @@ class TestRun(TestHighLowTransceiver):
                 while True:
                     self.hlt.collect_units_state()
                     try:
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '0')
                         tries = 1
                         break
                     except AssertionError:
@@ -1046,8 +1046,8 @@ class TestRun(TestHighLowTransceiver):
         while time.time() - check_time < delay:
             try:
                 for unit_addr in self.settings['power units']:
-                    ch1_state = self.hlt.power_units_state_dicts[unit_addr]['st']['state1']
-                    ch2_state = self.hlt.power_units_state_dicts[unit_addr]['st']['state2']
+                    ch1_state = self.hlt.power_units_state[unit_addr]['st']['state1']
+                    ch2_state = self.hlt.power_units_state[unit_addr]['st']['state2']
 
                     self.assertTrue(ch1_state not in ('0', '1', '3') and
                                     ch2_state not in ('0', '1', '3'))
@@ -1058,7 +1058,7 @@ class TestRun(TestHighLowTransceiver):
 
         for unit_addr in self.settings['power units']:
             # Проверяем отработку команд включения
-            ch1_state = self.hlt.power_units_state_dicts[unit_addr]['st']['state1']
+            ch1_state = self.hlt.power_units_state[unit_addr]['st']['state1']
             if ch1_state != '4':
                 print('Первый канал модуля "{}" находится в состоянии "{}".'
                       ' Проверка отработки команды включения проводиться не будет!'.format(
@@ -1067,7 +1067,7 @@ class TestRun(TestHighLowTransceiver):
                 cmd = str({'addr': 'ch:{}:1'.format(unit_addr), 'state': {'status': '5'}})
                 self.r.publish(channel='axiomLogic:cmd:state', message=cmd)
 
-            ch2_state = self.hlt.power_units_state_dicts[unit_addr]['st']['state2']
+            ch2_state = self.hlt.power_units_state[unit_addr]['st']['state2']
             if ch2_state != '4':
                 print('Второй канал модуля "{}" находится в состоянии "{}".'
                       ' Проверка отработки команды включения проводиться не будет!'.format(
@@ -1081,10 +1081,10 @@ class TestRun(TestHighLowTransceiver):
             while True:
                 try:
                     if ch1_state == '4':
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '5',
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '5',
                                          msg='Первый канал модуля "{}" не включился'.format(unit_addr))
                     if ch2_state == '4':
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '5',
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '5',
                                          msg='Второй канал модуля "{}" не включился'.format(unit_addr))
                     break
                 except AssertionError:
@@ -1096,7 +1096,7 @@ class TestRun(TestHighLowTransceiver):
                         raise
 
             # Проверяем отработку команд выключения
-            ch1_state = self.hlt.power_units_state_dicts[unit_addr]['st']['state1']
+            ch1_state = self.hlt.power_units_state[unit_addr]['st']['state1']
             if ch1_state != '5':
                 print('Первый канал модуля "{}" находится в состоянии "{}".'
                       ' Проверка отработки команды выключения проводиться не будет!'.format(
@@ -1105,7 +1105,7 @@ class TestRun(TestHighLowTransceiver):
                 cmd = str({'addr': 'ch:{}:1'.format(unit_addr), 'state': {'status': '4'}})
                 self.r.publish(channel='axiomLogic:cmd:state', message=cmd)
 
-            ch2_state = self.hlt.power_units_state_dicts[unit_addr]['st']['state2']
+            ch2_state = self.hlt.power_units_state[unit_addr]['st']['state2']
             if ch2_state != '5':
                 print('Второй канал модуля "{}" находится в состоянии "{}".'
                       ' Проверка отработки команды выключения проводиться не будет!'.format(
@@ -1119,10 +1119,10 @@ class TestRun(TestHighLowTransceiver):
             while True:
                 try:
                     if ch1_state == '5':
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '4',
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '4',
                                          msg='Первый канал модуля "{}" не выключился'.format(unit_addr))
                     if ch2_state == '5':
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '4',
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '4',
                                          msg='Второй канал модуля "{}" не выключился'.format(unit_addr))
                     break
                 except AssertionError:
@@ -1155,8 +1155,8 @@ class TestRun(TestHighLowTransceiver):
             self.hlt.redis.set(name='ch:{}:1'.format(unit_addr), value=str({'status': '5'}))
             self.hlt.redis.set(name='ch:{}:2'.format(unit_addr), value=str({'status': '5'}))
 
-            self.hlt.power_units_state_dicts[unit_addr]['st']['state1'] = None
-            self.hlt.power_units_state_dicts[unit_addr]['st']['state2'] = None
+            self.hlt.power_units_state[unit_addr]['st']['state1'] = None
+            self.hlt.power_units_state[unit_addr]['st']['state2'] = None
 
             tries = 3
             rst_cmd = 'rst {}'.format(unit_addr)
@@ -1167,8 +1167,8 @@ class TestRun(TestHighLowTransceiver):
                 while True:
                     self.hlt.collect_units_state()
                     try:
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '0')
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '0')
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '0')
                         tries = 1
                         break
                     except AssertionError:
@@ -1193,8 +1193,8 @@ class TestRun(TestHighLowTransceiver):
         while time.time() - check_time < delay:
             try:
                 for unit_addr in self.settings['power units']:
-                    ch1_state = self.hlt.power_units_state_dicts[unit_addr]['st']['state1']
-                    ch2_state = self.hlt.power_units_state_dicts[unit_addr]['st']['state2']
+                    ch1_state = self.hlt.power_units_state[unit_addr]['st']['state1']
+                    ch2_state = self.hlt.power_units_state[unit_addr]['st']['state2']
 
                     self.assertTrue(ch1_state not in ('0', '1', '3') and
                                     ch2_state not in ('0', '1', '3'))
@@ -1207,18 +1207,18 @@ class TestRun(TestHighLowTransceiver):
         for unit_addr in self.settings['power units']:
 
             # Текущее состояние выхода
-            ch1_state = self.hlt.power_units_state_dicts[unit_addr]['st']['state1']
-            ch2_state = self.hlt.power_units_state_dicts[unit_addr]['st']['state2']
+            ch1_state = self.hlt.power_units_state[unit_addr]['st']['state1']
+            ch2_state = self.hlt.power_units_state[unit_addr]['st']['state2']
 
             # Проверяем, что команды включения выполены
             check_state_time = time.time()
             while True:
                 try:
                     if ch1_state not in ('2', '6', '7'):
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state1'], '5',
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state1'], '5',
                                          msg='Первый канал модуля "{}" не включился'.format(unit_addr))
                     if ch2_state not in ('2', '6', '7'):
-                        self.assertEqual(self.hlt.power_units_state_dicts[unit_addr]['st']['state2'], '5',
+                        self.assertEqual(self.hlt.power_units_state[unit_addr]['st']['state2'], '5',
                                          msg='Второй канал модуля "{}" не включился'.format(unit_addr))
                     break
                 except AssertionError:
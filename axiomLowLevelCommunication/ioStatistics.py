@@ -0,0 +1,350 @@
+"""
+Статистика обмена по последовательным портам
+
+Статистика накапливается в памяти процесса и периодически записывается в Redis
+(:func:`publish_statistics`) одним пакетом команд. Просмотр скоростей обмена::
+
+    python -m axiomLowLevelCommunication.ioStatistics [--interval 5]
+"""
+import argparse
+import json
+import threading
+import time
+from axiomLowLevelCommunication.config import STATS_KEY_PREFIX, STATS_PUBLISH_INTERVAL
+
+
+class LatencyStatistics:
+    """
+    Накопительная статистика длительности операций ввода/вывода
+
+    Хранит количество измерений, суммарное, минимальное, максимальное и последнее
+    значения, а также гистограмму распределения по корзинам :attr:`buckets`
+    """
+
+    # Верхние границы корзин гистограммы [с]
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.5, 1.0, 3.0)
+
+    def __init__(self, buckets=None):
+        """
+        Инициализирует экземпляр класса
+
+        :type buckets: tuple
+        :param buckets: верхние границы корзин гистограммы в секундах (по возрастанию)
+
+        :ivar buckets: верхние границы корзин гистограммы
+        :ivar histogram: количество измерений в каждой корзине, последний элемент - измерения
+         больше верхней границы последней корзины
+        """
+        self.buckets = tuple(buckets or self.DEFAULT_BUCKETS)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Сбрасывает накопленную статистику
+        """
+        with self.lock:
+            self.count = 0
+            self.total = 0.0
+            self.min = None
+            self.max = None
+            self.last = None
+            self.histogram = [0] * (len(self.buckets) + 1)
+
+    def add(self, value):
+        """
+        Добавляет измерение
+
+        :type value: float
+        :param value: длительность операции [с]
+        """
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+
+        with self.lock:
+            self.count += 1
+            self.total += value
+            self.last = value
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+            self.histogram[index] += 1
+
+    @property
+    def mean(self):
+        """
+        Среднее значение длительности операции
+
+        :rtype: float
+        :return: среднее значение или None, если измерений не было
+        """
+        return self.total / self.count if self.count else None
+
+    def as_dict(self):
+        """
+        Возвращает снимок статистики
+
+        :rtype: dict
+        :return: словарь с полями count, mean, min, max, last, histogram
+        """
+        with self.lock:
+            return {
+                'count': self.count,
+                'mean': self.total / self.count if self.count else None,
+                'min': self.min,
+                'max': self.max,
+                'last': self.last,
+                'histogram': dict(zip([str(bound) for bound in self.buckets] + ['inf'], self.histogram)),
+            }
+
+
+class UnitStatistics:
+    """
+    Статистика посылок одного аппаратного модуля
+
+    Счетчик посылок модуля увеличивается на 1 в каждом цикле отправки; все посылки одного
+    цикла имеют одинаковое значение счетчика. Пропуск значений счетчика означает потерю циклов,
+    уменьшение - перезагрузку ПО модуля
+    """
+
+    def __init__(self, unit_addr, start_time=None):
+        """
+        Инициализирует экземпляр класса
+
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type start_time: float
+        :param start_time: время запуска (по часам :func:`time.monotonic`, None - время создания объекта)
+
+        :ivar frames: количество посылок, направленных модулю
+        :ivar regex_misses: количество посылок, которые не удалось разобрать
+        :ivar counter_gaps: количество пропущенных значений счетчика посылок
+        :ivar counter_resets: количество уменьшений счетчика посылок
+        :ivar last_counter: последнее значение счетчика посылок
+        :ivar last_parcel_time: время получения последней разобранной посылки (по часам :func:`time.monotonic`)
+        :ivar first_parcel_delay: время от запуска до получения первой разобранной посылки [с]
+         (None - посылок не было)
+        """
+        self.unit_addr = unit_addr
+        self.frames = 0
+        self.regex_misses = 0
+        self.counter_gaps = 0
+        self.counter_resets = 0
+        self.last_counter = None
+        self.last_parcel_time = None
+        self.start_time = time.monotonic() if start_time is None else start_time
+        self.first_parcel_delay = None
+
+    def on_parcel(self, counter):
+        """
+        Учитывает разобранную посылку
+
+        :type counter: str
+        :param counter: значение счетчика посылки (None - посылка без счетчика)
+        :rtype: bool
+        :return: True - посылка первая после запуска
+        """
+        self.frames += 1
+        self.last_parcel_time = time.monotonic()
+        first = self.first_parcel_delay is None
+        if first:
+            self.first_parcel_delay = self.last_parcel_time - self.start_time
+        if counter is None:
+            return first
+        counter = int(counter)
+        last_counter = self.last_counter
+        self.last_counter = counter
+        if last_counter is None or last_counter <= counter <= last_counter + 1:
+            return first
+        if counter > last_counter:
+            self.counter_gaps += counter - last_counter - 1
+        else:
+            self.counter_resets += 1
+        return first
+
+    def on_regex_miss(self):
+        """
+        Учитывает посылку, которую не удалось разобрать
+        """
+        self.frames += 1
+        self.regex_misses += 1
+
+    def as_dict(self):
+        """
+        Возвращает снимок статистики
+
+        :rtype: dict
+        :return: словарь с полями frames, regex_misses, counter_gaps, counter_resets, last_counter,
+         first_parcel_delay - время от запуска до получения первой посылки [с] и since_last_parcel - время
+         с момента получения последней посылки [с] (None - посылок не было)
+        """
+        last_parcel_time = self.last_parcel_time
+        return {
+            'frames': self.frames,
+            'regex_misses': self.regex_misses,
+            'counter_gaps': self.counter_gaps,
+            'counter_resets': self.counter_resets,
+            'last_counter': self.last_counter,
+            'first_parcel_delay': self.first_parcel_delay,
+            'since_last_parcel': None if last_parcel_time is None else time.monotonic() - last_parcel_time,
+        }
+
+
+def publish_statistics(redis, ports, units, commands=None, init=None):
+    """
+    Записывает статистику портов, модулей, команд и инициализации модулей в Redis одним пакетом команд (pipeline)
+
+    Статистика каждого порта, модуля и типа команд хранится в отдельном ключе
+    ``<STATS_KEY_PREFIX>:port:<порт>`` / ``<STATS_KEY_PREFIX>:unit:<адрес>`` /
+    ``<STATS_KEY_PREFIX>:command:<тип команды>`` / ``<STATS_KEY_PREFIX>:init:<тип модулей>``
+    в формате JSON с добавленным полем timestamp - временем записи
+
+    :type redis: redis.StrictRedis
+    :param redis: объект подключения к БД Redis
+    :type ports: dict
+    :param ports: статистика портов по именам портов
+    :type units: dict
+    :param units: статистика модулей по адресам модулей
+    :type commands: dict
+    :param commands: статистика выполнения команд по типам команд
+    :type init: dict
+    :param init: статистика инициализации модулей по типам модулей
+     (см. :meth:`~axiomLowLevelCommunication.initCoordinator.InitCoordinator.stats`)
+    """
+    timestamp = time.time()
+    pipeline = redis.pipeline(transaction=False)
+    for kind, entries in (('port', ports), ('unit', units), ('command', commands or {}), ('init', init or {})):
+        for name, stats in entries.items():
+            pipeline.set('{}:{}:{}'.format(STATS_KEY_PREFIX, kind, name), json.dumps(dict(stats, timestamp=timestamp)))
+    pipeline.execute()
+
+
+def load_statistics(redis):
+    """
+    Читает статистику портов, модулей, команд и инициализации модулей из Redis
+
+    :type redis: redis.StrictRedis
+    :param redis: объект подключения к БД Redis
+    :rtype: dict
+    :return: {'port': {порт: статистика}, 'unit': {адрес: статистика}, 'command': {тип команды: статистика},
+     'init': {тип модулей: статистика}}
+    """
+    statistics = {'port': {}, 'unit': {}, 'command': {}, 'init': {}}
+    keys = sorted(redis.scan_iter(match='{}:*'.format(STATS_KEY_PREFIX)))
+    if not keys:
+        return statistics
+    for key, value in zip(keys, redis.mget(keys)):
+        if value is None:
+            continue
+        if isinstance(key, bytes):
+            key, value = key.decode(), value.decode()
+        kind, name = key[len(STATS_KEY_PREFIX) + 1:].split(':', 1)
+        if kind in statistics:
+            statistics[kind][name] = json.loads(value)
+    return statistics
+
+
+def calc_rates(previous, current, fields):
+    """
+    Рассчитывает скорость изменения счетчиков между двумя снимками статистики
+
+    :type previous: dict
+    :param previous: предыдущий снимок статистики (с полем timestamp)
+    :type current: dict
+    :param current: текущий снимок статистики
+    :type fields: tuple
+    :param fields: имена счетчиков
+    :rtype: dict
+    :return: скорость изменения каждого счетчика [1/с] или None, если снимки сделаны в одно время
+    """
+    elapsed = current['timestamp'] - previous['timestamp']
+    if elapsed <= 0:
+        return dict.fromkeys(fields)
+    return {field: (current.get(field, 0) - previous.get(field, 0)) / elapsed for field in fields}
+
+
+PORT_RATE_FIELDS = ('bytes_in', 'bytes_out', 'frames_routed', 'crc_errors', 'commands_out', 'write_errors')
+UNIT_RATE_FIELDS = ('frames', 'regex_misses', 'counter_gaps')
+COMMAND_RATE_FIELDS = ('completed', 'failed', 'rejected')
+
+
+def format_rates(previous, current):
+    """
+    Формирует текстовую таблицу скоростей обмена
+
+    :type previous: dict
+    :param previous: предыдущий результат :func:`load_statistics`
+    :type current: dict
+    :param current: текущий результат :func:`load_statistics`
+    :rtype: list
+    :return: строки таблицы
+    """
+    def rate(value):
+        return '{:12.1f}'.format(value) if value is not None else '{:>12}'.format('-')
+
+    def milliseconds(value):
+        return '{:12.2f}'.format(value * 1000) if value is not None else '{:>12}'.format('-')
+
+    lines = ['{:<16}{:>12}{:>12}{:>12}{:>12}{:>12}{:>12}{:>12}{:>12}'.format(
+        'порт', 'байт/с вх', 'байт/с исх', 'посылок/с', 'CRC ош./с', 'команд/с', 'ошибок/с', 'запись мс', 'слот мс')]
+    for port, stats in sorted(current['port'].items()):
+        rates = calc_rates(previous['port'].get(port, stats), stats, PORT_RATE_FIELDS)
+        columns = [rate(rates[field]) for field in PORT_RATE_FIELDS]
+        columns += [milliseconds(stats['write_duration']['max']), milliseconds(stats['write_slot_wait']['max'])]
+        # Порт, работающий в ограниченном режиме, отмечается в конце строки
+        lines.append('{:<16}{}{}'.format(port, ''.join(columns), '' if stats.get('open', True) else '  не открыт'))
+
+    lines.append('{:<16}{:>12}{:>12}{:>12}{:>12}{:>14}{:>12}'.format(
+        'модуль', 'посылок/с', 'ошибок/с', 'потерь/с', 'перезапуск', 'посл. посылка', 'потери %'))
+    for unit_addr, stats in sorted(current['unit'].items()):
+        rates = calc_rates(previous['unit'].get(unit_addr, stats), stats, UNIT_RATE_FIELDS)
+        since = stats['since_last_parcel']
+        loss_rate = stats.get('loss_rate')
+        lines.append('{:<16}{}{:>12}{:>14}{:>12}{}'.format(
+            unit_addr, ''.join(rate(rates[field]) for field in UNIT_RATE_FIELDS), stats['counter_resets'],
+            '{:.1f} с'.format(since) if since is not None else '-',
+            '{:.1f}'.format(loss_rate * 100) if loss_rate is not None else '-',
+            '  нет связи' if stats.get('link') is False else ''))
+
+    lines.append('{:<16}{:>12}{:>12}{:>12}{:>12}{:>12}'.format(
+        'команда', 'выполн./с', 'ошибок/с', 'отклон./с', 'ср. мс', 'макс. мс'))
+    for command_type, stats in sorted(current.get('command', {}).items()):
+        rates = calc_rates(previous.get('command', {}).get(command_type, stats), stats, COMMAND_RATE_FIELDS)
+        columns = [rate(rates[field]) for field in COMMAND_RATE_FIELDS]
+        columns += [milliseconds(stats['latency']['mean']), milliseconds(stats['latency']['max'])]
+        lines.append('{:<16}{}'.format(command_type, ''.join(columns)))
+
+    for unit_type, stats in sorted(current.get('init', {}).items()):
+        restore = stats['last_restore']
+        lines.append('{:<16}очередь {}, инициализация {}, ошибок {}{}'.format(
+            unit_type, stats['queued'], stats['running'], stats['failed'],
+            ', восстановление {} модулей за {:.1f} с'.format(restore['units'], restore['duration']) if restore else ''))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Скорости обмена по последовательным портам')
+    parser.add_argument('--interval', type=float, default=STATS_PUBLISH_INTERVAL,
+                        help='интервал обновления [с]')
+    args = parser.parse_args()
+
+    import redis
+    client = redis.StrictRedis(decode_responses=True)
+    previous = load_statistics(client)
+    try:
+        while True:
+            time.sleep(args.interval)
+            current = load_statistics(client)
+            print('\n'.join(format_rates(previous, current)))
+            print()
+            previous = current
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+import math
+import threading
+import time
+from axiomLowLevelCommunication.config import LINK_TIMEOUT, LINK_WHEEL_TICK, LINK_LOSS_WINDOW
+
+# Количество интервалов, на которые делится скользящее окно статистики потерь
+LOSS_WINDOW_BUCKETS = 10
+
+
+class TimerWheel:
+    """
+    Хешированное колесо таймеров
+
+    Таймер помещается в ячейку колеса по номеру такта срабатывания (номер такта по модулю количества ячеек),
+    поэтому постановка и отмена таймера выполняются за O(1), а продвижение колеса на один такт проверяет
+    только таймеры одной ячейки. Таймер со сроком больше одного оборота колеса остается в ячейке
+    до нужного оборота. Для каждого ключа хранится не более одного таймера
+
+    Не потокобезопасен: вызовы синхронизирует владелец колеса
+    """
+
+    def __init__(self, tick, slots, now=None):
+        """
+        Инициализирует экземпляр класса
+
+        :type tick: float
+        :param tick: длительность такта [с]
+        :type slots: int
+        :param slots: количество ячеек колеса
+        :type now: float
+        :param now: текущее время (по часам :func:`time.monotonic`, None - определяется автоматически)
+
+        :ivar current_tick: номер последнего обработанного такта
+        :ivar timers: номера тактов срабатывания таймеров по ключам
+        """
+        self.tick = tick
+        self.slots = [{} for _ in range(slots)]
+        self.current_tick = int((time.monotonic() if now is None else now) / tick)
+        self.timers = {}
+
+    def schedule(self, key, deadline):
+        """
+        Ставит таймер, заменяя ранее поставленный таймер с тем же ключом
+
+        :param key: ключ таймера
+        :type deadline: float
+        :param deadline: время срабатывания (по часам :func:`time.monotonic`). Таймер срабатывает
+         не раньше этого времени и не позже чем через такт после него
+        """
+        self.cancel(key)
+        expiry = max(int(math.ceil(deadline / self.tick)), self.current_tick + 1)
+        self.slots[expiry % len(self.slots)][key] = expiry
+        self.timers[key] = expiry
+
+    def cancel(self, key):
+        """
+        Отменяет таймер
+
+        :param key: ключ таймера
+        """
+        expiry = self.timers.pop(key, None)
+        if expiry is not None:
+            del self.slots[expiry % len(self.slots)][key]
+
+    def advance(self, now=None):
+        """
+        Продвигает колесо до текущего времени
+
+        :type now: float
+        :param now: текущее время (по часам :func:`time.monotonic`, None - определяется автоматически)
+        :rtype: list
+        :return: ключи сработавших таймеров
+        """
+        target_tick = int((time.monotonic() if now is None else now) / self.tick)
+        # При отставании больше чем на оборот каждая ячейка проверяется один раз
+        self.current_tick = max(self.current_tick, target_tick - len(self.slots))
+        expired = []
+        while self.current_tick < target_tick:
+            self.current_tick += 1
+            slot = self.slots[self.current_tick % len(self.slots)]
+            for key, expiry in list(slot.items()):
+                if expiry <= self.current_tick:
+                    del slot[key]
+                    del self.timers[key]
+                    expired.append(key)
+        return expired
+
+
+class LossWindow:
+    """
+    Количество принятых посылок и пропущенных циклов отправки за скользящее окно
+
+    Окно делится на :data:`LOSS_WINDOW_BUCKETS` интервалов; устаревший интервал сбрасывается при первой
+    записи в него, поэтому учет посылки выполняется за O(1)
+    """
+
+    def __init__(self, window, buckets=LOSS_WINDOW_BUCKETS):
+        """
+        Инициализирует экземпляр класса
+
+        :type window: float
+        :param window: длительность окна [с]
+        :type buckets: int
+        :param buckets: количество интервалов окна
+        """
+        self.bucket_time = window / buckets
+        self.bucket_ids = [None] * buckets
+        self.received = [0] * buckets
+        self.lost = [0] * buckets
+
+    def add(self, now, received, lost):
+        """
+        Учитывает принятые посылки и пропущенные циклы
+
+        :type now: float
+        :param now: текущее время (по часам :func:`time.monotonic`)
+        :type received: int
+        :param received: количество принятых посылок
+        :type lost: int
+        :param lost: количество пропущенных циклов отправки
+        """
+        bucket = int(now / self.bucket_time)
+        i = bucket % len(self.bucket_ids)
+        if self.bucket_ids[i] != bucket:
+            self.bucket_ids[i] = bucket
+            self.received[i] = 0
+            self.lost[i] = 0
+        self.received[i] += received
+        self.lost[i] += lost
+
+    def totals(self, now):
+        """
+        :type now: float
+        :param now: текущее время (по часам :func:`time.monotonic`)
+        :rtype: tuple
+        :return: (количество принятых посылок, количество пропущенных циклов) за окно
+        """
+        oldest = int(now / self.bucket_time) - len(self.bucket_ids)
+        received = lost = 0
+        for bucket, bucket_received, bucket_lost in zip(self.bucket_ids, self.received, self.lost):
+            if bucket is not None and bucket > oldest:
+                received += bucket_received
+                lost += bucket_lost
+        return received, lost
+
+
+class LinkWatchdog:
+    """
+    Контроль связи с аппаратными модулями
+
+    Для каждого модуля и типа посылки запоминается время получения последней посылки. Таймеры всех модулей
+    обслуживаются одним колесом таймеров :class:`TimerWheel`, которое продвигается периодическим вызовом
+    :meth:`advance` (один поток на все модули). Учет посылки не изменяет колесо: при срабатывании таймера
+    модуля проверяется время последней посылки, и если модуль молчал меньше :attr:`timeout`, таймер
+    переставляется. Если модуль молчит дольше :attr:`timeout`, вызывается обработчик потери связи;
+    при получении следующей посылки - обработчик восстановления связи
+
+    По счетчикам посылок каждого типа считаются пропущенные циклы отправки за скользящее окно
+    (:class:`LossWindow`)
+    """
+
+    def __init__(self, unit_addrs, on_lost, on_restored, timeout=LINK_TIMEOUT, tick=LINK_WHEEL_TICK,
+                 window=LINK_LOSS_WINDOW):
+        """
+        Инициализирует экземпляр класса
+
+        :type unit_addrs: list
+        :param unit_addrs: адреса модулей
+        :type on_lost: callable
+        :param on_lost: обработчик потери связи, вызывается с адресом модуля и временем без посылок [с]
+        :type on_restored: callable
+        :param on_restored: обработчик восстановления связи, вызывается с адресом модуля и временем
+         отсутствия связи [с]
+        :type timeout: float
+        :param timeout: время без посылок, после которого связь с модулем считается потерянной [с]
+        :type tick: float
+        :param tick: такт колеса таймеров [с]
+        :type window: float
+        :param window: длительность окна статистики потерь [с]
+
+        :ivar last_seen: время получения последней посылки каждого типа по адресам модулей
+        :ivar unit_last_seen: время получения последней посылки по адресам модулей
+        :ivar last_counters: последние значения счетчиков посылок каждого типа по адресам модулей
+        :ivar windows: статистика потерь по адресам модулей
+        :ivar watched: модули, связь с которыми есть (для них поставлен таймер)
+        :ivar lost_since: время последней посылки модулей, связь с которыми потеряна
+        :ivar events: количество событий потери и восстановления связи
+        """
+        self.on_lost = on_lost
+        self.on_restored = on_restored
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        # Колесо охватывает время ожидания за один оборот
+        self.wheel = TimerWheel(tick, int(math.ceil(timeout / tick)) + 1)
+        self.last_seen = {unit_addr: {} for unit_addr in unit_addrs}
+        self.unit_last_seen = dict.fromkeys(unit_addrs)
+        self.last_counters = {unit_addr: {} for unit_addr in unit_addrs}
+        self.windows = {unit_addr: LossWindow(window) for unit_addr in unit_addrs}
+        self.watched = set()
+        self.lost_since = {}
+        self.events = {'lost': 0, 'restored': 0}
+
+    def on_parcel(self, unit_addr, parcel_type, counter, now=None):
+        """
+        Учитывает посылку от модуля
+
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type parcel_type: str
+        :param parcel_type: тип посылки
+        :param counter: значение счетчика посылки (None - посылка без счетчика)
+        :type now: float
+        :param now: время получения (по часам :func:`time.monotonic`, None - определяется автоматически)
+        """
+        if now is None:
+            now = time.monotonic()
+        self.last_seen[unit_addr][parcel_type] = now
+        self.unit_last_seen[unit_addr] = now
+
+        lost = 0
+        if counter is not None:
+            counter = int(counter)
+            last_counter = self.last_counters[unit_addr].get(parcel_type)
+            self.last_counters[unit_addr][parcel_type] = counter
+            if last_counter is not None and counter > last_counter + 1:
+                lost = counter - last_counter - 1
+        self.windows[unit_addr].add(now, 1, lost)
+
+        if unit_addr not in self.watched:
+            self.watch(unit_addr, now)
+
+    def watch(self, unit_addr, now):
+        """
+        Ставит таймер модуля после первой посылки или после восстановления связи
+
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type now: float
+        :param now: время получения посылки (по часам :func:`time.monotonic`)
+        """
+        with self.lock:
+            if unit_addr in self.watched:
+                return
+            self.watched.add(unit_addr)
+            self.wheel.schedule(unit_addr, now + self.timeout)
+            lost_since = self.lost_since.pop(unit_addr, None)
+            if lost_since is not None:
+                self.events['restored'] += 1
+        if lost_since is not None:
+            self.on_restored(unit_addr, now - lost_since)
+
+    def advance(self, now=None):
+        """
+        Продвигает колесо таймеров и вызывает обработчики потери связи
+
+        Вызывается периодически с интервалом не больше такта колеса
+
+        :type now: float
+        :param now: текущее время (по часам :func:`time.monotonic`, None - определяется автоматически)
+        """
+        if now is None:
+            now = time.monotonic()
+        lost = []
+        with self.lock:
+            for unit_addr in self.wheel.advance(now):
+                last_seen = self.unit_last_seen[unit_addr]
+                if now - last_seen < self.timeout:
+                    self.wheel.schedule(unit_addr, last_seen + self.timeout)
+                    continue
+                self.watched.discard(unit_addr)
+                self.lost_since[unit_addr] = last_seen
+                self.events['lost'] += 1
+                lost.append((unit_addr, now - last_seen))
+        for unit_addr, silence in lost:
+            self.on_lost(unit_addr, silence)
+
+    def unit_stats(self, unit_addr, now=None):
+        """
+        Возвращает снимок статистики связи с модулем
+
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type now: float
+        :param now: текущее время (по часам :func:`time.monotonic`, None - определяется автоматически)
+        :rtype: dict
+        :return: признак наличия связи (link), время с получения последней посылки каждого типа [с]
+         (since_last_seen), количество принятых посылок (window_received) и пропущенных циклов отправки
+         (window_lost) за окно и доля потерь за окно (loss_rate, None - посылок не было)
+        """
+        if now is None:
+            now = time.monotonic()
+        received, lost = self.windows[unit_addr].totals(now)
+        return {
+            'link': unit_addr in self.watched,
+            'since_last_seen': {parcel_type: now - seen
+                                for parcel_type, seen in list(self.last_seen[unit_addr].items())},
+            'window_received': received,
+            'window_lost': lost,
+            'loss_rate': lost / (received + lost) if received + lost else None,
+        }
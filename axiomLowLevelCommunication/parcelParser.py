@@ -0,0 +1,276 @@
+"""
+Разбор посылок от ПО низкого уровня
+
+Посылка имеет вид ``<тип> <поле> ... <поле> <счетчик><адрес>``. Тип посылки определяется по первому
+слову, после чего проверяются только поля этого типа. Результат разбора - запись
+(:class:`collections.namedtuple`) с полями посылки в виде строк; поля доступны как атрибуты
+и по имени (``parcel['cnt']``), как в словаре, который возвращал разбор регулярным выражением.
+
+Модули повторяют одни и те же посылки, в которых меняется только счетчик. :meth:`ParcelParser.parse_changed`
+сравнивает байты посылки до счетчика с предыдущей посылкой того же типа и для неизменившейся посылки
+возвращает :class:`RepeatedParcel` без разбора полей.
+
+Регулярные выражения :data:`POWER_UNIT_PARCEL_REGEX` и :data:`INPUT_UNIT_PARCEL_REGEX` задают
+тот же формат посылок и используются для сравнения в
+:mod:`axiomLowLevelCommunication.benchmarks.bench_parcel_parser`
+"""
+from collections import namedtuple
+
+# Регулярные выражения для посылок от модулей ввода и силовых модулей
+_pu_st_regex = r'(?P<type_st>st) (?P<state1>\d{1,4}) (?P<state2>\d{1,4}) ' \
+               r'(?P<signal1>\d{1,4}) (?P<signal2>\d{1,4})'
+_pu_adc_regex = r'(?P<type_adc>adc) (?P<sample1>\d{1,2}\.\d{0,100}) (?P<sample2>\d{1,2}\.\d{0,100})'
+_pu_tmpr_regex = r'(?P<type_tmpr>tmpr) (?P<temp1>\d{1,3}) (?P<temp2>\d{1,3})'
+_iu_st_regex = r'(?P<type_st>st) (?P<state>\d{1,4}) (?P<signal>\d{1,4})'
+_volt_regex = r'(?P<type_volt>volt) (?P<Vin>\d{1,3}\.\d{0,100}) (?P<freq>\d{0,2})'
+_cur_regex = r'(?P<type_cur>cur) (?P<Iin>\d{1,2}\.\d{0,100}) (?P<Iout>\d{1,2}\.\d{0,100}) ' \
+             r'(?P<Iypr>\d{1,2}\.\d{0,100})'
+_ld_regex = r'(?P<type_ld>ld) (?P<load1>\d{1,4}) (?P<load2>\d{1,4}) (?P<angle1>\d{1,4}) (?P<angle2>\d{1,4})'
+_rply_regex = r'(?P<reply>(?P<type_rply>rply) .+)'
+_counter_regex = r'(?P<cnt>\d{1,10})'
+_unit_addr_regex = r'(?P<addr>%s)'
+
+# Шаблон регулярного выражения для посылок от силовых модулей (%s - адрес модуля)
+POWER_UNIT_PARCEL_REGEX = r'(({st}|{adc}|{ld}|{tmpr}) {cnt}{addr})|{rply}'.format(
+    st=_pu_st_regex, adc=_pu_adc_regex, ld=_ld_regex, tmpr=_pu_tmpr_regex,
+    cnt=_counter_regex, addr=_unit_addr_regex, rply=_rply_regex)
+
+# Шаблон регулярного выражения для посылок от модулей ввода (%s - адрес модуля)
+INPUT_UNIT_PARCEL_REGEX = r'(({st}|{volt}|{cur}) {cnt}{addr})|{rply}'.format(
+    st=_iu_st_regex, volt=_volt_regex, cur=_cur_regex,
+    cnt=_counter_regex, addr=_unit_addr_regex, rply=_rply_regex)
+
+
+class ParcelRecord:
+    """
+    Примесь к записям посылок: доступ к полям по имени (``parcel['cnt']``) и :meth:`get`
+    """
+
+    __slots__ = ()
+
+    # True - посылка совпадает с предыдущей посылкой того же типа, кроме счетчика (:class:`RepeatedParcel`)
+    repeated = False
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._fields else default
+
+
+class PowerStateParcel(ParcelRecord, namedtuple('PowerStateParcel', 'type state1 state2 signal1 signal2 cnt addr')):
+    """
+    Посылка "st" силового модуля
+    """
+    __slots__ = ()
+
+
+class AdcParcel(ParcelRecord, namedtuple('AdcParcel', 'type sample1 sample2 cnt addr')):
+    """
+    Посылка "adc" силового модуля
+    """
+    __slots__ = ()
+
+
+class LoadParcel(ParcelRecord, namedtuple('LoadParcel', 'type load1 load2 angle1 angle2 cnt addr')):
+    """
+    Посылка "ld" силового модуля
+    """
+    __slots__ = ()
+
+
+class TemperatureParcel(ParcelRecord, namedtuple('TemperatureParcel', 'type temp1 temp2 cnt addr')):
+    """
+    Посылка "tmpr" силового модуля
+    """
+    __slots__ = ()
+
+
+class InputStateParcel(ParcelRecord, namedtuple('InputStateParcel', 'type state signal cnt addr')):
+    """
+    Посылка "st" модуля ввода
+    """
+    __slots__ = ()
+
+
+class VoltageParcel(ParcelRecord, namedtuple('VoltageParcel', 'type Vin freq cnt addr')):
+    """
+    Посылка "volt" модуля ввода
+    """
+    __slots__ = ()
+
+
+class CurrentParcel(ParcelRecord, namedtuple('CurrentParcel', 'type Iin Iout Iypr cnt addr')):
+    """
+    Посылка "cur" модуля ввода
+    """
+    __slots__ = ()
+
+
+class ReplyParcel(ParcelRecord, namedtuple('ReplyParcel', 'type reply')):
+    """
+    Ответ модуля на команду ("rply"); поле reply - текст посылки, начиная со слова "rply"
+    """
+    __slots__ = ()
+
+
+class RepeatedParcel(ParcelRecord, namedtuple('RepeatedParcel', 'type cnt addr')):
+    """
+    Посылка, совпадающая с предыдущей посылкой того же типа, кроме счетчика; поля посылки не разбираются
+    """
+    __slots__ = ()
+    repeated = True
+
+
+def is_integer(token, max_digits):
+    """
+    :rtype: bool
+    :return: True, если token - целое число из не более чем max_digits цифр
+    """
+    return 0 < len(token) <= max_digits and token.isdigit()
+
+
+def is_decimal(token, max_int_digits):
+    """
+    :rtype: bool
+    :return: True, если token - десятичная дробь с точкой и не более чем max_int_digits цифрами целой части
+    """
+    integer, point, fraction = token.partition('.')
+    return bool(point) and is_integer(integer, max_int_digits) and (not fraction or fraction.isdigit())
+
+
+def integer_field(max_digits):
+    return lambda token: is_integer(token, max_digits)
+
+
+def decimal_field(max_int_digits):
+    return lambda token: is_decimal(token, max_int_digits)
+
+
+# Типы посылок силовых модулей: класс записи и проверки полей
+POWER_UNIT_PARCELS = {
+    'st': (PowerStateParcel, (integer_field(4),) * 4),
+    'adc': (AdcParcel, (decimal_field(2),) * 2),
+    'ld': (LoadParcel, (integer_field(4),) * 4),
+    'tmpr': (TemperatureParcel, (integer_field(3),) * 2),
+}
+
+# Типы посылок модулей ввода: класс записи и проверки полей
+INPUT_UNIT_PARCELS = {
+    'st': (InputStateParcel, (integer_field(4),) * 2),
+    'volt': (VoltageParcel, (decimal_field(3), integer_field(2))),
+    'cur': (CurrentParcel, (decimal_field(2),) * 3),
+}
+
+
+class ParcelParser:
+    """
+    Разбирает посылки от одного аппаратного модуля
+
+    Тип посылки определяется по первому слову. Если перед типом посылки на линии появились
+    посторонние символы (например, при переключении направления передачи), они отбрасываются.
+    Ответ "rply" распознается и после эха команды в той же посылке.
+    Слова после поля "<счетчик><адрес>" не проверяются
+    """
+
+    def __init__(self, unit_addr, parcel_types):
+        """
+        Инициализирует экземпляр класса
+
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type parcel_types: dict
+        :param parcel_types: типы посылок модуля (:data:`POWER_UNIT_PARCELS` или :data:`INPUT_UNIT_PARCELS`)
+        """
+        self.unit_addr = unit_addr
+        self.parcel_types = parcel_types
+        self.addr_bytes = unit_addr.encode()
+        # Байты последней разобранной посылки каждого типа до счетчика: {b'<тип>': (байты, тип)}
+        self.last_payloads = {}
+
+    def find_type(self, word):
+        """
+        Определяет тип посылки по первому слову с посторонними символами в начале
+
+        :type word: str
+        :param word: первое слово посылки
+        :rtype: str
+        :return: тип посылки или None
+        """
+        if word.endswith('rply'):
+            return 'rply'
+        for parcel_type in self.parcel_types:
+            if word.endswith(parcel_type):
+                return parcel_type
+        return None
+
+    def parse(self, frame):
+        """
+        Разбирает посылку
+
+        :type frame: bytes or memoryview
+        :param frame: посылка
+        :return: запись посылки (:class:`PowerStateParcel`, :class:`AdcParcel`, ..., :class:`ReplyParcel`)
+         или None, если посылка не соответствует формату
+        """
+        text = str(frame, 'ascii', 'replace')
+        words = text.split()
+        if len(words) < 2:
+            return None
+
+        parcel_type = words[0]
+        if parcel_type != 'rply' and parcel_type not in self.parcel_types:
+            parcel_type = self.find_type(parcel_type)
+            if parcel_type is None:
+                # Ответ модуля может следовать в одной посылке за эхом команды
+                return ReplyParcel('rply', text[text.find('rply '):].strip()) if 'rply ' in text else None
+
+        if parcel_type == 'rply':
+            return ReplyParcel('rply', text[text.find('rply'):].strip())
+
+        record_class, checks = self.parcel_types[parcel_type]
+        fields_count = len(checks)
+        if len(words) < fields_count + 2:
+            return None
+        fields = words[1:fields_count + 1]
+        for check, field in zip(checks, fields):
+            if not check(field):
+                return None
+
+        tail = words[fields_count + 1]
+        counter = tail[:-len(self.unit_addr)]
+        if not tail.endswith(self.unit_addr) or not is_integer(counter, 10):
+            return None
+        fields.append(counter)
+        fields.append(self.unit_addr)
+        return record_class(parcel_type, *fields)
+
+    def parse_changed(self, frame):
+        """
+        Разбирает посылку, если она отличается от предыдущей посылки того же типа не только счетчиком
+
+        :type frame: bytes or memoryview
+        :param frame: посылка
+        :return: :class:`RepeatedParcel`, если до счетчика посылка совпадает с предыдущей посылкой того же типа,
+         иначе результат :meth:`parse`
+        """
+        frame = bytes(frame).rstrip()
+        position = frame.rfind(b' ')
+        payload = frame[:position]
+        word = payload[:payload.find(b' ')]
+        last = self.last_payloads.get(word)
+        if last is not None and last[0] == payload:
+            tail = frame[position + 1:]
+            counter = tail[:-len(self.addr_bytes)]
+            if tail.endswith(self.addr_bytes) and 0 < len(counter) <= 10 and counter.isdigit():
+                return RepeatedParcel(last[1], counter.decode(), self.unit_addr)
+
+        parcel = self.parse(frame)
+        # Запоминаются только посылки без посторонних символов перед типом
+        if parcel is not None and parcel.type != 'rply' and word == parcel.type.encode():
+            self.last_payloads[word] = (payload, parcel.type)
+        return parcel
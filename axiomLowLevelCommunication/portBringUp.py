@@ -0,0 +1,119 @@
+import threading
+import time
+from axiomLib.loggers import create_logger
+from axiomLowLevelCommunication.config import LOG_FILE_DIRECTORY, LOG_FILE_NAME, PORT_OPEN_DEADLINE, \
+    PORT_RETRY_INTERVAL
+
+
+class PortBringUp:
+    """
+    Открытие последовательных портов при запуске
+
+    Порты открываются одновременно, каждый в своем потоке, поэтому отсутствующее или зависшее устройство
+    не задерживает открытие остальных портов. Запуск ожидает открытия портов не дольше :attr:`deadline`;
+    порты, которые не удалось открыть за это время, работают в ограниченном режиме: их модули не
+    опрашиваются, а запись команд завершается ошибкой. Попытки открыть такой порт повторяются в фоне
+    с интервалом :attr:`retry_interval`, пока порт не будет открыт
+    """
+
+    def __init__(self, transceivers, deadline=PORT_OPEN_DEADLINE, retry_interval=PORT_RETRY_INTERVAL):
+        """
+        Инициализирует экземпляр класса
+
+        :type transceivers: dict
+        :param transceivers: трансиверы (еще не открытые) по именам портов
+        :type deadline: float
+        :param deadline: максимальное время ожидания открытия портов при запуске [с]
+        :type retry_interval: float
+        :param retry_interval: интервал между попытками открыть порт [с]
+
+        :ivar open_ports: открытые порты
+        :ivar open_times: время открытия каждого порта от начала запуска [с]
+        :ivar attempts: количество попыток открыть каждый порт
+        """
+        self.logger = create_logger(logger_name=__name__,
+                                    logfile_directory=LOG_FILE_DIRECTORY,
+                                    logfile_name=LOG_FILE_NAME)
+        self.transceivers = transceivers
+        self.deadline = deadline
+        self.retry_interval = retry_interval
+        self.condition = threading.Condition()
+        self.open_ports = set()
+        self.open_times = {}
+        self.attempts = dict.fromkeys(transceivers, 0)
+        self.start_time = None
+        self.stopped = False
+
+    def start(self):
+        """
+        Открывает порты и ожидает их открытия не дольше :attr:`deadline`
+
+        :rtype: set
+        :return: порты, которые не удалось открыть (работают в ограниченном режиме)
+        """
+        self.start_time = time.monotonic()
+        for port in self.transceivers:
+            self.reopen(port)
+
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.open_ports) == len(self.transceivers), self.deadline)
+            degraded = set(self.transceivers) - self.open_ports
+        self.logger.info('Открыто последовательных портов: {} из {} за {:.2f} с'.format(
+            len(self.transceivers) - len(degraded), len(self.transceivers), time.monotonic() - self.start_time))
+        if degraded:
+            self.logger.warning('Порты {} не открыты, попытки открыть их повторяются каждые {} с'.format(
+                ', '.join(sorted(degraded)), self.retry_interval))
+        return degraded
+
+    def reopen(self, port):
+        """
+        Запускает в фоне открытие порта, повторяя попытки до успешного открытия
+
+        Используется также для порта, чтение из которого прервалось из-за ошибки: порт закрывается
+        и открывается снова
+
+        :type port: str
+        :param port: имя файла последовательного порта в ОС
+        """
+        with self.condition:
+            self.open_ports.discard(port)
+        threading.Thread(target=self.open_target, args=(port,), daemon=True).start()
+
+    def open_target(self, port):
+        """
+        Открывает порт, повторяя попытки с интервалом :attr:`retry_interval`
+
+        :type port: str
+        :param port: имя файла последовательного порта в ОС
+        """
+        transceiver = self.transceivers[port]
+        transceiver.close()
+        while not self.stopped:
+            self.attempts[port] += 1
+            if transceiver.open():
+                break
+            time.sleep(self.retry_interval)
+        else:
+            return
+
+        with self.condition:
+            self.open_ports.add(port)
+            self.open_times[port] = time.monotonic() - self.start_time
+            self.condition.notify_all()
+        if self.attempts[port] > 1:
+            self.logger.info('Последовательный порт {} открыт с {}-й попытки'.format(port, self.attempts[port]))
+
+    def is_open(self, port):
+        """
+        :type port: str
+        :param port: имя файла последовательного порта в ОС
+        :rtype: bool
+        :return: True - порт открыт, False - порт работает в ограниченном режиме
+        """
+        return port in self.open_ports
+
+    def stop(self):
+        """
+        Прекращает повторные попытки открыть порты
+        """
+        self.stopped = True
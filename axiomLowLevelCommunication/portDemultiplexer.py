@@ -0,0 +1,127 @@
+from axiomLib.loggers import create_logger
+from axiomLowLevelCommunication.config import LOG_FILE_DIRECTORY, LOG_FILE_NAME, PARCEL_CRC_SUFFIX
+from axiomLowLevelCommunication.crc8 import strip_crc
+
+
+class PortDemultiplexer:
+    """
+    Распределяет посылки, принятые из одного последовательного порта, по модулям
+
+    К одному физическому порту может быть подключено несколько модулей (например, модуль ввода
+    и силовой модуль на ``/dev/ttyS0``). Порт читается одним трансивером, а адрес модуля
+    определяется один раз по окончанию посылки ``<счетчик><адрес>`` (например, ``1119m2``),
+    после чего посылка передается в обработчик этого модуля
+
+    В режиме с контрольной суммой посылка имеет вид ``<посылка>*<CRC8>`` (см. :mod:`~axiomLowLevelCommunication.crc8`):
+    посылки с неверной или отсутствующей контрольной суммой отбрасываются, остальные передаются
+    в обработчик модуля без контрольной суммы
+    """
+
+    # Лог общий для распределителей всех портов (обработчики лога добавляются один раз)
+    logger = create_logger(logger_name=__name__,
+                           logfile_directory=LOG_FILE_DIRECTORY,
+                           logfile_name=LOG_FILE_NAME)
+
+    # Количество байт в конце посылки, среди которых ищется адрес модуля
+    ADDR_TAIL_LENGTH = 8
+
+    def __init__(self, port, crc_suffix=PARCEL_CRC_SUFFIX):
+        """
+        Инициализирует экземпляр класса
+
+        :type port: str
+        :param port: имя файла последовательного порта в ОС
+        :type crc_suffix: bool
+        :param crc_suffix: True - посылки оканчиваются контрольной суммой, которая проверяется
+
+        :ivar handlers: обработчики посылок для каждого адреса модуля
+        :ivar routed: количество посылок, переданных каждому модулю
+        :ivar unrouted: количество посылок, для которых не найден модуль
+        :ivar crc_errors: количество посылок, отброшенных из-за неверной контрольной суммы
+        :ivar crc_missing: количество посылок, отброшенных из-за отсутствия контрольной суммы
+        """
+        self.port = port
+        self.handlers = {}
+        self.routed = {}
+        self.unrouted = 0
+        self.crc_suffix = crc_suffix
+        self.crc_errors = 0
+        self.crc_missing = 0
+
+    def add_unit(self, unit_addr, handler):
+        """
+        Добавляет модуль, подключенный к порту
+
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type handler: callable
+        :param handler: обработчик посылок модуля, вызывается с посылкой без терминальной последовательности
+        """
+        self.handlers[unit_addr] = handler
+        self.routed[unit_addr] = 0
+
+    def parse_unit_addr(self, frame):
+        """
+        Определяет адрес модуля по окончанию посылки
+
+        :type frame: bytes or memoryview
+        :param frame: посылка без терминальной последовательности
+        :rtype: str
+        :return: адрес модуля (например, "m2") или None, если посылка не оканчивается адресом
+        """
+        tail = bytes(frame[-self.ADDR_TAIL_LENGTH:]).rstrip()
+        position = tail.rfind(b'm')
+        if position == -1 or not tail[position + 1:].isdigit():
+            return None
+        return tail[position:].decode()
+
+    def check_crc(self, frame):
+        """
+        Проверяет контрольную сумму посылки
+
+        :type frame: bytes or memoryview
+        :param frame: посылка ``<посылка>*<CRC8>`` без терминальной последовательности
+        :rtype: memoryview
+        :return: посылка без контрольной суммы или None, если контрольная сумма неверна или отсутствует
+        """
+        payload, ok = strip_crc(frame)
+        if ok:
+            return payload
+        if len(payload) == len(frame):
+            self.crc_missing += 1
+            self.logger.debug('Посылка {} из порта {} без контрольной суммы'.format(bytes(frame), self.port))
+        else:
+            self.crc_errors += 1
+            self.logger.debug('Посылка {} из порта {} с неверной контрольной суммой'.format(bytes(frame), self.port))
+        return None
+
+    def dispatch(self, frame):
+        """
+        Передает посылку в обработчик модуля, которому она адресована
+
+        Посылка без адреса передается единственному модулю порта; если модулей на порту несколько,
+        такая посылка отбрасывается
+
+        :type frame: bytes or memoryview
+        :param frame: посылка без терминальной последовательности
+        :rtype: str
+        :return: адрес модуля, получившего посылку, или None
+        """
+        if self.crc_suffix:
+            frame = self.check_crc(frame)
+            if frame is None:
+                return None
+
+        unit_addr = self.parse_unit_addr(frame)
+        if unit_addr is None and len(self.handlers) == 1:
+            unit_addr = next(iter(self.handlers))
+
+        handler = self.handlers.get(unit_addr)
+        if handler is None:
+            self.unrouted += 1
+            self.logger.debug('Посылка {} из порта {} не адресована ни одному модулю'.format(bytes(frame), self.port))
+            return None
+
+        self.routed[unit_addr] += 1
+        handler(frame)
+        return unit_addr
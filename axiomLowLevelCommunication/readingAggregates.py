@@ -0,0 +1,163 @@
+"""
+Агрегаты показаний каналов силовых модулей между публикациями характеристик
+
+Каждая посылка "adc", "ld" и "tmpr" учитывается в агрегатах своего модуля за O(1): количество,
+сумма, минимальное, максимальное и последнее значения и взвешенное по времени среднее.
+При публикации характеристик агрегаты за прошедший интервал (окно) собираются
+(:meth:`PowerUnitAggregates.collect`) и начинается новое окно
+"""
+import math
+import threading
+import time
+from axiomLowLevelCommunication.config import MAINS_VOLTAGE
+
+
+class WindowAggregate:
+    """
+    Агрегат значений одной величины за окно
+
+    Взвешенное по времени среднее считает, что величина сохраняет последнее значение до прихода
+    следующего. Последнее значение переносится в следующее окно
+    """
+
+    __slots__ = ('count', 'total', 'min', 'max', 'last', 'last_time', 'start_time', 'weighted_total')
+
+    def __init__(self):
+        """
+        Инициализирует экземпляр класса
+
+        :ivar count: количество значений в окне
+        :ivar total: сумма значений в окне
+        :ivar last: последнее значение (None - значений еще не было)
+        :ivar last_time: время последнего значения или начала окна (по часам :func:`time.monotonic`)
+        :ivar start_time: время начала окна
+        :ivar weighted_total: интеграл величины по времени от начала окна до :attr:`last_time`
+        """
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.last = None
+        self.last_time = None
+        self.start_time = None
+        self.weighted_total = 0.0
+
+    def add(self, value, timestamp):
+        """
+        Учитывает значение
+
+        :type value: float
+        :type timestamp: float
+        :param timestamp: время получения значения (по часам :func:`time.monotonic`)
+        """
+        if self.last is None:
+            self.start_time = timestamp
+        else:
+            self.weighted_total += self.last * (timestamp - self.last_time)
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.last = value
+        self.last_time = timestamp
+
+    def collect(self, now):
+        """
+        Возвращает агрегаты за окно и начинает новое окно
+
+        :type now: float
+        :param now: время окончания окна (по часам :func:`time.monotonic`)
+        :rtype: dict
+        :return: {'count', 'sum', 'min', 'max', 'last', 'mean'} или None, если значений еще не было;
+         'mean' - взвешенное по времени среднее за окно
+        """
+        if self.last is None:
+            return None
+        duration = now - self.start_time
+        weighted_total = self.weighted_total + self.last * (now - self.last_time)
+        result = {'count': self.count, 'sum': self.total, 'min': self.min, 'max': self.max, 'last': self.last,
+                  'mean': weighted_total / duration if duration > 0 else self.last}
+
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.last_time = self.start_time = now
+        self.weighted_total = 0.0
+        return result
+
+
+class PowerUnitAggregates:
+    """
+    Агрегаты показаний каналов силового модуля: ток (I1, I2), активная (Pa1, Pa2) и реактивная (Pr1, Pr2)
+    мощность и температура (T1, T2)
+
+    Мощность пересчитывается при каждой посылке "adc" или "ld" по последним значениям тока и фазового
+    сдвига, поэтому среднее за окно мощности дает потребленную за окно энергию
+    """
+
+    NAMES = ('I1', 'I2', 'Pa1', 'Pa2', 'Pr1', 'Pr2', 'T1', 'T2')
+
+    def __init__(self, voltage=MAINS_VOLTAGE):
+        """
+        Инициализирует экземпляр класса
+
+        :type voltage: float
+        :param voltage: напряжение электросети для расчета мощности [В]
+
+        :ivar aggregates: :class:`WindowAggregate` по именам величин
+        """
+        self.voltage = voltage
+        self.lock = threading.Lock()
+        self.aggregates = {name: WindowAggregate() for name in self.NAMES}
+
+    def update(self, parcel_type, unit_state, timestamp=None):
+        """
+        Учитывает посылку, уже записанную в состояние модуля
+
+        :type parcel_type: str
+        :param parcel_type: тип посылки
+        :type unit_state: :class:`~axiomLowLevelCommunication.unitState.UnitState`
+        :param unit_state: состояние силового модуля
+        :type timestamp: float
+        :param timestamp: время получения посылки (по часам :func:`time.monotonic`, None - текущее)
+        """
+        if parcel_type not in ('adc', 'ld', 'tmpr'):
+            return
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        aggregates = self.aggregates
+        with self.lock:
+            if parcel_type == 'tmpr':
+                temperature = unit_state['tmpr']
+                aggregates['T1'].add(temperature.temp1, timestamp)
+                aggregates['T2'].add(temperature.temp2, timestamp)
+                return
+
+            adc = unit_state['adc']
+            if parcel_type == 'adc':
+                aggregates['I1'].add(adc.sample1, timestamp)
+                aggregates['I2'].add(adc.sample2, timestamp)
+
+            load = unit_state['ld']
+            if adc.sample1 is None or load.angle1 is None:
+                return
+            for channel, current, angle in (('1', adc.sample1, load.angle1), ('2', adc.sample2, load.angle2)):
+                phi = angle * math.pi / 80
+                aggregates['Pa' + channel].add(self.voltage * current * math.cos(phi), timestamp)
+                aggregates['Pr' + channel].add(self.voltage * current * math.sin(phi), timestamp)
+
+    def collect(self, now=None):
+        """
+        Возвращает агрегаты за окно и начинает новое окно
+
+        :type now: float
+        :param now: время окончания окна (по часам :func:`time.monotonic`, None - текущее)
+        :rtype: dict
+        :return: агрегаты (:meth:`WindowAggregate.collect`) по именам величин, для которых были значения
+        """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            collected = ((name, aggregate.collect(now)) for name, aggregate in self.aggregates.items())
+            return {name: result for name, result in collected if result is not None}
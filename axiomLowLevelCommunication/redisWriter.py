@@ -0,0 +1,183 @@
+import json
+import threading
+import time
+from axiomLib.loggers import create_logger
+from axiomLowLevelCommunication.config import LOG_FILE_DIRECTORY, LOG_FILE_NAME, REDIS_WRITE_WINDOW, \
+    REDIS_WRITE_BATCH
+
+
+class RedisWriter:
+    """
+    Отложенная запись в Redis пакетами команд (pipeline)
+
+    Команды :meth:`publish` и :meth:`set` не выполняются сразу, а накапливаются и отправляются в Redis
+    одним пакетом отдельным потоком: через :attr:`window` секунд после первой команды пакета или сразу,
+    как только в пакете наберется :attr:`max_batch` команд. Команды выполняются в порядке поступления.
+
+    Значения, не являющиеся строками, кодируются в JSON
+    """
+
+    def __init__(self, redis, window=REDIS_WRITE_WINDOW, max_batch=REDIS_WRITE_BATCH, channel_prefix=None):
+        """
+        Инициализирует экземпляр класса
+
+        :type redis: redis.StrictRedis
+        :param redis: объект подключения к БД Redis
+        :type window: float
+        :param window: максимальное время накопления пакета команд [с]
+        :type max_batch: int
+        :param max_batch: количество команд, при котором пакет отправляется, не дожидаясь окончания :attr:`window`
+        :type channel_prefix: str
+        :param channel_prefix: префикс каналов, в которые публикуются сообщения
+         (``<префикс>:<канал>``, None - сообщения публикуются в заданные каналы)
+
+        :ivar commands: команды, ожидающие отправки
+        :ivar counters: счетчики отправленных команд, пакетов (обращений к Redis) и ошибок отправки
+        :ivar max_batch_seen: наибольшее количество команд в отправленном пакете
+        """
+        self.logger = create_logger(logger_name=__name__,
+                                    logfile_directory=LOG_FILE_DIRECTORY,
+                                    logfile_name=LOG_FILE_NAME)
+        self.redis = redis
+        self.window = window
+        self.max_batch = max_batch
+        self.channel_prefix = channel_prefix
+        self.condition = threading.Condition()
+        self.commands = []
+        self.deadline = None
+        self.in_flight = 0
+        self.thread = None
+        self.counters = dict.fromkeys(('commands', 'batches', 'errors'), 0)
+        self.max_batch_seen = 0
+
+    @staticmethod
+    def encode(value):
+        """
+        :rtype: str
+        :return: строка без изменений, иное значение - в формате JSON
+        """
+        return value if isinstance(value, str) else json.dumps(value)
+
+    def channel(self, channel):
+        """
+        :type channel: str
+        :param channel: канал Redis
+        :rtype: str
+        :return: канал Redis с префиксом :attr:`channel_prefix`
+        """
+        return channel if self.channel_prefix is None else '{}:{}'.format(self.channel_prefix, channel)
+
+    def publish(self, channel, message):
+        """
+        Ставит в очередь публикацию сообщения в канал Redis
+
+        :type channel: str
+        :param channel: канал Redis
+        :param message: сообщение (строка или значение для кодирования в JSON)
+        """
+        self.append('publish', self.channel(channel), self.encode(message))
+
+    def set(self, name, value):
+        """
+        Ставит в очередь запись значения ключа Redis
+
+        :type name: str
+        :param name: ключ
+        :param value: значение (строка или значение для кодирования в JSON)
+        """
+        self.append('set', name, self.encode(value))
+
+    def publish_many(self, messages):
+        """
+        Ставит в очередь публикацию нескольких сообщений; сообщения отправляются в одном пакете
+
+        :type messages: list
+        :param messages: список (канал Redis, сообщение)
+        """
+        commands = [('publish', (self.channel(channel), self.encode(message))) for channel, message in messages]
+        self.extend(commands)
+
+    def append(self, command, *args):
+        """
+        Добавляет команду в пакет
+
+        :type command: str
+        :param command: имя метода pipeline
+        :param args: аргументы команды
+        """
+        self.extend([(command, args)])
+
+    def extend(self, commands):
+        """
+        Добавляет команды в пакет и при необходимости запускает поток отправки
+
+        Команды, добавленные одним вызовом, отправляются в одном пакете
+
+        :type commands: list
+        :param commands: команды (имя метода pipeline, аргументы)
+        """
+        with self.condition:
+            if not self.commands:
+                self.deadline = time.monotonic() + self.window
+            self.commands.extend(commands)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.writer_target, daemon=True)
+                self.thread.start()
+            if len(self.commands) == len(commands) or len(self.commands) >= self.max_batch:
+                self.condition.notify_all()
+
+    def writer_target(self):
+        """
+        Отправляет накопленные пакеты команд
+        """
+        while True:
+            with self.condition:
+                while True:
+                    if not self.commands:
+                        self.condition.wait()
+                        continue
+                    remaining = self.deadline - time.monotonic()
+                    if len(self.commands) >= self.max_batch or remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                commands, self.commands = self.commands, []
+                self.in_flight = len(commands)
+
+            self.execute(commands)
+
+            with self.condition:
+                self.in_flight = 0
+                self.condition.notify_all()
+
+    def execute(self, commands):
+        """
+        Отправляет пакет команд в Redis
+
+        :type commands: list
+        :param commands: команды (имя метода pipeline, аргументы)
+        """
+        pipeline = self.redis.pipeline(transaction=False)
+        for command, args in commands:
+            getattr(pipeline, command)(*args)
+        try:
+            pipeline.execute()
+        except Exception as e:
+            self.logger.error('Ошибка при отправке пакета из {} команд в Redis: {}'.format(len(commands), e))
+            self.counters['errors'] += 1
+        self.counters['commands'] += len(commands)
+        self.counters['batches'] += 1
+        self.max_batch_seen = max(self.max_batch_seen, len(commands))
+
+    def flush(self, timeout=None):
+        """
+        Отправляет накопленные команды, не дожидаясь окончания :attr:`window`, и ожидает окончания отправки
+
+        :type timeout: float
+        :param timeout: максимальное время ожидания [с] (None - без ограничения)
+        :rtype: bool
+        :return: True - все команды отправлены, False - истек таймаут
+        """
+        with self.condition:
+            self.deadline = time.monotonic()
+            self.condition.notify_all()
+            return self.condition.wait_for(lambda: not self.commands and not self.in_flight, timeout)
@@ -0,0 +1,91 @@
+import redis
+from collections import Counter
+from axiomLowLevelCommunication.highLowTransceiver import HighLowTransceiver
+from axiomLowLevelCommunication.commandScheduler import Command, classify_command
+from axiomLowLevelCommunication.redisWriter import RedisWriter
+from axiomLowLevelCommunication.config import REPLAY_REDIS_DB, REPLAY_CHANNEL_PREFIX
+
+
+class ReplayTransceiver(HighLowTransceiver):
+    """
+    Трансивер для воспроизведения записи обмена (см. :class:`~axiomLowLevelCommunication.trafficCapture.CaptureReplay`)
+
+    Посылки обрабатываются так же, как в :class:`~axiomLowLevelCommunication.highLowTransceiver.HighLowTransceiver`,
+    но трансивер не взаимодействует с аппаратной частью и с работающей системой:
+
+    * последовательные порты не открываются, обмен не записывается в :data:`CAPTURE_FILE`;
+    * команды модулям не отправляются, инициализация силовых модулей не выполняется: команды и запросы
+      инициализации только учитываются в :attr:`suppressed_commands` и :attr:`init_requests`;
+    * ключи записываются в отдельную БД Redis :data:`REPLAY_REDIS_DB`, а сообщения публикуются в каналы
+      с префиксом :data:`REPLAY_CHANNEL_PREFIX`, так как каналы Redis общие для всех БД
+    """
+
+    def __init__(self, settings=None, redis_client=None):
+        """
+        Инициализирует экземпляр класса
+
+        :type settings: dict
+        :param settings: конфигурация аппаратных модулей системы (None - загружается из файла настроек)
+        :type redis_client: redis.StrictRedis
+        :param redis_client: объект подключения к БД Redis (None - подключение к БД :data:`REPLAY_REDIS_DB`)
+
+        :ivar init_requests: количество запросов инициализации по адресам силовых модулей
+        :ivar suppressed_commands: неотправленные команды (адрес модуля, команда)
+        """
+        self.init_requests = Counter()
+        self.suppressed_commands = []
+        if redis_client is None:
+            redis_client = redis.StrictRedis(db=REPLAY_REDIS_DB, decode_responses=True)
+        super().__init__(settings, redis_client=redis_client)
+
+    def create_redis_writer(self):
+        """
+        :rtype: :class:`~axiomLowLevelCommunication.redisWriter.RedisWriter`
+        :return: отложенная запись в Redis с публикацией в каналы с префиксом :data:`REPLAY_CHANNEL_PREFIX`
+        """
+        return RedisWriter(self.redis, channel_prefix=REPLAY_CHANNEL_PREFIX)
+
+    def create_capture(self):
+        """
+        :return: None - обмен при воспроизведении не записывается
+        """
+        return None
+
+    def bring_up_ports(self):
+        """
+        Последовательные порты при воспроизведении не открываются
+
+        :rtype: set
+        :return: пустое множество
+        """
+        self.logger.info('Воспроизведение записи обмена: последовательные порты не открываются')
+        return set()
+
+    def start_power_unit_init(self, unit_addr):
+        """
+        Учитывает запрос инициализации силового модуля, не выполняя ее
+
+        :type unit_addr: str
+        :param unit_addr: адрес силового модуля
+        """
+        self.init_requests[unit_addr] += 1
+        self.logger.info('Воспроизведение записи обмена: инициализация модуля {} не выполняется'.format(unit_addr))
+
+    def submit_command(self, unit_addr, data, supersede=True):
+        """
+        Учитывает команду модулю, не отправляя ее
+
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type data: str
+        :param data: команда
+        :type supersede: bool
+        :param supersede: не используется
+        :rtype: :class:`~axiomLowLevelCommunication.commandScheduler.Command`
+        :return: команда со статусом 'rejected' - команда не записывается в порт
+        """
+        self.suppressed_commands.append((unit_addr, data))
+        self.logger.info('Воспроизведение записи обмена: команда "{}" не отправлена'.format(data))
+        command = Command(data, *classify_command(data))
+        command.finish('rejected')
+        return command
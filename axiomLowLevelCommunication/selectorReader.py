@@ -0,0 +1,94 @@
+import selectors
+from axiomLib.loggers import create_logger
+from axiomLowLevelCommunication.config import LOG_FILE_DIRECTORY, LOG_FILE_NAME
+from axiomLowLevelCommunication.frameBuffer import FrameBuffer
+
+
+class SelectorReader:
+    """
+    Принимает данные от всех последовательных портов в одном потоке
+
+    Дескрипторы открытых портов регистрируются в :mod:`selectors` (epoll в Linux).
+    Данные читаются только по готовности дескриптора, без блокировки порта на время
+    ожидания и без фиксированных пауз между чтениями. Данные читаются в буфер приема
+    :class:`~axiomLowLevelCommunication.frameBuffer.FrameBuffer` порта, из которого
+    посылки, оканчивающиеся последовательностью ``\\r\\n``, передаются в обработчик,
+    зарегистрированный для порта
+    """
+
+    def __init__(self):
+        """
+        Инициализирует экземпляр класса
+
+        :ivar selector: объект ожидания готовности дескрипторов
+        :ivar buffers: буферы приема для каждого дескриптора
+        """
+        self.logger = create_logger(logger_name=__name__,
+                                    logfile_directory=LOG_FILE_DIRECTORY,
+                                    logfile_name=LOG_FILE_NAME)
+        self.selector = selectors.DefaultSelector()
+        self.buffers = {}
+
+    def register(self, transceiver, callback):
+        """
+        Добавляет последовательный порт в список опрашиваемых
+
+        :type transceiver: :class:`~axiomLowLevelCommunication.serialTransceiver.SerialTransceiver`
+        :param transceiver: трансивер открытого последовательного порта
+        :type callback: callable
+        :param callback: обработчик посылок, вызывается с посылкой без терминальной последовательности
+         (:class:`memoryview`, действительный только во время вызова)
+        :rtype: bool
+        :return: True - порт добавлен, False - порт не открыт
+        """
+        fd = transceiver.fileno()
+        if fd is None:
+            self.logger.error('Последовательный порт {} не открыт и не будет опрашиваться'.format(transceiver.port))
+            return False
+        self.selector.register(fd, selectors.EVENT_READ, (transceiver, callback))
+        self.buffers[fd] = FrameBuffer()
+        return True
+
+    def unregister(self, fd):
+        """
+        Удаляет дескриптор из списка опрашиваемых
+
+        :type fd: int
+        :param fd: файловый дескриптор последовательного порта
+        """
+        try:
+            self.selector.unregister(fd)
+        except (KeyError, ValueError):
+            pass
+        self.buffers.pop(fd, None)
+
+    def poll(self, timeout=None):
+        """
+        Ожидает готовности дескрипторов и обрабатывает принятые данные
+
+        :type timeout: float
+        :param timeout: максимальное время ожидания [с]
+        :rtype: int
+        :return: количество переданных в обработчики посылок
+        """
+        frames_count = 0
+        for key, _ in self.selector.select(timeout):
+            transceiver, callback = key.data
+            buffer = self.buffers[key.fd]
+            if transceiver.read_into(buffer) is None:
+                self.unregister(key.fd)
+                continue
+            for frame in buffer.frames():
+                frames_count += 1
+                try:
+                    callback(frame)
+                except Exception as e:
+                    self.logger.error('Ошибка при обработке посылки {}: {}'.format(bytes(frame), e))
+        return frames_count
+
+    def close(self):
+        """
+        Освобождает объект ожидания готовности дескрипторов
+        """
+        self.selector.close()
+        self.buffers.clear()
@@ -1,8 +1,72 @@
 import threading
+import time
 import serial
 from time import sleep
 from axiomLib.loggers import create_logger
-from axiomLowLevelCommunication.config import LOG_FILE_DIRECTORY, LOG_FILE_NAME
+from axiomLowLevelCommunication.config import LOG_FILE_DIRECTORY, LOG_FILE_NAME, SERIAL_BAUDRATE, \
+	SERIAL_WRITE_MODE, SERIAL_INTER_BYTE_GAP, SERIAL_WRITE_TIMEOUT, MAX_FRAME_LENGTH
+from axiomLowLevelCommunication.halfDuplexScheduler import HalfDuplexScheduler
+from axiomLowLevelCommunication.ioStatistics import LatencyStatistics
+from axiomLowLevelCommunication.trafficCapture import DIRECTION_IN, DIRECTION_OUT
+
+
+class BaudPacer:
+	"""
+	Таймер для выдерживания пауз между байтами при записи в последовательный порт
+
+	Длительность паузы рассчитывается из скорости порта, поэтому не зависит от
+	разрешения системного таймера, как ``sleep(0.001)``. Время отправки каждого байта
+	отсчитывается от начала посылки, что исключает накопление ошибки
+	"""
+	#: максимальная длительность активного ожидания перед отправкой байта [с]
+	SPIN_TIME = 0.00005
+
+	def __init__(self, baudrate, gap_chars, bits_per_char=10):
+		"""
+		Инициализирует экземпляр класса
+
+		:type baudrate: int
+		:param baudrate: скорость последовательного порта [бод]
+		:type gap_chars: float
+		:param gap_chars: пауза между байтами в длительностях передачи одного символа
+		:type bits_per_char: int
+		:param bits_per_char: количество бит на символ с учетом старт- и стоп-битов
+
+		:ivar char_time: длительность передачи одного символа [с]
+		:ivar byte_period: интервал между началами передачи соседних байтов [с]
+		"""
+		self.char_time = bits_per_char / float(baudrate)
+		self.byte_period = self.char_time * (1 + gap_chars)
+
+	def wait_until(self, deadline):
+		"""
+		Ожидает наступления момента времени deadline (по часам :func:`time.perf_counter`)
+
+		Основная часть ожидания выполняется через sleep, активное ожидание ограничено
+		:attr:`SPIN_TIME`, чтобы поток не удерживал GIL и не мешал потокам чтения порта
+
+		:type deadline: float
+		:param deadline: момент времени, до которого нужно ждать
+		"""
+		remaining = deadline - time.perf_counter()
+		if remaining > self.SPIN_TIME:
+			sleep(remaining - self.SPIN_TIME)
+		while time.perf_counter() < deadline:
+			pass
+
+	def write(self, ser, data):
+		"""
+		Записывает данные в порт побайтно, выдерживая между байтами заданную паузу
+
+		:type ser: serial.Serial
+		:param ser: объект подключения к последовательному порту
+		:type data: bytes
+		:param data: данные для записи
+		"""
+		start = time.perf_counter()
+		for i in range(len(data)):
+			self.wait_until(start + i * self.byte_period)
+			ser.write(data[i:i + 1])
 
 
 class SerialTransceiver:
@@ -10,33 +74,63 @@ class SerialTransceiver:
 	Класс предоставляет API для работы с последовательным портом.
 	Основан на библиотеке pySerial
 	"""
-	def __init__(self, port):
+	def __init__(self, port, baudrate=SERIAL_BAUDRATE, write_mode=SERIAL_WRITE_MODE,
+				 inter_byte_gap=SERIAL_INTER_BYTE_GAP, capture=None, connect=True):
 		"""
 		Инициализирует экземпляр класса
 
 		:type port: str
 		:param port: имя файла последовательного порта в ОС
+		:type baudrate: int
+		:param baudrate: скорость последовательного порта [бод]
+		:type write_mode: str
+		:param write_mode: режим записи команд: 'framed' - одним вызовом write(), 'bytewise' - посимвольно
+		:type inter_byte_gap: float
+		:param inter_byte_gap: пауза между байтами в режиме 'framed' в длительностях передачи символа
+		:type capture: :class:`~axiomLowLevelCommunication.trafficCapture.CaptureWriter`
+		:param capture: файл записи обмена (None - запись не ведется)
+		:type connect: bool
+		:param connect: True - порт открывается при создании трансивера, False - порт открывается
+		 при вызове :func:`open`
 
 		:ivar port: имя файла COM порта в ОС
-		:ivar ser_lock: блокировка записи/чтения из последовательного порта
-		:ivar write_event: блокировка чтения из последовательного порта
+		:ivar scheduler: планировщик окон чтения и слотов записи полудуплексной линии
+		:ivar write_mode: режим записи команд
+		:ivar pacer: таймер пауз между байтами (None, если паузы не нужны)
+		:ivar write_latency: статистика времени записи команд в порт (с учетом ожидания слота записи)
+		:ivar capture: файл записи обмена
+		:ivar bytes_in: количество принятых байт
+		:ivar bytes_out: количество переданных байт
+		:ivar commands_out: количество записанных команд
+		:ivar write_errors: количество команд, которые не удалось записать
 		:ivar ser: объект подключения к последовательному порту
 		"""
 		self.logger = create_logger(logger_name=__name__,
 									logfile_directory=LOG_FILE_DIRECTORY,
 									logfile_name=LOG_FILE_NAME)
 		self.port = port
-		self.ser_lock = threading.Lock()
-		self.write_event = threading.Event()
-		self.write_event.set()
+		self.scheduler = HalfDuplexScheduler(port, baudrate)
+
+		self.write_mode = write_mode
+		self.pacer = BaudPacer(baudrate, inter_byte_gap) if inter_byte_gap else None
+		self.write_latency = LatencyStatistics()
+		self.capture = capture
+		self.bytes_in = 0
+		self.bytes_out = 0
+		self.commands_out = 0
+		self.write_errors = 0
 
 		try:
-			self.ser = serial.Serial(port=port, baudrate=115200, stopbits=1,
-									 bytesize=8, parity='N', timeout=0.1,
+			self.ser = serial.Serial(port=port if connect else None, baudrate=baudrate, stopbits=1,
+									 bytesize=8, parity='N', timeout=self.scheduler.read_window,
 									 xonxoff=False, rtscts=False, writeTimeout=0,
 									 dsrdtr=False, interCharTimeout=None)
 		except serial.SerialException as e:
 			self.logger.error('Ошибка при подключении к последовательному порту: {}'.format(e))
+			return
+		# Порт без подключения задается после создания объекта, чтобы pySerial не открывал его
+		if not connect:
+			self.ser.port = port
 
 	def open(self):
 		"""
@@ -59,6 +153,12 @@ class SerialTransceiver:
 		:rtype: bool
 		:return: True в случае успеха, False - в случае ошибки
 		"""
+		write_delay = self.scheduler.write_delay
+		if write_delay.count:
+			self.logger.info('Порт {}: наибольшая задержка записи {:.1f} мс, средняя {:.1f} мс '
+							 '(время передачи посылки {:.1f} мс)'.format(self.port, write_delay.max * 1000,
+																		 write_delay.mean * 1000,
+																		 self.scheduler.frame_time * 1000))
 		try:
 			self.ser.close()
 			# TODO написать тест
@@ -72,7 +172,15 @@ class SerialTransceiver:
 		"""
 		Записывает данные в последовательный порт
 
-		При записи последовательный порт блокируется (для других потоков) как на запись, так и на чтение
+		Запись выполняется в слоте записи :attr:`scheduler`: если идет окно чтения, запись
+		начинается после его окончания
+
+		В режиме 'framed' команда вместе с символом конца строки записывается одним вызовом
+		``write()`` (или побайтно с паузами :attr:`pacer`, если они заданы), входной буфер
+		при этом не сбрасывается. В режиме 'bytewise' команда записывается посимвольно
+		с паузой 1 мс после каждого символа.
+
+		Время записи с учетом ожидания слота записи сохраняется в :attr:`write_latency`
 
 		:type data: str
 		:param data: строка для записи
@@ -83,39 +191,72 @@ class SerialTransceiver:
 			:scale: 40%
 			:align: center
 		"""
-		self.write_event.clear()
-		if self.ser_lock.acquire(timeout=3):
-			self.write_event.set()
+		start_time = time.perf_counter()
+		if self.scheduler.begin_write(timeout=SERIAL_WRITE_TIMEOUT):
 			try:
-				self.ser.reset_output_buffer()
-				self.ser.reset_input_buffer()
-				for i in data:
-					self.ser.write(str(i).encode())
-					sleep(0.001)
-					self.ser.reset_input_buffer()
-					self.ser.reset_output_buffer()
-				self.ser.write('\n'.encode())
+				if self.write_mode == 'bytewise':
+					self.write_bytewise(data)
+				else:
+					self.write_frame(data)
 
 			except serial.SerialException as e:
 				log_msg = 'Ошибка при записи команды {} в последовательный порт: {}'.format(data, e)
 				self.logger.error(log_msg)
+				self.write_errors += 1
 				return False
 			finally:
-				self.ser_lock.release()
+				self.scheduler.end_write()
+			self.write_latency.add(time.perf_counter() - start_time)
+			self.record(DIRECTION_OUT, '{}\n'.format(data).encode())
 			return True
-		# Если блокировка записи не снята до истечения таймаута
+		# Если слот записи не получен до истечения таймаута
 		else:
-			self.write_event.set()
 			log_msg = 'Невозможно записать команду "{}" в последовательный порт {}. ' \
 					  'Запись заблокирована другим потоком'.format(data, self.port)
 			self.logger.error(log_msg)
+			self.write_errors += 1
 			return False
 
+	def write_frame(self, data):
+		"""
+		Записывает команду в последовательный порт целиком
+
+		Вызывается из :func:`write` в слоте записи :attr:`scheduler`
+
+		:type data: str
+		:param data: строка для записи
+		"""
+		frame = '{}\n'.format(data).encode()
+		if self.pacer:
+			self.pacer.write(self.ser, frame)
+		else:
+			self.ser.write(frame)
+		self.ser.flush()
+
+	def write_bytewise(self, data):
+		"""
+		Записывает команду в последовательный порт посимвольно с паузой 1 мс после каждого символа
+
+		Вызывается из :func:`write` в слоте записи :attr:`scheduler`
+
+		:type data: str
+		:param data: строка для записи
+		"""
+		self.ser.reset_output_buffer()
+		self.ser.reset_input_buffer()
+		for i in data:
+			self.ser.write(str(i).encode())
+			sleep(0.001)
+			self.ser.reset_input_buffer()
+			self.ser.reset_output_buffer()
+		self.ser.write('\n'.encode())
+
 	def read(self):
 		"""
 		Читает данные из последовательного порта
 
-		Блокирует чтение/запись из последовательного порта до появления терминальной последовательности \r\n
+		Читает в одном окне чтения :attr:`scheduler` до появления терминальной последовательности \r\n
+		или окончания окна (в этом случае возвращается начало посылки)
 
 		:rtype: bytes
 		:return: прочитанные данные
@@ -124,37 +265,132 @@ class SerialTransceiver:
 			:scale: 40%
 			:align: center
 		"""
+		self.scheduler.begin_read()
 		try:
-			self.write_event.wait(timeout=3)  # Запись имеет приоритет, ждем, пока закончится запить
-			if self.ser_lock.acquire(timeout=3):
-				data = self.ser.read_until(terminator=b'\r\n', size=None)
-				return data
+			data = self.ser.read_until(b'\r\n')
+			self.record(DIRECTION_IN, data)
+			return data
 		except serial.SerialException as e:
 			self.logger.error('Ошибка при чтении из последовательного порта: {}'.format(e))
 			return False
 		finally:
-			self.ser_lock.release()
+			self.scheduler.end_read()
+
+	def fileno(self):
+		"""
+		Возвращает файловый дескриптор открытого последовательного порта
+
+		:rtype: int
+		:return: файловый дескриптор или None, если порт не открыт
+		"""
+		ser = getattr(self, 'ser', None)
+		if ser is None or not ser.is_open:
+			return None
+		try:
+			return ser.fileno()
+		except (serial.SerialException, AttributeError):
+			return None
+
+	def read_into(self, frame_buffer):
+		"""
+		Читает из последовательного порта уже принятые данные непосредственно в буфер приема
+
+		Не ожидает поступления данных и окна чтения :attr:`scheduler`, но сообщает планировщику о приеме данных:
+		запись начинается после освобождения линии (см. :meth:`HalfDuplexScheduler.on_receive`).
+		Используется для чтения по готовности файлового дескриптора
+		(см. :class:`~axiomLowLevelCommunication.selectorReader.SelectorReader`)
+
+		:type frame_buffer: :class:`~axiomLowLevelCommunication.frameBuffer.FrameBuffer`
+		:param frame_buffer: буфер приема
+		:rtype: int
+		:return: количество прочитанных байт (0 - данных нет) или None в случае ошибки
+		"""
+		try:
+			size = frame_buffer.fill(self.ser.fileno())
+		except BlockingIOError:
+			return 0
+		except (OSError, serial.SerialException) as e:
+			self.logger.error('Ошибка при чтении из последовательного порта {}: {}'.format(self.port, e))
+			return None
+		# Пустой результат при готовности дескриптора означает, что устройство отключено
+		if not size:
+			self.logger.error('Последовательный порт {} закрыт устройством'.format(self.port))
+			return None
+		self.scheduler.on_receive()
+		self.record(DIRECTION_IN, frame_buffer.view[frame_buffer.end - size:frame_buffer.end])
+		return size
+
+	def record(self, direction, data):
+		"""
+		Учитывает данные, прошедшие через порт, в счетчиках обмена и добавляет их в файл записи
+		обмена :attr:`capture`, если он задан. Переданные данные учитываются как одна команда
+
+		:type direction: int
+		:param direction: направление передачи (:data:`~axiomLowLevelCommunication.trafficCapture.DIRECTION_IN`
+		 или :data:`~axiomLowLevelCommunication.trafficCapture.DIRECTION_OUT`)
+		:type data: bytes or memoryview
+		:param data: данные
+		"""
+		if direction == DIRECTION_IN:
+			self.bytes_in += len(data)
+		else:
+			self.bytes_out += len(data)
+			self.commands_out += 1
+		if self.capture is not None:
+			self.capture.write(self.port, direction, data)
+
+	def stats(self):
+		"""
+		Возвращает статистику обмена по порту
+
+		:rtype: dict
+		:return: счетчики байт и команд, статистика времени записи (write_duration), ожидания
+		 слота записи (write_slot_wait) и количество таймаутов ожидания слота записи
+		"""
+		return {
+			'bytes_in': self.bytes_in,
+			'bytes_out': self.bytes_out,
+			'commands_out': self.commands_out,
+			'write_errors': self.write_errors,
+			'write_duration': self.write_latency.as_dict(),
+			'write_slot_wait': self.scheduler.write_delay.as_dict(),
+			'write_timeouts': self.scheduler.write_timeouts,
+		}
 
 	def read_generator(self):
 		"""
 		Читает данные из последовательного порта
 
-		Работает аналогично функции :func:`read`, но в формате генератора
+		Работает аналогично функции :func:`read`, но в формате генератора. Если окно чтения
+		закончилось посреди посылки, начало посылки сохраняется и дополняется в следующем окне,
+		поэтому генератор выдает только целые посылки
 
 		:пример: ``for data in ser.read_generator(): pass``
 		:rtype: bytes
 		:return: прочитанные данные
 		"""
-		while threading.main_thread().isAlive():
+		partial = b''
+		while threading.main_thread().is_alive():
 			data = None
+			self.scheduler.begin_read()
 			try:
-				self.write_event.wait(timeout=3)  # Запись имеет приоритет, ждем, пока закончится запить
-				if self.ser_lock.acquire(timeout=3):
-					data = self.ser.read_until(terminator=b'\r\n', size=None)
+				data = self.ser.read_until(b'\r\n')
 			except serial.SerialException as e:
 				self.logger.error('Ошибка при чтении из последовательного порта: {}'.format(e))
 			finally:
-				self.ser_lock.release()
-				if data:
-					yield data
+				self.scheduler.end_read()
+			if data is None:
 				sleep(0.01)
+				continue
+			if not data:
+				continue
+			self.record(DIRECTION_IN, data)
+			if not data.endswith(b'\r\n'):
+				partial += data
+				if len(partial) > MAX_FRAME_LENGTH:
+					partial = b''
+				continue
+			if partial:
+				data = partial + data
+				partial = b''
+			yield data
@@ -0,0 +1,121 @@
+"""
+Маршрутизация команд модуля "Логика" между сегментами в режиме ``RUN_MODE = 'sharded'``
+
+В этом режиме последовательные порты распределены между процессами-сегментами
+(см. :mod:`~axiomLowLevelCommunication.shardSupervisor`). Команды из каналов ``axiomLogic:cmd:state``
+и ``axiomLogic:request:insulation`` принимаются одним маршрутизатором и пересылаются без изменений
+в канал сегмента, к портам которого подключен модуль-адресат (:func:`shard_channel`). Команда измерения
+сопротивления изоляции с адресами модулей нескольких сегментов разделяется по сегментам
+"""
+import re
+from collections import OrderedDict
+from axiomLib.loggers import create_logger
+from axiomLowLevelCommunication.insulationCampaign import split_targets, target_unit_addr
+from axiomLowLevelCommunication.config import LOG_FILE_DIRECTORY, LOG_FILE_NAME, INPUT_CMD_STATE_CHANNEL, \
+    INPUT_REQUEST_INSULATION_CHANNEL, COMMAND_LISTEN_TIMEOUT, SHARD_CHANNEL_PREFIX
+
+# Адрес модуля в адресе канала силового модуля ``ch:<адрес модуля>:<номер канала>``
+UNIT_ADDR_REGEX = re.compile(r'ch:(m\d+):')
+
+
+def shard_channel(channel, shard):
+    """
+    :type channel: str
+    :param channel: канал Redis, из которого модуль "Логика" отправляет команды
+    :type shard: int
+    :param shard: номер сегмента
+    :rtype: str
+    :return: канал Redis, из которого сегмент принимает команды
+    """
+    return '{}:{}:{}'.format(SHARD_CHANNEL_PREFIX, shard, channel)
+
+
+class ShardRouter:
+    """
+    Пересылает команды модуля "Логика" в каналы сегментов
+
+    Сегмент определяется по адресу модуля в адресе канала, содержащемся в команде. Команды, в которых
+    не удалось определить модуль, пересылаются сегменту 0: сегмент проверяет команду и сообщает об ошибке
+    так же, как при работе в одном процессе
+    """
+
+    channels = (INPUT_CMD_STATE_CHANNEL, INPUT_REQUEST_INSULATION_CHANNEL)
+
+    def __init__(self, redis, unit_shards):
+        """
+        Инициализирует экземпляр класса
+
+        :type redis: redis.StrictRedis
+        :param redis: объект подключения к БД Redis
+        :type unit_shards: dict
+        :param unit_shards: номера сегментов по адресам модулей
+
+        :ivar routed: количество команд, пересланных каждому сегменту
+        """
+        self.logger = create_logger(logger_name=__name__,
+                                    logfile_directory=LOG_FILE_DIRECTORY,
+                                    logfile_name=LOG_FILE_NAME)
+        self.redis = redis
+        self.unit_shards = unit_shards
+        self.routed = dict.fromkeys(set(unit_shards.values()) | {0}, 0)
+        self.isRunning = False
+
+    def route(self, channel, data):
+        """
+        Определяет канал сегмента для команды
+
+        :type channel: str
+        :param channel: канал Redis, из которого получена команда
+        :type data: str
+        :param data: команда
+        :rtype: str
+        :return: канал сегмента
+        """
+        match = UNIT_ADDR_REGEX.search(data) if isinstance(data, str) else None
+        shard = self.unit_shards.get(match.group(1), 0) if match else 0
+        self.routed[shard] += 1
+        return shard_channel(channel, shard)
+
+    def split(self, channel, data):
+        """
+        Распределяет команду по каналам сегментов
+
+        Команда измерения сопротивления изоляции может содержать адреса модулей разных сегментов
+        (см. :mod:`~axiomLowLevelCommunication.insulationCampaign`): каждому сегменту пересылается команда
+        только с адресами его модулей. Остальные команды пересылаются одному сегменту (:meth:`route`)
+
+        :type channel: str
+        :param channel: канал Redis, из которого получена команда
+        :type data: str
+        :param data: команда
+        :rtype: list
+        :return: список (канал сегмента, команда)
+        """
+        if channel != INPUT_REQUEST_INSULATION_CHANNEL or not isinstance(data, str):
+            return [(self.route(channel, data), data)]
+
+        shard_targets = OrderedDict()
+        for target in split_targets(data):
+            shard_targets.setdefault(self.unit_shards.get(target_unit_addr(target), 0), []).append(target)
+        if not shard_targets:
+            return [(self.route(channel, data), data)]
+        for shard in shard_targets:
+            self.routed[shard] += 1
+        # Команда для модулей одного сегмента пересылается без изменений
+        if len(shard_targets) == 1:
+            return [(shard_channel(channel, next(iter(shard_targets))), data)]
+        return [(shard_channel(channel, shard), ' '.join(targets)) for shard, targets in shard_targets.items()]
+
+    def router_target(self):
+        """
+        Принимает команды модуля "Логика" и пересылает их в каналы сегментов, пока установлен флаг :attr:`isRunning`
+        """
+        subscriber = self.redis.pubsub(ignore_subscribe_messages=True)
+        subscriber.subscribe(*self.channels)
+        while self.isRunning:
+            message = subscriber.get_message(timeout=COMMAND_LISTEN_TIMEOUT)
+            if message:
+                for target, data in self.split(message['channel'], message['data']):
+                    self.logger.debug('Команда {} переслана в канал {}'.format(data, target))
+                    self.redis.publish(target, data)
+        subscriber.close()
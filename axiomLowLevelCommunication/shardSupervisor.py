@@ -0,0 +1,195 @@
+"""
+Работа функционального модуля несколькими процессами (``RUN_MODE = 'sharded'``)
+
+Модули группируются по последовательным портам, группы портов распределяются между процессами-сегментами
+(:func:`assign_shards`). Каждый сегмент - отдельный процесс с
+:class:`~axiomLowLevelCommunication.highLowTransceiver.HighLowTransceiver`, который обслуживает только
+свои порты и публикует состояние и характеристики в общие каналы Redis. Команды модуля "Логика"
+пересылаются сегментам маршрутизатором :class:`~axiomLowLevelCommunication.shardRouter.ShardRouter`.
+Разбор посылок выполняется параллельно на нескольких ядрах процессора
+"""
+import copy
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+import redis
+from axiomLib.loggers import create_logger
+from axiomLowLevelCommunication.config import LOG_FILE_DIRECTORY, LOG_FILE_NAME, SHARD_COUNT
+from axiomLowLevelCommunication.highLowTransceiver import HighLowTransceiver
+from axiomLowLevelCommunication.shardRouter import ShardRouter
+
+
+def group_units_by_port(settings):
+    """
+    Группирует модули по последовательным портам
+
+    :type settings: dict
+    :param settings: конфигурация аппаратных модулей системы
+    :rtype: dict
+    :return: адреса модулей по портам
+    """
+    port_units = {}
+    for units in (settings['power units'], settings['input units']):
+        for unit_addr, params in units.items():
+            port_units.setdefault(params['port'], []).append(unit_addr)
+    return port_units
+
+
+def assign_shards(port_units, shard_count):
+    """
+    Распределяет порты между сегментами так, чтобы количество модулей в сегментах было примерно одинаковым
+
+    Модули одного порта всегда попадают в один сегмент: порт читается одним трансивером
+
+    :type port_units: dict
+    :param port_units: адреса модулей по портам (см. :func:`group_units_by_port`)
+    :type shard_count: int
+    :param shard_count: количество сегментов
+    :rtype: list
+    :return: списки портов сегментов (пустые сегменты не создаются)
+    """
+    shards = [[] for _ in range(min(shard_count, len(port_units)))]
+    loads = [0] * len(shards)
+    # Порты с наибольшим количеством модулей распределяются первыми, каждый - в наименее загруженный сегмент
+    for port in sorted(port_units, key=lambda port: (-len(port_units[port]), port)):
+        shard = loads.index(min(loads))
+        shards[shard].append(port)
+        loads[shard] += len(port_units[port])
+    return shards
+
+
+def shard_settings(settings, ports):
+    """
+    :type settings: dict
+    :param settings: конфигурация аппаратных модулей системы
+    :type ports: list
+    :param ports: порты сегмента
+    :rtype: dict
+    :return: конфигурация, содержащая только модули, подключенные к портам сегмента
+    """
+    result = copy.deepcopy(settings)
+    for key in ('power units', 'input units'):
+        result[key] = {unit_addr: params for unit_addr, params in result[key].items() if params['port'] in ports}
+    result['hardware units'] = {unit_addr: power_unit_addrs
+                                for unit_addr, power_unit_addrs in result['hardware units'].items()
+                                if unit_addr in result['input units']}
+    return result
+
+
+class ShardSupervisor:
+    """
+    Запускает процессы-сегменты и маршрутизатор команд, перезапускает завершившиеся сегменты
+    """
+
+    # Класс трансивера, запускаемого в каждом сегменте
+    worker_class = HighLowTransceiver
+
+    def __init__(self, shard_count=SHARD_COUNT):
+        """
+        Инициализирует экземпляр класса
+
+        :type shard_count: int
+        :param shard_count: количество сегментов (None - по количеству ядер процессора)
+
+        :ivar settings: конфигурация аппаратных модулей системы
+        :ivar shards: списки портов сегментов
+        :ivar unit_shards: номера сегментов по адресам модулей
+        :ivar workers: процессы сегментов
+        :ivar router: маршрутизатор команд модуля "Логика"
+        """
+        self.logger = create_logger(logger_name=__name__,
+                                    logfile_directory=LOG_FILE_DIRECTORY,
+                                    logfile_name=LOG_FILE_NAME)
+        # Настройки загружаются так же, как в режиме одного процесса
+        self.settings = HighLowTransceiver.load_settings(self)
+        if not self.settings:
+            sys.exit(0)
+
+        port_units = group_units_by_port(self.settings)
+        self.shards = assign_shards(port_units, shard_count or os.cpu_count() or 1)
+        self.unit_shards = {unit_addr: shard for shard, ports in enumerate(self.shards)
+                            for port in ports for unit_addr in port_units[port]}
+        self.workers = {}
+        self.router = None
+        self.isRunning = False
+
+    def worker_target(self, shard):
+        """
+        Работа процесса сегмента
+
+        :type shard: int
+        :param shard: номер сегмента
+        """
+        # Обработчики сигналов наследуются от процесса супервизора: пока трансивер создается, сегмент
+        # завершается по SIGTERM сразу, а SIGINT (Ctrl+C в терминале) обрабатывает только супервизор
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        hlt = self.worker_class(settings=shard_settings(self.settings, self.shards[shard]), shard=shard)
+        signal.signal(signal.SIGTERM, hlt.sigterm_handler)
+        hlt.run()
+
+    def start_worker(self, shard):
+        """
+        Запускает процесс сегмента
+
+        :type shard: int
+        :param shard: номер сегмента
+        """
+        worker = multiprocessing.Process(target=self.worker_target, args=(shard,),
+                                         name='axiom low level communication shard {}'.format(shard))
+        worker.start()
+        self.workers[shard] = worker
+        self.logger.info('Запущен сегмент {} (pid {}), порты: {}'.format(shard, worker.pid,
+                                                                         ', '.join(self.shards[shard])))
+
+    def sigterm_handler(self, signum, frame):
+        """
+        Корректно останавливает программу при получении сигнала SIGTERM, SIGINT
+
+        :param signum: signal number (не используется)
+        :param frame:  current stack frame (не используется)
+        """
+        self.logger.info('Остановка программы')
+        self.isRunning = False
+
+    def run(self):
+        """
+        Запускает процессы сегментов и маршрутизатор команд
+
+        Контролирует работу сегментов: завершившийся сегмент запускается снова. При остановке программы
+        сегментам отправляется сигнал SIGTERM
+        """
+        self.logger.info('Программа запущена, сегментов: {}'.format(len(self.shards)))
+
+        self.isRunning = True
+        for shard in range(len(self.shards)):
+            self.start_worker(shard)
+
+        self.router = ShardRouter(redis.StrictRedis(decode_responses=True), self.unit_shards)
+        self.router.isRunning = True
+        router = threading.Thread(target=self.router.router_target)
+        router.start()
+
+        try:
+            while self.isRunning:
+                for shard, worker in self.workers.items():
+                    if not worker.is_alive():
+                        self.logger.error('Сегмент {} завершился с кодом {}'.format(shard, worker.exitcode))
+                        self.start_worker(shard)
+                if not router.is_alive():
+                    router = threading.Thread(target=self.router.router_target)
+                    router.start()
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.isRunning = False
+        finally:
+            self.router.isRunning = False
+            for worker in self.workers.values():
+                worker.terminate()
+            for worker in self.workers.values():
+                worker.join(timeout=10)
+            router.join()
+            sys.exit(0)
@@ -0,0 +1,263 @@
+"""
+Запись и воспроизведение обмена по последовательным портам
+
+Формат файла записи: сигнатура :data:`CAPTURE_MAGIC`, за которой следуют записи::
+
+    <длина данных: uint32><время: float64><направление: uint8><длина имени порта: uint8><имя порта><данные>
+
+Все числа записываются в порядке little-endian, время - показания :func:`time.monotonic`.
+Файл только дополняется, поэтому его можно читать через mmap во время записи; незавершенная
+последняя запись при чтении пропускается.
+
+Запуск::
+
+    python -m axiomLowLevelCommunication.trafficCapture dump <файл>
+    python -m axiomLowLevelCommunication.trafficCapture replay <файл> [--speed 1.0]
+
+Запись воспроизводится в отдельный трансивер
+(:class:`~axiomLowLevelCommunication.replayTransceiver.ReplayTransceiver`), который не открывает
+последовательные порты, не отправляет команды модулям и не пишет в каналы и БД работающей системы
+"""
+import argparse
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+from axiomLowLevelCommunication.frameBuffer import FrameBuffer
+
+CAPTURE_MAGIC = b'AXCAP\x01'
+
+# Заголовок записи: длина данных, время, направление, длина имени порта
+RECORD_HEADER = struct.Struct('<IdBB')
+
+# Направления передачи
+DIRECTION_IN = 0
+DIRECTION_OUT = 1
+
+CaptureRecord = namedtuple('CaptureRecord', ['timestamp', 'port', 'direction', 'data'])
+
+
+class CaptureWriter:
+    """
+    Записывает данные, переданные через последовательные порты, в файл записи обмена
+
+    Один объект может использоваться несколькими трансиверами из разных потоков. Записи попадают
+    в файл при заполнении буфера файла и при вызове :meth:`flush`, который трансивер выполняет
+    периодически (:data:`~axiomLowLevelCommunication.config.CAPTURE_FLUSH_INTERVAL`)
+    """
+
+    def __init__(self, path):
+        """
+        Инициализирует экземпляр класса
+
+        :type path: str
+        :param path: путь к файлу записи; если файл существует, записи добавляются в конец
+
+        :ivar records: количество сделанных записей
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(CAPTURE_MAGIC)
+            self.file.flush()
+        self.port_names = {}
+        self.records = 0
+
+    def write(self, port, direction, data):
+        """
+        Добавляет запись
+
+        :type port: str
+        :param port: имя файла последовательного порта в ОС
+        :type direction: int
+        :param direction: :data:`DIRECTION_IN` - принятые данные, :data:`DIRECTION_OUT` - переданные
+        :type data: bytes or memoryview
+        :param data: данные в том виде, в котором они прошли через порт
+        """
+        port_name = self.port_names.get(port)
+        if port_name is None:
+            port_name = self.port_names[port] = port.encode()[:255]
+        header = RECORD_HEADER.pack(len(data), time.monotonic(), direction, len(port_name))
+        with self.lock:
+            self.file.write(header)
+            self.file.write(port_name)
+            self.file.write(data)
+            self.records += 1
+
+    def flush(self):
+        """
+        Сбрасывает буферизованные записи в файл
+        """
+        with self.lock:
+            self.file.flush()
+
+    def close(self):
+        """
+        Закрывает файл записи
+        """
+        with self.lock:
+            self.file.close()
+
+
+class CaptureReader:
+    """
+    Читает файл записи обмена через mmap
+
+    Данные записей выдаются срезами memoryview отображенного файла, без копирования
+    """
+
+    def __init__(self, path):
+        """
+        Инициализирует экземпляр класса
+
+        :type path: str
+        :param path: путь к файлу записи
+        :raises ValueError: если файл не является файлом записи обмена
+        """
+        self.path = path
+        with open(path, 'rb') as capture_file:
+            size = os.fstat(capture_file.fileno()).st_size
+            if size < len(CAPTURE_MAGIC):
+                raise ValueError('Файл {} не является файлом записи обмена'.format(path))
+            self.mmap = mmap.mmap(capture_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mmap[:len(CAPTURE_MAGIC)] != CAPTURE_MAGIC:
+            self.mmap.close()
+            raise ValueError('Файл {} не является файлом записи обмена'.format(path))
+        self.view = memoryview(self.mmap)
+
+    def __iter__(self):
+        """
+        :rtype: generator
+        :return: записи :class:`CaptureRecord` в порядке записи
+        """
+        view = self.view
+        size = len(view)
+        position = len(CAPTURE_MAGIC)
+        port_names = {}
+        while position + RECORD_HEADER.size <= size:
+            length, timestamp, direction, port_length = RECORD_HEADER.unpack_from(view, position)
+            position += RECORD_HEADER.size
+            end = position + port_length + length
+            if end > size:
+                break
+            raw_port = bytes(view[position:position + port_length])
+            port = port_names.get(raw_port)
+            if port is None:
+                port = port_names[raw_port] = raw_port.decode()
+            position += port_length
+            yield CaptureRecord(timestamp, port, direction, view[position:end])
+            position = end
+
+    def close(self):
+        """
+        Освобождает отображение файла
+        """
+        self.view.release()
+        self.mmap.close()
+
+
+class CaptureReplay:
+    """
+    Воспроизводит принятые данные из файла записи обмена в
+    :class:`~axiomLowLevelCommunication.highLowTransceiver.HighLowTransceiver`
+
+    Принятые данные каждого порта разбиваются на посылки так же, как при чтении из порта
+    (:class:`~axiomLowLevelCommunication.frameBuffer.FrameBuffer`), и передаются распределителю
+    посылок порта. Переданные в порт команды не воспроизводятся
+    """
+
+    def __init__(self, hlt, reader, ports=None):
+        """
+        Инициализирует экземпляр класса
+
+        :type hlt: :class:`~axiomLowLevelCommunication.highLowTransceiver.HighLowTransceiver`
+        :param hlt: трансивер, в который воспроизводится обмен
+        :type reader: :class:`CaptureReader`
+        :param reader: файл записи обмена
+        :type ports: dict
+        :param ports: соответствие имен портов в записи именам портов трансивера; если порт записи
+         отсутствует в соответствии и в настройках трансивера, его данные пропускаются
+
+        :ivar frames: количество воспроизведенных посылок
+        :ivar skipped: количество пропущенных записей
+        """
+        self.hlt = hlt
+        self.reader = reader
+        self.ports = ports or {}
+        self.frame_buffers = {}
+        self.frames = 0
+        self.skipped = 0
+
+    def run(self, speed=1.0):
+        """
+        Воспроизводит запись
+
+        :type speed: float
+        :param speed: скорость воспроизведения относительно реального времени;
+         0 - с максимальной скоростью
+        :rtype: float
+        :return: длительность воспроизведения [с]
+        """
+        start_time = time.monotonic()
+        first_timestamp = None
+        for record in self.reader:
+            if record.direction != DIRECTION_IN:
+                continue
+            port = self.ports.get(record.port, record.port)
+            demultiplexer = self.hlt.port_demultiplexers.get(port)
+            if demultiplexer is None:
+                self.skipped += 1
+                continue
+
+            if speed:
+                if first_timestamp is None:
+                    first_timestamp = record.timestamp
+                delay = (record.timestamp - first_timestamp) / speed - (time.monotonic() - start_time)
+                if delay > 0:
+                    time.sleep(delay)
+
+            frame_buffer = self.frame_buffers.get(port)
+            if frame_buffer is None:
+                frame_buffer = self.frame_buffers[port] = FrameBuffer()
+            frame_buffer.feed(record.data)
+            for frame in frame_buffer.frames():
+                self.frames += 1
+                demultiplexer.dispatch(frame)
+        return time.monotonic() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Просмотр и воспроизведение записи обмена')
+    subparsers = parser.add_subparsers(dest='command')
+    dump_parser = subparsers.add_parser('dump', help='вывести записи')
+    dump_parser.add_argument('path')
+    replay_parser = subparsers.add_parser('replay', help='воспроизвести запись')
+    replay_parser.add_argument('path')
+    replay_parser.add_argument('--speed', type=float, default=1.0, help='скорость воспроизведения (0 - максимальная)')
+    args = parser.parse_args()
+
+    reader = CaptureReader(args.path)
+    if args.command == 'dump':
+        for record in reader:
+            print('{:.6f} {} {} {}'.format(record.timestamp, record.port,
+                                           '<' if record.direction == DIRECTION_IN else '>', bytes(record.data)))
+    elif args.command == 'replay':
+        from axiomLowLevelCommunication.replayTransceiver import ReplayTransceiver
+        hlt = ReplayTransceiver()
+        replay = CaptureReplay(hlt, reader)
+        elapsed = replay.run(speed=args.speed)
+        hlt.redis_writer.flush(timeout=1)
+        print('Воспроизведено {} посылок за {:.3f} с ({:.0f} посылок/с), пропущено записей: {}'.format(
+            replay.frames, elapsed, replay.frames / elapsed if elapsed else 0, replay.skipped))
+        print('Запросов инициализации: {}, неотправленных команд: {}'.format(
+            sum(hlt.init_requests.values()), len(hlt.suppressed_commands)))
+    else:
+        parser.print_help()
+    reader.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""
+Структура состояния аппаратных модулей
+
+Состояние модуля хранится в записях (:class:`StateRecord`) - по одной на каждый тип посылки.
+Поля записей хранят значения в числовом виде (коды состояний и сигналов каналов - в виде строк
+кодов, как в таблицах :data:`~axiomLowLevelCommunication.config.POWER_UNIT_STATES_TABLE`
+и :data:`~axiomLowLevelCommunication.config.POWER_UNIT_SIGNALS_TABLE` и в сообщениях Redis).
+Для каждого поля хранится время последнего обновления, для записи - номер версии.
+
+Запись обновляется на месте потоком приема посылок. Читающие потоки получают согласованный снимок
+записи (:meth:`StateRecord.snapshot`) без блокировки: если запись изменилась во время копирования,
+копирование повторяется. Потоки, ожидающие определенного состояния, ожидают обновления записи
+(:meth:`StateRecord.wait_for`) и проверяют условие при каждом обновлении
+"""
+import threading
+import time
+from collections import namedtuple
+
+# Снимок записи состояния: номер версии, значения и время обновления полей
+StateSnapshot = namedtuple('StateSnapshot', 'version values timestamps')
+
+
+class StateRecord:
+    """
+    Запись состояния модуля по посылкам одного типа
+
+    Поля записи перечислены в :attr:`FIELDS`, функции преобразования значений из посылки -
+    в :attr:`CONVERTERS`. Поля доступны как атрибуты и по имени (``record['state1']``).
+    До получения первой посылки значения полей - None
+
+    Номер версии :attr:`sequence` увеличивается на 1 в начале и в конце каждого обновления:
+    нечетное значение означает, что запись обновляется
+    """
+
+    __slots__ = ('condition', 'sequence', 'timestamps')
+
+    FIELDS = ()
+    CONVERTERS = ()
+
+    def __init__(self):
+        """
+        Инициализирует экземпляр класса
+
+        :ivar sequence: номер версии записи
+        :ivar timestamps: время последнего обновления каждого поля (по часам :func:`time.time`, None - не обновлялось)
+        """
+        self.condition = threading.Condition()
+        self.sequence = 0
+        self.timestamps = [None] * len(self.FIELDS)
+        for name in self.FIELDS:
+            setattr(self, name, None)
+
+    @property
+    def version(self):
+        """
+        :rtype: int
+        :return: количество выполненных обновлений записи
+        """
+        return self.sequence // 2
+
+    def __getitem__(self, name):
+        if name not in self.FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __setitem__(self, name, value):
+        self.update(**{name: value})
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def get(self, name, default=None):
+        return getattr(self, name) if name in self.FIELDS else default
+
+    def update(self, **values):
+        """
+        Устанавливает значения полей записи
+
+        :param values: значения полей по именам (без преобразования)
+        """
+        now = time.time()
+        with self.condition:
+            self.sequence += 1
+            for name, value in values.items():
+                setattr(self, name, value)
+                self.timestamps[self.FIELDS.index(name)] = now
+            self.sequence += 1
+            self.condition.notify_all()
+
+    def update_from_parcel(self, parcel):
+        """
+        Обновляет все поля записи значениями из посылки
+
+        :type parcel: :class:`~axiomLowLevelCommunication.parcelParser.ParcelRecord`
+        :param parcel: разобранная посылка того же типа
+        """
+        values = [convert(getattr(parcel, name)) for name, convert in zip(self.FIELDS, self.CONVERTERS)]
+        now = time.time()
+        with self.condition:
+            self.sequence += 1
+            for name, value in zip(self.FIELDS, values):
+                setattr(self, name, value)
+            self.timestamps[:] = [now] * len(self.FIELDS)
+            self.sequence += 1
+            self.condition.notify_all()
+
+    def wait_for(self, predicate, timeout=None):
+        """
+        Ожидает, пока запись не будет удовлетворять условию
+
+        Условие проверяется сразу и после каждого обновления записи
+
+        :type predicate: callable
+        :param predicate: условие, принимает запись
+        :type timeout: float
+        :param timeout: максимальное время ожидания [с] (None - без ограничения)
+        :rtype: bool
+        :return: True - условие выполнено, False - истек таймаут
+        """
+        with self.condition:
+            return bool(self.condition.wait_for(lambda: predicate(self), timeout))
+
+    def snapshot(self):
+        """
+        Возвращает согласованный снимок записи
+
+        :rtype: :class:`StateSnapshot`
+        :return: номер версии, значения полей по именам и время обновления полей по именам
+        """
+        while True:
+            sequence = self.sequence
+            if sequence % 2 == 0:
+                values = {name: getattr(self, name) for name in self.FIELDS}
+                timestamps = dict(zip(self.FIELDS, self.timestamps))
+                if self.sequence == sequence:
+                    return StateSnapshot(sequence // 2, values, timestamps)
+            time.sleep(0)
+
+
+class PowerState(StateRecord):
+    """
+    Состояние каналов силового модуля (посылка "st")
+    """
+    __slots__ = ('state1', 'state2', 'signal1', 'signal2', 'cnt')
+    FIELDS = __slots__
+    CONVERTERS = (str, str, str, str, int)
+
+
+class AdcState(StateRecord):
+    """
+    Токи каналов силового модуля [А] (посылка "adc")
+    """
+    __slots__ = ('sample1', 'sample2', 'cnt')
+    FIELDS = __slots__
+    CONVERTERS = (float, float, int)
+
+
+class LoadState(StateRecord):
+    """
+    Нагрузка и фазовый сдвиг в каналах силового модуля (посылка "ld")
+    """
+    __slots__ = ('load1', 'load2', 'angle1', 'angle2', 'cnt')
+    FIELDS = __slots__
+    CONVERTERS = (int, int, int, int, int)
+
+
+class TemperatureState(StateRecord):
+    """
+    Температура каналов силового модуля (посылка "tmpr")
+    """
+    __slots__ = ('temp1', 'temp2', 'cnt')
+    FIELDS = __slots__
+    CONVERTERS = (int, int, int)
+
+
+class InsulationState(StateRecord):
+    """
+    Измеренное сопротивление изоляции каналов силового модуля (ответ "rply" на команду "resist start")
+    """
+    __slots__ = ('isol1', 'isol2')
+    FIELDS = __slots__
+    CONVERTERS = (float, float)
+
+
+class InputState(StateRecord):
+    """
+    Состояние модуля ввода (посылка "st")
+    """
+    __slots__ = ('state', 'signal', 'cnt')
+    FIELDS = __slots__
+    CONVERTERS = (str, str, int)
+
+
+class VoltageState(StateRecord):
+    """
+    Напряжение [В] и частота [Гц] электросети на модуле ввода (посылка "volt")
+    """
+    __slots__ = ('Vin', 'freq', 'cnt')
+    FIELDS = __slots__
+    CONVERTERS = (float, int, int)
+
+
+class CurrentState(StateRecord):
+    """
+    Токи модуля ввода [А] (посылка "cur")
+    """
+    __slots__ = ('Iin', 'Iout', 'Iypr', 'cnt')
+    FIELDS = __slots__
+    CONVERTERS = (float, float, float, int)
+
+
+# Записи состояния силовых модулей по типам посылок
+POWER_UNIT_STATE_RECORDS = {
+    'st': PowerState,
+    'adc': AdcState,
+    'ld': LoadState,
+    'tmpr': TemperatureState,
+    'isol': InsulationState,
+}
+
+# Записи состояния модулей ввода по типам посылок
+INPUT_UNIT_STATE_RECORDS = {
+    'st': InputState,
+    'volt': VoltageState,
+    'cur': CurrentState,
+}
+
+
+class UnitState:
+    """
+    Состояние аппаратного модуля: записи :class:`StateRecord` по типам посылок
+    (``unit_state['st']``) и признак наличия связи с модулем :attr:`link`
+    """
+
+    def __init__(self, unit_addr, record_classes):
+        """
+        Инициализирует экземпляр класса
+
+        :type unit_addr: str
+        :param unit_addr: адрес модуля
+        :type record_classes: dict
+        :param record_classes: классы записей по типам посылок
+         (:data:`POWER_UNIT_STATE_RECORDS` или :data:`INPUT_UNIT_STATE_RECORDS`)
+
+        :ivar link: True - посылки от модуля поступают с интервалом не более ``LINK_TIMEOUT`` секунд,
+         False - посылок от модуля еще не было или их нет дольше ``LINK_TIMEOUT`` секунд
+         (сбрасывается при потере связи, см. :class:`~axiomLowLevelCommunication.linkWatchdog.LinkWatchdog`)
+        """
+        self.addr = unit_addr
+        self.link = False
+        self.records = {parcel_type: record_class() for parcel_type, record_class in record_classes.items()}
+
+    def __getitem__(self, parcel_type):
+        return self.records[parcel_type]
+
+    def update_from_parcel(self, parcel):
+        """
+        Обновляет запись состояния, соответствующую типу посылки
+
+        :type parcel: :class:`~axiomLowLevelCommunication.parcelParser.ParcelRecord`
+        :param parcel: разобранная посылка
+        """
+        self.records[parcel.type].update_from_parcel(parcel)
+
+    def snapshot(self):
+        """
+        Возвращает снимки всех записей состояния модуля
+
+        :rtype: dict
+        :return: :class:`StateSnapshot` по типам посылок
+        """
+        return {parcel_type: record.snapshot() for parcel_type, record in self.records.items()}
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import pty
+import tty
+from unittest import TestCase
+from axiomLowLevelCommunication.asyncSerialTransceiver import AsyncSerialTransceiver
+
+
+class TestAsyncSerialTransceiver(TestCase):
+
+    def setUp(self):
+        # Вместо последовательного порта используется псевдотерминал
+        self.master_fd, slave_fd = pty.openpty()
+        tty.setraw(self.master_fd)
+        tty.setraw(slave_fd)
+        self.slave_fd = slave_fd
+        self.loop = asyncio.new_event_loop()
+        self.transceiver = AsyncSerialTransceiver(port=os.ttyname(slave_fd))
+        self.transceiver.attach(self.loop)
+
+    def tearDown(self):
+        self.transceiver.detach()
+        self.transceiver.close()
+        self.loop.close()
+        os.close(self.master_fd)
+        os.close(self.slave_fd)
+
+    def test_read_frame_returns_frames_without_terminator(self):
+        """
+        Тест проверяет, что AsyncSerialTransceiver.read_frame возвращает
+        посылки в порядке поступления без терминальной последовательности
+        """
+        os.write(self.master_fd, b'st 5 4 12 13 7m1\r\nadc 0.5 0.0 7m1\r\n')
+
+        async def read_two():
+            return [await self.transceiver.read_frame(), await self.transceiver.read_frame()]
+
+        frames = self.loop.run_until_complete(asyncio.wait_for(read_two(), 1))
+        self.assertEqual(frames, [b'st 5 4 12 13 7m1', b'adc 0.5 0.0 7m1'])
+
+    def test_write_frame_writes_command_with_newline(self):
+        """
+        Тест проверяет, что AsyncSerialTransceiver.write_frame записывает
+        команду с символом конца строки и возвращает True
+        """
+        result = self.loop.run_until_complete(self.transceiver.write_frame('ch 1 on m1'))
+        self.assertTrue(result)
+        self.assertEqual(os.read(self.master_fd, 100), b'ch 1 on m1\n')
+        self.assertEqual(self.transceiver.write_latency.count, 1)
+
+    def test_paced_write_schedules_bytes_from_frame_start(self):
+        """
+        Тест проверяет, что при заданной паузе между байтами
+        AsyncSerialTransceiver.write_frame записывает команду побайтно,
+        отсчитывая время отправки каждого байта от начала посылки
+        """
+        self.transceiver.detach()
+        self.transceiver.close()
+        self.transceiver = AsyncSerialTransceiver(port=os.ttyname(self.slave_fd), baudrate=9600, inter_byte_gap=1)
+        self.transceiver.attach(self.loop)
+        deadlines = []
+        call_at = self.loop.call_at
+
+        def record_call_at(when, *args):
+            deadlines.append(when)
+            return call_at(when, *args)
+
+        self.loop.call_at = record_call_at
+        start_time = self.loop.time()
+        result = self.loop.run_until_complete(self.transceiver.write_frame('rst m1'))
+        duration = self.loop.time() - start_time
+        self.assertTrue(result)
+        self.assertEqual(os.read(self.master_fd, 100), b'rst m1\n')
+        byte_period = self.transceiver.pacer.byte_period
+        self.assertEqual(len(deadlines), len('rst m1\n') - 1)
+        for i, deadline in enumerate(deadlines, start=1):
+            self.assertAlmostEqual(deadline - deadlines[0], (i - 1) * byte_period, places=9)
+        self.assertGreaterEqual(duration, (len('rst m1\n') - 1) * byte_period)
+
+    def test_oldest_frame_is_dropped_when_queue_is_full(self):
+        """
+        Тест проверяет, что при переполнении очереди принятых посылок
+        отбрасывается самая старая посылка
+        """
+        self.transceiver.frames = asyncio.Queue(maxsize=1)
+        self.transceiver.frame_buffer.feed(b'first\r\n')
+        os.write(self.master_fd, b'second\r\n')
+        self.loop.run_until_complete(asyncio.sleep(0.1))
+        self.assertEqual(self.transceiver.dropped_frames, 1)
+        self.assertEqual(self.transceiver.frames.get_nowait(), b'second')
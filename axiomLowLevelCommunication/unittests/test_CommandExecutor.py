@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from unittest import TestCase
+from axiomLowLevelCommunication.commandExecutor import CommandExecutor
+
+
+class TestCommandExecutor(TestCase):
+
+    def test_shared_logger(self):
+        """
+        Тест проверяет, что исполнители пишут в общий лог и не добавляют обработчики лога при создании
+        """
+        handlers_count = len(logging.getLogger('axiomLowLevelCommunication.commandExecutor').handlers)
+
+        self.assertIs(CommandExecutor().logger, CommandExecutor(max_workers=2).logger)
+        self.assertEqual(len(logging.getLogger('axiomLowLevelCommunication.commandExecutor').handlers),
+                         handlers_count)
+
+    def test_channel_order(self):
+        """
+        Тест проверяет, что команды одного канала выполняются по одной в порядке поступления
+        """
+        executor = CommandExecutor(max_workers=4)
+        done = threading.Event()
+        executed = []
+        active = []
+
+        def command(i):
+            active.append(i)
+            self.assertEqual(len(active), 1)
+            time.sleep(0.001)
+            executed.append(i)
+            active.remove(i)
+            if i == 19:
+                done.set()
+
+        for i in range(20):
+            self.assertTrue(executor.submit('ch:m2:1', 'state', command, i))
+        self.assertTrue(done.wait(2))
+        self.assertEqual(executed, list(range(20)))
+
+    def test_channels_in_parallel(self):
+        """
+        Тест проверяет, что команды разных каналов выполняются параллельно, но не более чем в max_workers потоков
+        """
+        executor = CommandExecutor(max_workers=3)
+        barrier = threading.Barrier(3, timeout=2)
+        release = threading.Event()
+        finished = []
+
+        def command(channel_addr):
+            if channel_addr != 'ch:m3:2':
+                barrier.wait()
+            release.wait(2)
+            finished.append(channel_addr)
+
+        for channel_addr in ('ch:m2:1', 'ch:m2:2', 'ch:m3:1', 'ch:m3:2'):
+            executor.submit(channel_addr, 'state', command, channel_addr)
+        time.sleep(0.1)
+        self.assertFalse(barrier.broken)
+        self.assertEqual(len(executor.workers), 3)
+        self.assertEqual(finished, [])
+        release.set()
+        time.sleep(0.1)
+        self.assertEqual(sorted(finished), ['ch:m2:1', 'ch:m2:2', 'ch:m3:1', 'ch:m3:2'])
+
+    def test_replace_pending(self):
+        """
+        Тест проверяет, что команда с replace=True замещает ожидающую выполнения команду того же канала,
+        но не выполняемую команду
+        """
+        executor = CommandExecutor(max_workers=2)
+        started = threading.Event()
+        release = threading.Event()
+        done = threading.Event()
+        executed = []
+
+        def command(i):
+            executed.append(i)
+            if i == 0:
+                started.set()
+                release.wait(2)
+            else:
+                done.set()
+
+        executor.submit('ch:m2:1', 'state', command, 0, replace=True)
+        self.assertTrue(started.wait(2))
+        for i in (1, 2, 3):
+            self.assertTrue(executor.submit('ch:m2:1', 'state', command, i, replace=True))
+        release.set()
+
+        self.assertTrue(done.wait(2))
+        time.sleep(0.05)
+        self.assertEqual(executed, [0, 3])
+        stats = executor.stats()['state']
+        self.assertEqual((stats['submitted'], stats['superseded'], stats['completed']), (4, 2, 2))
+
+    def test_reject_when_full(self):
+        """
+        Тест проверяет, что при переполнении очереди команда отклоняется и учитывается в статистике своего типа
+        """
+        executor = CommandExecutor(max_workers=1, max_pending=2)
+        release = threading.Event()
+        executor.submit('ch:m2:1', 'insulation', release.wait, 2)
+        time.sleep(0.05)
+        self.assertTrue(executor.submit('ch:m2:2', 'state', lambda: True))
+        self.assertTrue(executor.submit('ch:m2:2', 'state', lambda: True))
+        self.assertFalse(executor.submit('ch:m2:1', 'state', lambda: True))
+        release.set()
+        time.sleep(0.1)
+
+        stats = executor.stats()
+        self.assertEqual(stats['state']['submitted'], 2)
+        self.assertEqual(stats['state']['rejected'], 1)
+        self.assertEqual(stats['state']['completed'], 2)
+        self.assertEqual(stats['insulation']['latency']['count'], 1)
+
+    def test_failed_commands(self):
+        """
+        Тест проверяет, что команды, обработчик которых вернул False или вызвал исключение, учитываются как неуспешные,
+        а исключение не останавливает выполнение следующих команд канала
+        """
+        executor = CommandExecutor(max_workers=1)
+        done = threading.Event()
+
+        def fail():
+            raise ValueError('ошибка')
+
+        executor.submit('ch:m2:1', 'state', fail)
+        executor.submit('ch:m2:1', 'state', lambda: False)
+        executor.submit('ch:m2:1', 'state', done.set)
+        self.assertTrue(done.wait(2))
+        time.sleep(0.05)
+
+        stats = executor.stats()['state']
+        self.assertEqual((stats['failed'], stats['completed']), (2, 1))
+
+    def test_shutdown(self):
+        """
+        Тест проверяет, что после остановки исполнителя выполняемая команда завершается, потоки выполнения
+        останавливаются, а новые команды отклоняются
+        """
+        executor = CommandExecutor(max_workers=2)
+        started = threading.Event()
+        done = threading.Event()
+
+        def command():
+            started.set()
+            time.sleep(0.05)
+            done.set()
+
+        executor.submit('ch:m2:1', 'state', command)
+        executor.submit('ch:m2:2', 'state', lambda: None)
+        self.assertTrue(started.wait(2))
+
+        executor.shutdown(timeout=2)
+
+        self.assertTrue(done.is_set())
+        self.assertFalse(any(worker.is_alive() for worker in executor.workers))
+        self.assertFalse(executor.submit('ch:m2:1', 'state', command))
+        self.assertEqual(executor.stats()['state']['rejected'], 1)
@@ -0,0 +1,175 @@
+import logging
+import threading
+from unittest import TestCase
+from unittest.mock import MagicMock
+from axiomLowLevelCommunication.commandScheduler import CommandQueue, CommandScheduler, classify_command, \
+    PRIORITY_SAFETY, PRIORITY_STATE, PRIORITY_LED
+
+
+class TestCommandQueue(TestCase):
+
+    def setUp(self):
+        self.queue = CommandQueue('/dev/ttyS0', max_depth=3)
+
+    def test_shared_logger(self):
+        """
+        Тест проверяет, что очереди разных портов пишут в общий лог и не добавляют обработчики лога при создании
+        """
+        handlers_count = len(logging.getLogger('axiomLowLevelCommunication.commandScheduler').handlers)
+        queue = CommandQueue('/dev/ttyS1')
+
+        self.assertIs(queue.logger, self.queue.logger)
+        self.assertEqual(len(logging.getLogger('axiomLowLevelCommunication.commandScheduler').handlers),
+                         handlers_count)
+
+    def drain(self):
+        commands = []
+        while True:
+            command = self.queue.pop()
+            if command is None:
+                return commands
+            self.queue.complete(command, True)
+            commands.append(command.data)
+
+    def test_classify(self):
+        """
+        Тест проверяет приоритеты команд: отключение канала и сброс - наивысший, светодиоды - наименьший
+        """
+        self.assertEqual(classify_command('ch 1 off m2'), (PRIORITY_SAFETY, ('ch', 'm2', '1')))
+        self.assertEqual(classify_command('ch 1 on m2'), (PRIORITY_STATE, ('ch', 'm2', '1')))
+        self.assertEqual(classify_command('led inst 1 on m2'), (PRIORITY_LED, ('led', 'm2', '1')))
+        self.assertEqual(classify_command('rst m2')[0], PRIORITY_SAFETY)
+        self.assertEqual(classify_command('run start m2')[0], PRIORITY_STATE)
+
+    def test_priority_order(self):
+        """
+        Тест проверяет, что команды выдаются в порядке приоритета, а при равном приоритете - в порядке поступления
+        """
+        self.queue.push('led inst 1 on m2')
+        self.queue.push('ch 1 on m2')
+        self.queue.push('ch 2 off m2')
+
+        self.assertEqual(self.drain(), ['ch 2 off m2', 'ch 1 on m2', 'led inst 1 on m2'])
+
+    def test_coalescing(self):
+        """
+        Тест проверяет, что новая команда для того же канала замещает ожидающую отправки команду,
+        а замещающая команда получает наивысший из двух приоритетов
+        """
+        first = self.queue.push('ch 1 off m2')
+        self.queue.push('led inst 1 on m2')
+        self.queue.push('led inst 1 off m2')
+        last = self.queue.push('ch 1 on m2')
+
+        self.assertEqual(first.status, 'superseded')
+        self.assertFalse(first.wait(0))
+        self.assertEqual(self.drain(), ['ch 1 on m2', 'led inst 1 off m2'])
+        self.assertTrue(last.wait(0))
+        self.assertEqual(self.queue.stats()['superseded'], 2)
+
+    def test_superseded_result(self):
+        """
+        Тест проверяет, что результатом замещенной команды считается результат замещающей команды
+        """
+        first = self.queue.push('ch 1 on m2')
+        second = self.queue.push('ch 1 off m2')
+        results = []
+        first.add_result_callback(results.append)
+
+        self.assertEqual(first.replaced_by, second)
+        self.assertEqual(results, [])
+        self.assertEqual(self.drain(), ['ch 1 off m2'])
+        self.assertTrue(first.wait(0))
+        self.assertEqual(results, [True])
+
+    def test_no_supersede(self):
+        """
+        Тест проверяет, что команда с supersede=False не замещает ожидающую отправки команду для того же канала
+        """
+        pending = self.queue.push('ch 1 off m2')
+        restore = self.queue.push('ch 1 on m2', supersede=False)
+
+        self.assertEqual(restore.status, 'superseded')
+        self.assertEqual(restore.replaced_by, pending)
+        self.assertEqual(pending.status, 'pending')
+        self.assertEqual(self.drain(), ['ch 1 off m2'])
+        self.assertTrue(pending.wait(0))
+
+    def test_bounded_depth(self):
+        """
+        Тест проверяет, что при переполнении очереди удаляется команда с наименьшим приоритетом,
+        а команда с приоритетом не выше ожидающих отклоняется
+        """
+        led = self.queue.push('led inst 1 on m2')
+        self.queue.push('ch 1 on m2')
+        self.queue.push('ch 2 on m2')
+        off = self.queue.push('ch 1 off m3')
+        rejected = self.queue.push('run start m3')
+
+        self.assertEqual(led.status, 'rejected')
+        self.assertEqual(off.status, 'pending')
+        self.assertEqual(rejected.status, 'rejected')
+        self.assertEqual(self.drain(), ['ch 1 off m3', 'ch 1 on m2', 'ch 2 on m2'])
+
+    def test_stats(self):
+        """
+        Тест проверяет метрики очереди: глубину, наибольшую глубину, счетчики и время ожидания
+        """
+        self.queue.push('ch 1 on m2')
+        self.queue.push('ch 2 on m2')
+        self.assertEqual(self.queue.stats()['depth'], 2)
+        self.queue.complete(self.queue.pop(), False)
+
+        stats = self.queue.stats()
+        self.assertEqual(stats['depth'], 1)
+        self.assertEqual(stats['max_depth'], 2)
+        self.assertEqual(stats['submitted'], 2)
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['wait']['count'], 1)
+
+
+class TestCommandScheduler(TestCase):
+
+    def test_submit(self):
+        """
+        Тест проверяет, что команды записываются в порт потоком отправки, а результат записи
+        возвращается ожидающему
+        """
+        transceiver = MagicMock(port='/dev/ttyS0')
+        transceiver.write.side_effect = [True, False]
+        scheduler = CommandScheduler(transceiver)
+
+        self.assertTrue(scheduler.submit('ch 1 on m2').wait(1))
+        self.assertFalse(scheduler.submit('ch 2 on m2').wait(1))
+        self.assertEqual([call[0][0] for call in transceiver.write.call_args_list], ['ch 1 on m2', 'ch 2 on m2'])
+
+    def test_close(self):
+        """
+        Тест проверяет, что закрытие отклоняет команды, ожидающие отправки, дожидается записи отправляемой
+        команды и останавливает поток отправки; новые команды отклоняются
+        """
+        writing = threading.Event()
+        release = threading.Event()
+
+        def write(data):
+            writing.set()
+            return release.wait(1)
+
+        transceiver = MagicMock(port='/dev/ttyS0')
+        transceiver.write.side_effect = write
+        scheduler = CommandScheduler(transceiver)
+        written = scheduler.submit('ch 1 on m2')
+        self.assertTrue(writing.wait(1))
+        pending = scheduler.submit('ch 2 on m2')
+
+        closer = threading.Thread(target=scheduler.close, kwargs={'timeout': 1})
+        closer.start()
+        self.assertFalse(pending.wait(1))
+        release.set()
+        closer.join(1)
+
+        self.assertTrue(written.wait(1))
+        self.assertEqual(pending.status, 'rejected')
+        self.assertFalse(scheduler.thread.is_alive())
+        self.assertFalse(scheduler.submit('ch 1 off m2').wait(1))
+        self.assertEqual(transceiver.write.call_count, 1)
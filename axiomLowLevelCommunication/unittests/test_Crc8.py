@@ -0,0 +1,41 @@
+from unittest import TestCase
+from axiomLowLevelCommunication.crc8 import crc8, append_crc, strip_crc
+
+
+class TestCrc8(TestCase):
+
+    def test_crc8(self):
+        """
+        Тест проверяет контрольную сумму CRC8 (полином 0x31, начальное значение 0xff) для байтов и memoryview
+        """
+        self.assertEqual(crc8(b'123456789'), 0xF7)
+        self.assertEqual(crc8(memoryview(b'123456789')), 0xF7)
+        self.assertEqual(crc8(b''), 0xFF)
+        self.assertEqual(crc8(bytes([33]), 0xff), crc8(b'!'))
+
+    def test_append_crc(self):
+        """
+        Тест проверяет, что контрольная сумма добавляется к посылке двумя шестнадцатеричными цифрами после "*"
+        """
+        self.assertEqual(append_crc(b'123456789'), b'123456789*F7')
+
+    def test_strip_crc(self):
+        """
+        Тест проверяет, что верная контрольная сумма отделяется от посылки, а неверная или отсутствующая
+        контрольная сумма обнаруживается
+        """
+        frame = append_crc(b'st 5 4 12 13 1119m2')
+        payload, ok = strip_crc(frame)
+        self.assertTrue(ok)
+        self.assertEqual(bytes(payload), b'st 5 4 12 13 1119m2')
+        self.assertTrue(strip_crc(memoryview(frame + b' '))[1])
+
+        # потерян байт посылки
+        self.assertFalse(strip_crc(frame[:3] + frame[4:])[1])
+        self.assertEqual(len(strip_crc(frame[:3] + frame[4:])[0]), len(frame) - 4)
+        # нет контрольной суммы
+        payload, ok = strip_crc(b'st 5 4 12 13 1119m2')
+        self.assertFalse(ok)
+        self.assertEqual(bytes(payload), b'st 5 4 12 13 1119m2')
+        self.assertFalse(strip_crc(b'st 5 4 12 13 1119m2*G1')[1])
+        self.assertFalse(strip_crc(b'*')[1])
@@ -0,0 +1,72 @@
+import os
+from unittest import TestCase
+from axiomLowLevelCommunication.frameBuffer import FrameBuffer
+
+
+class TestFrameBuffer(TestCase):
+
+    def setUp(self):
+        self.buffer = FrameBuffer(size=64, max_frame_length=16)
+        self.read_fd, self.write_fd = os.pipe()
+
+    def tearDown(self):
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+    def test_frames(self):
+        """
+        Тест проверяет, что полные посылки выдаются без терминальной последовательности,
+        а неполная посылка остается в буфере до приема ее окончания
+        """
+        self.buffer.feed(b'st 1 2m2\r\nadc 0 0')
+        self.assertEqual([bytes(frame) for frame in self.buffer.frames()], [b'st 1 2m2'])
+        self.assertEqual(len(self.buffer), len(b'adc 0 0'))
+
+        self.buffer.feed(b' 3m2\r\n\r\n')
+        self.assertEqual([bytes(frame) for frame in self.buffer.frames()], [b'adc 0 0 3m2'])
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_fill_without_copy(self):
+        """
+        Тест проверяет, что данные читаются из дескриптора в буфер, а посылки выдаются
+        как срезы memoryview этого буфера
+        """
+        os.write(self.write_fd, b'volt 220.1 50 17m3\r\n')
+        self.assertEqual(self.buffer.fill(self.read_fd), 20)
+
+        frames = list(self.buffer.frames())
+        self.assertEqual(len(frames), 1)
+        self.assertIsInstance(frames[0], memoryview)
+        self.assertIs(frames[0].obj, self.buffer.buffer)
+        self.assertEqual(bytes(frames[0]), b'volt 220.1 50 17m3')
+
+    def test_wrap_around(self):
+        """
+        Тест проверяет, что при достижении конца буфера неполная посылка переносится
+        в его начало и не теряется
+        """
+        received = []
+        for i in range(20):
+            self.buffer.feed('ld {}m2\r\nst '.format(i).encode())
+            received.extend(bytes(frame) for frame in self.buffer.frames())
+            self.buffer.feed('{}m2\r\n'.format(i).encode())
+            received.extend(bytes(frame) for frame in self.buffer.frames())
+
+        expected = []
+        for i in range(20):
+            expected.extend(['ld {}m2'.format(i).encode(), 'st {}m2'.format(i).encode()])
+        self.assertEqual(received, expected)
+        self.assertEqual(self.buffer.overflows, 0)
+
+    def test_overflow(self):
+        """
+        Тест проверяет, что данные без терминальной последовательности длиннее
+        max_frame_length отбрасываются, а следующая посылка принимается
+        """
+        self.buffer.feed(b'x' * 40)
+        self.assertEqual(list(self.buffer.frames()), [])
+        self.assertEqual(self.buffer.overflows, 1)
+        self.assertEqual(len(self.buffer), 0)
+
+        self.buffer.feed(b'st 1m2\r\n')
+        self.assertEqual([bytes(frame) for frame in self.buffer.frames()], [b'st 1m2'])
@@ -0,0 +1,103 @@
+import threading
+import time
+from unittest import TestCase
+from axiomLowLevelCommunication.halfDuplexScheduler import HalfDuplexScheduler
+
+
+class TestHalfDuplexScheduler(TestCase):
+
+    def setUp(self):
+        self.scheduler = HalfDuplexScheduler('/dev/ttyS0', baudrate=9600, frame_length=48)
+
+    def test_read_window(self):
+        """
+        Тест проверяет, что окно чтения равно времени передачи посылки ожидаемой длины
+        """
+        self.assertAlmostEqual(self.scheduler.frame_time, 0.05)
+        self.assertEqual(self.scheduler.read_window, self.scheduler.frame_time)
+
+    def test_write_waits_for_read_window(self):
+        """
+        Тест проверяет, что запись начинается после окончания текущего окна чтения,
+        а задержка записи сохраняется в статистике
+        """
+        self.scheduler.begin_read()
+        timer = threading.Timer(self.scheduler.read_window, self.scheduler.end_read)
+        timer.start()
+        self.assertTrue(self.scheduler.begin_write(timeout=1))
+        self.scheduler.end_write()
+        timer.join()
+
+        delay = self.scheduler.stats()['write_delay']
+        self.assertEqual(delay['count'], 1)
+        self.assertGreaterEqual(delay['max'], self.scheduler.read_window * 0.9)
+
+    def test_pending_write_blocks_next_read_window(self):
+        """
+        Тест проверяет, что при ожидающей записи новое окно чтения не начинается до окончания записи
+        """
+        self.scheduler.begin_read()
+        writer = threading.Thread(target=lambda: self.scheduler.begin_write() and self.scheduler.end_write())
+        writer.start()
+        time.sleep(0.05)
+        self.scheduler.end_read()
+
+        self.assertTrue(self.scheduler.begin_read(timeout=1))
+        writer.join()
+        self.assertEqual(self.scheduler.write_delay.count, 1)
+        self.scheduler.end_read()
+
+    def test_reader_gets_window_between_writes(self):
+        """
+        Тест проверяет, что если поток чтения ожидал во время записи, следующая запись
+        начинается только после его окна чтения
+        """
+        events = []
+
+        def reader():
+            self.scheduler.begin_read()
+            events.append('read')
+            self.scheduler.end_read()
+
+        self.scheduler.begin_write()
+        reader_thread = threading.Thread(target=reader)
+        reader_thread.start()
+        time.sleep(0.05)
+        self.scheduler.end_write()
+        self.assertTrue(self.scheduler.begin_write(timeout=1))
+        events.append('write')
+        self.scheduler.end_write()
+        reader_thread.join()
+
+        self.assertEqual(events, ['read', 'write'])
+
+    def test_write_timeout(self):
+        """
+        Тест проверяет, что если слот записи не получен до истечения таймаута,
+        возвращается False и увеличивается счетчик таймаутов
+        """
+        self.scheduler.begin_read()
+        self.assertFalse(self.scheduler.begin_write(timeout=0.05))
+        self.assertEqual(self.scheduler.stats()['write_timeouts'], 1)
+        self.scheduler.end_read()
+        self.assertTrue(self.scheduler.begin_write(timeout=0))
+
+    def test_write_waits_for_idle_line(self):
+        """
+        Тест проверяет, что после приема данных запись начинается только после того,
+        как линия простояла без приема время передачи посылки
+        """
+        self.scheduler.on_receive()
+        start_time = time.monotonic()
+        self.assertTrue(self.scheduler.begin_write(timeout=1))
+        self.scheduler.end_write()
+        self.assertGreaterEqual(time.monotonic() - start_time, self.scheduler.frame_time * 0.9)
+        self.assertEqual(self.scheduler.idle_delay(), 0)
+
+    def test_write_timeout_on_busy_line(self):
+        """
+        Тест проверяет, что если таймаут записи меньше времени до освобождения линии, возвращается False
+        """
+        self.scheduler.on_receive()
+        self.assertFalse(self.scheduler.begin_write(timeout=self.scheduler.frame_time / 5))
+        self.assertEqual(self.scheduler.stats()['write_timeouts'], 1)
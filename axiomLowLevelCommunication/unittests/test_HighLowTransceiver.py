@@ -1,3127 +1,1298 @@
-import math
-import os
-import sys
-import threading
-import time
-from unittest import TestCase, skip
-from unittest.mock import MagicMock, patch
-import serial
-from axiomLowLevelCommunication.serialTransceiver import SerialTransceiver
-import builtins
 import json
-from apscheduler.schedulers.background import BackgroundScheduler
+import threading
+from unittest import TestCase
+from unittest.mock import MagicMock, call, patch
+import redis
+from axiomLowLevelCommunication.highLowTransceiver import HighLowTransceiver
+from axiomLowLevelCommunication.config import INIT_WAIT_TIMEOUT, POWER_UNIT_STATES_TABLE
+
+
+# Модули, создающие лог при создании объектов трансивера
+LOGGER_MODULES = ('highLowTransceiver', 'serialTransceiver', 'selectorReader', 'portBringUp', 'initCoordinator',
+                  'redisWriter')
+
+
+def patch_loggers(test_case):
+    """
+    Заменяет объектами-заглушками логи, создаваемые трансивером, до конца теста test_case
+
+    Логи распределителей, очередей и исполнителей команд общие и создаются при импорте модулей
+
+    :type test_case: TestCase
+    """
+    for module in LOGGER_MODULES:
+        patcher = patch('axiomLowLevelCommunication.{}.create_logger'.format(module))
+        patcher.start()
+        test_case.addCleanup(patcher.stop)
 
 
 class HighLowTransceiverTestBase(TestCase):
+    """
+    Трансивер с настройками четырех силовых модулей и четырех модулей ввода: последовательные порты
+    не открываются, запись в порты и Redis заменены объектами-заглушками, лог - объектом-заглушкой
+    """
 
-    def setUp(self):
-        # Подменяем open, чтобы при попытке считать настройки тесты
-        # не пытались открывать несуществующие в тестовом окружении файлы
-        # builtins.open = MagicMock()
-
-        # словарь настроек, с которыми работают тесты
-        self.test_axiom_settings = {
-            'hardware units': {
-                'm5': ['m1'],
-                'm6': ['m2'],
-                'm7': ['m3'],
-                'm8': ['m4'],
-            },
-            'power units': {
-                'm1': '/dev/ttyS0',
-                'm2': '/dev/ttyS1',
-                'm3': '/dev/ttyS2',
-                'm4': '/dev/ttyS3',
-            },
-            'power units thresholds': {
-                'm1': [1, 2],
-                'm2': [3, 4],
-                'm3': [5, 6],
-                'm4': [7, 8],
-            },
-            'input units': {
-                'm5': '/dev/ttyS4',
-                'm6': '/dev/ttyS5',
-                'm7': '/dev/ttyS6',
-                'm8': '/dev/ttyS7',
-            }
+    # словарь настроек, с которыми работают тесты
+    settings = {
+        'hardware units': {
+            'm5': ['m1'],
+            'm6': ['m2'],
+            'm7': ['m3'],
+            'm8': ['m4'],
+        },
+        'power units': {
+            'm1': {'port': '/dev/ttyS0', 'max consumption current': [1, 2], 'max leak current': [0.01, 0.02]},
+            'm2': {'port': '/dev/ttyS1', 'max consumption current': [3, 4], 'max leak current': [0.01, 0.02]},
+            'm3': {'port': '/dev/ttyS2', 'max consumption current': [5, 6], 'max leak current': [0.01, 0.02]},
+            'm4': {'port': '/dev/ttyS3', 'max consumption current': [7, 8], 'max leak current': [0.01, 0.02]},
+        },
+        'input units': {
+            'm5': {'port': '/dev/ttyS4'},
+            'm6': {'port': '/dev/ttyS5'},
+            'm7': {'port': '/dev/ttyS6'},
+            'm8': {'port': '/dev/ttyS7'},
         }
-        json.load = MagicMock(return_value=self.test_axiom_settings)
+    }
+
+    def setUp(self):
+        patch_loggers(self)
+
+        with patch.object(HighLowTransceiver, 'bring_up_ports', return_value=set()):
+            self.hlt = HighLowTransceiver(self.settings, redis_client=MagicMock(spec=redis.StrictRedis))
+        self.addCleanup(self.hlt.close)
+        self.logger = self.hlt.logger
+        self.hlt.redis_writer = MagicMock()
 
-        from axiomLowLevelCommunication.highLowTransceiver import logger
-        logger.write_log = MagicMock()
-        self.logger = logger
+        # Команды, записанные в порт, исполняются силовым модулем
+        for transceiver in self.hlt.port_transceivers.values():
+            transceiver.write = MagicMock(side_effect=self.execute_command)
 
-        from axiomLowLevelCommunication.highLowTransceiver import redis
-        redis.StrictRedis = MagicMock(spec=redis.StrictRedis)
-        self.redis = redis
+        # Все каналы выключены
+        for unit_addr in self.hlt.power_unit_addrs:
+            self.set_state(unit_addr, state1='4', state2='4', signal1='1', signal2='1', cnt=1)
 
-        from axiomLowLevelCommunication.highLowTransceiver import HighLowTransceiver
-        self.HighLowTransceiver = HighLowTransceiver
-        self.HighLowTransceiver.load_settings = MagicMock(return_value=self.test_axiom_settings)
+    def set_state(self, unit_addr, **values):
+        self.hlt.power_units_state[unit_addr]['st'].update(**values)
+
+    def execute_command(self, data):
+        """
+        Эмулирует исполнение силовым модулем команды включения/выключения канала
+        """
+        words = data.split()
+        if words[0] == 'ch':
+            self.set_state(words[3], **{'state{}'.format(words[1]): '5' if words[2] == 'on' else '4'})
+        return True
+
+    def flush_commands(self, unit_addr):
+        """
+        Ожидает записи в порт команд модуля, поставленных в очередь без ожидания (команд светодиодов)
+        """
+        self.hlt.submit_command(unit_addr, 'led inst 0 off {}'.format(unit_addr)).wait(timeout=1)
+
+    def written(self, unit_addr):
+        """
+        :return: команды, записанные в порт модуля
+        """
+        return [args[0] for args, _ in self.hlt.unit_addrs_to_transceivers_map[unit_addr].write.call_args_list]
 
 
 class TestSettingsLoading(HighLowTransceiverTestBase):
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
+    @patch('json.load', MagicMock(return_value={'power units': {}}))
+    @patch('builtins.open')
     @patch('os.environ.get', MagicMock(return_value='/file/from/environ/var'))
-    def test_load_settings_function_read_environ_var_if_it_exists(self):
+    def test_load_settings_function_read_environ_var_if_it_exists(self, mock_open):
         """
         Тест проверяет, что если задана переменная окружения AXIOM_SETTINGS,
         функция HighLowTransceiver.load_settings загружает настройки из файла
         заданного в этой переменной
         """
-        self.HighLowTransceiver()
-        os.environ.get.assert_called_with('AXIOM_SETTINGS', default='/etc/axiom/settings_input_unit.json')
-        builtins.open.assert_called_with('/file/from/environ/var')
+        self.assertEqual(self.hlt.load_settings(), {'power units': {}})
+        mock_open.assert_called_once_with('/file/from/environ/var')
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_load_settings_function_open_default_file_if_envvar_does_not_exist(self):
+    @patch('json.load', MagicMock(return_value={'power units': {}}))
+    @patch('builtins.open')
+    def test_load_settings_function_open_default_file_if_envvar_does_not_exist(self, mock_open):
         """
         Тест проверяет, что если переменная окружения AXIOM_SETTINGS не задана,
         функция HighLowTransceiver.load_settings загружает настройки из файла
-        /etc/axiom/settings_input_unit.json
+        /etc/axiom/settings.json
         """
-        self.HighLowTransceiver()
-        builtins.open.assert_called_with('/etc/axiom/settings_input_unit.json')
+        with patch.dict('os.environ', clear=True):
+            self.hlt.load_settings()
+        mock_open.assert_called_once_with('/etc/axiom/settings.json')
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
+    @patch('json.load', MagicMock(return_value={'power units': {}}))
     @patch('os.environ.get', MagicMock(return_value='/file/from/environ/var'))
     def test_load_settings_function_open_default_file_if_file_set_in_envvar_can_not_be_opened(self):
         """
         Тест проверяет, что если файл заданный в переменной окружения AXIOM_SETTINGS,
         не удается открыть, функция HighLowTransceiver.load_settings загружает настройки
-        из файла /etc/axiom/settings_input_unit.json
+        из файла /etc/axiom/settings.json
         """
+        for error in (IOError, FileNotFoundError):
+            def open_side_effect(fname):
+                if fname == '/file/from/environ/var':
+                    raise error
+                return MagicMock()
 
-        # Нет прав на открытие файла
-        def open_side_effect(fname):
-            if fname == '/file/from/environ/var':
-                raise IOError
-
-        builtins.open = MagicMock(side_effect=open_side_effect)
-        threading.Thread(target=self.HighLowTransceiver).start()
-        time.sleep(0.01)
-        builtins.open.assert_called_with('/etc/axiom/settings_input_unit.json')
-
-        # Файл не найден
-        def open_side_effect(fname):
-            if fname == '/file/from/environ/var':
-                raise FileNotFoundError
-
-        builtins.open = MagicMock(side_effect=open_side_effect)
-        threading.Thread(target=self.HighLowTransceiver).start()
-        time.sleep(0.01)
-        builtins.open.assert_called_with('/etc/axiom/settings_input_unit.json')
+            with patch('builtins.open', MagicMock(side_effect=open_side_effect)) as mock_open:
+                self.assertEqual(self.hlt.load_settings(), {'power units': {}})
+            mock_open.assert_called_with('/etc/axiom/settings.json')
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
     @patch('os.environ.get', MagicMock(return_value='/file/from/environ/var'))
     def test_load_settings_function_log_error_if_file_can_not_be_opened(self):
         """
         Тест проверяет, что если файл с настройками не удается открыть,
         функция HighLowTransceiver.load_settings логирует ошибку
         """
+        for error in (IOError('some error'), FileNotFoundError('some error')):
+            self.logger.reset_mock()
+            with patch('builtins.open', MagicMock(side_effect=error)):
+                self.assertEqual(self.hlt.load_settings(), {})
 
-        # Нет прав на открытие файла
-        builtins.open.side_effect = IOError('some error')
-
-        threading.Thread(target=self.HighLowTransceiver).start()
-        time.sleep(0.01)
-
-        self.logger.write_log.assert_any_call(log_level='ERROR',
-                                              log_msg='Ошибка при попытке открыть файл настроек: some error')
-        self.logger.write_log.assert_any_call(log_level='ERROR',
-                                              log_msg='Ошибка при попытке открыть файл настроек по умолчанию: some '
-                                                      'error')
-
-        # Файл не найден
-        builtins.open.side_effect = FileNotFoundError('some error')
-
-        threading.Thread(target=self.HighLowTransceiver).start()
-        time.sleep(0.01)
+            self.logger.error.assert_has_calls([
+                call('Ошибка при попытке открыть файл настроек: some error'),
+                call('Ошибка при попытке открыть файл настроек по умолчанию: some error'),
+            ])
 
-        self.logger.write_log.assert_any_call(log_level='ERROR',
-                                              log_msg='Ошибка при попытке открыть файл настроек: some error')
-        self.logger.write_log.assert_any_call(log_level='ERROR',
-                                              log_msg='Ошибка при попытке открыть файл настроек по умолчанию: some '
-                                                      'error')
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
+    @patch('builtins.open', MagicMock())
     @patch('os.environ.get', MagicMock(return_value='/file/from/environ/var'))
     def test_load_settings_function_log_error_if_settings_can_not_be_loaded_from_file(self):
         """
-        Тест проверяет, что если не удается загрузить настройки из открытого файла,
+        Тест проверяет, что если настройки не удается загрузить из файла,
         функция HighLowTransceiver.load_settings логирует ошибку
         """
+        for error in (TypeError('some error'), ValueError('some error')):
+            self.logger.reset_mock()
+            with patch('json.load', MagicMock(side_effect=error)):
+                self.assertEqual(self.hlt.load_settings(), {})
 
-        json.load = MagicMock(side_effect=TypeError('some error'))
-
-        threading.Thread(target=self.HighLowTransceiver).start()
-        time.sleep(0.01)
-
-        self.logger.write_log.assert_any_call(log_level='ERROR',
-                                              log_msg='Ошибка при попытке загрузить настройки из файла настроек: some '
-                                                      'error')
-        self.logger.write_log.assert_any_call(log_level='ERROR',
-                                              log_msg="Ошибка при попытке загрузить настройки из файла настроек по "
-                                                      "умолчанию: some error")
-
-        json.load = MagicMock(side_effect=ValueError('some error'))
-
-        threading.Thread(target=self.HighLowTransceiver).start()
-        time.sleep(0.01)
-
-        self.logger.write_log.assert_any_call(log_level='ERROR',
-                                              log_msg='Ошибка при попытке загрузить настройки из файла настроек: some '
-                                                      'error')
-        self.logger.write_log.assert_any_call(log_level='ERROR',
-                                              log_msg='Ошибка при попытке загрузить настройки из файла настроек по '
-                                                      'умолчанию: some error')
+            self.logger.error.assert_has_calls([
+                call('Ошибка при попытке загрузить настройки из файла настроек: some error'),
+                call('Ошибка при попытке загрузить настройки из файла настроек по умолчанию: some error'),
+            ])
 
 
 class TestTransceiverInitialization(HighLowTransceiverTestBase):
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_HighLowTransceiver_connects_to_com_for_every_power_unit(self):
+    def test_HighLowTransceiver_creates_transceiver_for_every_power_unit(self):
         """
-        Тест проверяет, что при создании объекта HighLowTransceiver
-        происходит создание объектов SerialTransceiver для каждого
-        силового модуля
+        Тест проверяет, что для порта каждого силового модуля создается трансивер
         """
+        for unit_addr, params in self.settings['power units'].items():
+            self.assertEqual(self.hlt.unit_addrs_to_transceivers_map[unit_addr].port, params['port'])
 
-        hlTransceiver = self.HighLowTransceiver()
-        for unit, port in self.test_axiom_settings['power units'].items():
-            self.assertEqual(hlTransceiver.unit_addrs_to_transceivers_map[unit].port, port)
+    def test_HighLowTransceiver_creates_transceiver_for_every_input_unit(self):
+        """
+        Тест проверяет, что для порта каждого модуля ввода создается трансивер
+        """
+        for unit_addr, params in self.settings['input units'].items():
+            self.assertEqual(self.hlt.unit_addrs_to_transceivers_map[unit_addr].port, params['port'])
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_HighLowTransceiver_connects_to_com_for_every_input_unit(self):
+    def test_units_on_one_port_share_transceiver(self):
         """
-        Тест проверяет, что при создании объекта HighLowTransceiver
-        происходит создание объектов SerialTransceiver для каждого
-        модуля ввода
+        Тест проверяет, что модули, подключенные к одному порту, используют общий трансивер
+        и общую очередь команд
         """
+        settings = dict(self.settings, **{'input units': {'m5': {'port': '/dev/ttyS0'}}})
+        with patch.object(HighLowTransceiver, 'bring_up_ports', return_value=set()):
+            hlt = HighLowTransceiver(settings, redis_client=MagicMock(spec=redis.StrictRedis))
+        self.addCleanup(hlt.close)
 
-        hlTransceiver = self.HighLowTransceiver()
-        for unit, port in self.test_axiom_settings['input units'].items():
-            self.assertEqual(hlTransceiver.unit_addrs_to_transceivers_map[unit].port, port)
+        self.assertIs(hlt.unit_addrs_to_transceivers_map['m5'], hlt.unit_addrs_to_transceivers_map['m1'])
+        self.assertEqual(len(hlt.port_transceivers), 4)
+        self.assertEqual(len(hlt.command_schedulers), 4)
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_valid_state_structure_is_created_for_every_power_unit(self):
+    def test_HighLowTransceiver_logs_units_on_ports_that_can_not_be_opened(self):
         """
-        Тест проверяет, что при создании объекта HighLowTransceiver
-        происходит создание структуры для хранения состояния
-        каждого силового модуля
+        Тест проверяет, что модули, порты которых не удалось открыть, записываются в лог
         """
-        hlTransceiver = self.HighLowTransceiver()
-        for unit in self.test_axiom_settings['power units']:
-            correct_state_struct = {
-                'link': False,
-                'st': {'state1': None, 'state2': None, 'signal1': None, 'signal2': None, 'addr': '{}'.format(unit),
-                       'cnt': None},
-                'adc': {'sample1': None, 'sample2': None, 'addr': '{}'.format(unit), 'cnt': None},
-                'ld': {'load1': None, 'load2': None, 'angle1': None, 'angle2': None, 'addr': '{}'.format(unit),
-                       'cnt': None},
-            }
-            self.assertEqual(hlTransceiver.power_units_state_dicts[unit], correct_state_struct)
+        with patch.object(HighLowTransceiver, 'bring_up_ports', return_value={'/dev/ttyS1'}):
+            hlt = HighLowTransceiver(self.settings, redis_client=MagicMock(spec=redis.StrictRedis))
+        self.addCleanup(hlt.close)
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_valid_state_structure_is_created_for_every_input_unit(self):
+        hlt.logger.warning.assert_called_once_with('Модуль m2 работает в ограниченном режиме: порт /dev/ttyS1 не открыт')
+
+    def test_capture_is_flushed_periodically(self):
         """
-        Тест проверяет, что при создании объекта HighLowTransceiver
-        происходит создание структуры для хранения состояния
-        каждого модуля ввода
+        Тест проверяет, что если ведется запись обмена, планировщик периодически сбрасывает записи в файл
         """
-        hlTransceiver = self.HighLowTransceiver()
-        for unit in self.test_axiom_settings['input units']:
-            correct_state_struct = {
-                'st': {'state': None, 'signal': None, 'addr': '{}'.format(unit), 'cnt': None},
-                'adc': {'sample': None, 'addr': '{}'.format(unit), 'cnt': None},
-            }
-            self.assertEqual(hlTransceiver.input_units_state_dicts[unit], correct_state_struct)
+        with patch.object(HighLowTransceiver, 'bring_up_ports', return_value=set()), \
+                patch.object(HighLowTransceiver, 'create_capture', return_value=MagicMock()):
+            hlt = HighLowTransceiver(self.settings, redis_client=MagicMock(spec=redis.StrictRedis))
+        self.addCleanup(hlt.close)
+
+        self.assertIn(hlt.capture.flush, [job.func for job in hlt.scheduler.get_jobs()])
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_lock_object_is_created_for_every_ch(self):
         """
-        Тест проверяет, что при создании объекта HighLowTransceiver
-        происходит создание блокировщика (threading.Lock) для
-        каждого выхода каждого силового модуля
+        Тест проверяет, что для каждого канала силового модуля создается объект блокировки управления
         """
-        hlTransceiver = self.HighLowTransceiver()
-
-        ch_addrs = []
-
-        for unit in self.test_axiom_settings['power units']:
-            for output in ['1', '2']:
-                ch_addrs.append('ch:{}:{}'.format(unit, output))
+        self.assertEqual(set(self.hlt.ch_locks), {'ch:{}:{}'.format(unit_addr, position)
+                                                 for unit_addr in self.settings['power units']
+                                                 for position in ('1', '2')})
+        for lock in self.hlt.ch_locks.values():
+            self.assertIsInstance(lock, type(threading.Lock()))
 
 
-        # Вычислим объект какого класса создает threading.Lock() на данной платформе
-        lock_class = threading.Lock().__class__
-
-        # Проверим, что для каждого выхода создан объект типа threading.Lock
-        for ch_addr in ch_addrs:
-            self.assertTrue(isinstance(hlTransceiver.ch_locks[ch_addr], lock_class))
+class TestStateCollection(HighLowTransceiverTestBase):
 
-        # Проверим, что все блокировщики уникальны
-        self.assertTrue(len(set(hlTransceiver.ch_locks.values())) == len(hlTransceiver.ch_locks.values()))
+    def setUp(self):
+        super().setUp()
+        self.hlt.start_power_unit_init = MagicMock()
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_lock_object_is_created_for_every_serial_transceiver(self):
+    def test_handle_power_unit_frame_publishes_new_state_if_it_changes(self):
         """
-        Тест проверяет, что при создании объекта HighLowTransceiver
-        происходит создание блокировщика (threading.Lock) для
-        каждого последовательного порта
+        Тест проверяет, что при изменении состояния канала новое состояние публикуется на брокер
         """
-        hlTransceiver = self.HighLowTransceiver()
-
-        # Вычислим объект какого класса создает threading.Lock() на данной платформе
-        lock_class = threading.Lock().__class__
+        self.hlt.handle_power_unit_frame('m1', b'st 5 4 12 1 2m1')
 
-        # Проверим, что для каждого силового модуля создан объект типа threading.Lock
-        # для блокировки работы с последовательным портом данного модуля
-        for unit_addr in hlTransceiver.power_unit_addrs:
-            self.assertTrue(isinstance(hlTransceiver.com_locks[unit_addr], lock_class))
+        self.hlt.redis_writer.publish.assert_called_once_with(
+            channel='axiomLowLevelCommunication:info:state', message={'addr': 'ch:m1:1', 'state': {'status': '5'}})
 
-        # Проверим, что все блокировщики уникальны
-        self.assertTrue(len(set(hlTransceiver.com_locks.values())) == len(hlTransceiver.com_locks.values()))
-
-
-class TestStateCollection(HighLowTransceiverTestBase):
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_collect_function_update_unit_state_structure_for_st_cmd(self):
-        """
-        Тест проверяет, что корректно обновляется поле 'st' структуры состояния модуля
-        при чтении данных из последовательного порта
+    def test_handle_power_unit_frame_saves_new_state_if_it_changes(self):
         """
-        hlTransceiver = self.HighLowTransceiver()
-
-        # Для каждого трансивера добавляем возвращамое значение для функции read,
-        # соответствующее адресу модуля, которому он соответствует
-        for unit in self.test_axiom_settings['power units']:
-            hlTransceiver.unit_addrs_to_transceivers_map[unit].read = MagicMock(
-                return_value='st 1 2 3 4 5491{}'.format(unit).encode())
-
-        hlTransceiver.collect_units_state()
+        Тест проверяет, что при переходе канала в стабильное состояние новое состояние сохраняется в БД,
+        а переходные состояния не сохраняются
+        """
+        self.hlt.handle_power_unit_frame('m1', b'st 5 4 12 1 2m1')
+        self.hlt.redis_writer.set.assert_called_once_with(name='ch:m1:1', value={'status': '5'})
 
-        for unit in self.test_axiom_settings['power units']:
-            self.assertTrue(hlTransceiver.power_units_state_dicts[unit]['link'])
-            self.assertEqual(hlTransceiver.power_units_state_dicts[unit]['st'], {'state1': '1',
-                                                                                 'state2': '2',
-                                                                                 'signal1': '3',
-                                                                                 'signal2': '4',
-                                                                                 'addr': '{}'.format(unit),
-                                                                                 'cnt': '5491'})
+        self.hlt.redis_writer.reset_mock()
+        self.hlt.handle_power_unit_frame('m1', b'st 5 1 12 1 3m1')
+        self.hlt.redis_writer.set.assert_not_called()
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_collect_function_publishes_new_state_if_it_changes(self):
+    def test_handle_power_unit_frame_logs_new_state_if_it_changes(self):
         """
-        Тест проверяет, функция HighLowTransceiver.collect_units_state
-        публикует на брокер новое состояние, если оно изменилось
+        Тест проверяет, что переход канала в новое состояние записывается в лог
         """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.redis.get = MagicMock(return_value=str({'status': '0'}))
-        # Для каждого трансивера добавляем возвращамое значение для функции read,
-        # соответствующее адресу модуля, которому он соответствует
-        for unit in self.test_axiom_settings['power units']:
-            hlTransceiver.unit_addrs_to_transceivers_map[unit].read = MagicMock(
-                return_value='st 1 2 3 4 5491{}'.format(unit).encode())
+        self.hlt.handle_power_unit_frame('m1', b'st 5 4 12 1 2m1')
 
-        hlTransceiver.collect_units_state()
+        self.logger.info.assert_any_call('Выход "ch:m1:1" модуля "m1" перешел в состояние "Включен".'
+                                         ' Сигнал перехода: "Команда включения канала"')
 
-        for unit_addr in self.test_axiom_settings['power units']:
-            hlTransceiver.redis.publish.assert_any_call(channel='axiomLowLevelCommunication:info:state',
-                                                        message={'addr': 'ch:{}:1'.format(unit_addr),
-                                                             'state': {'status': '1'}})
-            hlTransceiver.redis.publish.assert_any_call(channel='axiomLowLevelCommunication:info:state',
-                                                        message={'addr': 'ch:{}:2'.format(unit_addr),
-                                                             'state': {'status': '2'}})
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_collect_function_saves_new_state_if_it_changes(self):
-        """
-        Тест проверяет, функция HighLowTransceiver.collect_units_state
-        сохраняет в redis новое состоние выхода, если оно изменилось
+    def test_handle_power_unit_frame_does_not_publish_unchanged_state(self):
         """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.redis.get = MagicMock(return_value=str({'status': '0'}))
-        # Для каждого трансивера добавляем возвращамое значение для функции read,
-        # соответствующее адресу модуля, которому он соответствует
-        for unit in self.test_axiom_settings['power units']:
-            hlTransceiver.unit_addrs_to_transceivers_map[unit].read = MagicMock(
-                return_value='st 1 2 3 4 5491{}'.format(unit).encode())
-
-        hlTransceiver.collect_units_state()
+        Тест проверяет, что если состояние каналов не изменилось, ничего не публикуется
+        """
+        self.hlt.handle_power_unit_frame('m1', b'st 4 4 1 1 2m1')
+        self.hlt.handle_power_unit_frame('m1', b'st 4 4 1 1 3m1')
 
-        for unit_addr in self.test_axiom_settings['power units']:
-            hlTransceiver.redis.set.assert_any_call(name='ch:{}:1'.format(unit_addr), value={'status': '1'})
-            hlTransceiver.redis.set.assert_any_call(name='ch:{}:2'.format(unit_addr), value={'status': '2'})
+        self.hlt.redis_writer.publish.assert_not_called()
+        self.assertEqual(self.hlt.power_units_state['m1']['st'].cnt, 3)
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_collect_function_logs_new_state_if_it_changes(self):
+    def test_handle_power_unit_frame_sets_link(self):
         """
-        Тест проверяет, функция HighLowTransceiver.collect_units_state
-        сохраняет в redis новое состоние выхода, если оно изменилось
+        Тест проверяет, что после получения посылки от модуля устанавливается признак наличия связи
         """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.redis.get = MagicMock(return_value=str({'status': '0'}))
-
-        for unit_addr in self.test_axiom_settings['power units']:
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal1'] = '0'
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal2'] = '0'
-
-        # Для каждого трансивера добавляем возвращамое значение для функции read,
-        # соответствующее адресу модуля, которому он соответствует
-        for unit in self.test_axiom_settings['power units']:
-            hlTransceiver.unit_addrs_to_transceivers_map[unit].read = MagicMock(
-                return_value='st 1 1 1 1 5491{}'.format(unit).encode())
-
-        hlTransceiver.collect_units_state()
+        self.hlt.power_units_state['m1'].link = False
+        self.hlt.handle_power_unit_frame('m1', b'st 4 4 1 1 2m1')
 
-        for unit_addr in self.test_axiom_settings['power units']:
-            for i in ('1', '2'):
-                humanreadable_state = hlTransceiver.humanreadable_states['1']
-                humanreadable_signal = hlTransceiver.humanreadable_signals['1']
-                log_msg = 'Выход "{}" модуля "{}" перешел в состояние "{}". Сигнал перехода: "{}"'.format(
-                    'ch:{}:{}'.format(unit_addr, i), unit_addr, humanreadable_state, humanreadable_signal
-                )
-                self.logger.write_log.assert_any_call(log_msg=log_msg, log_level='INFO')
+        self.assertTrue(self.hlt.power_units_state['m1'].link)
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_collect_function_update_unit_state_structure_for_adc_cmd(self):
+    def test_handle_power_unit_frame_does_not_crash_on_invalid_read_data(self):
         """
-        Тест проверяет, что корректно обновляется поле 'adc' структуры состояния модуля
-        при чтении данных из последовательного порта
+        Тест проверяет, что некорректная посылка не изменяет состояние модуля и учитывается в статистике
         """
-        hlTransceiver = self.HighLowTransceiver()
+        for raw_data in (b'', b'st 4 4m1', b'some garbage', b'xyz 1 2 3m1'):
+            self.hlt.handle_power_unit_frame('m1', raw_data)
 
-        # Для каждого трансивера добавляем возвращамое значение для функции read,
-        # соответствующее адресу модуля, которому он соответствует
-        for unit in self.test_axiom_settings['power units']:
-            hlTransceiver.unit_addrs_to_transceivers_map[unit].read = MagicMock(
-                return_value='adc 2048 2048 5489{}'.format(unit).encode())
+        self.assertEqual(self.hlt.power_units_state['m1']['st'].cnt, 1)
+        self.hlt.redis_writer.publish.assert_not_called()
+        self.assertEqual(self.hlt.unit_statistics['m1'].regex_misses, 4)
 
-        hlTransceiver.collect_units_state()
-
-        for unit in self.test_axiom_settings['power units']:
-            self.assertTrue(hlTransceiver.power_units_state_dicts[unit]['link'])
-            self.assertEqual(hlTransceiver.power_units_state_dicts[unit]['adc'], {'sample1': '2048',
-                                                                                  'sample2': '2048',
-                                                                                  'addr': '{}'.format(unit),
-                                                                                  'cnt': '5489'})
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_collect_function_update_unit_state_structure_for_ld_cmd(self):
+    def test_check_counter_calls_init_power_unit_on_appearance(self):
         """
-        Тест проверяет, что корректно обновляется поле 'ld' структуры состояния модуля
-        при чтении данных из последовательного порта
+        Тест проверяет, что при получении первой посылки от модуля модуль ставится в очередь инициализации
         """
-        hlTransceiver = self.HighLowTransceiver()
-
-        # Для каждого трансивера добавляем возвращамое значение для функции read,
-        # соответствующее адресу модуля, которому он соответствует
-        for unit in self.test_axiom_settings['power units']:
-            hlTransceiver.unit_addrs_to_transceivers_map[unit].read = MagicMock(
-                return_value='ld 12 13 14 15 5492{}'.format(unit).encode())
+        self.set_state('m1', cnt=None)
+        self.hlt.check_power_unit_counter(10, 'm1', 'st')
 
-        hlTransceiver.collect_units_state()
+        self.hlt.start_power_unit_init.assert_called_once_with('m1')
 
-        for unit in self.test_axiom_settings['power units']:
-            self.assertTrue(hlTransceiver.power_units_state_dicts[unit]['link'])
-            self.assertEqual(hlTransceiver.power_units_state_dicts[unit]['ld'], {'load1': '12',
-                                                                                 'load2': '13',
-                                                                                 'angle1': '14',
-                                                                                 'angle2': '15',
-                                                                                 'addr': '{}'.format(unit),
-                                                                                 'cnt': '5492'})
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_collect_function_set_link_to_False_if_there_is_no_data(self):
+    def test_check_counter_calls_init_power_unit_on_wrong_counter(self):
         """
-        Тест проверяет, что для поля 'link' структуры состояния модуля
-        устанавливается значение False в случае отсутствия данных в последовательном порте
+        Тест проверяет, что при получении посылки с нулевым счетчиком модуль ставится в очередь инициализации
         """
-        hlTransceiver = self.HighLowTransceiver()
-
-        for unit in self.test_axiom_settings['power units']:
-            hlTransceiver.power_units_state_dicts[unit]['link'] = True
-            hlTransceiver.unit_addrs_to_transceivers_map[unit].read = MagicMock(return_value=''.encode())
-
-        hlTransceiver.collect_units_state()
+        self.hlt.check_power_unit_counter(0, 'm1', 'st')
 
-        for unit in self.test_axiom_settings['power units']:
-            self.assertFalse(hlTransceiver.power_units_state_dicts[unit]['link'])
+        self.hlt.start_power_unit_init.assert_called_once_with('m1')
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_collect_function_does_nothing_for_invalid_cmd_type(self):
+    def test_check_counter_doesnt_call_init_power_unit_on_correct_counter(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.collect_units_state
-        не изменяет структуру состояния модуля в случае получения
-        некорректного значения типа команды
+        Тест проверяет, что при получении посылок с корректным счетчиком, после получения первой посылки
+        и в режиме обслуживания модуль не ставится в очередь инициализации
         """
-        hlTransceiver = self.HighLowTransceiver()
-        state_before_collect_call = hlTransceiver.power_units_state_dicts
+        self.hlt.check_power_unit_counter(2, 'm1', 'st')
 
-        # Для каждого трансивера добавляем возвращамое значение для функции read,
-        # соответствующее адресу модуля, которому он соответствует
-        for unit in self.test_axiom_settings['power units']:
-            hlTransceiver.unit_addrs_to_transceivers_map[unit].read = MagicMock(
-                return_value='invalid 12 13 14 15 5492{}'.format(unit).encode())
+        self.set_state('m1', cnt=2 ** 32 - 1)
+        self.hlt.check_power_unit_counter(0, 'm1', 'st')
 
-        hlTransceiver.collect_units_state()
+        self.set_state('m1', cnt=1)
+        self.hlt.power_units_maintenance['m1'] = True
+        self.hlt.check_power_unit_counter(0, 'm1', 'st')
 
-        self.assertEqual(state_before_collect_call, hlTransceiver.power_units_state_dicts)
+        self.hlt.start_power_unit_init.assert_not_called()
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_collect_units_state_does_not_crash_on_invalid_read_data(self):
+    def test_check_counter_log_on_appearance(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.collect_units_state
-        не изменяет структуру состояния модуля и не создает исключений в случае получения
-        некорректных данных из последовательного порта
+        Тест проверяет, что получение первой посылки от модуля записывается в лог
         """
-        hlTransceiver = self.HighLowTransceiver()
-        state_before_collect_call = hlTransceiver.power_units_state_dicts
-
-        # Для каждого трансивера добавляем возвращамое значение для функции read,
-        # соответствующее адресу модуля, которому он соответствует
-        for unit in self.test_axiom_settings['power units']:
-            hlTransceiver.unit_addrs_to_transceivers_map[unit].read = MagicMock(
-                return_value='somerandomdata'.encode())
-
-        hlTransceiver.collect_units_state()
+        self.set_state('m1', cnt=None)
+        self.hlt.check_power_unit_counter(10, 'm1', 'st')
 
-        self.assertEqual(state_before_collect_call, hlTransceiver.power_units_state_dicts)
+        self.logger.info.assert_called_once_with('Модуль m1 впервые зафиксирован с системе')
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_collect_units_state_does_not_crash_on_invalid_arguments(self):
+    def test_check_counter_log_on_power_unit_reboot(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.collect_units_state
-        не изменяет структуру состояния модуля и не создает исключений в случае получения
-        некорректного списка аргументов для какой-либо структуры
+        Тест проверяет, что перезагрузка ПО модуля записывается в лог
         """
-        hlTransceiver = self.HighLowTransceiver()
-        state_before_collect_call = hlTransceiver.power_units_state_dicts
-
-        # Для каждого трансивера добавляем возвращамое значение для функции read,
-        # соответствующее адресу модуля, которому он соответствует
-        for unit in self.test_axiom_settings['power units']:
-            hlTransceiver.unit_addrs_to_transceivers_map[unit].read = MagicMock(
-                return_value='st some random arguments 123{}'.format(unit).encode())
+        self.set_state('m1', cnt=25)
+        self.hlt.check_power_unit_counter(0, 'm1', 'st')
 
-        hlTransceiver.collect_units_state()
+        self.logger.error.assert_called_once_with('От модуля m1 получена посылка со значением счетчика 0.'
+                                                  ' Текущее значение счетчика 25. ПО модуля перезагружалось')
 
-        self.assertEqual(state_before_collect_call, hlTransceiver.power_units_state_dicts)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_check_counter_calls_init_power_unit_on_appearance(self):
+    def test_handle_power_unit_frame_calls_check_counter(self):
         """
-        Тест проверяет, что в случае, когда значение счетчика None,
-        а от силового модуля начинают поступать сообщения, функция check_counter
-        вызывает функцию инициализации HighLowTransceiver.init_power_unit
+        Тест проверяет, что для каждой посылки проверяется счетчик
         """
-        self.HighLowTransceiver.load_settings = MagicMock(return_value=self.test_axiom_settings)
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.init_power_unit = MagicMock()
-
-        for unit_addr in self.test_axiom_settings['power units']:
-            type_cmd = 'st'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
-            hlTransceiver.init_power_unit.assert_called_once_with(unit_addr)
-            hlTransceiver.init_power_unit.reset_mock()
-
-            type_cmd = 'adc'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
-
-            type_cmd = 'ld'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
+        self.hlt.check_power_unit_counter = MagicMock()
+        self.hlt.handle_power_unit_frame('m1', b'st 4 4 1 1 2m1')
+        self.hlt.handle_power_unit_frame('m1', b'adc 1.5 2.5 3m1')
 
-            hlTransceiver.init_power_unit.assert_not_called()
+        self.hlt.check_power_unit_counter.assert_has_calls([call(2, 'm1', 'st'), call(3, 'm1', 'adc')])
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_check_counter_calls_init_power_unit_on_wrong_counter(self):
+    def test_handle_power_unit_frame_calls_init_if_channel_is_idle(self):
         """
-        Тест проверяет, что в случае когда значение счетчика посылок 0, а предыдущее
-        сохраненное в структуре состояние значение не равно 2^32 - 1,
-        функция check_counter вызывает функцию инициализации модуля
+        Тест проверяет, что при получении посылки с каналом в состоянии "0" и ненулевым счетчиком
+        модуль ставится в очередь инициализации
         """
-        self.HighLowTransceiver.load_settings = MagicMock(return_value=self.test_axiom_settings)
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.init_power_unit = MagicMock()
-
-        for unit_addr in self.test_axiom_settings['power units']:
-
-            # Устанавливаем значение счетчика отличное от 2^32 - 1
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['cnt'] = '1'
-            hlTransceiver.power_units_state_dicts[unit_addr]['adc']['cnt'] = '1'
-            hlTransceiver.power_units_state_dicts[unit_addr]['ld']['cnt'] = '1'
+        self.hlt.handle_power_unit_frame('m1', b'st 0 0 0 0 2m1')
 
-            type_cmd = 'st'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
-            hlTransceiver.init_power_unit.assert_called_once_with(unit_addr)
-            hlTransceiver.init_power_unit.reset_mock()
+        self.hlt.start_power_unit_init.assert_called_once_with('m1')
 
-            type_cmd = 'adc'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
 
-            type_cmd = 'ld'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
-
-            hlTransceiver.init_power_unit.assert_not_called()
+class TestReaderAndWriterThreads(HighLowTransceiverTestBase):
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_check_counter_doesnt_call_init_power_unit_on_correct_counter(self):
+    def test_update_port_state_dispatches_read_frames(self):
         """
-        Тест проверяет, что в случае значение счетчика посылок 0, а предыдущее
-        сохраненное в структуре состояние значение равно 2^32 - 1,
-        функция check_counter не вызывает функцию инициализации модуля
+        Тест проверяет, что посылки, прочитанные из порта, передаются обработчику модуля-адресата
         """
-        self.HighLowTransceiver.load_settings = MagicMock(return_value=self.test_axiom_settings)
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.init_power_unit = MagicMock()
+        self.hlt.isRunning = True
+        self.hlt.port_transceivers['/dev/ttyS0'].read_generator = MagicMock(
+            return_value=iter([b'st 5 4 12 1 2m1', b'st 5 5 12 12 3m1']))
+        self.hlt.start_power_unit_init = MagicMock()
 
-        for unit_addr in self.test_axiom_settings['power units']:
+        self.hlt.update_port_state('/dev/ttyS0')
 
-            # Устанавливаем значение счетчика отличное от 2^32 - 1
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['cnt'] = str(2**32 - 1)
-            hlTransceiver.power_units_state_dicts[unit_addr]['adc']['cnt'] = str(2**32 - 1)
-            hlTransceiver.power_units_state_dicts[unit_addr]['ld']['cnt'] = str(2**32 - 1)
+        self.assertEqual(self.hlt.power_units_state['m1']['st'].state2, '5')
 
-            type_cmd = 'st'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
-
-            type_cmd = 'adc'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
-
-            type_cmd = 'ld'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
-
-            hlTransceiver.init_power_unit.assert_not_called()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_check_counter_log_on_appearance(self):
+    def test_update_port_state_stops_when_isRunning_is_False(self):
         """
-        Тест проверяет, что в случае, когда значение счетчика None,
-        а от силового модуля начинают поступать сообщения, функция check_counter
-        записывает это событие в лог
+        Тест проверяет, что чтение посылок из порта прекращается после остановки программы
         """
-        self.HighLowTransceiver.load_settings = MagicMock(return_value=self.test_axiom_settings)
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.init_power_unit = MagicMock()
-
-        for unit_addr in self.test_axiom_settings['power units']:
-            type_cmd = 'st'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
-
-            log_msg = 'Модуль {} впервые зафиксирован с системе'.format(unit_addr)
-            self.logger.write_log.assert_called_once_with(log_msg=log_msg, log_level='INFO')
-            self.logger.write_log.reset_mock()
+        self.hlt.isRunning = False
+        self.hlt.port_transceivers['/dev/ttyS0'].read_generator = MagicMock(return_value=iter([b'st 5 4 12 1 2m1']))
 
-            type_cmd = 'adc'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
+        self.hlt.update_port_state('/dev/ttyS0')
 
-            type_cmd = 'ld'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
+        self.assertEqual(self.hlt.power_units_state['m1']['st'].state1, '4')
 
-            self.logger.write_log.assert_not_called()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_check_counter_log_on_power_unit_reboot(self):
+    def test_reader_target_starts_thread_for_every_open_port(self):
         """
-        Тест проверяет, что в случае значение счетчика посылок 0, а предыдущее
-        сохраненное в структуре состояние значение равно 2^32 - 1, функция check_counter
-        пишет в лог сообщение об ошибке
+        Тест проверяет, что в режиме 'threads' для каждого открытого порта запускается поток чтения
         """
-        self.HighLowTransceiver.load_settings = MagicMock(return_value=self.test_axiom_settings)
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.init_power_unit = MagicMock()
-
-        for unit_addr in self.test_axiom_settings['power units']:
-            # Устанавливаем значение счетчика отличное от 2^32 - 1
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['cnt'] = '1000'
-            hlTransceiver.power_units_state_dicts[unit_addr]['adc']['cnt'] = '1000'
-            hlTransceiver.power_units_state_dicts[unit_addr]['ld']['cnt'] = '1000'
+        self.hlt.reader_mode = 'threads'
+        self.hlt.isRunning = True
+        self.hlt.port_bring_up.is_open = MagicMock(side_effect=lambda port: port != '/dev/ttyS1')
+        self.hlt.update_port_state = MagicMock()
 
-            type_cmd = 'st'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
+        def stop(_):
+            self.hlt.isRunning = False
 
-            log_msg = 'От модуля {} получена посылка со значением счетчика 0. Текущее значение счетчика 1000.' \
-                      ' ПО модуля перезагружалось'.format(unit_addr)
-            self.logger.write_log.assert_any_call(log_msg=log_msg, log_level='ERROR')
-            self.logger.write_log.reset_mock()
+        with patch('axiomLowLevelCommunication.highLowTransceiver.time.sleep', MagicMock(side_effect=stop)):
+            self.hlt.reader_target()
 
-            type_cmd = 'adc'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
+        started = {args[0] for args, _ in self.hlt.update_port_state.call_args_list}
+        self.assertEqual(started, set(self.hlt.port_transceivers) - {'/dev/ttyS1'})
 
-            type_cmd = 'ld'
-            hlTransceiver.check_power_unit_counter('0', unit_addr, type_cmd)
-
-            self.logger.write_log.assert_not_called()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_collect_function_calls_check_counter(self):
+    def test_reader_target_calls_selector_reader_target_in_selector_mode(self):
         """
-        Тест проверяет, что корректно обновляется поле 'st' структуры состояния модуля
-        при чтении данных из последовательного порта
+        Тест проверяет, что в режиме 'selector' прием данных выполняется в одном потоке
         """
-        self.HighLowTransceiver.load_settings = MagicMock(return_value=self.test_axiom_settings)
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.check_power_unit_counter = MagicMock()
-        hlTransceiver.run_power_unit = MagicMock(return_value=True)
-        hlTransceiver.configure_power_unit = MagicMock(return_value=True)
-
-        # Для каждого трансивера добавляем возвращамое значение для функции read,
-        # соответствующее адресу модуля, которому он соответствует
-        for unit in self.test_axiom_settings['power units']:
-            hlTransceiver.unit_addrs_to_transceivers_map[unit].read = MagicMock(
-                return_value='st 1 2 3 4 5491{}'.format(unit).encode())
+        self.hlt.reader_mode = 'selector'
+        self.hlt.selector_reader_target = MagicMock()
 
-        hlTransceiver.collect_units_state()
+        self.hlt.reader_target()
 
-        for unit in self.test_axiom_settings['power units']:
-            hlTransceiver.check_power_unit_counter.assert_any_call('5491', unit, 'st')
-
-
-class TestReaderAndWriterThreads(HighLowTransceiverTestBase):
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_reader_target_constantly_calls_collect_unit_state(self):
-        """
-        Тест проверяет, что функция  HighLowTransceiver.reader_target
-        постоянно вызывает функцию HighLowTransceiver.collect_units_state,
-        пока установлен флаг HighLowTransceiver.isRunning = True
-        """
-        hlTransceiver = self.HighLowTransceiver()
-
-        # после 10 вызовов поток опроса нужно остановить
-        num_of_calls = 10
-
-        def collect_units_state_side_effect_func():
-            nonlocal num_of_calls
-            if num_of_calls == 1:
-                hlTransceiver.isRunning = False
-            num_of_calls -= 1
-
-        hlTransceiver.collect_units_state = MagicMock(side_effect=collect_units_state_side_effect_func)
-        hlTransceiver.isRunning = True
-        reader = threading.Thread(target=hlTransceiver.reader_target())
-        reader.start()
-        self.assertEqual(hlTransceiver.collect_units_state.call_count, 10)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    @patch('axiomLowLevelCommunication.highToLowTransceiver.SerialTransceiver', MagicMock(spec=SerialTransceiver))
-    def test_reader_and_writer_stop_when_isRunning_is_False(self):
-        """
-        Тест проверяет, потоки reader и writer останавливаются,
-        когда HighLowTransceiver.isRunning = False
-        """
-        # TODO добавить проверку потока writer
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.collect_units_state = MagicMock()
-        t = threading.Thread(target=hlTransceiver.run).start()
-        time.sleep(0.01)
-        try:
-            # проверяем, что функция сбора состояния вызывалась
-            hlTransceiver.collect_units_state.assert_called()
-            # останавливаем потоки
-            hlTransceiver.isRunning = False
-            # сбрасываем mock и проверяем, что функция
-            # сбора состояния перестала вызываться
-            hlTransceiver.collect_units_state.reset_mock()
-            time.sleep(0.1)
-            hlTransceiver.collect_units_state.assert_not_called()
-        except AssertionError:
-            raise
-        finally:
-            hlTransceiver.isRunning = False
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_reader_restart_after_crashing(self):
-        """
-        Тест проверяет, поток reader запускается снова после падения
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.collect_units_state = MagicMock(side_effect=lambda: sys.exit(0))
-        hlTransceiver.init_power_unit = MagicMock(return_value=True)
-
-        threading.Thread(target=hlTransceiver.run).start()
-        time.sleep(0.5)
-        try:
-            hlTransceiver.collect_units_state.reset_mock()
-            time.sleep(6)
-            hlTransceiver.collect_units_state.assert_called()
-        except AssertionError:
-            raise
-        finally:
-            hlTransceiver.isRunning = False
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_writer_restart_after_crashing(self):
-        """
-        Тест проверяет, поток отправки команд запускается снова после падения
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-        subscriber = self.redis.StrictRedis().pubsub()
-        self.redis.StrictRedis().pubsub().get_message.side_effect = lambda: sys.exit(0)
-
-        hlTransceiver.init_power_unit = MagicMock(return_value=True)
-        threading.Thread(target=hlTransceiver.run).start()
-        try:
-            subscriber.get_message.reset_mock()
-            time.sleep(6)
-            subscriber.get_message.assert_called()
-        except AssertionError:
-            raise
-        finally:
-            hlTransceiver.isRunning = False
-
-    @patch('time.sleep', MagicMock(side_effect=KeyboardInterrupt))
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_start_reader_thread_and_stop_on_KeyboardInterrupt(self):
-        """
-        Тест проверяет, что функция  HighLowTransceiver.run запускает
-        в потоке функцию HighLowTransceiver.reader_target,
-        которая работает до появления исключения KeyboardInterrupt
-        """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.collect_units_state = MagicMock()
-        try:
-            threading.Thread(target=hlTransceiver.run).start()
-        except KeyboardInterrupt:
-            try:
-                hlTransceiver.collect_units_state.assert_called()
-                self.assertFalse(hlTransceiver.isRunning)
-            except AttributeError:
-                raise
-            finally:
-                hlTransceiver.isRunning = False
-        finally:
-            hlTransceiver.isRunning = False
+        self.hlt.selector_reader_target.assert_called_once_with()
 
 
 class TestHandleSetPowerUnitStateExit(HighLowTransceiverTestBase):
-    """
-    Тесты проверки функции HighLowTransceiver.before_return_from_set_ch_state
-    """
 
-    # <editor-fold desc="Функциональность удалена. Новое состояние силового выхода публикуется функцией collect_units_state при его изменении">
-    @skip
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_before_return_from_set_ch_state_publish_current_state(self):
         """
-        Тест проверяет, что функция  HighLowTransceiver.before_return_from_set_ch_state
-        публикует на брокер текущее состояние силового выхода
+        Тест проверяет, что функция before_return_from_set_ch_state публикует текущее состояние канала
         """
-        channel_addr = 'ch:m1:1'
-        current_state = '0'
-        redis_msg = ''
-        log_msg = ''
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.before_return_from_set_ch_state(channel_addr, current_state, redis_msg, log_msg)
+        self.hlt.before_return_from_set_ch_state(log_msg='msg', channel_addr='ch:m1:1', current_state='4')
 
-        hlTransceiver.redis.publish.assert_any_call(
-            channel='axiomLowLevelCommunication:info:state',
-            message={'addr': channel_addr, 'state': {'status': current_state}})
-    # </editor-fold>
+        self.hlt.redis_writer.publish.assert_called_once_with(
+            channel='axiomLowLevelCommunication:info:state', message={'addr': 'ch:m1:1', 'state': {'status': '4'}})
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_before_return_from_set_ch_state_publish_error(self):
         """
-        Тест проверяет, что функция  HighLowTransceiver.before_return_from_set_ch_state
-        публикует на брокер сообщение об ошибке
+        Тест проверяет, что функция before_return_from_set_ch_state публикует сообщение об ошибке
         """
-        channel_addr = ''
-        current_state = ''
-        redis_msg = 'redis error message'
-        log_msg = ''
+        self.hlt.before_return_from_set_ch_state(log_msg='msg', channel_addr='ch:m1:1', current_state='4',
+                                                 redis_error_msg='error')
 
-        hlTransceiver = self.HighLowTransceiver()
+        self.hlt.redis_writer.publish.assert_called_with(channel='axiomLowLevelCommunication:info:error',
+                                                         message='error')
 
-        hlTransceiver.before_return_from_set_ch_state(channel_addr, current_state, log_msg, redis_msg)
-
-        hlTransceiver.redis.publish.assert_any_call(
-            channel='axiomLowLevelCommunication:info:error', message=redis_msg)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_before_return_from_set_ch_state_log_info(self):
         """
-        Тест проверяет, что функция  HighLowTransceiver.before_return_from_set_ch_state
-        пишет в лог сообщение об ошибке
+        Тест проверяет, что если ошибки нет, функция before_return_from_set_ch_state пишет сообщение в лог
+        с уровнем INFO
         """
-        channel_addr = ''
-        current_state = ''
-        redis_msg = ''
-        log_msg = 'log message'
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.before_return_from_set_ch_state(log_msg, channel_addr, current_state, redis_msg)
+        self.hlt.before_return_from_set_ch_state(log_msg='msg', channel_addr='ch:m1:1', current_state='4')
 
-        self.logger.write_log.assert_called_once_with(log_msg=log_msg, log_level='INFO')
+        self.logger.info.assert_called_once_with('msg')
+        self.logger.error.assert_not_called()
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_before_return_from_set_ch_state_log_error(self):
         """
-        Тест проверяет, что функция  HighLowTransceiver.before_return_from_set_ch_state
-        пишет в лог сообщение об ошибке
+        Тест проверяет, что при ошибке функция before_return_from_set_ch_state пишет сообщение в лог
+        с уровнем ERROR
         """
-        channel_addr = ''
-        current_state = ''
-        redis_msg = 'redis error message'
-        log_msg = 'log message'
+        self.hlt.before_return_from_set_ch_state(log_msg='msg', channel_addr='ch:m1:1', current_state='4',
+                                                 redis_error_msg='error')
 
-        hlTransceiver = self.HighLowTransceiver()
+        self.logger.error.assert_called_once_with('msg')
+        self.logger.info.assert_not_called()
 
-        hlTransceiver.before_return_from_set_ch_state(log_msg, channel_addr, current_state, redis_msg)
 
-        self.logger.write_log.assert_called_once_with(log_msg=log_msg, log_level='ERROR')
+class TestSetPowerUnitState(HighLowTransceiverTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.hlt.start_power_unit_init = MagicMock()
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_before_return_from_set_ch_state_save_state(self):
+    def test_set_ch_state_function_rejects_invalid_cmd(self):
         """
-        Тест проверяет, что функция  HighLowTransceiver.before_return_from_set_ch_state
-        сохраняет в redis текущее состояние канала
+        Тест проверяет, что функция set_ch_state не выполняет некорректные команды
         """
-        channel_addr = 'channel addr'
-        current_state = 'current state'
-        redis_msg = 'redis error message'
-        log_msg = 'log message'
+        invalid_cmds = [
+            (None, {'status': '5'}),
+            ('ch', {'status': '5'}),
+            ('ch:m9:1', {'status': '5'}),
+            ('ch:m5:1', {'status': '5'}),
+            ('ch:m1:3', {'status': '5'}),
+            ('ch:m1:1', {'status': '7'}),
+            ('ch:m1:1', {'state': '5'}),
+            ('ch:m1:1', '5'),
+        ]
+        for channel_addr, new_state_dict in invalid_cmds:
+            self.assertFalse(self.hlt.set_ch_state(channel_addr, new_state_dict))
 
-        hlTransceiver = self.HighLowTransceiver()
+        for transceiver in self.hlt.port_transceivers.values():
+            transceiver.write.assert_not_called()
 
-        hlTransceiver.before_return_from_set_ch_state(channel_addr, current_state, log_msg, redis_msg)
-
-
-class TestSetPowerUnitState(HighLowTransceiverTestBase):
-    """
-    Тесты функции установки состояния силового выхода
-    HighLowTransceiver.set_ch_state
-    """
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_function_rejects_invalid_cmd(self):
-        """
-        Тест проверяет, что функция  HighLowTransceiver.set_ch_state
-        отбрасывает некорректные команды (возвращает False)
-        """
-        hlTransceiver = self.HighLowTransceiver()
-        # Неверный адрес модуля и номер канала
-        self.assertEqual(hlTransceiver.set_ch_state(channel_addr='ch:m0:3', new_state_dict={'status': '5'}), False)
-        # Неверный номер канала
-        self.assertEqual(hlTransceiver.set_ch_state(channel_addr='ch:m1:3', new_state_dict={'status': '5'}), False)
-        # Неверный адрес модуля
-        self.assertEqual(hlTransceiver.set_ch_state(channel_addr='ch:m5:1', new_state_dict={'status': '5'}), False)
-        # Некорректный адрес канала
-        self.assertEqual(hlTransceiver.set_ch_state(channel_addr='::', new_state_dict={'status': '5'}), False)
-        self.assertEqual(hlTransceiver.set_ch_state(channel_addr='some random string', new_state_dict={'status': '5'}), False)
-        self.assertEqual(hlTransceiver.set_ch_state(channel_addr=123, new_state_dict={'status': '5'}), False)
-        # Новое состояние вне допустимого диапазона значений ('4', '5')
-        self.assertEqual(hlTransceiver.set_ch_state(channel_addr='ch:m1:1', new_state_dict={'status': '3'}), False)
-        # Некоректное новое состояние
-        self.assertEqual(hlTransceiver.set_ch_state(channel_addr='ch:m1:1', new_state_dict={}), False)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_set_ch_state_function_logs_error_when_gets_invalid_cmd(self):
         """
-        Тест проверяет, что функция  HighLowTransceiver.set_ch_state
-        логирует ошибку, если полученная команда не проходит валидацию
-        """
-        hlTransceiver = self.HighLowTransceiver()
-
-        # Неверный адрес модуля и номер канала
-        channel_addr = 'ch:m0:3'
-        new_state_dict = {'status': '5'}
-        hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict=new_state_dict)
-        invalid_cmd_log_msg = 'Получены некорректные данные для установки нового состояния силового выхода:' \
-                              ' адрес канала: {}, новое состояние: {}'.format(channel_addr, new_state_dict)
-        self.logger.write_log.assert_called_once_with(log_msg=invalid_cmd_log_msg, log_level='ERROR')
-        self.logger.write_log.reset_mock()
-
-        # Неверный номер канала
-        channel_addr = 'ch:m1:3'
-        new_state_dict = {'status': '5'}
-        hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict=new_state_dict)
-        invalid_cmd_log_msg = 'Получены некорректные данные для установки нового состояния силового выхода:' \
-                              ' адрес канала: {}, новое состояние: {}'.format(channel_addr, new_state_dict)
-        self.logger.write_log.assert_called_once_with(log_msg=invalid_cmd_log_msg, log_level='ERROR')
-        self.logger.write_log.reset_mock()
-
-        # Неверный адрес модуля
-        channel_addr = 'ch:m5:1'
-        new_state_dict = {'status': '5'}
-        hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict=new_state_dict)
-        invalid_cmd_log_msg = 'Получены некорректные данные для установки нового состояния силового выхода:' \
-                              ' адрес канала: {}, новое состояние: {}'.format(channel_addr, new_state_dict)
-        self.logger.write_log.assert_called_once_with(log_msg=invalid_cmd_log_msg, log_level='ERROR')
-        self.logger.write_log.reset_mock()
-
-        # Некорректный адрес канала
-        channel_addr = '::'
-        new_state_dict = {'status': '5'}
-        hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict=new_state_dict)
-        invalid_cmd_log_msg = 'Получены некорректные данные для установки нового состояния силового выхода:' \
-                              ' адрес канала: {}, новое состояние: {}'.format(channel_addr, new_state_dict)
-        self.logger.write_log.assert_called_once_with(log_msg=invalid_cmd_log_msg, log_level='ERROR')
-        self.logger.write_log.reset_mock()
-
-        channel_addr = 'some random string'
-        new_state_dict = {'status': '5'}
-        hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict=new_state_dict)
-        invalid_cmd_log_msg = 'Получены некорректные данные для установки нового состояния силового выхода:' \
-                              ' адрес канала: {}, новое состояние: {}'.format(channel_addr, new_state_dict)
-        self.logger.write_log.assert_called_once_with(log_msg=invalid_cmd_log_msg, log_level='ERROR')
-        self.logger.write_log.reset_mock()
-
-        channel_addr = 123
-        new_state_dict = {'status': '5'}
-        hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict=new_state_dict)
-        invalid_cmd_log_msg = 'Получены некорректные данные для установки нового состояния силового выхода:' \
-                              ' адрес канала: {}, новое состояние: {}'.format(channel_addr, new_state_dict)
-        self.logger.write_log.assert_called_once_with(log_msg=invalid_cmd_log_msg, log_level='ERROR')
-        self.logger.write_log.reset_mock()
-
-        # Новое состояние вне допустимого диапазона значений ('4', '5')
-        channel_addr = 'ch:m1:1'
-        new_state_dict = {'status': '3'}
-        hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict=new_state_dict)
-        invalid_cmd_log_msg = 'Получены некорректные данные для установки нового состояния силового выхода:' \
-                              ' адрес канала: {}, новое состояние: {}'.format(channel_addr, new_state_dict)
-        self.logger.write_log.assert_called_once_with(log_msg=invalid_cmd_log_msg, log_level='ERROR')
-        self.logger.write_log.reset_mock()
-
-        # Некоректное новое состояние
-        channel_addr = 'ch:m1:1'
-        new_state_dict = {}
-        hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict=new_state_dict)
-        invalid_cmd_log_msg = 'Получены некорректные данные для установки нового состояния силового выхода:' \
-                              ' адрес канала: {}, новое состояние: {}'.format(channel_addr, new_state_dict)
-        self.logger.write_log.assert_called_once_with(log_msg=invalid_cmd_log_msg, log_level='ERROR')
-        self.logger.write_log.reset_mock()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_write_to_log_when_get_correct_cmd(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.set_ch_state
-        пишет в лог сообщение при получении корректной команды
+        Тест проверяет, что функция set_ch_state записывает некорректную команду в лог
         """
-        hlTransceiver = self.HighLowTransceiver()
-
-        for unit_addr in self.test_axiom_settings['power units']:
-            for channel_position in ['1', '2']:
-                channel_addr = 'ch:{}:{}'.format(unit_addr, channel_position)
-
-                for new_state in ['5', '4']:
+        self.hlt.set_ch_state('ch:m1:3', {'status': '5'})
 
-                    hlTransceiver.power_units_state_dicts[unit_addr]['st']['state{}'.format(
-                        channel_position)] = new_state
+        self.logger.error.assert_called_once_with('Получены некорректные данные для установки нового состояния'
+                                                  ' силового выхода: адрес канала: ch:m1:3,'
+                                                  ' новое состояние: {\'status\': \'5\'}')
 
-                    hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict={'status': new_state})
-
-                    log_msg = 'Получена команда на установку состояния "{}" на выходе "{}"'.format(
-                        hlTransceiver.humanreadable_states[new_state], channel_addr)
+    def test_set_ch_state_write_to_log_when_get_correct_cmd(self):
+        """
+        Тест проверяет, что функция set_ch_state записывает в лог полученную корректную команду
+        """
+        self.hlt.set_ch_state('ch:m1:1', {'status': '5'})
 
-                    self.logger.write_log.assert_any_call(log_msg=log_msg, log_level='INFO')
-                    self.logger.write_log.reset_mock()
+        self.logger.info.assert_any_call('Получена команда на установку состояния "Включен" на выходе "ch:m1:1"')
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_set_ch_state_function_calls_init_unit_function_if_unit_is_not_initialized(self):
         """
-        Тест проверяет, что функция  HighLowTransceiver.set_ch_state
-        вызывает функцию инициализации модуля HighLowTransceiver.init_power_unit
-        в случае, когда значение поля 'state' равно 0 или 3
+        Тест проверяет, что если канал находится в состоянии '0' или '3', модуль ставится в очередь
+        инициализации, и команда выполняется после инициализации модуля
         """
-        hlTransceiver = self.HighLowTransceiver()
+        for state in ('0', '3'):
+            self.set_state('m1', state1=state, state2=state)
+            self.hlt.start_power_unit_init.reset_mock()
+            self.hlt.start_power_unit_init.side_effect = lambda unit_addr: self.set_state(unit_addr, state1='4',
+                                                                                         state2='4')
 
-        unit = list(self.test_axiom_settings['power units'].keys())[0]
+            self.assertTrue(self.hlt.set_ch_state('ch:m1:1', {'status': '5'}))
 
-        # силовой выход находится в состоянии 0 (idle)
-        hlTransceiver.power_units_state_dicts[unit]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit]['st']['signal1'] = '0'
-        hlTransceiver.init_power_unit = MagicMock()
-        hlTransceiver.set_ch_state(channel_addr='ch:{}:1'.format(unit), new_state_dict={'status': '5'})
-        hlTransceiver.init_power_unit.assert_called_with(unit)
+            self.hlt.start_power_unit_init.assert_called_once_with('m1')
+            self.assertIn('ch 1 on m1', self.written('m1'))
 
-        # силовой выход находится в состоянии 3 (nuse)
-        hlTransceiver.power_units_state_dicts[unit]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit]['st']['signal1'] = '2'
-        hlTransceiver.init_power_unit = MagicMock()
-        hlTransceiver.set_ch_state(channel_addr='ch:{}:1'.format(unit), new_state_dict={'status': '5'})
-        hlTransceiver.init_power_unit.assert_called_with(unit)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_set_ch_state_function_write_in_log_if_unit_is_not_initialized(self):
         """
-        Тест проверяет, что функция  HighLowTransceiver.set_ch_state
-        пишет сообщение в лог в случае, когда значение поля 'state' равно 0 или 3
+        Тест проверяет, что если канал находится в состоянии '0' или '3', функция set_ch_state
+        пишет об этом в лог
         """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.run_power_unit = MagicMock(return_value=True)
-        hlTransceiver.configure_power_unit= MagicMock(return_value=True)
+        self.set_state('m1', state1='3')
+        self.hlt.await_state = MagicMock(return_value=False)
 
-        unit = list(self.test_axiom_settings['power units'].keys())[0]
+        self.hlt.set_ch_state('ch:m1:1', {'status': '5'})
 
-        # силовой выход находится в состоянии 0 (idle)
-        for current_state, current_signal in zip(['0', '3'], ['0', '2']):
-            hlTransceiver.power_units_state_dicts[unit]['st']['state1'] = current_state
-            hlTransceiver.power_units_state_dicts[unit]['st']['signal1'] = current_signal
-            channel_addr = 'ch:{}:1'.format(unit)
-            hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict={'status': '5'})
-            log_msg = 'Силовой выход {} находится в состоянии {}. Требуется инициализация модуля'.format(
-                channel_addr, current_state)
-            self.logger.write_log.assert_any_call(log_msg=log_msg, log_level='WARNING')
-            self.logger.write_log.reset_mock()
+        self.logger.warning.assert_called_once_with('Силовой выход ch:m1:1 находится в состоянии 3.'
+                                                    ' Требуется инициализация модуля')
+        self.hlt.await_state.assert_called_once()
+        self.assertEqual(self.hlt.await_state.call_args.kwargs['timeout'], INIT_WAIT_TIMEOUT)
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_function_calls_before_return_from_set_ch_state_if_init_unit_function_returns_False(self):
+    def test_set_ch_state_function_calls_before_return_from_set_ch_state_if_unit_is_not_initialized(self):
         """
-        Тест проверяет, что если функции HighLowTransceiver.init_power_unit
-        не удается проинициализировать силовой модуль, вызывается функция
-        HighLowTransceiver.before_return_from_set_ch_state
+        Тест проверяет, что если модуль не удалось инициализировать, функция set_ch_state
+        вызывает before_return_from_set_ch_state с сообщением об ошибке, не пишет команду в порт
+        и возвращает False
         """
-        hlTransceiver = self.HighLowTransceiver()
+        self.set_state('m1', state1='3', signal1='2')
+        self.hlt.await_state = MagicMock(return_value=False)
+        self.hlt.before_return_from_set_ch_state = MagicMock()
 
-        # Функции инициализации не удается проинициализировать модуль, возвращает False
-        hlTransceiver.init_power_unit = MagicMock(return_value=False)
-        hlTransceiver.before_return_from_set_ch_state = MagicMock()
+        self.assertFalse(self.hlt.set_ch_state('ch:m1:1', {'status': '5'}))
 
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-        channel_addr = 'ch:{}:1'.format(unit_addr)
-        new_state = '5'
+        log_msg = 'Невозможно установить в канале "ch:m1:1" состояние "Включен". Канал находится в состоянии:' \
+                  ' "Ожидается конфигурация", сигнал перехода: "Отсутствие конфигурации"'
+        self.hlt.before_return_from_set_ch_state.assert_called_once_with(channel_addr='ch:m1:1', current_state='3',
+                                                                         log_msg=log_msg, redis_error_msg=log_msg)
+        self.assertEqual(self.written('m1'), [])
 
-        # Проверяем, что для любого из состояний логируется ошибка
-        for current_state, current_signal in zip(['0', '3'], ['0', '2']):
-            # Устанавливаем тестовое состояние и сигнал
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = current_state
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal1'] = current_signal
+    def test_set_ch_state_function_calls_before_return_from_set_ch_state_if_channel_in_fault_power_off_or_lock_state(
+            self):
+        """
+        Тест проверяет, что если канал находится в состоянии '2', '6' или '7', функция set_ch_state
+        вызывает before_return_from_set_ch_state с сообщением об ошибке, не пишет команду в порт
+        и возвращает False
+        """
+        self.hlt.before_return_from_set_ch_state = MagicMock()
+        for state in ('2', '6', '7'):
+            self.set_state('m1', state1=state, signal1='7')
+            self.hlt.before_return_from_set_ch_state.reset_mock()
 
-            humanreadable_current_state = hlTransceiver.humanreadable_states[current_state]
-            humanreadable_new_state = hlTransceiver.humanreadable_states[new_state]
-            humanreadable_current_signal = hlTransceiver.humanreadable_signals[current_signal]
+            self.assertFalse(self.hlt.set_ch_state('ch:m1:1', {'status': '5'}))
 
-            hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict={'status': new_state})
+            log_msg = 'Невозможно установить в канале "ch:m1:1" состояние "Включен". Канал находится в состоянии:' \
+                      ' "{}", сигнал перехода: "Короткое замыкание"'.format(POWER_UNIT_STATES_TABLE[state])
+            self.hlt.before_return_from_set_ch_state.assert_called_once_with(
+                channel_addr='ch:m1:1', current_state=state, log_msg=log_msg, redis_error_msg=log_msg)
+        self.assertEqual(self.written('m1'), [])
 
-            log_msg = 'Невозможно установить в канале "{}" состояние "{}".' \
-                      ' Канал находится в состоянии: "{}", сигнал перехода: "{}"'.format(
-                       channel_addr, humanreadable_new_state, humanreadable_current_state,
-                       humanreadable_current_signal, )
+    def test_set_ch_state_function_calls_before_return_from_set_ch_state_if_new_state_is_already_set(self):
+        """
+        Тест проверяет, что если канал уже находится в требуемом состоянии, функция set_ch_state
+        вызывает before_return_from_set_ch_state без сообщения об ошибке, не пишет команду в порт
+        и возвращает True
+        """
+        self.hlt.before_return_from_set_ch_state = MagicMock()
 
-            redis_error_msg = log_msg
+        self.assertTrue(self.hlt.set_ch_state('ch:m1:1', {'status': '4'}))
 
-            hlTransceiver.before_return_from_set_ch_state.assert_called_once_with(channel_addr=channel_addr,
-                                                                                  current_state=current_state,
-                                                                                  redis_error_msg=redis_error_msg,
-                                                                                  log_msg=log_msg)
-            hlTransceiver.before_return_from_set_ch_state.reset_mock()
+        self.hlt.before_return_from_set_ch_state.assert_called_once_with(
+            log_msg='Выполнение команды не требуется. Выход "ch:m1:1" уже находится в состоянии "Выключен"',
+            channel_addr='ch:m1:1', current_state='4')
+        self.assertEqual(self.written('m1'), [])
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_function_does_not_write_in_COM_if_init_unit_function_returns_False(self):
+    def test_set_ch_state_function_use_ch_lock_during_command_sending(self):
         """
-        Тест проверяет, что если функции HighLowTransceiver.init_power_unit
-        не удается проинициализировать силовой модуль, функция HighLowTransceiver.set_ch_state
-        ничего не записывает в последовательный порт
+        Тест проверяет, что функция set_ch_state отправляет команду, заблокировав управление каналом,
+        и снимает блокировку после выполнения команды
         """
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.init_power_unit = MagicMock(return_value=False)
+        lock = self.hlt.ch_locks['ch:m1:1']
 
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-        channel_addr = 'ch:{}:1'.format(unit_addr)
-        new_state = {'status': '5'}
+        def execute_command(data):
+            if data.startswith('ch'):
+                self.assertTrue(lock.locked())
+            return self.execute_command(data)
+        self.hlt.unit_addrs_to_transceivers_map['m1'].write.side_effect = execute_command
 
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal2'] = '0'
+        self.assertTrue(self.hlt.set_ch_state('ch:m1:1', {'status': '5'}))
+        self.assertFalse(lock.locked())
 
-        # силовой выход находится в состоянии 0 (idle)
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
+    def test_set_ch_state_function_calls_before_return_from_set_ch_state_if_channel_is_locked(self):
+        """
+        Тест проверяет, что если блокировка управления каналом не снимается до истечения таймаута,
+        функция set_ch_state не пишет команду в порт, вызывает before_return_from_set_ch_state
+        с сообщением об ошибке и возвращает False
+        """
+        self.hlt.ch_locks['ch:m1:1'] = MagicMock()
+        self.hlt.ch_locks['ch:m1:1'].acquire.return_value = False
+        self.hlt.before_return_from_set_ch_state = MagicMock()
 
-        hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict=new_state)
+        self.assertFalse(self.hlt.set_ch_state('ch:m1:1', {'status': '5'}))
 
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].ser.write.assert_not_called()
+        self.hlt.ch_locks['ch:m1:1'].acquire.assert_called_once_with(timeout=3)
+        log_msg = 'Невозможно установить состояние "Включен" на выходе "ch:m1:1":' \
+                  ' управление заблокировано другим потоком'
+        self.hlt.before_return_from_set_ch_state.assert_called_once_with(channel_addr='ch:m1:1', current_state='4',
+                                                                         log_msg=log_msg, redis_error_msg=log_msg)
+        self.assertEqual(self.written('m1'), [])
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_function_calls_before_return_from_set_ch_state_if_channel_in_fault_power_off_or_lock_state(self):
+    def test_set_ch_state_function_write_correct_cmd(self):
         """
-        Тест проверяет, что если канал находится в состоянии 2 (fault), 6 (poff)
-        или 7 (lock) функция HighLowTransceiver.set_ch_state вызывает функцию
-        HighLowTransceiver.before_return_from_set_ch_state
+        Тест проверяет, что функция set_ch_state пишет в порт команду для канала
+        и, после ее выполнения, команду для светодиода канала
         """
+        self.assertTrue(self.hlt.set_ch_state('ch:m1:2', {'status': '5'}))
+        self.hlt.unit_addrs_to_transceivers_map['m1'].write.assert_any_call('ch 2 on m1')
 
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.before_return_from_set_ch_state = MagicMock()
-
-        # Первый модуль из тестовой конфигурации.
-        # Для проверки будет использоваться его адрес
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-        channel_addr = 'ch:{}:1'.format(unit_addr)
+        self.assertTrue(self.hlt.set_ch_state('ch:m1:2', {'status': '4'}))
+        self.hlt.unit_addrs_to_transceivers_map['m1'].write.assert_any_call('ch 2 off m1')
 
-        # Проверяем, что для любого из состояний логируется ошибка
-        for current_state, current_signal in zip(['2', '6', '7'], ['3', '10', '14']):
-            # Устанавливаем тестовое состояние и сигнал
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = current_state
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal1'] = current_signal
+        # Команды светодиода отправляются без ожидания
+        self.flush_commands('m1')
+        self.assertIn('led inst 2 on m1', self.written('m1'))
+        self.assertIn('led inst 2 off m1', self.written('m1'))
 
-            new_state = '5'
-            hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict={'status': new_state})
-
-            humanreadable_current_state = hlTransceiver.humanreadable_states[current_state]
-            humanreadable_new_state = hlTransceiver.humanreadable_states[new_state]
-            humanreadable_current_signal = hlTransceiver.humanreadable_signals[current_signal]
+    def test_set_ch_state_calls_before_return_from_set_ch_state_if_SerialTransceiver_write_fails(self):
+        """
+        Тест проверяет, что если команду не удалось записать в порт, функция set_ch_state
+        вызывает before_return_from_set_ch_state с сообщением об ошибке, снимает блокировку
+        управления каналом и возвращает False
+        """
+        self.hlt.unit_addrs_to_transceivers_map['m1'].write.side_effect = None
+        self.hlt.unit_addrs_to_transceivers_map['m1'].write.return_value = False
+        self.hlt.before_return_from_set_ch_state = MagicMock()
 
-            log_msg = 'Невозможно установить в канале "{}" состояние "{}". Канал находится в состоянии: "{}", ' \
-                      'сигнал перехода: "{}"'.format(channel_addr, humanreadable_new_state, humanreadable_current_state,
-                                                     humanreadable_current_signal)
+        self.assertFalse(self.hlt.set_ch_state('ch:m1:1', {'status': '5'}))
 
-            hlTransceiver.before_return_from_set_ch_state.assert_called_once_with(channel_addr=channel_addr,
-                                                                                  current_state=current_state,
-                                                                                  log_msg=log_msg,
-                                                                                  redis_error_msg=log_msg)
-            hlTransceiver.before_return_from_set_ch_state.reset_mock()
+        log_msg = 'Произошла ошибка записи в последовательный порт при установке состояния "Включен"' \
+                  ' на выходе "ch:m1:1". Команда не выполнена.'
+        self.hlt.before_return_from_set_ch_state.assert_called_once_with(channel_addr='ch:m1:1', current_state='4',
+                                                                         log_msg=log_msg, redis_error_msg=log_msg)
+        self.assertFalse(self.hlt.ch_locks['ch:m1:1'].locked())
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_function_does_not_write_in_COM_if_channel_in_fault_power_off_or_lock_state(self):
+    def test_set_ch_state_returns_True_on_success(self):
         """
-        Тест проверяет, что если силовой выход находится в состоянии fault, poff или lock
-        функция HighLowTransceiver.set_ch_state ничего не записывает в последовательный порт
+        Тест проверяет, что если канал перешел в требуемое состояние, функция set_ch_state
+        не вызывает before_return_from_set_ch_state и возвращает True
         """
-        hlTransceiver = self.HighLowTransceiver()
+        self.hlt.before_return_from_set_ch_state = MagicMock()
 
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-        channel_addr = 'ch:{}:1'.format(unit_addr)
-        new_state = {'status': '5'}
+        self.assertTrue(self.hlt.set_ch_state('ch:m1:1', {'status': '5'}))
 
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal2'] = '0'
+        self.hlt.before_return_from_set_ch_state.assert_not_called()
+        self.assertEqual(self.hlt.power_units_state['m1']['st'].state1, '5')
 
-        for current_state in ['2', '6', '7']:
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = current_state
+    def test_set_ch_state_calls_before_return_from_set_ch_state_if_new_state_is_2_6_7(self):
+        """
+        Тест проверяет, что если после отправки команды канал перешел в состояние '2', '6' или '7',
+        функция set_ch_state выключает светодиод канала, вызывает before_return_from_set_ch_state
+        с сообщением об ошибке и возвращает False
+        """
+        self.hlt.unit_addrs_to_transceivers_map['m1'].write.side_effect = \
+            lambda data: self.set_state('m1', state1='7', signal1='7') or True
+        self.hlt.before_return_from_set_ch_state = MagicMock()
 
-            hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict=new_state)
+        self.assertFalse(self.hlt.set_ch_state('ch:m1:1', {'status': '5'}))
 
-            hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].ser.write.assert_not_called()
+        redis_msg = 'Ошибка при установке состояния "Включен" на выходе "ch:m1:1". Текущее состояние:' \
+                    ' "Сработала защита по КЗ или утечке тока", сигнал перехода в состояние: "Короткое замыкание"'
+        self.hlt.before_return_from_set_ch_state.assert_called_once_with(channel_addr='ch:m1:1', current_state='7',
+                                                                         redis_error_msg=redis_msg, log_msg=redis_msg)
+        self.flush_commands('m1')
+        self.assertIn('led inst 1 off m1', self.written('m1'))
+        self.assertFalse(self.hlt.ch_locks['ch:m1:1'].locked())
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_function_calls_before_return_from_set_ch_state_if_new_state_is_already_set(self):
+    def test_set_ch_state_calls_before_return_from_set_ch_state_if_state_does_not_change(self):
         """
-        Тест проверяет, что если функцией HighLowTransceiver.set_ch_state получено
-        новое состояние, которое уже и так установлено на силовом выходе,
-        то она вызывает функцию HighLowTransceiver.before_return_from_set_ch_state
+        Тест проверяет, что если до истечения таймаута канал не перешел в требуемое состояние,
+        функция set_ch_state вызывает before_return_from_set_ch_state с сообщением об ошибке
+        и возвращает False
         """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.before_return_from_set_ch_state = MagicMock()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-        channel_addr = 'ch:{}:1'.format(unit_addr)
+        self.hlt.unit_addrs_to_transceivers_map['m1'].write.side_effect = None
+        self.hlt.unit_addrs_to_transceivers_map['m1'].write.return_value = True
+        self.hlt.await_state = MagicMock(return_value=False)
+        self.hlt.before_return_from_set_ch_state = MagicMock()
 
-        for new_state in ['4', '5']:
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = new_state
+        self.assertFalse(self.hlt.set_ch_state('ch:m1:1', {'status': '5'}))
 
-            hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict={'status': new_state})
+        redis_msg = 'Ошибка при установке состояния "Включен" на выходе "ch:m1:1". Текущее состояние:' \
+                    ' "Выключен", сигнал перехода в состояние: "Сигнал к началу работы КАС"'
+        self.hlt.before_return_from_set_ch_state.assert_called_once_with(channel_addr='ch:m1:1', current_state='4',
+                                                                         redis_error_msg=redis_msg, log_msg=redis_msg)
+        self.assertFalse(self.hlt.ch_locks['ch:m1:1'].locked())
 
-            humanreadable_state = hlTransceiver.humanreadable_states[new_state]
 
-            log_msg = 'Выполнение команды не требуется. Выход "{}" уже находится в состоянии "{}"'.format(
-                channel_addr, humanreadable_state)
+class TestInitPowerUnit(HighLowTransceiverTestBase):
 
-            hlTransceiver.before_return_from_set_ch_state.assert_called_once_with(channel_addr=channel_addr,
-                                                                                  current_state=new_state,
-                                                                                  log_msg=log_msg)
-            hlTransceiver.before_return_from_set_ch_state.reset_mock()
+    def setUp(self):
+        super().setUp()
+        sleep_patcher = patch('axiomLowLevelCommunication.highLowTransceiver.time.sleep')
+        sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+        self.hlt.redis.mget.return_value = [None, None]
+        self.hlt.run_power_unit = MagicMock(return_value=True)
+        self.hlt.configure_power_unit = MagicMock(return_value=True)
+        self.hlt.restore_channel_states = MagicMock()
+
+    def mock_locks(self, unit_addr, first=True, second=True):
+        for position, acquired in (('1', first), ('2', second)):
+            lock = MagicMock()
+            lock.acquire.return_value = acquired
+            lock.release.return_value = None
+            self.hlt.ch_locks['ch:{}:{}'.format(unit_addr, position)] = lock
+        return self.hlt.ch_locks['ch:{}:1'.format(unit_addr)], self.hlt.ch_locks['ch:{}:2'.format(unit_addr)]
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_function_does_not_write_in_COM_if_new_state_is_already_set(self):
+    def test_init_power_unit_acquires_lock_for_both_channel(self):
         """
-        Тест проверяет, что если функцией HighLowTransceiver.set_ch_state получено
-        новое состояние, которое уже и так установлено на силовом выходе,
-        то она ничего не записывает в последовательный порт
+        Тест проверяет, что функция init_power_unit блокирует управление обоими каналами модуля
+        и снимает блокировку после инициализации
         """
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-        channel_addr = 'ch:{}:1'.format(unit_addr)
+        ch1_lock, ch2_lock = self.mock_locks('m1')
 
-        for new_state in ['4', '5']:
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = new_state
+        self.assertTrue(self.hlt.init_power_unit('m1'))
 
-            hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict={'status': new_state})
+        ch1_lock.acquire.assert_called_once_with(timeout=3)
+        ch2_lock.acquire.assert_called_once_with(timeout=3)
+        ch1_lock.release.assert_called_once_with()
+        ch2_lock.release.assert_called_once_with()
 
-            hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].ser.write.assert_not_called()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_function_use_ch_lock_during_command_sending(self):
+    def test_init_power_unit_returns_False_and_log_error_if_cant_acquire_first_lock(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.set_ch_state
-        блокирует управление каналом на время отправки команды
-        и проверки результата ее выполнения
+        Тест проверяет, что если не удается заблокировать управление первым каналом и модуль
+        не инициализирован другим потоком, функция init_power_unit логирует ошибку и возвращает False
         """
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-        channel_addr = 'ch:{}:1'.format(unit_addr)
-
-        hlTransceiver.ch_locks[channel_addr] = MagicMock(spec=threading.Lock())
-
-        for new_state, current_state in zip(['4', '5'], ['5', '4']):
-
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal1'] = '0'
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal2'] = '0'
+        self.mock_locks('m1', first=False)
+        self.hlt.wait_for_unit_state = MagicMock(return_value=False)
 
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = current_state
+        self.assertFalse(self.hlt.init_power_unit('m1'))
 
-            hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict={'status': new_state})
+        self.logger.error.assert_called_once_with('Ошибка при инициализации модуля "m1":'
+                                                  ' не удается заблокировать управление первым каналом')
+        self.hlt.run_power_unit.assert_not_called()
 
-            hlTransceiver.ch_locks[channel_addr].acquire.assert_called()
-            hlTransceiver.ch_locks[channel_addr].release.assert_called()
-            hlTransceiver.ch_locks[channel_addr].acquire.reset_mock()
-            hlTransceiver.ch_locks[channel_addr].release.reset_mock()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_function_does_not_call_serialTransceiver_write_if_channel_is_locked(self):
+    def test_init_power_unit_returns_False_and_log_error_if_cant_acquire_second_lock(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.set_ch_state
-        не вызывает функцию SerialTransceiver.write, если управление
-        каналом заблокировано
+        Тест проверяет, что если не удается заблокировать управление вторым каналом и модуль
+        не инициализирован другим потоком, функция init_power_unit снимает блокировку первого канала,
+        логирует ошибку и возвращает False
         """
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-        channel_addr = 'ch:{}:1'.format(unit_addr)
+        ch1_lock, _ = self.mock_locks('m1', second=False)
+        self.hlt.wait_for_unit_state = MagicMock(return_value=False)
 
-        serTransceiver = hlTransceiver.unit_addrs_to_transceivers_map[unit_addr]
-        serTransceiver.write = MagicMock()
+        self.assertFalse(self.hlt.init_power_unit('m1'))
 
-        hlTransceiver.ch_locks[channel_addr].acquire()
+        ch1_lock.release.assert_called_once_with()
+        self.logger.error.assert_called_once_with('Ошибка при инициализации модуля "m1":'
+                                                  ' не удается заблокировать управление вторым каналом')
+        self.hlt.run_power_unit.assert_not_called()
 
-        for new_state, current_state in zip(['4', '5'], ['5', '4']):
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = current_state
-            hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict={'status': new_state})
-            serTransceiver.write.assert_not_called()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_function_calls_serialTransceiver_write_after_channel_is_unlocked(self):
+    def test_init_power_unit_returns_True_if_unit_is_initialized_by_another_thread(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.set_ch_state вызавает
-        функцию SerialTransceiver.write, после того, как снимается
-        блокировка управления каналом
+        Тест проверяет, что если управление каналами заблокировано, но модуль инициализирован
+        другим потоком, функция init_power_unit возвращает True
         """
-        hlTransceiver = self.HighLowTransceiver()
+        for first, second in ((False, True), (True, False)):
+            self.mock_locks('m1', first=first, second=second)
+            self.assertTrue(self.hlt.init_power_unit('m1'))
 
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-        channel_addr = 'ch:{}:1'.format(unit_addr)
+        self.hlt.run_power_unit.assert_not_called()
+        self.logger.error.assert_not_called()
 
-        serTransceiver = hlTransceiver.unit_addrs_to_transceivers_map[unit_addr]
-        serTransceiver.write = MagicMock()
+    def test_init_power_unit_calls_run_power_unit_if_current_state_is_0(self):
+        """
+        Тест проверяет, что функция init_power_unit запускает модуль, если хотя бы один из каналов
+        в состоянии '0', и не запускает в остальных случаях
+        """
+        self.set_state('m1', state1='0')
+        self.hlt.init_power_unit('m1')
+        self.hlt.run_power_unit.assert_called_once_with(unit_addr='m1')
 
-        for new_state, current_state, current_signal in zip(['4', '5'], ['5', '4'], ['0', '0']):
-            hlTransceiver.ch_locks[channel_addr].acquire()
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = current_state
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal1'] = current_signal
-            threading.Thread(target=hlTransceiver.set_ch_state, args=(channel_addr, {'status': new_state})).start()
-            time.sleep(0.1)
-            # пока управление каналом заблокировано, функция SerialTransceiver.write не вызывается
-            serTransceiver.write.assert_not_called()
-            hlTransceiver.ch_locks[channel_addr].release()
-            time.sleep(0.1)
-            # после того, как было разблокировано управление каналом, функция SerialTransceiver.write была вызвана
-            serTransceiver.write.assert_called()
-            serTransceiver.write.reset_mock()
+        self.hlt.run_power_unit.reset_mock()
+        self.set_state('m1', state1='4')
+        self.hlt.init_power_unit('m1')
+        self.hlt.run_power_unit.assert_not_called()
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_calls_before_return_from_set_ch_state_if_lock_is_not_released_before_timeout_expiration(self):
+    def test_init_power_unit_returns_False_and_releases_locks_if_unit_cant_be_run(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.set_ch_state
-        вызывает функцию HighLowTransceiver.before_return_from_set_ch_state,
-        если блокировка управления каналом не снимается до истечения таймаута
+        Тест проверяет, что если модуль не удалось запустить, функция init_power_unit снимает
+        блокировку управления каналами и возвращает False
         """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.before_return_from_set_ch_state = MagicMock()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-        channel_addr = 'ch:{}:1'.format(unit_addr)
+        self.set_state('m1', state2='0')
+        self.hlt.run_power_unit.return_value = False
 
-        for new_state, current_state in zip(['4', '5'], ['5', '4']):
-            hlTransceiver.ch_locks[channel_addr].acquire()
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = current_state
-            hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict={'status': new_state})
+        self.assertFalse(self.hlt.init_power_unit('m1'))
 
-            humanreadable_new_state = hlTransceiver.humanreadable_states[new_state]
-            log_msg = 'Невозможно установить состояние "{}" на выходе "{}":' \
-                      ' управление заблокировано другим потоком'.format(humanreadable_new_state, channel_addr)
+        self.assertFalse(self.hlt.ch_locks['ch:m1:1'].locked())
+        self.assertFalse(self.hlt.ch_locks['ch:m1:2'].locked())
+        self.hlt.configure_power_unit.assert_not_called()
+        self.hlt.restore_channel_states.assert_not_called()
 
-            hlTransceiver.before_return_from_set_ch_state.assert_called_once_with(channel_addr=channel_addr,
-                                                                                  current_state=current_state,
-                                                                                  log_msg=log_msg,
-                                                                                  redis_error_msg=log_msg)
-            hlTransceiver.before_return_from_set_ch_state.reset_mock()
+    def test_init_power_unit_calls_configure_power_unit_if_current_state_is_3(self):
+        """
+        Тест проверяет, что функция init_power_unit конфигурирует модуль, если хотя бы один из каналов
+        в состоянии '3', и не конфигурирует в остальных случаях
+        """
+        self.set_state('m1', state2='3')
+        self.hlt.init_power_unit('m1')
+        self.hlt.configure_power_unit.assert_called_once_with(unit_addr='m1')
 
-            hlTransceiver.ch_locks[channel_addr].release()
+        self.hlt.configure_power_unit.reset_mock()
+        self.set_state('m1', state2='5')
+        self.hlt.init_power_unit('m1')
+        self.hlt.configure_power_unit.assert_not_called()
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_function_write_correct_cmd(self):
+    def test_init_power_unit_returns_False_and_releases_locks_if_unit_cant_be_configured(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.set_ch_state
-        правильно формирует команду для записи в последовательный порт
+        Тест проверяет, что если модуль не удалось сконфигурировать, функция init_power_unit снимает
+        блокировку управления каналами и возвращает False
         """
-        hlTransceiver = self.HighLowTransceiver()
+        self.set_state('m1', state1='3')
+        self.hlt.configure_power_unit.return_value = False
 
-        for unit_addr in self.test_axiom_settings['power units']:
+        self.assertFalse(self.hlt.init_power_unit('m1'))
 
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal1'] = '0'
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal2'] = '0'
+        self.assertFalse(self.hlt.ch_locks['ch:m1:1'].locked())
+        self.assertFalse(self.hlt.ch_locks['ch:m1:2'].locked())
+        self.hlt.restore_channel_states.assert_not_called()
 
-            for channel_position in ['1', '2']:
-                channel_addr = 'ch:{}:{}'.format(unit_addr, channel_position)
+    def test_init_power_unit_calls_configure_after_run(self):
+        """
+        Тест проверяет, что если после запуска каналы модуля перешли в состояние '3',
+        функция init_power_unit конфигурирует модуль
+        """
+        self.set_state('m1', state1='0', state2='0')
+        self.hlt.run_power_unit.side_effect = lambda unit_addr: self.set_state(unit_addr, state1='3',
+                                                                               state2='3') or True
 
-                serTransceiver = hlTransceiver.unit_addrs_to_transceivers_map[unit_addr]
-                serTransceiver.write = MagicMock()
+        self.assertTrue(self.hlt.init_power_unit('m1'))
 
-                for new_state, current_state in zip(['4', '5'], ['5', '4']):
+        self.hlt.run_power_unit.assert_called_once_with(unit_addr='m1')
+        self.hlt.configure_power_unit.assert_called_once_with(unit_addr='m1')
 
-                    hlTransceiver.power_units_state_dicts[unit_addr]['st']['state{}'.format(channel_position)] = current_state
+    def test_init_power_unit_returns_True_and_releases_locks_if_unit_is_run_and_configured(self):
+        """
+        Тест проверяет, что после успешного запуска и конфигурации модуля функция init_power_unit
+        снимает блокировку управления каналами и возвращает True
+        """
+        self.set_state('m1', state1='0', state2='3')
 
-                    # команда для отправки
-                    if new_state == '4':
-                        ch_cmd = 'ch {} off {}'.format(channel_position, unit_addr)
-                    elif new_state == '5':
-                        ch_cmd = 'ch {} on {}'.format(channel_position, unit_addr)
+        self.assertTrue(self.hlt.init_power_unit('m1'))
 
-                    hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict={'status': new_state})
-                    serTransceiver.write.assert_called_with(ch_cmd)
+        self.assertFalse(self.hlt.ch_locks['ch:m1:1'].locked())
+        self.assertFalse(self.hlt.ch_locks['ch:m1:2'].locked())
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_calls_before_return_from_set_ch_state_if_SerialTransceiver_write_fails(self):
+    def test_init_power_unit_restore_saved_channels_state(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.set_ch_state
-        вызывает функцию HighLowTransceiver.before_return_from_set_ch_state
-        в случае неудачной записи в последовательный порт
+        Тест проверяет, что после инициализации функция init_power_unit восстанавливает состояние каналов,
+        сохраненное в БД
         """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.before_return_from_set_ch_state = MagicMock()
-
-        for unit_addr in self.test_axiom_settings['power units']:
-            for channel_position in ['1', '2']:
-                channel_addr = 'ch:{}:{}'.format(unit_addr, channel_position)
+        raw_prev_states = [json.dumps({'status': '5'}), json.dumps({'status': '4'})]
+        self.hlt.redis.mget.return_value = raw_prev_states
 
-                serTransceiver = hlTransceiver.unit_addrs_to_transceivers_map[unit_addr]
-                serTransceiver.write = MagicMock(return_value=False)
+        self.hlt.init_power_unit('m1')
 
-                for new_state, current_state in zip(['4', '5'], ['5', '4']):
+        self.hlt.redis.mget.assert_called_once_with(['ch:m1:1', 'ch:m1:2'])
+        self.hlt.restore_channel_states.assert_called_once_with('m1', raw_prev_states)
 
-                    hlTransceiver.power_units_state_dicts[unit_addr]['st']['state{}'.format(channel_position)] = current_state
 
-                    hlTransceiver.set_ch_state(channel_addr=channel_addr, new_state_dict={'status': new_state})
+class TestRestoreChannelStates(HighLowTransceiverTestBase):
 
-                    humanreadable_new_state = hlTransceiver.humanreadable_states[new_state]
+    def setUp(self):
+        super().setUp()
+        self.hlt.set_ch_state = MagicMock()
 
-                    log_msg = 'Произошла ошибка записи в последовательный порт' \
-                              ' при установке состояния "{}" на выходе "{}". Команда не выполнена.'.format(
-                               humanreadable_new_state, channel_addr)
+    def test_restore_channel_states_turns_on_saved_channels(self):
+        """
+        Тест проверяет, что выходы, включенные до перезагрузки модуля, включаются, после чего
+        включаются их светодиоды
+        """
+        self.hlt.restore_channel_states('m1', [json.dumps({'status': '5'}), json.dumps({'status': '4'})])
 
-                    hlTransceiver.before_return_from_set_ch_state.assert_called_once_with(channel_addr=channel_addr,
-                                                                                          current_state=current_state,
-                                                                                          log_msg=log_msg,
-                                                                                          redis_error_msg=log_msg)
-                    hlTransceiver.before_return_from_set_ch_state.reset_mock()
+        self.flush_commands('m1')
+        self.assertEqual(self.written('m1'), ['ch 1 on m1', 'led inst 1 on m1', 'led inst 0 off m1'])
+        self.assertEqual(self.hlt.power_units_state['m1']['st'].state1, '5')
+        self.hlt.set_ch_state.assert_not_called()
+        self.assertFalse(self.hlt.ch_locks['ch:m1:1'].locked())
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_calls_before_return_from_set_ch_state_on_success(self):
+    def test_restore_channel_states_ignores_invalid_saved_states(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.set_ch_state
-        вызывает HighLowTransceiver.before_return_from_set_ch_state
-        при успешном выполнении команды
+        Тест проверяет, что некорректные или отсутствующие в БД состояния не восстанавливаются
         """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.before_return_from_set_ch_state = MagicMock()
+        self.hlt.restore_channel_states('m1', ['garbage', None])
+        self.hlt.restore_channel_states('m1', [json.dumps({'state': '5'}), json.dumps(5)])
 
-        for unit_addr in self.test_axiom_settings['power units']:
-            for channel_position in ['1', '2']:
-                channel_addr = 'ch:{}:{}'.format(unit_addr, channel_position)
+        self.assertEqual(self.written('m1'), [])
+        self.hlt.set_ch_state.assert_not_called()
 
-                serTransceiver = hlTransceiver.unit_addrs_to_transceivers_map[unit_addr]
-                serTransceiver.write = MagicMock()
+    def test_restore_channel_states_calls_set_ch_state_if_channel_is_not_off(self):
+        """
+        Тест проверяет, что выход, который не находится в состоянии '4', включается функцией set_ch_state
+        без замещения команд модуля "Логика"
+        """
+        self.set_state('m1', state2='6')
 
-                for new_state, current_state in zip(['4', '5'], ['5', '4']):
+        self.hlt.restore_channel_states('m1', [None, json.dumps({'status': '5'})])
 
-                    hlTransceiver.power_units_state_dicts[unit_addr]['st']['state{}'.format(channel_position)] = current_state
+        self.assertEqual(self.written('m1'), [])
+        self.hlt.set_ch_state.assert_called_once_with(channel_addr='ch:m1:2', new_state_dict={'status': '5'},
+                                                      supersede=False)
 
-                    threading.Thread(target=hlTransceiver.set_ch_state,
-                                     args=(channel_addr, {'status': new_state})).start()
 
-                    time.sleep(0.01)
+class TestRunPowerUnit(HighLowTransceiverTestBase):
 
-                    hlTransceiver.power_units_state_dicts[unit_addr]['st'][
-                        'state{}'.format(channel_position)] = new_state
+    def setUp(self):
+        super().setUp()
+        sleep_patcher = patch('axiomLowLevelCommunication.highLowTransceiver.time.sleep')
+        sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
 
-                    time.sleep(0.05)
+        self.set_state('m1', state1='0', state2='0', signal1='0', signal2='0')
+        self.write = self.hlt.unit_addrs_to_transceivers_map['m1'].write
+        self.write.side_effect = self.execute_run
 
-                    humanreadable_new_state = hlTransceiver.humanreadable_states[new_state]
-                    log_msg = 'Установлено состояние "{}" на выходе "{}"'.format(humanreadable_new_state, channel_addr)
-                    hlTransceiver.before_return_from_set_ch_state.assert_called_once_with(channel_addr=channel_addr,
-                                                                                          current_state=new_state,
-                                                                                          log_msg=log_msg)
-                    hlTransceiver.before_return_from_set_ch_state.reset_mock()
+    def execute_run(self, data):
+        """
+        Эмулирует запуск силового модуля: каналы переходят в состояние '3'
+        """
+        self.set_state('m1', state1='3', state2='3', signal1='2', signal2='2')
+        return True
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_calls_before_return_from_set_ch_state_if_new_state_is_2_6_7(self):
+    def test_run_power_unit_calls_serial_write_with_correct_cmd(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.set_ch_state
-        вызывает функцию HighLowTransceiver.before_return_from_set_ch_state,
-        если после отправки записи команды в последовательный порт, силовой
-        выход переходит в состояние 2 (fault), 6(poff) или 7(lock)
+        Тест проверяет, что функция run_power_unit пишет в порт команду запуска модуля
         """
-        hlTransceiver = self.HighLowTransceiver()
+        self.hlt.run_power_unit('m1')
 
-        for unit_addr in self.test_axiom_settings['power units']:
-            for channel_position in ['1', '2']:
-                channel_addr = 'ch:{}:{}'.format(unit_addr, channel_position)
+        self.write.assert_called_once_with('run start m1')
 
-                hlTransceiver.before_return_from_set_ch_state = MagicMock()
+    def test_run_power_unit_calls_serial_write_again_if_it_returns_False(self):
+        """
+        Тест проверяет, что если команду не удалось записать в порт, функция run_power_unit
+        повторяет попытку
+        """
+        self.write.side_effect = [False, False, True]
+        self.hlt.wait_for_unit_state = MagicMock(return_value=True)
 
-                for new_state, current_state in zip(['4', '5'], ['5', '4']):
-                    for result_state, result_signal in zip(['2', '6', '7'], ['3', '10', '14']):
+        self.assertTrue(self.hlt.run_power_unit('m1'))
 
-                        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state{}'.format(channel_position)] = current_state
+        self.assertEqual(self.write.call_count, 3)
 
-                        threading.Thread(target=hlTransceiver.set_ch_state,
-                                         args=(channel_addr, {'status': new_state})).start()
+    def test_run_power_unit_returns_False_and_log_error_if_serial_write_returns_False(self):
+        """
+        Тест проверяет, что если команду не удалось записать в порт ни с одной попытки,
+        функция run_power_unit логирует ошибку и возвращает False
+        """
+        self.write.side_effect = None
+        self.write.return_value = False
 
-                        time.sleep(0.1)
+        self.assertFalse(self.hlt.run_power_unit('m1', retries=2))
 
-                        # Устанавливаем состояние и сигнал, получившиеся после отправки команды
-                        hlTransceiver.power_units_state_dicts[unit_addr]['st'][
-                            'state{}'.format(channel_position)] = result_state
-                        hlTransceiver.power_units_state_dicts[unit_addr]['st'][
-                            'signal{}'.format(channel_position)] = result_signal
+        self.assertEqual(self.write.call_count, 3)
+        self.logger.error.assert_called_once_with('Ошибка при выполнении запуска модуля "m1". Текущее состояние'
+                                                  ' выходов: "ch:m1:1" - "Начальное состояние", "ch:m1:2" -'
+                                                  ' "Начальное состояние"')
 
-                        time.sleep(0.1)
+    def test_run_power_unit_returns_False_and_log_error_if_state_doesnt_change_before_timeout_expired(self):
+        """
+        Тест проверяет, что если до истечения таймаута каналы не вышли из состояний '0' и '1',
+        функция run_power_unit повторяет попытку, а после всех попыток логирует ошибку и возвращает False
+        """
+        self.write.side_effect = None
+        self.write.return_value = True
+        self.hlt.wait_for_unit_state = MagicMock(return_value=False)
 
-                        humanreadable_new_state = hlTransceiver.humanreadable_states[new_state]
-                        humanreadable_result_state = hlTransceiver.humanreadable_states[result_state]
-                        humanreadable_result_signal = hlTransceiver.humanreadable_signals[result_signal]
+        self.assertFalse(self.hlt.run_power_unit('m1'))
 
-                        redis_msg = 'Ошибка при установке состояния "{}" на выходе "{}".' \
-                                    ' Текущее состояние: "{}", сигнал перехода в состояние: "{}"'.format(
-                                     humanreadable_new_state, channel_addr, humanreadable_result_state,
-                                     humanreadable_result_signal)
-                        log_msg = redis_msg
-                        hlTransceiver.before_return_from_set_ch_state.assert_called_with(channel_addr=channel_addr,
-                                                                                         current_state=result_state,
-                                                                                         redis_error_msg=redis_msg,
-                                                                                         log_msg=log_msg)
-                        hlTransceiver.before_return_from_set_ch_state.reset_mock()
+        self.assertEqual(self.write.call_count, 4)
+        self.assertEqual(self.hlt.wait_for_unit_state.call_count, 4)
+        self.logger.error.assert_called_once_with('Ошибка при выполнении запуска модуля "m1". Текущее состояние'
+                                                  ' выходов: "ch:m1:1" - "Начальное состояние", "ch:m1:2" -'
+                                                  ' "Начальное состояние"')
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_set_ch_state_calls_before_return_from_set_ch_state_if_state_does_not_change(self):
+    def test_run_power_unit_returns_True_and_log_success_if_state_changes(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.set_ch_state
-        вызывает функцию обработки выхода HighLowTransceiver.before_return_from_set_ch_state,
-        если после отправки записи команды в последовательный порт состояние
-        выхода не меняется до истечения таймаута
+        Тест проверяет, что если каналы вышли из состояний '0' и '1', функция run_power_unit
+        не повторяет команду, логирует успешный запуск и возвращает True
         """
-        hlTransceiver = self.HighLowTransceiver()
+        self.assertTrue(self.hlt.run_power_unit('m1'))
 
-        for unit_addr in self.test_axiom_settings['power units']:
-            for channel_position in ['1', '2']:
-                channel_addr = 'ch:{}:{}'.format(unit_addr, channel_position)
+        self.assertEqual(self.write.call_count, 1)
+        self.logger.error.assert_called_once_with('Запуск модуля "m1" выполнен. Текущее состояние выходов:'
+                                                  ' "ch:m1:1" - "Ожидается конфигурация", "ch:m1:2" -'
+                                                  ' "Ожидается конфигурация"')
 
-                hlTransceiver.before_return_from_set_ch_state = MagicMock()
 
-                for new_state, current_state, current_signal in zip(['4', '5'], ['5', '4'], ['12', '13']):
+class TestConfigurePowerUnit(HighLowTransceiverTestBase):
 
-                    hlTransceiver.power_units_state_dicts[unit_addr]['st']['state{}'.format(channel_position)] = current_state
-                    hlTransceiver.power_units_state_dicts[unit_addr]['st']['signal{}'.format(channel_position)] = current_signal
+    # Команды конфигурации модуля m1 (пороги [1, 2] А по току потребления, [0.01, 0.02] А по току утечки)
+    consumption_current_cmd = 'adc hgrp 16 32 239 42 m1'
+    leak_current_cmd = 'adc hlgrp 14 29 179 163 m1'
 
-                    threading.Thread(target=hlTransceiver.set_ch_state,
-                                     args=(channel_addr, {'status': new_state})).start()
+    def setUp(self):
+        super().setUp()
+        sleep_patcher = patch('axiomLowLevelCommunication.highLowTransceiver.time.sleep')
+        sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
 
-                    time.sleep(3.1)
+        self.set_state('m1', state1='3', state2='3', signal1='2', signal2='2')
+        self.write = self.hlt.unit_addrs_to_transceivers_map['m1'].write
+        self.write.side_effect = self.execute_configuration
 
-                    humanreadable_new_state = hlTransceiver.humanreadable_states[new_state]
-                    humanreadable_result_state = hlTransceiver.humanreadable_states[current_state]
-                    humanreadable_result_signal = hlTransceiver.humanreadable_signals[current_signal]
+    def execute_configuration(self, data):
+        """
+        Эмулирует конфигурацию силового модуля: после получения порогов по току утечки
+        каналы переходят в состояние '4'
+        """
+        if data.startswith('adc hlgrp'):
+            self.set_state('m1', state1='4', state2='4', signal1='9', signal2='9')
+        return True
 
-                    redis_msg = 'Ошибка при установке состояния "{}" на выходе "{}".' \
-                                ' Текущее состояние: "{}", сигнал перехода в состояние: "{}"'.format(
-                                 humanreadable_new_state, channel_addr, humanreadable_result_state,
-                                 humanreadable_result_signal)
-                    log_msg = redis_msg
-                    hlTransceiver.before_return_from_set_ch_state.assert_called_with(channel_addr=channel_addr,
-                                                                                     current_state=current_state,
-                                                                                     redis_error_msg=redis_msg,
-                                                                                     log_msg=log_msg)
-                    hlTransceiver.before_return_from_set_ch_state.reset_mock()\
+    def test_build_configuration_cmds(self):
+        """
+        Тест проверяет, что команды конфигурации формируются по настройкам модуля
+        """
+        self.assertEqual(self.hlt.build_configuration_cmds('m1'),
+                         (self.consumption_current_cmd, self.leak_current_cmd))
 
+    def test_configure_power_unit_calls_serial_write_with_correct_cmd(self):
+        """
+        Тест проверяет, что функция configure_power_unit пишет в порт команды установки порогов
+        """
+        self.hlt.configure_power_unit('m1')
 
-class TestInitPowerUnit(HighLowTransceiverTestBase):
-    """
-    Тесты функции инициализации силового модуля
-    HighLowTransceiver.init_power_unit
-    """
+        self.assertEqual(self.written('m1'), [self.consumption_current_cmd, self.leak_current_cmd])
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_acquires_lock_for_both_channel(self):
+    def test_configure_power_unit_calls_serial_write_again_if_it_returns_False(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.init_power_unit
-        блокирует управление обоими каналами модуля
+        Тест проверяет, что если команду не удалось записать в порт, функция configure_power_unit
+        повторяет попытку
         """
+        self.write.side_effect = [False, True, False, True, True]
+        self.hlt.wait_for_unit_state = MagicMock(return_value=True)
 
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
+        self.assertTrue(self.hlt.configure_power_unit('m1'))
 
-        ch1_lock = hlTransceiver.ch_locks['ch:{}:1'.format(unit_addr)] = MagicMock(
-            spec=hlTransceiver.ch_locks['ch:{}:1'.format(unit_addr)])
-        ch2_lock = hlTransceiver.ch_locks['ch:{}:2'.format(unit_addr)] = MagicMock(
-            spec=hlTransceiver.ch_locks['ch:{}:2'.format(unit_addr)])
+        self.assertEqual(self.written('m1'), [self.consumption_current_cmd, self.consumption_current_cmd,
+                                              self.leak_current_cmd, self.consumption_current_cmd,
+                                              self.leak_current_cmd])
 
-        ch1_lock.acquire = MagicMock(return_value=True)
-        ch2_lock.acquire = MagicMock(return_value=True)
+    def test_configure_power_unit_returns_False_and_log_error_if_serial_write_returns_False(self):
+        """
+        Тест проверяет, что если команды не удалось записать в порт ни с одной попытки,
+        функция configure_power_unit логирует ошибку и возвращает False
+        """
+        self.write.side_effect = None
+        self.write.return_value = False
 
-        hlTransceiver.init_power_unit(unit_addr)
+        self.assertFalse(self.hlt.configure_power_unit('m1', retries=2))
 
-        ch1_lock.acquire.assert_called_once()
-        ch2_lock.acquire.assert_called_once()
+        self.assertEqual(self.write.call_count, 3)
+        self.logger.error.assert_called_once_with('Ошибка1 при выполнении конфигурации модуля "m1". Текущее'
+                                                  ' состояние выходов: "ch:m1:1" - "Ожидается конфигурация",'
+                                                  ' "ch:m1:2" - "Ожидается конфигурация"')
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_returns_False_if_cant_acquire_first_lock(self):
+    def test_configure_power_unit_returns_False_and_log_error_if_state_doesnt_change_before_timeout_expired(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.init_power_unit
-        возвращает False, если не может заблокировать управление первым каналом
+        Тест проверяет, что если до истечения таймаута каналы не вышли из состояния '3',
+        функция configure_power_unit повторяет попытку, а после всех попыток логирует ошибку и возвращает False
         """
-        hlTransceiver = self.HighLowTransceiver()
+        self.write.side_effect = None
+        self.write.return_value = True
+        self.hlt.wait_for_unit_state = MagicMock(return_value=False)
 
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
+        self.assertFalse(self.hlt.configure_power_unit('m1'))
 
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
+        self.assertEqual(self.write.call_count, 8)
+        self.logger.error.assert_called_once_with('Ошибка1 при выполнении конфигурации модуля "m1". Текущее'
+                                                  ' состояние выходов: "ch:m1:1" - "Ожидается конфигурация",'
+                                                  ' "ch:m1:2" - "Ожидается конфигурация"')
 
-        ch1_lock = hlTransceiver.ch_locks['ch:{}:1'.format(unit_addr)] = MagicMock(
-            spec=hlTransceiver.ch_locks['ch:{}:1'.format(unit_addr)])
-        ch1_lock.acquire.return_value = False
-
-        self.assertEqual(hlTransceiver.init_power_unit(unit_addr), False)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_log_error_if_cant_acquire_first_lock(self):
+    def test_configure_power_unit_returns_True_and_log_success_if_state_changes(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.init_power_unit
-        логирует ошибку, если не может заблокировать управление первым каналом
+        Тест проверяет, что если каналы вышли из состояния '3', функция configure_power_unit
+        не повторяет команды, логирует успешную конфигурацию и возвращает True
         """
-        hlTransceiver = self.HighLowTransceiver()
+        self.assertTrue(self.hlt.configure_power_unit('m1'))
 
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
+        self.assertEqual(self.write.call_count, 2)
+        self.logger.info.assert_called_once_with('Конфигурация модуля "m1" выполнена. Текущее состояние выходов:'
+                                                 ' "ch:m1:1" - "Выключен", "ch:m1:2" - "Выключен"')
 
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
 
-        ch1_lock = hlTransceiver.ch_locks['ch:{}:1'.format(unit_addr)] = MagicMock(
-            spec=hlTransceiver.ch_locks['ch:{}:1'.format(unit_addr)])
-        ch1_lock.acquire.return_value = False
+class TestWriterTarget(HighLowTransceiverTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.hlt.command_executor = MagicMock()
+        self.hlt.insulation_executor = MagicMock()
+        self.subscriber = self.hlt.redis.pubsub.return_value
 
-        hlTransceiver.init_power_unit(unit_addr)
+    def run_writer(self, *messages):
+        """
+        Запускает writer_target, который получает сообщения messages и останавливается
+        """
+        self.hlt.isRunning = True
+        messages = list(messages)
 
-        log_msg = 'Ошибка при инициализации модуля "{}":' \
-                  ' не удается заблокировать управление первым каналом'.format(unit_addr)
+        def get_message(timeout):
+            if not messages:
+                self.hlt.isRunning = False
+                return None
+            return messages.pop(0)
 
-        self.logger.write_log.assert_called_once_with(log_msg=log_msg, log_level='ERROR')
+        self.subscriber.get_message.side_effect = get_message
+        self.hlt.writer_target()
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_returns_False_if_cant_acquire_second_lock(self):
+    def test_writer_target_subscribes_to_correct_channels(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.init_power_unit
-        возвращает False, если не может заблокировать управление вторым каналом
+        Тест проверяет, что writer_target подписывается одним подписчиком на каналы команд
+        и закрывает подписчика после остановки
         """
-        hlTransceiver = self.HighLowTransceiver()
+        self.run_writer()
 
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
+        self.hlt.redis.pubsub.assert_called_once_with(ignore_subscribe_messages=True)
+        self.subscriber.subscribe.assert_called_once_with('axiomLogic:cmd:state', 'axiomLogic:request:insulation')
+        self.subscriber.close.assert_called_once_with()
 
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        ch2_lock = hlTransceiver.ch_locks['ch:{}:2'.format(unit_addr)] = MagicMock(
-            spec=hlTransceiver.ch_locks['ch:{}:2'.format(unit_addr)])
-        ch2_lock.acquire.return_value = False
+    def test_writer_target_calls_subscriber_get_message_while_isRunning(self):
+        """
+        Тест проверяет, что writer_target ожидает сообщения, пока не будет остановлен
+        """
+        self.run_writer(None, None)
 
-        self.assertEqual(hlTransceiver.init_power_unit(unit_addr), False)
+        self.assertEqual(self.subscriber.get_message.call_count, 3)
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_log_error_if_cant_acquire_second_lock(self):
+    def test_writer_target_submits_set_ch_state_if_gets_cmd_for_ch(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.init_power_unit
-        логирует ошибку, если не может заблокировать управление вторым каналом
+        Тест проверяет, что команда установки состояния канала ставится в очередь канала исполнителя
         """
-        hlTransceiver = self.HighLowTransceiver()
+        self.run_writer({'channel': 'axiomLogic:cmd:state',
+                         'data': json.dumps({'addr': 'ch:m1:2', 'state': {'status': '5'}})})
 
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
+        self.hlt.command_executor.submit.assert_called_once_with('ch:m1:2', 'state', self.hlt.set_ch_state,
+                                                                 'ch:m1:2', {'status': '5'}, replace=True)
 
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
+    def test_writer_target_doesnt_submit_set_ch_state_if_gets_cmd_not_for_ch(self):
+        """
+        Тест проверяет, что некорректные команды установки состояния не выполняются
+        """
+        self.run_writer({'channel': 'axiomLogic:cmd:state', 'data': json.dumps({'addr': 'm1', 'state': {}})},
+                        {'channel': 'axiomLogic:cmd:state', 'data': 'garbage'},
+                        {'channel': 'axiomLogic:cmd:state', 'data': json.dumps({'state': {'status': '5'}})},
+                        {'channel': 'some:channel', 'data': json.dumps({'addr': 'ch:m1:2', 'state': {}})})
 
-        ch2_lock = hlTransceiver.ch_locks['ch:{}:2'.format(unit_addr)] = MagicMock(
-            spec=hlTransceiver.ch_locks['ch:{}:2'.format(unit_addr)])
-        ch2_lock.acquire.return_value = False
+        self.hlt.command_executor.submit.assert_not_called()
 
-        hlTransceiver.init_power_unit(unit_addr)
+    def test_writer_target_rejects_cmd_if_queue_is_full(self):
+        """
+        Тест проверяет, что если очередь канала исполнителя переполнена, команда отклоняется,
+        а сообщение об ошибке публикуется на брокер
+        """
+        self.hlt.command_executor.submit.return_value = False
 
-        log_msg = 'Ошибка при инициализации модуля "{}":' \
-                  ' не удается заблокировать управление вторым каналом'.format(unit_addr)
+        self.run_writer({'channel': 'axiomLogic:cmd:state',
+                         'data': json.dumps({'addr': 'ch:m1:2', 'state': {'status': '5'}})})
 
-        self.logger.write_log.assert_called_once_with(log_msg=log_msg, log_level='ERROR')
+        log_msg = 'Команда установки состояния {\'status\': \'5\'} на выходе "ch:m1:2" отклонена:' \
+                  ' очередь команд переполнена'
+        self.logger.error.assert_called_once_with(log_msg)
+        self.hlt.redis_writer.publish.assert_called_once_with(channel='axiomLowLevelCommunication:info:error',
+                                                              message=log_msg)
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_releases_first_lock_if_cant_get_second(self):
+    def test_writer_target_submits_insulation_measurement_on_request(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.init_power_unit
-        снимает блокировку управления первым каналом, если не может
-        получить блокировку управления вторым
+        Тест проверяет, что измерение сопротивления изоляции ставится в очередь порта модуля
         """
+        self.run_writer({'channel': 'axiomLogic:request:insulation', 'data': 'ch:m2:1'})
 
-        hlTransceiver = self.HighLowTransceiver()
+        self.hlt.insulation_executor.submit.assert_called_once()
+        args = self.hlt.insulation_executor.submit.call_args.args
+        self.assertEqual(args[:4], ('/dev/ttyS1', 'insulation', self.hlt.measure_unit_insulation, 'm2'))
+        self.hlt.command_executor.submit.assert_not_called()
 
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
 
-        ch1_lock = hlTransceiver.ch_locks['ch:{}:1'.format(unit_addr)] = MagicMock(
-            spec=hlTransceiver.ch_locks['ch:{}:1'.format(unit_addr)])
-        ch2_lock = hlTransceiver.ch_locks['ch:{}:2'.format(unit_addr)] = MagicMock(
-            spec=hlTransceiver.ch_locks['ch:{}:2'.format(unit_addr)])
-
-        ch1_lock.acquire = MagicMock(return_value=True)
-        ch2_lock.acquire = MagicMock(return_value=False)
+class TestRun(HighLowTransceiverTestBase):
 
-        hlTransceiver.init_power_unit(unit_addr)
+    def setUp(self):
+        super().setUp()
+        self.hlt.scheduler = MagicMock(running=False)
+        self.hlt.port_bring_up = MagicMock()
+        self.hlt.reader_target = MagicMock()
+        self.hlt.writer_target = MagicMock()
 
-        ch1_lock.acquire.assert_called()
-        ch2_lock.acquire.assert_called()
-        ch1_lock.release.assert_called_once()
+    def run_until_interrupt(self):
+        with patch('axiomLowLevelCommunication.highLowTransceiver.time.sleep',
+                   MagicMock(side_effect=KeyboardInterrupt)):
+            with self.assertRaises(SystemExit):
+                self.hlt.run()
 
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_calls_run_power_unit_if_current_state_is_0(self):
+    def test_run_calls_reader_and_writer_target(self):
         """
-        Тест проверяет, что функция HighLowTransceiver.init_power_unit
-        вызывает функцию HighLowTransceiver.run_power_unit, если состояние
-        одного или двух выходов '0'
+        Тест проверяет, что функция run запускает потоки опроса модулей и обработки команд
+        и планировщик
         """
+        self.run_until_interrupt()
 
-        hlTransceiver = self.HighLowTransceiver()
+        self.hlt.reader_target.assert_called_with()
+        self.hlt.writer_target.assert_called_with()
+        self.hlt.scheduler.start.assert_called_once_with()
 
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
+    def test_run_stops_on_KeyboardInterrupt(self):
+        """
+        Тест проверяет, что при прерывании функция run останавливает программу, исполнители и очереди команд,
+        записывает отложенные данные в Redis и закрывает порты
+        """
+        for transceiver in self.hlt.port_transceivers.values():
+            transceiver.close = MagicMock()
 
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
+        self.run_until_interrupt()
 
-        hlTransceiver.run_power_unit = MagicMock()
+        self.assertFalse(self.hlt.isRunning)
+        self.hlt.scheduler.shutdown.assert_called_once_with()
+        self.assertTrue(self.hlt.command_executor.stopped)
+        self.assertTrue(self.hlt.insulation_executor.stopped)
+        for command_scheduler in self.hlt.command_schedulers.values():
+            self.assertTrue(command_scheduler.queue.closed)
+        self.hlt.port_bring_up.stop.assert_called_once_with()
+        self.hlt.redis_writer.flush.assert_called_once_with(timeout=1)
+        for transceiver in self.hlt.port_transceivers.values():
+            transceiver.close.assert_called_once_with()
 
-        # Оба выхода находятся в состоянии 0
-        hlTransceiver.init_power_unit(unit_addr)
+    def test_run_log_on_start(self):
+        """
+        Тест проверяет, что запуск программы записывается в лог
+        """
+        self.run_until_interrupt()
 
-        hlTransceiver.run_power_unit.assert_called_once_with(unit_addr=unit_addr)
-        hlTransceiver.run_power_unit.reset_mock()
+        self.logger.info.assert_any_call('Программа запущена')
 
-        # первый выход находится в состоянии 2, второй - 0
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '2'
+    def test_sigterm_handler_log_on_exit(self):
+        """
+        Тест проверяет, что остановка программы записывается в лог
+        """
+        self.hlt.sigterm_handler(None, None)
 
-        hlTransceiver.init_power_unit(unit_addr)
+        self.logger.info.assert_called_once_with('Остановка программы')
 
-        hlTransceiver.run_power_unit.assert_called_once_with(unit_addr=unit_addr)
-        hlTransceiver.run_power_unit.reset_mock()
+    def test_sigterm_handler_set_isRunning_False(self):
+        """
+        Тест проверяет, что при получении сигнала останавливается планировщик и сбрасывается флаг работы
+        """
+        self.hlt.isRunning = True
 
-        # первый выход находится в состоянии 0, второй - 2
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '2'
+        self.hlt.sigterm_handler(None, None)
 
-        hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.run_power_unit.assert_called_once_with(unit_addr=unit_addr)
-        hlTransceiver.run_power_unit.reset_mock()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_returns_False_if_unit_cant_be_run(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.init_power_unit
-        возвращает False, если модуль не может быть запущен (функция
-        HighLowTransceiver.run_power_unit возвращает False)
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        hlTransceiver.run_power_unit = MagicMock(return_value=False)
-
-        self.assertEqual(hlTransceiver.init_power_unit(unit_addr), False)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_releases_locks_if_unit_cant_be_run(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.init_power_unit
-        снимает блокировку управления каналами, если модуль не может быть запущен
-        (функция HighLowTransceiver.run_power_unit возвращает False)
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.run_power_unit = MagicMock(return_value=False)
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        self.assertEqual(hlTransceiver.ch_locks['ch:{}:1'.format(unit_addr)].locked(), False)
-        self.assertEqual(hlTransceiver.ch_locks['ch:{}:2'.format(unit_addr)].locked(), False)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_calls_configure_power_unit_if_current_state_is_3(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.init_power_unit
-        вызывает функцию HighLowTransceiver.configure_power_unit, если состояние
-        одного или двух выходов '0'
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.configure_power_unit = MagicMock()
-
-        # Оба выхода находятся в состоянии 3
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.configure_power_unit.assert_called_once_with(unit_addr=unit_addr)
-        hlTransceiver.configure_power_unit.reset_mock()
-
-        # первый выход находится в состоянии 2, второй - 3
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '2'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.configure_power_unit.assert_called_once_with(unit_addr=unit_addr)
-        hlTransceiver.configure_power_unit.reset_mock()
-
-        # первый выход находится в состоянии 3, второй - 2
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '2'
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.configure_power_unit.assert_called_once_with(unit_addr=unit_addr)
-        hlTransceiver.configure_power_unit.reset_mock()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_returns_False_if_unit_cant_be_configured(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.init_power_unit
-        возвращает False, если модуль не может быть сконфигурирован (функция
-        HighLowTransceiver.configure_power_unit возвращает False)
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.configure_power_unit = MagicMock(return_value=False)
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-
-        self.assertEqual(hlTransceiver.init_power_unit(unit_addr), False)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_releases_locks_if_unit_cant_be_configured(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.init_power_unit
-        снимает блокировку управления каналами, если модуль не может быть сконфигурирован
-        (функция HighLowTransceiver.configure_power_unit возвращает False)
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-
-        hlTransceiver.configure_power_unit = MagicMock(return_value=False)
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        self.assertEqual(hlTransceiver.ch_locks['ch:{}:1'.format(unit_addr)].locked(), False)
-        self.assertEqual(hlTransceiver.ch_locks['ch:{}:2'.format(unit_addr)].locked(), False)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_calls_configure_after_run(self):
-        """
-        Тест проверяет, что если после вызова функции HighLowTransceiver.run_power_unit
-        один или оба выхода переходят в состояние '3', вызывается функция
-        HighLowTransceiver.configure_power_unit
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        def run_power_unit_side_effect(**args):
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-            return True
-
-        hlTransceiver.run_power_unit = MagicMock(return_value=True, side_effect=run_power_unit_side_effect)
-        hlTransceiver.configure_power_unit = MagicMock(return_value=True)
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.run_power_unit.assert_called_once_with(unit_addr=unit_addr)
-        hlTransceiver.configure_power_unit.assert_called_once_with(unit_addr=unit_addr)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_returns_True_if_unit_is_run_and_configured(self):
-        """
-        Тест проверяет, что если функции HighLowTransceiver.run_power_unit
-        и HighLowTransceiver.configure_power_unit возвращают True,
-        функция HighLowTransceiver.init_power_unit возвращает True
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        def run_power_unit_side_effect(**args):
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-            return True
-
-        hlTransceiver.run_power_unit = MagicMock(return_value=True, side_effect=run_power_unit_side_effect)
-        hlTransceiver.configure_power_unit = MagicMock(return_value=True)
-
-        result = hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.run_power_unit.assert_called_once_with(unit_addr=unit_addr)
-        hlTransceiver.configure_power_unit.assert_called_once_with(unit_addr=unit_addr)
-
-        self.assertEqual(result, True)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_returns_True_if_unit_is_initialized_by_another_thread(self):
-        """
-        Тест проверяет, что если функция HighLowTransceiver.init_power_unit
-        не может установить блокировку управления каналов, выполяется проверка
-        того, не был ли модуль проинициализирован в другом потоке, и возвращает
-        True, если это так
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        # Устанавливаем блокировку
-        hlTransceiver.ch_locks['ch:{}:1'.format(unit_addr)].acquire()
-        hlTransceiver.ch_locks['ch:{}:2'.format(unit_addr)].acquire()
-
-        # Устанавливаем состояние выходов, такое, как будто они были проинициализированы в другом потоке
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '4'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '4'
-
-        self.assertTrue(hlTransceiver.init_power_unit(unit_addr))
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_releases_locks_if_unit_is_run_and_configured(self):
-        """
-        Тест проверяет, что если функции HighLowTransceiver.run_power_unit
-        и HighLowTransceiver.configure_power_unit возвращают True,
-        функция HighLowTransceiver.init_power_unit снимает блокировку управления каналами
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        def run_power_unit_side_effect(**args):
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-            return True
-
-        hlTransceiver.run_power_unit = MagicMock(return_value=True, side_effect=run_power_unit_side_effect)
-        hlTransceiver.configure_power_unit = MagicMock(return_value=True)
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.run_power_unit.assert_called_once_with(unit_addr=unit_addr)
-        hlTransceiver.configure_power_unit.assert_called_once_with(unit_addr=unit_addr)
-
-        self.assertEqual(hlTransceiver.ch_locks['ch:{}:1'.format(unit_addr)].locked(), False)
-        self.assertEqual(hlTransceiver.ch_locks['ch:{}:2'.format(unit_addr)].locked(), False)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_restore_saved_channels_state(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.run_power_unit
-        после завершения инициализации устанавливает на выходах состояние
-        сохраненное в redis
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.redis.get = MagicMock(return_value="{'status': '5'}")
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '4'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '4'
-
-        hlTransceiver.run_power_unit = MagicMock(return_value=True)
-        hlTransceiver.configure_power_unit = MagicMock(return_value=True)
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write.assert_any_call('ch 1 on {}'.format(unit_addr))
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write.assert_any_call('ch 2 on {}'.format(unit_addr))
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_save_defective_channel_state(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.run_power_unit
-        после завершения инициализации сохраняет в БД состояние канала,
-        если оно стало 2, 6 или 7
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.redis.get = MagicMock(return_value="{'status': '5'}")
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.run_power_unit = MagicMock(return_value=True)
-        hlTransceiver.configure_power_unit = MagicMock(return_value=True)
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '2'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '2'
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.redis.set.assert_any_call(name='ch:{}:1'.format(unit_addr), value={'status': '2'})
-        hlTransceiver.redis.set.assert_any_call(name='ch:{}:2'.format(unit_addr), value={'status': '2'})
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '6'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '6'
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.redis.set.assert_any_call(name='ch:{}:1'.format(unit_addr), value={'status': '6'})
-        hlTransceiver.redis.set.assert_any_call(name='ch:{}:2'.format(unit_addr), value={'status': '6'})
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '7'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '7'
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.redis.set.assert_any_call(name='ch:{}:1'.format(unit_addr), value={'status': '7'})
-        hlTransceiver.redis.set.assert_any_call(name='ch:{}:2'.format(unit_addr), value={'status': '7'})
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_save_channel_state_if_cant_read_from_redis(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.run_power_unit
-        после завершения инициализации сохраняет в БД текущее состояние канала,
-        если в БД записано некорректное значение или не записано никакого
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.redis.get = MagicMock(return_value=None)
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.run_power_unit = MagicMock(return_value=True)
-        hlTransceiver.configure_power_unit = MagicMock(return_value=True)
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '4'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '4'
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.redis.set.assert_any_call(name='ch:{}:1'.format(unit_addr), value={'status': '4'})
-        hlTransceiver.redis.set.assert_any_call(name='ch:{}:2'.format(unit_addr), value={'status': '4'})
-
-        hlTransceiver.redis.get = MagicMock(return_value='corrupted value')
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.redis.set.assert_any_call(name='ch:{}:1'.format(unit_addr), value={'status': '4'})
-        hlTransceiver.redis.set.assert_any_call(name='ch:{}:2'.format(unit_addr), value={'status': '4'})
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_unit_doesnt_crash_if_unit_isnt_connected(self):
-        """
-        Тест проверяет, что вызов функции HighLowTransceiver.run_power_unit
-        не приводит к ошибкам, если силовой модуль не подключен (структура
-        состояния заполнена None)
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.redis.get = MagicMock(return_value=None)
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        self.assertTrue(hlTransceiver.init_power_unit(unit_addr))
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_init_power_restrore_turn_on_state(self):
-        """
-        Тест проверяет, функция HighLowTransceiver.run_power_unit
-        устанавливает состояние включено на выходах, которые были
-        включены до перезагрузки
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.set_ch_state = MagicMock()
-
-        redis_side_effect = [str({'status': '5'}), str({'status': '5'})]
-        hlTransceiver.redis.get = MagicMock(side_effect=redis_side_effect)
-
-        hlTransceiver.run_power_unit = MagicMock(return_value=True)
-
-        def conf_side_effect(**kwargs):
-            hlTransceiver.redis.get.side_effect = [str({'status': '4'}), str({'status': '4'})]
-            return True
-
-        hlTransceiver.configure_power_unit = MagicMock(side_effect=conf_side_effect)
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-
-        hlTransceiver.init_power_unit(unit_addr)
-
-        hlTransceiver.set_ch_state.assert_any_call(channel_addr='ch:{}:1'.format(unit_addr),
-                                                   new_state_dict={'status': '5'})
-        hlTransceiver.set_ch_state.assert_any_call(channel_addr='ch:{}:2'.format(unit_addr),
-                                                   new_state_dict={'status': '5'})
-
-
-class TestRunPowerUnit(HighLowTransceiverTestBase):
-    """
-    Тесты функции запуска силового модуля
-    HighLowTransceiver.run_power_unit
-    """
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_power_unit_calls_serial_write_with_correct_cmd(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.run_power_unit
-        вызывает функцию SerialTransceiver.write с правильной командой
-        запуска силового модуля
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock()
-
-        run_cmd = 'run start {}'.format(unit_addr)
-
-        hlTransceiver.run_power_unit(unit_addr=unit_addr)
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write.assert_called_with(run_cmd)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_power_unit_calls_serial_write_again_if_it_returns_False(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.run_power_unit
-        вызывает функцию SerialTransceiver.write количество раз равное
-        retries + 1, если она возвращает False
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=False)
-
-        retries = 1
-
-        hlTransceiver.run_power_unit(unit_addr=unit_addr, retries=retries)
-
-        self.assertEqual(hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write.call_count, retries + 1)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_power_unit_returns_False_if_serial_write_returns_False(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.run_power_unit
-        возвращает False, если функция SerialTransceiver.write возвращает False
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=False)
-
-        self.assertEqual(hlTransceiver.run_power_unit(unit_addr=unit_addr), False)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_power_unit_log_error_if_serial_write_returns_False(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.run_power_unit
-        логирует ошибку, если функция SerialTransceiver.write возвращает False
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=False)
-
-        hlTransceiver.run_power_unit(unit_addr=unit_addr)
-
-        ch1_humanreadable_state = hlTransceiver.humanreadable_states['0']
-        ch2_humanreadable_state = ch1_humanreadable_state
-
-        channel1_addr = 'ch:{}:1'.format(unit_addr)
-        channel2_addr = 'ch:{}:2'.format(unit_addr)
-
-        log_msg = 'Ошибка при выполнении запуска модуля "{}".' \
-                  ' Текущее состояние выходов: "{}" - "{}", "{}" - "{}"'.format(
-                   unit_addr, channel1_addr, ch1_humanreadable_state, channel2_addr, ch2_humanreadable_state)
-
-        self.logger.write_log.assert_called_once_with(log_msg=log_msg, log_level='ERROR')
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_power_unit_calls_serial_write_again_if_state_doesnt_change_before_timeout_expired(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.run_power_unit
-        что, если функция SerialTransceiver.write вернула True, но состояние
-        хотя бы одного из выходов осталось '0', команда записывается в
-        последовательный снова (количество раз равно retries + 1)
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        retries = 3
-
-        hlTransceiver.run_power_unit(unit_addr=unit_addr, retries=retries)
-
-        self.assertEqual(hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write.call_count, retries + 1)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_power_unit_returns_False_if_state_doesnt_change_before_timeout_expired(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.run_power_unit
-        возвращает False, если состояние хотя бы одного из выходов
-        остается '0'
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        self.assertEqual(hlTransceiver.run_power_unit(unit_addr=unit_addr, retries=1), False)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_power_unit_log_error_if_state_doesnt_change_before_timeout_expired(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.run_power_unit
-        логирует ошибку, если состояние хотя бы одного из выходов остается 0
-        """
-
-        self.logger.write_log.reset_mock()
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-
-        hlTransceiver.run_power_unit(unit_addr=unit_addr, retries=1)
-
-        ch1_state = hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1']
-        ch2_state = hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2']
-
-        ch1_humanreadable_state = hlTransceiver.humanreadable_states[ch1_state]
-        ch2_humanreadable_state = hlTransceiver.humanreadable_states[ch2_state]
-
-        channel1_addr = 'ch:{}:1'.format(unit_addr)
-        channel2_addr = 'ch:{}:2'.format(unit_addr)
-
-        log_msg = 'Ошибка при выполнении запуска модуля "{}".' \
-                  ' Текущее состояние выходов: "{}" - "{}", "{}" - "{}"'.format(
-                   unit_addr, channel1_addr, ch1_humanreadable_state, channel2_addr, ch2_humanreadable_state)
-
-        self.logger.write_log.assert_called_once_with(log_msg=log_msg, log_level='ERROR')
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_power_unit_doesnt_calls_serial_write_again_if_state_changes_before_timeout_expired(self):
-        """
-        Тест проверяет, что если состояние обоих выходов стало не '0'
-        до истечения таймаута функция SerialTransceiver.write повторно не вызывается
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        retries = 1
-        timeout = 3
-
-        threading.Thread(target=hlTransceiver.run_power_unit, args=(unit_addr, retries)).start()
-
-        time.sleep(1)
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-
-        time.sleep((retries + 1) * timeout)
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write.assert_called_once()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_power_unit_returns_True_if_state_changes(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.run_power_unit
-        возвращает True, если состояние обоих выходов становится не '0'
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-
-        self.assertEqual(hlTransceiver.run_power_unit(unit_addr=unit_addr, retries=1), True)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_power_unit_log_success_if_state_changes(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.run_power_unit
-        делает запись в лог о завершении запуска, если состояние
-        обоих выходов становится не '0'
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-
-        hlTransceiver.run_power_unit(unit_addr=unit_addr, retries=1)
-
-        ch1_humanreadable_state = hlTransceiver.humanreadable_states['3']
-        ch2_humanreadable_state = ch1_humanreadable_state
-
-        channel1_addr = 'ch:{}:1'.format(unit_addr)
-        channel2_addr = 'ch:{}:2'.format(unit_addr)
-
-        log_msg = 'Запуск модуля "{}" выполнен.' \
-                  ' Текущее состояние выходов: "{}" - "{}", "{}" - "{}"'.format(
-                   unit_addr, channel1_addr, ch1_humanreadable_state, channel2_addr, ch2_humanreadable_state)
-
-        self.logger.write_log.assert_called_once_with(log_msg=log_msg, log_level='INFO')
-
-
-class TestConfigurePowerUnit(HighLowTransceiverTestBase):
-    """
-    Тесты функции конфигурации силового модуля
-    HighLowTransceiver.configure_power_unit
-    """
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_configure_power_unit_calls_serial_write_with_correct_cmd(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.configure_power_unit
-        вызывает функцию SerialTransceiver.write с правильной командой
-        конфигурации силового модуля
-        """
-        self.HighLowTransceiver.load_settings = MagicMock(return_value=self.test_axiom_settings)
-        hlTransceiver = self.HighLowTransceiver()
-
-        for unit_addr in self.test_axiom_settings['power units']:
-
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-            hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-            hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock()
-
-            value1 = self.test_axiom_settings['power units thresholds'][unit_addr][0]
-            value2 = self.test_axiom_settings['power units thresholds'][unit_addr][1]
-
-            configure_cmd = 'adc hgrp {} {} 1 2 {}'.format(value1, value2, unit_addr)
-
-            hlTransceiver.configure_power_unit(unit_addr=unit_addr)
-
-            hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write.assert_called_with(configure_cmd)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_configure_power_unit_calls_serial_write_again_if_it_returns_False(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.configure_power_unit
-        вызывает функцию SerialTransceiver.write количество раз равное
-        retries + 1, если она возвращает False
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=False)
-
-        retries = 1
-
-        hlTransceiver.configure_power_unit(unit_addr=unit_addr, retries=retries)
-
-        self.assertEqual(hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write.call_count, retries + 1)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_configure_power_unit_returns_False_if_serial_write_returns_False(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.configure_power_unit
-        возвращает False, если функция SerialTransceiver.write возвращает False
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '0'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '0'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=False)
-
-        self.assertEqual(hlTransceiver.configure_power_unit(unit_addr=unit_addr), False)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_configure_power_unit_log_error_if_serial_write_returns_False(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.configure_power_unit
-        логирует ошибку, если функция SerialTransceiver.write возвращает False
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=False)
-
-        hlTransceiver.configure_power_unit(unit_addr=unit_addr)
-
-        ch1_humanreadable_state = hlTransceiver.humanreadable_states['3']
-        ch2_humanreadable_state = ch1_humanreadable_state
-
-        channel1_addr = 'ch:{}:1'.format(unit_addr)
-        channel2_addr = 'ch:{}:2'.format(unit_addr)
-
-        log_msg = 'Ошибка при выполнении конфигурации модуля "{}".' \
-                  ' Текущее состояние выходов: "{}" - "{}", "{}" - "{}"'.format(
-                   unit_addr, channel1_addr, ch1_humanreadable_state, channel2_addr, ch2_humanreadable_state)
-
-        self.logger.write_log.assert_called_once_with(log_msg=log_msg, log_level='ERROR')
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_configure_power_unit_calls_serial_write_again_if_state_doesnt_change_before_timeout_expired(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.configure_power_unit
-        что, если функция SerialTransceiver.write вернула True, но состояние
-        хотя бы одного из выходов осталось '3', команда записывается в
-        последовательный снова (количество раз равно retries + 1)
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        retries = 1
-
-        hlTransceiver.configure_power_unit(unit_addr=unit_addr, retries=retries)
-
-        self.assertEqual(hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write.call_count, retries + 1)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_configure_power_unit_returns_False_if_state_doesnt_change_before_timeout_expired(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.configure_power_unit
-        возвращает False, если состояние хотя бы одного из выходов
-        остается '3'
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '4'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        self.assertEqual(hlTransceiver.configure_power_unit(unit_addr=unit_addr, retries=1), False)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_configure_power_unit_log_error_if_state_doesnt_change_before_timeout_expired(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.configure_power_unit
-        логирует ошибку, если состояние хотя бы одного из выходов остается 3
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '4'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        hlTransceiver.configure_power_unit(unit_addr=unit_addr, retries=1)
-
-        ch1_state = hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1']
-        ch2_state = hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2']
-
-        ch1_humanreadable_state = hlTransceiver.humanreadable_states[ch1_state]
-        ch2_humanreadable_state = hlTransceiver.humanreadable_states[ch2_state]
-
-        channel1_addr = 'ch:{}:1'.format(unit_addr)
-        channel2_addr = 'ch:{}:2'.format(unit_addr)
-
-        log_msg = 'Ошибка при выполнении конфигурации модуля "{}".' \
-                  ' Текущее состояние выходов: "{}" - "{}", "{}" - "{}"'.format(
-                   unit_addr, channel1_addr, ch1_humanreadable_state, channel2_addr, ch2_humanreadable_state)
-
-        self.logger.write_log.assert_called_once_with(log_msg=log_msg, log_level='ERROR')
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_configure_power_unit_doesnt_calls_serial_write_again_if_state_changes_before_timeout_expired(self):
-        """
-        Тест проверяет, что если состояние обоих выходов стало не '3'
-        до истечения таймаута функция SerialTransceiver.write повторно не вызывается
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '3'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '3'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        retries = 1
-        timeout = 3
-
-        threading.Thread(target=hlTransceiver.configure_power_unit, args=(unit_addr, retries)).start()
-
-        time.sleep(1)
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '4'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '4'
-
-        time.sleep((retries + 1) * timeout)
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write.assert_called_once()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_configure_power_unit_returns_True_if_state_changes(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.configure_power_unit
-        возвращает True, если состояние обоих выходов становится не '3'
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '4'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '4'
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        self.assertEqual(hlTransceiver.configure_power_unit(unit_addr=unit_addr, retries=1), True)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_configure_power_unit_log_success_if_state_changes(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.configure_power_unit
-        делает запись в лог о завершении конфигурации, если состояние
-        обоих выходов становится не '3'
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].write = MagicMock(return_value=True)
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state1'] = '4'
-        hlTransceiver.power_units_state_dicts[unit_addr]['st']['state2'] = '4'
-
-        hlTransceiver.configure_power_unit(unit_addr=unit_addr, retries=1)
-
-        ch1_humanreadable_state = hlTransceiver.humanreadable_states['4']
-        ch2_humanreadable_state = ch1_humanreadable_state
-
-        channel1_addr = 'ch:{}:1'.format(unit_addr)
-        channel2_addr = 'ch:{}:2'.format(unit_addr)
-
-        log_msg = 'Конфигурация модуля "{}" выполнена.' \
-                  ' Текущее состояние выходов: "{}" - "{}", "{}" - "{}"'.format(
-                   unit_addr, channel1_addr, ch1_humanreadable_state, channel2_addr, ch2_humanreadable_state)
-
-        self.logger.write_log.assert_called_once_with(log_msg=log_msg, log_level='INFO')
-
-
-class TestWriterTarget(HighLowTransceiverTestBase):
-    """
-    Тесты функции обработки команд от брокера
-    HighLowTransceiver.writer_target
-    """
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_writer_target_subscribes_to_correct_channels(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.writer_target
-        создает подписчиков на каналы redis с командами изменения состояния
-        и запросы потребления на модуле от модуля "Логика"
-        """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.writer_target()
-        cmd_channel = 'axiomLogic:cmd:state'
-        req_channel = 'axiomLogic:request:consumption'
-        subscriber = self.redis.StrictRedis().pubsub()
-        subscriber.subscribe.assert_any_call(cmd_channel)
-        subscriber.subscribe.assert_any_call(req_channel)
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_writer_target_calls_subscriber_get_message_while_isRunning(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.writer_target
-        читает сообщения с брокера пока HighLowTransceiver.isRunning=True
-        """
-        hlTransceiver = self.HighLowTransceiver()
-        subscriber = self.redis.StrictRedis().pubsub()
-
-        hlTransceiver.isRunning = True
-        threading.Thread(target=hlTransceiver.writer_target).start()
-
-        subscriber.get_message.assert_called()
-
-        hlTransceiver.isRunning = False
-
-        time.sleep(1)
-
-        subscriber.get_message.reset_mock()
-
-        time.sleep(0.1)
-
-        subscriber.get_message.assert_not_called()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_writer_target_calls_set_ch_state_if_gets_cmd_for_ch(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.writer_target
-        вызывает функцию установки нового состояния силового выхода
-        если получает от логики команду с адресом силового выхода
-        """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.set_ch_state = MagicMock()
-        subscriber = self.redis.StrictRedis().pubsub()
-
-        channel_addr = 'ch:m2:1'
-        new_state_dict = {'status': '4'}
-        cmd = {'addr': channel_addr, 'state': new_state_dict}
-        msg = {'data': str(cmd)}
-        subscriber.get_message.return_value = msg
-
-        hlTransceiver.isRunning = True
-        threading.Thread(target=hlTransceiver.writer_target).start()
-
-        time.sleep(0.1)
-
-        try:
-            hlTransceiver.set_ch_state.assert_called_with(channel_addr=channel_addr, new_state_dict=new_state_dict)
-        except AssertionError:
-            raise
-        finally:
-            hlTransceiver.isRunning = False
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_writer_target_doesnt_call_set_ch_state_if_gets_cmd_not_for_ch(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.writer_target
-        вызывает функцию установки нового состояния силового выхода
-        если получает от логики команду не для силового выхода
-        """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.set_ch_state = MagicMock()
-        subscriber = self.redis.StrictRedis().pubsub()
-
-        channel_addr = 'do:m2:1'
-        new_state_dict = {'status': '4'}
-        cmd = {'addr': channel_addr, 'state': new_state_dict}
-        msg = {'data': str(cmd)}
-        subscriber.get_message.return_value = msg
-
-        hlTransceiver.isRunning = True
-        threading.Thread(target=hlTransceiver.writer_target).start()
-
-        time.sleep(0.1)
-
-        try:
-            hlTransceiver.set_ch_state.assert_not_called()
-        except AssertionError:
-            raise
-        finally:
-            hlTransceiver.isRunning = False
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_writer_target_calls_publish_unit_consumption_on_request(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.writer_target
-        вызывает функцию отправки текущего потребления в каналах,
-        при получении запроса от модуля "Логика"
-        """
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.publish_unit_consumption = MagicMock()
-
-        subscriber1 = MagicMock()
-        subscriber2 = MagicMock()
-
-        subscriber1.get_message = MagicMock(return_value=None)
-        subscriber2.get_message = MagicMock(return_value={'data': 'm1'})
-
-        self.redis.StrictRedis().pubsub.side_effect = [subscriber1, subscriber2]
-
-        hlTransceiver.isRunning = True
-        threading.Thread(target=hlTransceiver.writer_target).start()
-
-        time.sleep(0.01)
-
-        try:
-            hlTransceiver.publish_unit_consumption.assert_called_with('m1')
-            pass
-        except AssertionError:
-            raise
-        finally:
-            hlTransceiver.isRunning = False
-
-
-class TestRun(HighLowTransceiverTestBase):
-    """
-    Тесты функции HighLowTransceiver, запускающей основного рабочий
-    цикл модуля взаимодействия с низкоуровневым ПО
-    """
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_calls_reader_target(self):
-        """
-        Тест проверяет, что HighLowTransceiver.init_power_unit
-        вызывает фукнцию HighLowTransceiver.reader_target
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.init_power_unit = MagicMock(return_value=True)
-        hlTransceiver.reader_target = MagicMock()
-
-        threading.Thread(target=hlTransceiver.run).start()
-
-        time.sleep(0.1)
-
-        hlTransceiver.isRunning = False
-
-        hlTransceiver.reader_target.assert_called()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_log_on_start(self):
-        """
-        Тест проверяет, что функция HighLowTransceiver.run
-        пишет в лог сообщение о запуске программы
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        threading.Thread(target=hlTransceiver.run).start()
-        time.sleep(0.01)
-
-        try:
-            log_msg = 'Программа запущена'
-            self.logger.write_log.assert_called_once_with(log_msg=log_msg, log_level='INFO')
-        except AssertionError:
-            raise
-        finally:
-            hlTransceiver.isRunning = False
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_sigterm_handler_log_on_exit(self):
-        """
-        Тест проверяет, что HighLowTransceiver.sigterm_handler
-        пишет в лог сообщение о завершении программы
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.sigterm_handler(None, None)
-
-        log_msg = 'Остановка программы'
-        self.logger.write_log.assert_called_once_with(log_msg=log_msg, log_level='INFO')
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_sigterm_handler_set_isRunning_False(self):
-        """
-        Тест проверяет, что HighLowTransceiver.sigterm_handler
-        останавливает работу программы, устанавливая isRunning = False
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.isRunning = True
-
-        hlTransceiver.sigterm_handler(None, None)
-
-        self.assertEqual(hlTransceiver.isRunning, False)
-
-    # DEPRECATED
-    @skip
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_run_calls_init_power_unit_for_every_power_unit(self):
-        """
-        Тест проверяет, что для каждого силового модуля вызывается
-        функция инициализации HighLowTransceiver.init_power_unit
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        hlTransceiver.init_power_unit = MagicMock(return_value=True)
-
-        threading.Thread(target=hlTransceiver.run).start()
-
-        time.sleep(0.1)
-
-        hlTransceiver.isRunning = False
-
-        for unit_addr in self.test_axiom_settings['power units']:
-            hlTransceiver.init_power_unit.assert_any_call(unit_addr=unit_addr)
-
-
-class TestPublishUnitConsumption(HighLowTransceiverTestBase):
-    """
-    Тесты функции HighLowTransceiver.publish_unit_consumption,
-    публикующеий на брокер потребление в каналах модуля
-    """
-
-    @skip
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    @patch('time.time', MagicMock(return_value=12345))
-    def test_publish_unit_consumption_calculate_correct_consumption_value(self):
-        """
-        Тест проверяет, что фукнция публикуюет правильно рассчитанные
-        значения потребления в каналах
-        """
-
-        hlTransceiver = self.HighLowTransceiver()
-
-        unit_addr = list(self.test_axiom_settings['power units'].keys())[0]
-
-        sample1 = sample2 = 4096
-        angle1 = 15
-        angle2 = 30
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['adc']['sample1'] = str(sample1)
-        hlTransceiver.power_units_state_dicts[unit_addr]['adc']['sample2'] = str(sample2)
-
-        hlTransceiver.power_units_state_dicts[unit_addr]['ld']['angle1'] = str(angle1)
-        hlTransceiver.power_units_state_dicts[unit_addr]['ld']['angle2'] = str(angle2)
-
-        I1 = (abs(1.5 - (3 * sample1/4096)) / 0.066) * 0.707
-        I2 = (abs(1.5 - (3 * sample2/4096)) / 0.066) * 0.707
-
-        phi1 = (angle1 * math.pi)/2000
-        phi2 = (angle2 * math.pi)/2000
-
-        P1 = 220 * I1 * math.cos(phi1)
-        P2 = 220 * I2 * math.cos(phi2)
-
-        hlTransceiver.publish_unit_consumption(unit_addr)
-
-        hlTransceiver.redis.publish.assert_called_with(channel='axiomLowLevelCommunication:response:consumption',
-                                                       message='{} {} {} 12345'.format(P1, P2, unit_addr))
+        self.assertFalse(self.hlt.isRunning)
+        self.hlt.scheduler.shutdown.assert_called_once_with()
 
 
 class TestUpdateInputUnitState(HighLowTransceiverTestBase):
-    """
-    Тесты функции HighLowTransceiver.update_input_unit_state,
-    обновляющей структуру состояния модулей ввода
-    """
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_update_st(self):
-        """
-        Тест проверяет, что правильно обновляется
-        поле 'st' структуры состояния модуля ввода
-        """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.isRunning = True
-
-        for unit_addr in self.test_axiom_settings['input units']:
-            hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].read_generator = MagicMock()
-
-            def side_effect():
-                parcel = 'st 3 4 70{}\r\n'.format(unit_addr)
-                yield parcel.encode()
 
-            hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].read_generator.side_effect = side_effect
-
-            hlTransceiver.update_input_unit_state(unit_addr=unit_addr)
-
-            self.assertEqual(hlTransceiver.input_units_state_dicts[unit_addr]['st'], {'state': '3',
-                                                                                      'signal': '4',
-                                                                                      'addr': unit_addr,
-                                                                                      'cnt': '70'})
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_update_adc(self):
-        """
-        Тест проверяет, что правильно обновляется
-        поле 'adc' структуры состояния модуля ввода
-        """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.isRunning = True
-
-        for unit_addr in self.test_axiom_settings['input units']:
-            hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].read_generator = MagicMock()
-
-            def side_effect():
-                parcel = 'adc 3743 103 65{}\r\n'.format(unit_addr)
-                yield parcel.encode()
-
-            hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].read_generator.side_effect = side_effect
-
-            hlTransceiver.update_input_unit_state(unit_addr=unit_addr)
-
-            self.assertEqual(hlTransceiver.input_units_state_dicts[unit_addr]['adc'], {'sample': '3743',
-                                                                                       'addr': unit_addr,
-                                                                                       'cnt': '65'})
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_log_rply(self):
         """
-        Тест проверяет, что если тип посылки 'rply',
-        сообщение от низкого уровня записывается в лог
-        """
-        hlTransceiver = self.HighLowTransceiver()
-        hlTransceiver.isRunning = True
-
-        for unit_addr in self.test_axiom_settings['input units']:
-            hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].read_generator = MagicMock()
-
-            reply = 'rply some reply text\r\n'.format(unit_addr)
-
-            def side_effect():
-                parcel = reply
-                yield parcel.encode()
-
-            hlTransceiver.unit_addrs_to_transceivers_map[unit_addr].read_generator.side_effect = side_effect
-
-            hlTransceiver.update_input_unit_state(unit_addr=unit_addr)
-
-            log_msg = 'Сообщение от низкого уровня: {}'.format(reply.replace('\n', ''))
-
-            self.logger.write_log.assert_called_with(log_msg=log_msg, log_level='INFO')
-
-
-class TestPublishCurrentConsumption(HighLowTransceiverTestBase):
-    """
-    Тесты функции HighLowTransceiver.publish_current_consumption,
-    отправляющей на брокер текущие значения электрических характеристик
-    """
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    @patch('time.time', MagicMock(return_value=12345))
-    def test_calculate_and_publish_correct_consumption_values(self):
-        """
-        Тест проверяет, что фукнция публикуюет правильно рассчитанные
-        значения потребления в каналах для всех силовых модулей
-        """
-
-        self.HighLowTransceiver.load_settings = MagicMock(return_value=self.test_axiom_settings)
-        hlTransceiver = self.HighLowTransceiver()
-
-        voltage_sample = 3970
-        current_sample1 = current_sample2 = 4096
-        angle1 = 15
-        angle2 = 30
-
-        I1 = (abs(1.5 - (3 * current_sample1 / 4096)) / 0.066)
-        I2 = (abs(1.5 - (3 * current_sample2 / 4096)) / 0.066)
-
-        Um = abs(voltage_sample * (3 / 4096) - 1.5) * 253.557
-
-        phi1 = (angle1 * math.pi) / 2000
-        phi2 = (angle2 * math.pi) / 2000
-
-        P1 = 2 * Um * I1 * math.cos(phi1)
-        P2 = 2 * Um * I2 * math.cos(phi2)
-
-        for unit_addr in self.test_axiom_settings['input units']:
-            hlTransceiver.input_units_state_dicts[unit_addr]['adc']['sample'] = str(voltage_sample)
-
-        for unit_addr in self.test_axiom_settings['power units']:
-
-            hlTransceiver.power_units_state_dicts[unit_addr]['adc']['sample1'] = str(current_sample1)
-            hlTransceiver.power_units_state_dicts[unit_addr]['adc']['sample2'] = str(current_sample2)
-
-            hlTransceiver.power_units_state_dicts[unit_addr]['ld']['angle1'] = str(angle1)
-            hlTransceiver.power_units_state_dicts[unit_addr]['ld']['angle2'] = str(angle2)
-
-        hlTransceiver.publish_current_characteristics()
-
-        for unit_addr in self.test_axiom_settings['power units']:
-            consumption_message = {'P1': P1, 'P2': P2, 'addr': unit_addr, 'timestamp': 12345}
-
-            hlTransceiver.redis.publish.assert_any_call(channel='axiomLowLevelCommunication:info:consumption',
-                                                        message=json.dumps(consumption_message))
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    @patch('time.time', MagicMock(return_value=12345))
-    def test_calculate_and_publish_correct_current_values(self):
-        """
-        Тест проверяет, что фукнция публикуюет правильно рассчитанные
-        значения потребляемого тока в каналах для всех силовых модулей
-        """
-
-        self.HighLowTransceiver.load_settings = MagicMock(return_value=self.test_axiom_settings)
-        hlTransceiver = self.HighLowTransceiver()
-
-        voltage_sample = 3970
-        current_sample1 = current_sample2 = 4096
-        angle1 = 15
-        angle2 = 30
-
-        I1 = (abs(1.5 - (3 * current_sample1 / 4096)) / 0.066)
-        I2 = (abs(1.5 - (3 * current_sample2 / 4096)) / 0.066)
-
-
-        for unit_addr in self.test_axiom_settings['input units']:
-            hlTransceiver.input_units_state_dicts[unit_addr]['adc']['sample'] = str(voltage_sample)
-
-        for unit_addr in self.test_axiom_settings['power units']:
-
-            hlTransceiver.power_units_state_dicts[unit_addr]['adc']['sample1'] = str(current_sample1)
-            hlTransceiver.power_units_state_dicts[unit_addr]['adc']['sample2'] = str(current_sample2)
-
-            hlTransceiver.power_units_state_dicts[unit_addr]['ld']['angle1'] = str(angle1)
-            hlTransceiver.power_units_state_dicts[unit_addr]['ld']['angle2'] = str(angle2)
-
-        hlTransceiver.publish_current_characteristics()
-
-        for unit_addr in self.test_axiom_settings['power units']:
-            current_message = {'I1': I1, 'I2': I2, 'addr': unit_addr, 'timestamp': 12345}
-
-            hlTransceiver.redis.publish.assert_any_call(channel='axiomLowLevelCommunication:info:current',
-                                                        message=json.dumps(current_message))\
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    @patch('time.time', MagicMock(return_value=12345))
-    def test_calculate_and_publish_correct_voltage_values(self):
-        """
-        Тест проверяет, что фукнция публикуюет правильно рассчитанные
-        значения напряжения на модуле ввода
+        Тест проверяет, что ответ модуля ввода записывается в лог
         """
+        self.hlt.handle_input_unit_frame('m5', b'rply some reply m5')
 
-        self.HighLowTransceiver.load_settings = MagicMock(return_value=self.test_axiom_settings)
-        hlTransceiver = self.HighLowTransceiver()
-
-        voltage_sample = 3970
-        current_sample1 = current_sample2 = 4096
-        angle1 = 15
-        angle2 = 30
-
-        Um = abs(voltage_sample * (3 / 4096) - 1.5) * 253.557
-        U = Um * 0.707
-
-        for unit_addr in self.test_axiom_settings['input units']:
-            hlTransceiver.input_units_state_dicts[unit_addr]['adc']['sample'] = str(voltage_sample)
-
-        for unit_addr in self.test_axiom_settings['power units']:
-
-            hlTransceiver.power_units_state_dicts[unit_addr]['adc']['sample1'] = str(current_sample1)
-            hlTransceiver.power_units_state_dicts[unit_addr]['adc']['sample2'] = str(current_sample2)
-
-            hlTransceiver.power_units_state_dicts[unit_addr]['ld']['angle1'] = str(angle1)
-            hlTransceiver.power_units_state_dicts[unit_addr]['ld']['angle2'] = str(angle2)
-
-        hlTransceiver.publish_current_characteristics()
-
-        for unit_addr in self.test_axiom_settings['input units']:
-            voltage_message = {'U': U, 'addr': unit_addr, 'timestamp': 12345}
-
-            hlTransceiver.redis.publish.assert_any_call(channel='axiomLowLevelCommunication:info:voltage',
-                                                        message=json.dumps(voltage_message))
\ No newline at end of file
+        self.logger.info.assert_any_call('Сообщение от низкого уровня: rply some reply m5')
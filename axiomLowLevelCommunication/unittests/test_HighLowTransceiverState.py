@@ -0,0 +1,526 @@
+import asyncio
+import json
+import math
+import time
+from unittest import TestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+import redis
+from axiomLowLevelCommunication.asyncHighLowTransceiver import AsyncHighLowTransceiver
+from axiomLowLevelCommunication.highLowTransceiver import HighLowTransceiver
+from axiomLowLevelCommunication.unitState import StateRecord
+from axiomLowLevelCommunication.unittests.test_HighLowTransceiver import patch_loggers
+from axiomLowLevelCommunication.config import MAINS_VOLTAGE, OUTPUT_INFO_METRICS_CHANNEL, CONFIGURE_WAIT_TIMEOUT
+
+
+class HighLowTransceiverStateTestBase(TestCase):
+    """
+    Трансивер с настройками одного силового модуля и одного модуля ввода: последовательные порты
+    не открываются, Redis заменен объектом-заглушкой, инициализация модулей не выполняется
+    """
+
+    settings = {
+        'hardware units': {'m3': ['m2']},
+        'power units': {'m2': {'port': '/dev/ttyS0', 'max consumption current': [16, 8],
+                               'max leak current': [0.02, 0.02]}},
+        'input units': {'m3': {'port': '/dev/ttyS0'}},
+    }
+
+    transceiver_class = HighLowTransceiver
+
+    def setUp(self):
+        patch_loggers(self)
+
+        with patch.object(HighLowTransceiver, 'bring_up_ports', return_value=set()):
+            self.hlt = self.transceiver_class(self.settings, redis_client=MagicMock(spec=redis.StrictRedis))
+        self.addCleanup(self.hlt.close)
+        self.hlt.start_power_unit_init = MagicMock()
+        self.hlt.redis_writer = MagicMock()
+
+    def feed(self, *frames):
+        for frame in frames:
+            self.hlt.handle_power_unit_frame('m2', frame)
+
+
+class TestUnitStateUpdate(HighLowTransceiverStateTestBase):
+
+    def test_update_from_parcel(self):
+        """
+        Тест проверяет, что посылки силового модуля и модуля ввода записываются в записи состояния
+        в числовом виде, а коды состояний каналов хранятся строками
+        """
+        self.feed(b'st 4 5 1 2 17m2', b'adc 1.5 2.25 18m2', b'ld 1 2 40 0 19m2', b'tmpr 30 31 20m2')
+        self.hlt.handle_input_unit_frame('m3', b'volt 220.1 50 17m3')
+
+        state = self.hlt.power_units_state['m2']
+        self.assertTrue(state.link)
+        self.assertEqual(state['st'].snapshot().values,
+                         {'state1': '4', 'state2': '5', 'signal1': '1', 'signal2': '2', 'cnt': 17})
+        self.assertEqual(state['adc'].snapshot().values, {'sample1': 1.5, 'sample2': 2.25, 'cnt': 18})
+        self.assertEqual(state['ld'].snapshot().values,
+                         {'load1': 1, 'load2': 2, 'angle1': 40, 'angle2': 0, 'cnt': 19})
+        self.assertEqual(state['tmpr'].snapshot().values, {'temp1': 30, 'temp2': 31, 'cnt': 20})
+        self.assertEqual(self.hlt.input_units_state['m3']['volt'].snapshot().values,
+                         {'Vin': 220.1, 'freq': 50, 'cnt': 17})
+
+    def test_version(self):
+        """
+        Тест проверяет, что каждая посылка увеличивает версию записи своего типа на 1
+        и не изменяет версии других записей
+        """
+        state = self.hlt.power_units_state['m2']
+        self.feed(b'st 4 4 1 1 17m2')
+        adc_version = state['adc'].version
+        st_version = state['st'].version
+
+        self.feed(b'st 5 4 1 1 18m2', b'st 5 5 1 1 19m2')
+
+        self.assertEqual(state['st'].version, st_version + 2)
+        self.assertEqual(state['adc'].version, adc_version)
+
+    def test_field_timestamps(self):
+        """
+        Тест проверяет, что посылка обновляет время обновления всех полей своей записи,
+        а ответ с измеренным сопротивлением изоляции - только поля измеренного канала
+        """
+        self.feed(b'adc 1.5 2.25 18m2')
+        adc = self.hlt.power_units_state['m2']['adc'].snapshot()
+        self.assertEqual(len(set(adc.timestamps.values())), 1)
+        self.assertIsNotNone(adc.timestamps['sample1'])
+
+        self.hlt.handle_reply('rply isol ch2 12.5 7m2')
+
+        isol = self.hlt.power_units_state['m2']['isol'].snapshot()
+        self.assertEqual(isol.values, {'isol1': None, 'isol2': 12.5})
+        self.assertIsNone(isol.timestamps['isol1'])
+        self.assertIsNotNone(isol.timestamps['isol2'])
+
+
+class TestRestoreChannelStates(HighLowTransceiverStateTestBase):
+
+    def test_saved_states_decoded_as_json(self):
+        """
+        Тест проверяет, что сохраненные в Redis состояния каналов разбираются как JSON,
+        а выражения Python не восстанавливаются и не выполняются
+        """
+        self.feed(b'st 0 0 1 1 17m2')
+        self.hlt.set_ch_state = MagicMock()
+
+        with patch('os.getpid') as getpid:
+            self.hlt.restore_channel_states('m2', ['{"status": "5"}', "__import__('os').getpid() and {'status': '5'}"])
+
+        getpid.assert_not_called()
+        self.hlt.set_ch_state.assert_called_once_with(channel_addr='ch:m2:1', new_state_dict={'status': '5'},
+                                                      supersede=False)
+
+    def test_legacy_saved_states_restored(self):
+        """
+        Тест проверяет, что состояния каналов, сохраненные прежними версиями в виде литерала Python,
+        восстанавливаются
+        """
+        self.feed(b'st 0 0 1 1 17m2')
+        self.hlt.set_ch_state = MagicMock()
+
+        self.hlt.restore_channel_states('m2', [None, "{'status': '5'}"])
+
+        self.hlt.set_ch_state.assert_called_once_with(channel_addr='ch:m2:2', new_state_dict={'status': '5'},
+                                                      supersede=False)
+
+
+class TestAsyncRestoreChannelStates(HighLowTransceiverStateTestBase):
+    """
+    Восстановление состояния каналов после инициализации силового модуля в режиме asyncio
+    """
+
+    transceiver_class = AsyncHighLowTransceiver
+
+    def test_init_restores_saved_states(self):
+        """
+        Тест проверяет, что инициализация силового модуля восстанавливает состояния каналов,
+        сохраненные в формате JSON и в виде литерала Python
+        """
+        self.feed(b'st 4 4 1 1 17m2')
+        self.hlt.set_ch_state = AsyncMock(return_value=True)
+        self.hlt.redis.mget.return_value = ["{'status': '5'}", '{"status": "5"}']
+
+        self.assertTrue(self.hlt.loop.run_until_complete(self.hlt.init_power_unit('m2')))
+
+        self.hlt.set_ch_state.assert_any_call(channel_addr='ch:m2:1', new_state_dict={'status': '5'}, supersede=False)
+        self.hlt.set_ch_state.assert_any_call(channel_addr='ch:m2:2', new_state_dict={'status': '5'}, supersede=False)
+
+
+class TestPublishCurrentCharacteristics(HighLowTransceiverStateTestBase):
+
+    def test_skipped_until_all_parcels_received(self):
+        """
+        Тест проверяет, что характеристики модуля не публикуются, пока от него не получены
+        посылки "adc", "ld" и "tmpr"
+        """
+        self.feed(b'adc 1.5 2.25 18m2', b'ld 1 2 40 0 19m2')
+
+        self.hlt.publish_current_characteristics()
+
+        self.hlt.redis_writer.publish_many.assert_not_called()
+
+    def test_publish_from_snapshots(self):
+        """
+        Тест проверяет, что характеристики рассчитываются по снимкам записей "adc", "ld" и "tmpr"
+        """
+        self.feed(b'adc 1.5 2.25 18m2', b'ld 1 2 40 0 19m2', b'tmpr 30 31 20m2')
+        state = self.hlt.power_units_state['m2']
+
+        snapshot = StateRecord.snapshot
+        with patch.object(StateRecord, 'snapshot', autospec=True, side_effect=snapshot) as snapshot_mock:
+            self.hlt.publish_current_characteristics()
+
+        snapshotted = [call[0][0] for call in snapshot_mock.call_args_list]
+        for parcel_type in ('adc', 'ld', 'tmpr'):
+            self.assertIn(state[parcel_type], snapshotted)
+
+        messages = dict(self.hlt.redis_writer.publish_many.call_args[0][0])
+        metrics = messages[OUTPUT_INFO_METRICS_CHANNEL]
+        self.assertEqual((metrics['I1'], metrics['I2']), (1.5, 2.25))
+        self.assertEqual((metrics['T1'], metrics['T2']), (30, 31))
+        self.assertAlmostEqual(metrics['Pa1'], 0)
+        self.assertAlmostEqual(metrics['Pr1'], MAINS_VOLTAGE * 1.5)
+        self.assertAlmostEqual(metrics['Pa2'], MAINS_VOLTAGE * 2.25 * math.cos(0))
+        self.assertAlmostEqual(metrics['Pr2'], 0)
+        self.assertEqual(metrics['addr'], 'm2')
+
+
+class TestRepeatedFrames(HighLowTransceiverStateTestBase):
+    """
+    Посылки, отличающиеся от предыдущей посылки того же типа только счетчиком
+    """
+
+    def test_counter_checked(self):
+        """
+        Тест проверяет, что для повторной посылки проверяется счетчик, обновляются только счетчик
+        и время его обновления, а состояние каналов не публикуется
+        """
+        self.feed(b'st 4 4 1 1 17m2')
+        before = self.hlt.power_units_state['m2']['st'].snapshot()
+        self.hlt.redis_writer.reset_mock()
+
+        with patch.object(self.hlt, 'check_power_unit_counter', wraps=self.hlt.check_power_unit_counter) as check:
+            self.feed(b'st 4 4 1 1 18m2')
+
+        check.assert_called_once_with(18, 'm2', 'st')
+        after = self.hlt.power_units_state['m2']['st'].snapshot()
+        self.assertEqual(after.values, dict(before.values, cnt=18))
+        self.assertEqual(after.version, before.version + 1)
+        self.assertEqual(after.timestamps['state1'], before.timestamps['state1'])
+        self.assertGreaterEqual(after.timestamps['cnt'], before.timestamps['cnt'])
+        self.hlt.redis_writer.publish.assert_not_called()
+
+    def test_idle_state_after_maintenance(self):
+        """
+        Тест проверяет, что повторная посылка "st" с каналом в состоянии "0" после выхода модуля
+        из режима обслуживания запускает инициализацию модуля
+        """
+        self.hlt.power_units_maintenance['m2'] = True
+        self.feed(b'st 0 0 1 1 17m2')
+        self.hlt.start_power_unit_init.reset_mock()
+
+        self.feed(b'st 0 0 1 1 18m2')
+        self.hlt.start_power_unit_init.assert_not_called()
+
+        self.hlt.power_units_maintenance['m2'] = False
+        self.feed(b'st 0 0 1 1 19m2')
+        self.hlt.start_power_unit_init.assert_called_once_with('m2')
+        self.assertEqual(self.hlt.power_units_state['m2']['st'].cnt, 19)
+
+    def test_counter_reset(self):
+        """
+        Тест проверяет, что повторная посылка с нулевым счетчиком (ПО модуля перезагружалось)
+        запускает инициализацию модуля
+        """
+        self.feed(b'st 4 4 1 1 17m2', b'adc 1.5 2.25 18m2')
+        self.hlt.start_power_unit_init.reset_mock()
+
+        self.feed(b'st 4 4 1 1 0m2')
+
+        self.hlt.start_power_unit_init.assert_called_once_with('m2')
+        state = self.hlt.power_units_state['m2']
+        self.assertEqual(state['st'].cnt, 0)
+        self.assertEqual(state['adc'].cnt, 2 ** 32 - 1)
+
+    def test_aggregates(self):
+        """
+        Тест проверяет, что повторные посылки "tmpr" и "adc" учитываются в агрегатах показаний
+        """
+        self.feed(b'tmpr 30 31 20m2', b'tmpr 30 31 21m2', b'tmpr 30 31 22m2',
+                  b'adc 1.5 2.25 23m2', b'adc 1.5 2.25 24m2')
+
+        window = self.hlt.power_unit_aggregates['m2'].collect()
+        self.assertEqual(window['T1']['count'], 3)
+        self.assertEqual(window['T2']['sum'], 93)
+        self.assertEqual(window['I1']['count'], 2)
+        self.assertEqual(window['I2']['last'], 2.25)
+
+
+class TestSetChStateInit(HighLowTransceiverStateTestBase):
+    """
+    Установка состояния канала неинициализированного силового модуля
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.hlt.init_power_unit = MagicMock()
+        self.feed(b'st 0 0 1 1 17m2')
+        self.hlt.start_power_unit_init.reset_mock()
+        self.hlt.redis_writer.reset_mock()
+
+    def test_waits_for_init(self):
+        """
+        Тест проверяет, что модуль ставится в очередь инициализации, а установка состояния
+        продолжается после выхода канала из состояния "0"
+        """
+        self.hlt.start_power_unit_init.side_effect = lambda unit_addr: self.feed(b'st 4 4 1 1 18m2')
+
+        self.assertTrue(self.hlt.set_ch_state('ch:m2:1', {'status': '4'}))
+
+        self.hlt.start_power_unit_init.assert_called_once_with('m2')
+        self.hlt.init_power_unit.assert_not_called()
+
+    @patch('axiomLowLevelCommunication.highLowTransceiver.INIT_WAIT_TIMEOUT', 0.1)
+    def test_init_timeout(self):
+        """
+        Тест проверяет, что если канал не вышел из состояния "0" за время ожидания инициализации,
+        публикуется сообщение об ошибке
+        """
+        self.assertFalse(self.hlt.set_ch_state('ch:m2:1', {'status': '5'}))
+
+        self.hlt.start_power_unit_init.assert_called_once_with('m2')
+        self.hlt.init_power_unit.assert_not_called()
+        channels = [call[1]['channel'] for call in self.hlt.redis_writer.publish.call_args_list]
+        self.assertIn('axiomLowLevelCommunication:info:error', channels)
+
+
+class TestAsyncSetChStateInit(HighLowTransceiverStateTestBase):
+    """
+    Установка состояния канала неинициализированного силового модуля в режиме asyncio
+    """
+
+    transceiver_class = AsyncHighLowTransceiver
+
+    def setUp(self):
+        super().setUp()
+        self.loop = self.hlt.loop
+        self.addCleanup(self.loop.close)
+        self.hlt.init_power_unit = MagicMock()
+        self.feed(b'st 0 0 1 1 17m2')
+        self.hlt.start_power_unit_init.reset_mock()
+
+    def test_waits_for_init(self):
+        """
+        Тест проверяет, что модуль ставится в очередь инициализации, а установка состояния
+        продолжается после выхода канала из состояния "0"
+        """
+        def on_init(unit_addr):
+            self.feed(b'st 4 4 1 1 18m2')
+            self.hlt.notify_unit_state(unit_addr)
+        self.hlt.start_power_unit_init.side_effect = lambda unit_addr: self.loop.call_soon(on_init, unit_addr)
+
+        self.assertTrue(self.loop.run_until_complete(self.hlt.set_ch_state('ch:m2:1', {'status': '4'})))
+
+        self.hlt.start_power_unit_init.assert_called_once_with('m2')
+        self.hlt.init_power_unit.assert_not_called()
+
+
+class TestStateCommandCoalescing(HighLowTransceiverStateTestBase):
+    """
+    Замещение ожидающих выполнения команд установки состояния канала
+    """
+
+    frames = {'ch 1 on m2': b'st 5 4 1 1 18m2', 'ch 1 off m2': b'st 4 4 1 1 19m2'}
+
+    def setUp(self):
+        super().setUp()
+        self.feed(b'st 4 4 1 1 17m2')
+        self.written = []
+        self.hlt.port_transceivers['/dev/ttyS0'].write = MagicMock(side_effect=self.write)
+
+    def write(self, data):
+        # Модуль переключает канал по команде
+        self.written.append(data)
+        if data in self.frames:
+            self.feed(self.frames[data])
+        return True
+
+    def message(self, status):
+        return {'data': json.dumps({'addr': 'ch:m2:1', 'state': {'status': status}})}
+
+    def test_toggles_coalesced(self):
+        """
+        Тест проверяет, что из серии команд включения/выключения/включения канала в порт
+        записывается одна команда "ch"
+        """
+        for status in ('5', '4', '5'):
+            self.hlt.handle_state_command(self.message(status))
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            stats = self.hlt.command_executor.stats()['state']
+            if stats['completed'] + stats['failed'] + stats['superseded'] == stats['submitted']:
+                break
+            time.sleep(0.01)
+
+        self.assertEqual([data for data in self.written if data.startswith('ch ')], ['ch 1 on m2'])
+        self.assertGreater(self.hlt.command_executor.stats()['state']['superseded'], 0)
+        self.assertEqual(self.hlt.power_units_state['m2']['st'].state1, '5')
+
+
+class TestAsyncStateCommandCoalescing(TestStateCommandCoalescing):
+    """
+    Замещение ожидающих выполнения команд установки состояния канала в режиме asyncio
+    """
+
+    transceiver_class = AsyncHighLowTransceiver
+
+    def setUp(self):
+        super().setUp()
+        self.loop = self.hlt.loop
+        self.addCleanup(self.loop.close)
+        self.addCleanup(self.cancel_command_writers)
+        self.hlt.port_transceivers['/dev/ttyS0'].write_frame = self.write_frame
+
+    def cancel_command_writers(self):
+        writers = list(self.hlt.command_writers.values())
+        for writer in writers:
+            writer.cancel()
+        self.loop.run_until_complete(asyncio.gather(*writers, return_exceptions=True))
+
+    async def write_frame(self, data):
+        ok = self.write(data)
+        self.hlt.notify_unit_state('m2')
+        return ok
+
+    def test_toggles_coalesced(self):
+        """
+        Тест проверяет, что из серии команд включения/выключения/включения канала, поступивших
+        во время выполнения первой команды, в порт записывается одна команда "ch"
+        """
+        self.hlt.submit_state_command('ch:m2:1', {'status': '5'})
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.hlt.submit_state_command('ch:m2:1', {'status': '4'})
+        self.hlt.submit_state_command('ch:m2:1', {'status': '5'})
+
+        self.loop.run_until_complete(asyncio.wait_for(self.hlt.state_workers['ch:m2:1'], 5))
+
+        self.assertEqual([data for data in self.written if data.startswith('ch ')], ['ch 1 on m2'])
+        self.assertEqual(self.hlt.pending_states, {})
+        self.assertEqual(self.hlt.power_units_state['m2']['st'].state1, '5')
+
+
+class TestAsyncConfigurePowerUnit(HighLowTransceiverStateTestBase):
+    """
+    Конфигурация силового модуля в режиме asyncio
+    """
+
+    transceiver_class = AsyncHighLowTransceiver
+
+    def setUp(self):
+        super().setUp()
+        self.loop = self.hlt.loop
+        self.addCleanup(self.loop.close)
+        self.hlt.send_command = AsyncMock(return_value=True)
+        self.hlt.wait_for_unit_state = AsyncMock(return_value=True)
+
+    @patch('axiomLowLevelCommunication.asyncHighLowTransceiver.asyncio.sleep', AsyncMock())
+    def test_waits_configure_timeout_from_send_time(self):
+        """
+        Тест проверяет, что результат конфигурации ожидается CONFIGURE_WAIT_TIMEOUT с момента
+        отправки первой команды, как в режиме потоков
+        """
+        self.assertTrue(self.loop.run_until_complete(self.hlt.configure_power_unit('m2')))
+
+        timeout = self.hlt.wait_for_unit_state.call_args[1]['timeout']
+        self.assertLessEqual(timeout, CONFIGURE_WAIT_TIMEOUT)
+        self.assertGreater(timeout, CONFIGURE_WAIT_TIMEOUT - 0.1)
+
+
+class TestAsyncInsulationQueue(HighLowTransceiverStateTestBase):
+    """
+    Очередь измерений сопротивления изоляции порта в режиме asyncio
+    """
+
+    transceiver_class = AsyncHighLowTransceiver
+
+    def setUp(self):
+        super().setUp()
+        self.loop = self.hlt.loop
+        self.addCleanup(self.loop.close)
+        self.hlt.measure_unit_insulation = AsyncMock(return_value=True)
+        self.hlt.insulation_queues['/dev/ttyS0'] = asyncio.Queue(maxsize=1)
+        self.hlt.listen_commands = MagicMock()
+        self.hlt.isRunning = True
+
+    def run_writer(self, *messages):
+        for message in messages:
+            self.hlt.commands.put_nowait({'channel': 'axiomLogic:request:insulation', 'data': message})
+
+        async def run():
+            writer = self.loop.create_task(self.hlt.writer_target())
+            while self.hlt.insulation_workers or not self.hlt.commands.empty():
+                await asyncio.sleep(0.01)
+            writer.cancel()
+        self.loop.run_until_complete(asyncio.wait_for(run(), 1))
+
+    def test_rejects_when_port_queue_is_full(self):
+        """
+        Тест проверяет, что при переполнении очереди порта измерение отклоняется и сообщение об ошибке
+        публикуется в канал axiomLowLevelCommunication:info:error, как в режиме потоков
+        """
+        self.run_writer('ch:m2:1', 'ch:m2:2')
+
+        self.hlt.measure_unit_insulation.assert_awaited_once_with('m2', ['1'])
+        self.hlt.redis_writer.publish.assert_called_once_with(
+            channel='axiomLowLevelCommunication:info:error',
+            message='Команда измерения сопротивления изоляции на выходе "ch:m2:2" отклонена:'
+                    ' очередь команд переполнена')
+
+    def test_port_queue_is_drained(self):
+        """
+        Тест проверяет, что измерения из очереди порта выполняются по одному в порядке поступления
+        """
+        self.run_writer('ch:m2:1')
+        self.run_writer('ch:m2:2')
+
+        self.assertEqual([call[0] for call in self.hlt.measure_unit_insulation.await_args_list],
+                         [('m2', ['1']), ('m2', ['2'])])
+        self.hlt.redis_writer.publish.assert_not_called()
+        self.assertEqual(self.hlt.insulation_workers, {})
+
+
+class TestAsyncChannelInsulation(HighLowTransceiverStateTestBase):
+    """
+    Измерение сопротивления изоляции канала в режиме asyncio
+    """
+
+    transceiver_class = AsyncHighLowTransceiver
+
+    def setUp(self):
+        super().setUp()
+        self.loop = self.hlt.loop
+        self.addCleanup(self.loop.close)
+        self.hlt.send_command = self.send_command
+
+    async def send_command(self, unit_addr, data):
+        # Модуль отвечает результатом измерения
+        self.loop.call_later(0.01, self.reply, unit_addr)
+        return True
+
+    def reply(self, unit_addr):
+        self.hlt.handle_reply('rply isol ch1 12.5 7{}'.format(unit_addr))
+        self.hlt.notify_unit_state(unit_addr)
+
+    def test_result_awaited_by_event(self):
+        """
+        Тест проверяет, что результат измерения принимается сразу после получения ответа модуля,
+        без периодического опроса состояния
+        """
+        start_time = time.monotonic()
+        self.assertTrue(self.loop.run_until_complete(self.hlt.measure_channel_insulation('m2', '1')))
+
+        self.assertLess(time.monotonic() - start_time, 0.08)
+        self.assertEqual(self.hlt.power_units_state['m2']['isol'].isol1, 12.5)
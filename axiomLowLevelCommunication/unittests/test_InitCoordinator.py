@@ -0,0 +1,65 @@
+import threading
+import time
+from unittest import TestCase
+from axiomLowLevelCommunication.initCoordinator import InitCoordinator
+
+
+class TestInitCoordinator(TestCase):
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.active = []
+        self.max_active = 0
+        self.calls = []
+        self.release = threading.Event()
+        unit_ports = {'m1': '/dev/ttyS0', 'm2': '/dev/ttyS0', 'm3': '/dev/ttyS1', 'm4': '/dev/ttyS2',
+                      'm5': '/dev/ttyS3'}
+        self.coordinator = InitCoordinator(self.init_unit, unit_ports, max_parallel=2)
+
+    def init_unit(self, unit_addr):
+        with self.lock:
+            self.calls.append(unit_addr)
+            self.active.append(self.coordinator.unit_ports[unit_addr])
+            self.max_active = max(self.max_active, len(self.active))
+            ports = list(self.active)
+        self.release.wait(1)
+        time.sleep(0.01)
+        with self.lock:
+            self.active.remove(self.coordinator.unit_ports[unit_addr])
+        # Модули одного порта не инициализируются одновременно
+        return len(ports) == len(set(ports)) and unit_addr != 'm5'
+
+    def test_deduplicate(self):
+        """
+        Тест проверяет, что повторные запросы инициализации модуля, который ожидает инициализации
+        или инициализируется, отбрасываются
+        """
+        self.assertTrue(self.coordinator.request('m1'))
+        self.assertFalse(self.coordinator.request('m1'))
+        self.assertTrue(self.coordinator.request('m2'))
+        self.assertFalse(self.coordinator.request('m2'))
+        self.release.set()
+
+        self.assertTrue(self.coordinator.wait_idle(timeout=2))
+        self.assertEqual(sorted(self.calls), ['m1', 'm2'])
+        stats = self.coordinator.stats()
+        self.assertEqual((stats['requests'], stats['deduplicated'], stats['completed']), (4, 2, 2))
+
+    def test_bounded_parallel(self):
+        """
+        Тест проверяет, что на одном порту одновременно инициализируется один модуль, количество портов,
+        обслуживаемых одновременно, ограничено, а по завершении сохраняется время восстановления
+        """
+        for unit_addr in ('m1', 'm2', 'm3', 'm4', 'm5'):
+            self.coordinator.request(unit_addr)
+        time.sleep(0.05)
+        self.assertEqual(self.coordinator.stats()['running'], 2)
+        self.release.set()
+
+        self.assertTrue(self.coordinator.wait_idle(timeout=2))
+        self.assertEqual(sorted(self.calls), ['m1', 'm2', 'm3', 'm4', 'm5'])
+        self.assertEqual(self.max_active, 2)
+        stats = self.coordinator.stats()
+        self.assertEqual((stats['completed'], stats['failed'], stats['queued'], stats['running']), (4, 1, 0, 0))
+        self.assertEqual((stats['last_restore']['units'], stats['last_restore']['failed']), (5, 1))
+        self.assertGreater(stats['last_restore']['duration'], 0)
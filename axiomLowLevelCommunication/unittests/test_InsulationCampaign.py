@@ -0,0 +1,37 @@
+from unittest import TestCase
+from axiomLowLevelCommunication.insulationCampaign import parse_insulation_request, target_unit_addr
+
+
+class TestParseInsulationRequest(TestCase):
+
+    def test_single_channel(self):
+        """
+        Тест проверяет, что команда с адресом одного канала разбирается в один модуль с одним каналом
+        """
+        self.assertEqual(parse_insulation_request('ch:m2:1'), ({'m2': ['1']}, []))
+
+    def test_group_by_unit(self):
+        """
+        Тест проверяет, что каналы группируются по модулям в порядке первого упоминания модуля,
+        адрес модуля означает оба канала, а повторные адреса не дублируют измерения
+        """
+        units, invalid = parse_insulation_request('ch:m3:2, m1 ch:m3:1,ch:m1:2\nm10 ch:m3:2')
+        self.assertEqual(list(units.items()), [('m3', ['1', '2']), ('m1', ['1', '2']), ('m10', ['1', '2'])])
+        self.assertEqual(invalid, [])
+
+    def test_invalid_targets(self):
+        """
+        Тест проверяет, что некорректные адреса возвращаются отдельно и не прерывают разбор команды
+        """
+        units, invalid = parse_insulation_request('ch:m1:3 ch:m2 x ch:m4:1')
+        self.assertEqual(units, {'m4': ['1']})
+        self.assertEqual(invalid, ['ch:m1:3', 'ch:m2', 'x'])
+        self.assertEqual(parse_insulation_request('  '), ({}, []))
+
+    def test_target_unit_addr(self):
+        """
+        Тест проверяет определение адреса модуля по адресу канала или модуля
+        """
+        self.assertEqual(target_unit_addr('ch:m12:2'), 'm12')
+        self.assertEqual(target_unit_addr('m5'), 'm5')
+        self.assertIsNone(target_unit_addr('ch:m5'))
@@ -0,0 +1,148 @@
+import json
+import time
+from unittest import TestCase
+from unittest.mock import MagicMock
+from axiomLowLevelCommunication.config import STATS_KEY_PREFIX
+from axiomLowLevelCommunication.ioStatistics import LatencyStatistics, UnitStatistics, publish_statistics, \
+    load_statistics, calc_rates, format_rates
+
+
+class TestLatencyStatistics(TestCase):
+
+    def test_add_updates_count_min_max_and_mean(self):
+        """
+        Тест проверяет, что LatencyStatistics.add обновляет количество измерений,
+        минимальное, максимальное и среднее значения
+        """
+        stats = LatencyStatistics()
+        for value in (0.001, 0.003, 0.002):
+            stats.add(value)
+        self.assertEqual(stats.count, 3)
+        self.assertEqual(stats.min, 0.001)
+        self.assertEqual(stats.max, 0.003)
+        self.assertAlmostEqual(stats.mean, 0.002)
+        self.assertEqual(stats.last, 0.002)
+
+    def test_add_puts_value_into_correct_histogram_bucket(self):
+        """
+        Тест проверяет, что измерение попадает в первую корзину,
+        верхняя граница которой не меньше измеренного значения
+        """
+        stats = LatencyStatistics(buckets=(0.001, 0.01))
+        stats.add(0.0005)
+        stats.add(0.005)
+        stats.add(0.005)
+        stats.add(1)
+        self.assertEqual(stats.histogram, [1, 2, 1])
+        self.assertEqual(stats.as_dict()['histogram'], {'0.001': 1, '0.01': 2, 'inf': 1})
+
+    def test_reset_clears_statistics(self):
+        """
+        Тест проверяет, что LatencyStatistics.reset сбрасывает накопленную статистику
+        """
+        stats = LatencyStatistics()
+        stats.add(0.1)
+        stats.reset()
+        self.assertEqual(stats.count, 0)
+        self.assertIsNone(stats.mean)
+        self.assertIsNone(stats.max)
+
+
+class TestUnitStatistics(TestCase):
+
+    def test_counter_gaps_and_resets(self):
+        """
+        Тест проверяет, что посылки одного цикла и следующего цикла не считаются пропусками,
+        пропущенные значения счетчика суммируются, а уменьшение счетчика считается перезапуском
+        """
+        stats = UnitStatistics('m2')
+        for counter in ('5', '5', '6', '9', None, '0', '1'):
+            stats.on_parcel(counter)
+        stats.on_regex_miss()
+
+        snapshot = stats.as_dict()
+        self.assertEqual(snapshot['frames'], 8)
+        self.assertEqual(snapshot['regex_misses'], 1)
+        self.assertEqual(snapshot['counter_gaps'], 2)
+        self.assertEqual(snapshot['counter_resets'], 1)
+        self.assertEqual(snapshot['last_counter'], 1)
+        self.assertGreaterEqual(snapshot['since_last_parcel'], 0)
+
+    def test_no_parcels(self):
+        """
+        Тест проверяет, что до получения посылок время с последней посылки не определено
+        """
+        self.assertIsNone(UnitStatistics('m2').as_dict()['since_last_parcel'])
+
+    def test_first_parcel_delay(self):
+        """
+        Тест проверяет, что время получения первой посылки отсчитывается от времени запуска
+        и фиксируется только для первой посылки
+        """
+        stats = UnitStatistics('m2', start_time=time.monotonic() - 1.5)
+        self.assertIsNone(stats.as_dict()['first_parcel_delay'])
+        self.assertTrue(stats.on_parcel('1'))
+        delay = stats.first_parcel_delay
+        self.assertGreaterEqual(delay, 1.5)
+        self.assertFalse(stats.on_parcel('2'))
+        self.assertEqual(stats.as_dict()['first_parcel_delay'], delay)
+
+
+class TestPublishStatistics(TestCase):
+
+    def test_publish_uses_single_pipeline(self):
+        """
+        Тест проверяет, что статистика всех портов и модулей записывается одним пакетом команд
+        """
+        redis = MagicMock()
+        publish_statistics(redis, {'/dev/ttyS0': {'bytes_in': 10}}, {'m2': {'frames': 1}, 'm3': {'frames': 2}})
+
+        redis.pipeline.assert_called_once_with(transaction=False)
+        pipeline = redis.pipeline.return_value
+        self.assertEqual(sorted(call[0][0] for call in pipeline.set.call_args_list), [
+            '{}:port:/dev/ttyS0'.format(STATS_KEY_PREFIX),
+            '{}:unit:m2'.format(STATS_KEY_PREFIX),
+            '{}:unit:m3'.format(STATS_KEY_PREFIX),
+        ])
+        self.assertEqual(json.loads(pipeline.set.call_args_list[0][0][1])['bytes_in'], 10)
+        pipeline.execute.assert_called_once_with()
+        redis.set.assert_not_called()
+
+    def test_load_statistics(self):
+        """
+        Тест проверяет, что статистика читается из Redis по типам и именам
+        """
+        redis = MagicMock()
+        keys = ['{}:port:/dev/ttyS0'.format(STATS_KEY_PREFIX), '{}:unit:m2'.format(STATS_KEY_PREFIX),
+                '{}:command:state'.format(STATS_KEY_PREFIX)]
+        redis.scan_iter.return_value = iter(keys)
+        # значения возвращаются в порядке сортировки ключей
+        redis.mget.return_value = ['{"completed": 2}', '{"bytes_in": 10}', '{"frames": 1}']
+
+        self.assertEqual(load_statistics(redis), {'port': {'/dev/ttyS0': {'bytes_in': 10}},
+                                                  'unit': {'m2': {'frames': 1}},
+                                                  'command': {'state': {'completed': 2}},
+                                                  'init': {}})
+
+    def test_rates(self):
+        """
+        Тест проверяет расчет скоростей изменения счетчиков и вывод таблицы скоростей
+        """
+        port = {'bytes_in': 100, 'bytes_out': 0, 'frames_routed': 10, 'commands_out': 0, 'write_errors': 0,
+                'write_duration': {'max': 0.002}, 'write_slot_wait': {'max': None}, 'timestamp': 100.0}
+        unit = {'frames': 10, 'regex_misses': 0, 'counter_gaps': 0, 'counter_resets': 0,
+                'since_last_parcel': 0.1, 'timestamp': 100.0}
+        previous = {'port': {'/dev/ttyS0': port}, 'unit': {'m2': unit}}
+        current = {'port': {'/dev/ttyS0': dict(port, bytes_in=600, frames_routed=60, timestamp=105.0)},
+                   'unit': {'m2': dict(unit, frames=60, counter_gaps=5, timestamp=105.0)}}
+
+        rates = calc_rates(port, current['port']['/dev/ttyS0'], ('bytes_in', 'frames_routed'))
+        self.assertEqual(rates, {'bytes_in': 100.0, 'frames_routed': 10.0})
+        self.assertEqual(calc_rates(port, port, ('bytes_in',)), {'bytes_in': None})
+
+        lines = format_rates(previous, current)
+        self.assertTrue(lines[1].startswith('/dev/ttyS0'))
+        self.assertIn('100.0', lines[1])
+        self.assertIn('2.00', lines[1])
+        self.assertTrue(lines[3].startswith('m2'))
+        self.assertIn('1.0', lines[3])
@@ -0,0 +1,110 @@
+from unittest import TestCase
+from axiomLowLevelCommunication.linkWatchdog import TimerWheel, LossWindow, LinkWatchdog
+
+
+class TestTimerWheel(TestCase):
+
+    def test_timers_fire_in_their_tick(self):
+        """
+        Тест проверяет, что таймер срабатывает не раньше срока, в том числе таймер со сроком
+        больше одного оборота колеса
+        """
+        wheel = TimerWheel(tick=1, slots=4, now=0)
+        wheel.schedule('a', 2)
+        wheel.schedule('b', 6)
+        self.assertEqual(wheel.advance(1), [])
+        self.assertEqual(wheel.advance(2), ['a'])
+        self.assertEqual(wheel.advance(5), [])
+        self.assertEqual(wheel.advance(6), ['b'])
+        self.assertEqual(wheel.timers, {})
+
+    def test_reschedule_and_cancel(self):
+        """
+        Тест проверяет, что повторная постановка таймера заменяет предыдущий, а отмененный таймер не срабатывает
+        """
+        wheel = TimerWheel(tick=1, slots=4, now=0)
+        wheel.schedule('a', 1)
+        wheel.schedule('a', 3)
+        wheel.schedule('b', 2)
+        wheel.cancel('b')
+        self.assertEqual(wheel.advance(2), [])
+        self.assertEqual(wheel.advance(3), ['a'])
+
+    def test_advance_after_long_pause(self):
+        """
+        Тест проверяет, что после паузы длиннее оборота колеса срабатывают все просроченные таймеры
+        """
+        wheel = TimerWheel(tick=1, slots=4, now=0)
+        for i in range(1, 8):
+            wheel.schedule(i, i)
+        self.assertEqual(sorted(wheel.advance(100)), list(range(1, 8)))
+
+
+class TestLossWindow(TestCase):
+
+    def test_old_buckets_leave_window(self):
+        """
+        Тест проверяет, что посылки и потери учитываются только за последнее окно
+        """
+        window = LossWindow(window=10, buckets=5)
+        window.add(0.5, 10, 2)
+        window.add(5, 5, 0)
+        self.assertEqual(window.totals(9), (15, 2))
+        self.assertEqual(window.totals(11), (5, 0))
+        window.add(11, 1, 1)
+        self.assertEqual(window.totals(11), (6, 1))
+
+
+class TestLinkWatchdog(TestCase):
+
+    def setUp(self):
+        self.events = []
+        self.watchdog = LinkWatchdog(['m1', 'm2'], lambda unit_addr, silence: self.events.append(('lost', unit_addr)),
+                                     lambda unit_addr, downtime: self.events.append(('restored', unit_addr)),
+                                     timeout=3, tick=0.5, window=60)
+        self.watchdog.wheel = TimerWheel(tick=0.5, slots=7, now=0)
+
+    def test_lost_and_restored(self):
+        """
+        Тест проверяет, что связь с модулем, от которого нет посылок дольше таймаута, считается потерянной,
+        а следующая посылка восстанавливает связь
+        """
+        for now in (1, 2, 3, 4):
+            self.watchdog.on_parcel('m1', 'st', now, now=now)
+            self.watchdog.on_parcel('m2', 'st', now, now=now)
+            self.watchdog.advance(now)
+        self.assertEqual(self.events, [])
+
+        # m2 продолжает отправлять посылки, m1 молчит
+        for now in (5, 6, 7, 8):
+            self.watchdog.on_parcel('m2', 'st', now, now=now)
+            self.watchdog.advance(now)
+        self.assertEqual(self.events, [('lost', 'm1')])
+        self.assertFalse(self.watchdog.unit_stats('m1', now=8)['link'])
+
+        self.watchdog.on_parcel('m1', 'st', 9, now=9)
+        self.watchdog.advance(9)
+        self.assertEqual(self.events, [('lost', 'm1'), ('restored', 'm1')])
+        self.assertTrue(self.watchdog.unit_stats('m1', now=9)['link'])
+        self.assertEqual(self.watchdog.events, {'lost': 1, 'restored': 1})
+
+    def test_never_seen_unit_is_not_reported(self):
+        """
+        Тест проверяет, что для модуля, от которого не было посылок, события не формируются
+        """
+        self.watchdog.advance(100)
+        self.assertEqual(self.events, [])
+
+    def test_counter_gaps(self):
+        """
+        Тест проверяет, что пропуски счетчика посылок каждого типа учитываются как потерянные циклы
+        """
+        for counter in (1, 2, 5, 6):
+            self.watchdog.on_parcel('m1', 'st', counter, now=1)
+            self.watchdog.on_parcel('m1', 'adc', counter, now=1)
+        self.watchdog.on_parcel('m1', 'rply', None, now=1)
+        stats = self.watchdog.unit_stats('m1', now=2)
+        self.assertEqual((stats['window_received'], stats['window_lost']), (9, 4))
+        self.assertAlmostEqual(stats['loss_rate'], 4 / 13)
+        self.assertEqual(sorted(stats['since_last_seen']), ['adc', 'rply', 'st'])
+        self.assertIsNone(self.watchdog.unit_stats('m2', now=2)['loss_rate'])
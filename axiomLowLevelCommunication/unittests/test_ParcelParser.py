@@ -0,0 +1,112 @@
+import os
+import re
+from unittest import TestCase
+from axiomLowLevelCommunication.parcelParser import ParcelParser, POWER_UNIT_PARCELS, INPUT_UNIT_PARCELS, \
+    POWER_UNIT_PARCEL_REGEX, INPUT_UNIT_PARCEL_REGEX, PowerStateParcel, AdcParcel, VoltageParcel, ReplyParcel, \
+    RepeatedParcel
+
+DUMP_FILE = os.path.join(os.path.dirname(__file__), '..', '..', 'axiomLib', 'serial_dump.txt')
+
+
+class TestParcelParser(TestCase):
+
+    def setUp(self):
+        self.power_unit_parser = ParcelParser('m2', POWER_UNIT_PARCELS)
+        self.input_unit_parser = ParcelParser('m3', INPUT_UNIT_PARCELS)
+
+    def test_power_unit_parcels(self):
+        """
+        Тест проверяет, что посылки силового модуля разбираются в записи соответствующих типов
+        """
+        self.assertEqual(self.power_unit_parser.parse(b'st 5 4 12 13 1119m2'),
+                         PowerStateParcel('st', '5', '4', '12', '13', '1119', 'm2'))
+        self.assertEqual(self.power_unit_parser.parse(b'adc 0.5 12.25 7m2'), AdcParcel('adc', '0.5', '12.25', '7', 'm2'))
+        self.assertEqual(self.power_unit_parser.parse(b'ld 1 2 3 4 8m2').angle2, '4')
+        self.assertEqual(self.power_unit_parser.parse(b'tmpr 35 36 9m2').temp1, '35')
+
+    def test_input_unit_parcels(self):
+        """
+        Тест проверяет, что посылки модуля ввода разбираются в записи соответствующих типов
+        """
+        self.assertEqual(self.input_unit_parser.parse(b'st 1 0 17m3').signal, '0')
+        self.assertEqual(self.input_unit_parser.parse(memoryview(b'volt 220.1 50 17m3')),
+                         VoltageParcel('volt', '220.1', '50', '17', 'm3'))
+        self.assertEqual(self.input_unit_parser.parse(b'cur 1.5 2.5 0.25 18m3').Iypr, '0.25')
+
+    def test_dict_access(self):
+        """
+        Тест проверяет, что поля записи доступны по имени, как в словаре
+        """
+        parcel = self.power_unit_parser.parse(b'st 5 4 12 13 1119m2')
+        self.assertEqual(parcel['state1'], '5')
+        self.assertEqual(parcel.get('cnt'), '1119')
+        self.assertIsNone(parcel.get('reply'))
+        with self.assertRaises(KeyError):
+            parcel['reply']
+
+    def test_noise_and_reply(self):
+        """
+        Тест проверяет, что посторонние символы перед типом посылки отбрасываются,
+        а ответ "rply" распознается и после эха команды
+        """
+        self.assertEqual(self.power_unit_parser.parse(b'\x00\xffst 5 4 12 13 1119m2').cnt, '1119')
+        self.assertEqual(self.power_unit_parser.parse(b'rply ch 1 on '), ReplyParcel('rply', 'rply ch 1 on'))
+        self.assertEqual(self.power_unit_parser.parse(b'run start m2\rrply proc'), ReplyParcel('rply', 'rply proc'))
+
+    def test_invalid_parcels(self):
+        """
+        Тест проверяет, что посылки другого модуля, неизвестных типов и с неверными полями не разбираются
+        """
+        for frame in (b'st 5 4 12 13 1119m4', b'volt 220.1 50 17m2', b'adc 2048 2048 7m2', b'st 5 4 12 1119m2',
+                      b'st 5 4 12345 13 1119m2', b'tmpr 35 36 m2', b'ch 1 on m2', b'', b'st'):
+            self.assertIsNone(self.power_unit_parser.parse(frame), frame)
+
+    def test_same_as_regex(self):
+        """
+        Тест проверяет, что на записи реального обмена результат разбора совпадает с результатом
+        разбора регулярным выражением
+        """
+        with open(DUMP_FILE, 'rb') as f:
+            frames = [line.rstrip(b'\r\n') for line in f.read().split(b'\n') if line.strip()]
+
+        for parcel_types, parcel_regex in ((POWER_UNIT_PARCELS, POWER_UNIT_PARCEL_REGEX),
+                                           (INPUT_UNIT_PARCELS, INPUT_UNIT_PARCEL_REGEX)):
+            for unit_addr in ('m1', 'm2', 'm3', 'm4'):
+                parser = ParcelParser(unit_addr, parcel_types)
+                regex = re.compile((parcel_regex % unit_addr).encode())
+                for frame in frames:
+                    match = regex.search(frame)
+                    parcel = parser.parse(frame)
+                    if match is None:
+                        self.assertIsNone(parcel, frame)
+                        continue
+                    expected = {key: value.decode().strip() for key, value in match.groupdict().items() if value}
+                    self.assertEqual({key: parcel[key] for key in parcel._fields if key != 'type'},
+                                     {key: value for key, value in expected.items() if not key.startswith('type_')},
+                                     frame)
+
+    def test_parse_changed(self):
+        """
+        Тест проверяет, что посылка, отличающаяся от предыдущей посылки того же типа только счетчиком,
+        возвращается как RepeatedParcel, а измененная посылка разбирается полностью
+        """
+        parser = ParcelParser('m2', POWER_UNIT_PARCELS)
+        parcel = parser.parse_changed(memoryview(b'st 5 4 12 13 1119m2'))
+        self.assertFalse(parcel.repeated)
+        self.assertEqual(parcel.state2, '4')
+
+        parser.parse_changed(b'tmpr 35 36 1120m2')
+        parcel = parser.parse_changed(memoryview(b'st 5 4 12 13 1121m2'))
+        self.assertTrue(parcel.repeated)
+        self.assertEqual(parcel, RepeatedParcel('st', '1121', 'm2'))
+        self.assertEqual(parcel['cnt'], '1121')
+
+        parcel = parser.parse_changed(b'st 5 5 12 13 1122m2')
+        self.assertFalse(parcel.repeated)
+        self.assertEqual(parcel.state2, '5')
+
+        # Неверный счетчик и ответы на команды не считаются повторами
+        self.assertIsNone(parser.parse_changed(b'st 5 5 12 13 11a3m2'))
+        reply = b'rply isol 1 100 1123m2'
+        self.assertEqual(parser.parse_changed(reply).type, 'rply')
+        self.assertEqual(parser.parse_changed(reply).type, 'rply')
@@ -0,0 +1,95 @@
+import threading
+import time
+from unittest import TestCase
+from axiomLowLevelCommunication.portBringUp import PortBringUp
+
+
+class FakeTransceiver:
+    """
+    Трансивер, открытие которого завершается через delay секунд; первые failures попыток завершаются ошибкой,
+    а успешная попытка, если задано событие gate, ожидает его установки
+    """
+
+    def __init__(self, delay=0.0, failures=0, gate=None):
+        self.delay = delay
+        self.failures = failures
+        self.gate = gate
+        self.is_open = False
+        self.closed = 0
+
+    def open(self):
+        time.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            return False
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.is_open = True
+        return True
+
+    def close(self):
+        self.closed += 1
+        self.is_open = False
+        return True
+
+
+class TestPortBringUp(TestCase):
+
+    def test_ports_open_concurrently(self):
+        """
+        Тест проверяет, что порты открываются одновременно: время запуска определяется самым медленным портом,
+        а не суммой времени открытия всех портов
+        """
+        transceivers = {'/dev/ttyS{}'.format(i): FakeTransceiver(delay=0.2) for i in range(5)}
+        bring_up = PortBringUp(transceivers, deadline=2, retry_interval=0.05)
+        start = time.monotonic()
+        self.assertEqual(bring_up.start(), set())
+        self.assertLess(time.monotonic() - start, 0.6)
+        self.assertTrue(all(transceiver.is_open for transceiver in transceivers.values()))
+        self.assertTrue(bring_up.is_open('/dev/ttyS0'))
+
+    def test_deadline_and_background_retry(self):
+        """
+        Тест проверяет, что запуск не ожидает зависший и недоступный порты дольше deadline, а недоступный
+        порт открывается повторными попытками в фоне
+        """
+        # Порты ttyS1 и ttyS2 не могут открыться, пока тест не установит события
+        hung = threading.Event()
+        available = threading.Event()
+        self.addCleanup(hung.set)
+        transceivers = {'/dev/ttyS0': FakeTransceiver(), '/dev/ttyS1': FakeTransceiver(gate=hung),
+                        '/dev/ttyS2': FakeTransceiver(failures=2, gate=available)}
+        bring_up = PortBringUp(transceivers, deadline=0.1, retry_interval=0.05)
+        start = time.monotonic()
+        self.assertEqual(bring_up.start(), {'/dev/ttyS1', '/dev/ttyS2'})
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertFalse(bring_up.is_open('/dev/ttyS2'))
+        self.assertTrue(bring_up.is_open('/dev/ttyS0'))
+
+        available.set()
+
+        deadline = time.monotonic() + 2
+        while not bring_up.is_open('/dev/ttyS2') and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(bring_up.is_open('/dev/ttyS2'))
+        self.assertEqual(bring_up.attempts['/dev/ttyS2'], 3)
+        bring_up.stop()
+
+    def test_reopen(self):
+        """
+        Тест проверяет, что порт, чтение из которого прервалось, закрывается и открывается повторно
+        """
+        transceiver = FakeTransceiver()
+        bring_up = PortBringUp({'/dev/ttyS0': transceiver}, deadline=1, retry_interval=0.05)
+        bring_up.start()
+        closed = transceiver.closed
+        transceiver.failures = 1
+
+        bring_up.reopen('/dev/ttyS0')
+        self.assertFalse(bring_up.is_open('/dev/ttyS0'))
+        deadline = time.monotonic() + 2
+        while not bring_up.is_open('/dev/ttyS0') and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(bring_up.is_open('/dev/ttyS0'))
+        self.assertEqual(transceiver.closed, closed + 1)
+        self.assertGreater(bring_up.open_times['/dev/ttyS0'], 0)
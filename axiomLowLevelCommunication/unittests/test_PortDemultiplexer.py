@@ -0,0 +1,91 @@
+import logging
+from unittest import TestCase
+from unittest.mock import MagicMock
+from axiomLowLevelCommunication.portDemultiplexer import PortDemultiplexer
+from axiomLowLevelCommunication.crc8 import append_crc
+
+
+class TestPortDemultiplexer(TestCase):
+
+    def setUp(self):
+        self.demultiplexer = PortDemultiplexer('/dev/ttyS0')
+        self.power_unit_handler = MagicMock()
+        self.input_unit_handler = MagicMock()
+        self.demultiplexer.add_unit('m2', self.power_unit_handler)
+        self.demultiplexer.add_unit('m3', self.input_unit_handler)
+
+    def test_shared_logger(self):
+        """
+        Тест проверяет, что распределители разных портов пишут в общий лог
+        и не добавляют обработчики лога при создании
+        """
+        handlers_count = len(logging.getLogger('axiomLowLevelCommunication.portDemultiplexer').handlers)
+        demultiplexer = PortDemultiplexer('/dev/ttyS1')
+
+        self.assertIs(demultiplexer.logger, self.demultiplexer.logger)
+        self.assertEqual(len(logging.getLogger('axiomLowLevelCommunication.portDemultiplexer').handlers),
+                         handlers_count)
+
+    def test_parse_unit_addr(self):
+        """
+        Тест проверяет, что адрес модуля определяется по окончанию посылки
+        """
+        self.assertEqual(self.demultiplexer.parse_unit_addr(b'st 5 4 12 13 1119m2'), 'm2')
+        self.assertEqual(self.demultiplexer.parse_unit_addr(memoryview(b'volt 220.1 50 17m3')), 'm3')
+        self.assertEqual(self.demultiplexer.parse_unit_addr(b'ld 1 2 3 4 5m12 '), 'm12')
+        self.assertIsNone(self.demultiplexer.parse_unit_addr(b'version'))
+        self.assertIsNone(self.demultiplexer.parse_unit_addr(b'adc 0.5 0.1 1119m'))
+
+    def test_dispatch_to_unit(self):
+        """
+        Тест проверяет, что посылки модулей, подключенных к одному порту, передаются
+        в обработчик модуля-адресата
+        """
+        self.assertEqual(self.demultiplexer.dispatch(b'st 5 4 12 13 1119m2'), 'm2')
+        self.assertEqual(self.demultiplexer.dispatch(b'volt 220.1 50 17m3'), 'm3')
+        self.assertEqual(self.demultiplexer.dispatch(b'\nversion m2st 2 4 6 13 4422m2'), 'm2')
+
+        self.assertEqual(self.power_unit_handler.call_count, 2)
+        self.input_unit_handler.assert_called_once_with(b'volt 220.1 50 17m3')
+        self.assertEqual(self.demultiplexer.routed, {'m2': 2, 'm3': 1})
+
+    def test_unrouted(self):
+        """
+        Тест проверяет, что посылки без адреса или с адресом модуля другого порта отбрасываются
+        """
+        self.assertIsNone(self.demultiplexer.dispatch(b'st 5 4 12 13 1119m7'))
+        self.assertIsNone(self.demultiplexer.dispatch(b'version'))
+
+        self.power_unit_handler.assert_not_called()
+        self.input_unit_handler.assert_not_called()
+        self.assertEqual(self.demultiplexer.unrouted, 2)
+
+    def test_single_unit_without_addr(self):
+        """
+        Тест проверяет, что посылка без адреса передается единственному модулю порта
+        """
+        demultiplexer = PortDemultiplexer('/dev/ttyS1')
+        handler = MagicMock()
+        demultiplexer.add_unit('m4', handler)
+
+        self.assertEqual(demultiplexer.dispatch(b'rply version 1.2'), 'm4')
+        handler.assert_called_once_with(b'rply version 1.2')
+
+    def test_crc_suffix(self):
+        """
+        Тест проверяет, что в режиме с контрольной суммой модулю передается посылка без контрольной суммы,
+        а посылки с неверной или отсутствующей контрольной суммой отбрасываются и учитываются в счетчиках
+        """
+        demultiplexer = PortDemultiplexer('/dev/ttyS1', crc_suffix=True)
+        handler = MagicMock()
+        demultiplexer.add_unit('m2', handler)
+        frame = append_crc(b'st 5 4 12 13 1119m2')
+
+        self.assertEqual(demultiplexer.dispatch(frame), 'm2')
+        self.assertEqual(bytes(handler.call_args[0][0]), b'st 5 4 12 13 1119m2')
+        self.assertIsNone(demultiplexer.dispatch(frame.replace(b'12', b'21')))
+        self.assertIsNone(demultiplexer.dispatch(b'st 5 4 12 13 1119m2'))
+
+        self.assertEqual(handler.call_count, 1)
+        self.assertEqual((demultiplexer.crc_errors, demultiplexer.crc_missing), (1, 1))
+        self.assertEqual(demultiplexer.routed, {'m2': 1})
@@ -0,0 +1,66 @@
+from unittest import TestCase
+from axiomLowLevelCommunication.parcelParser import AdcParcel, LoadParcel, TemperatureParcel
+from axiomLowLevelCommunication.readingAggregates import WindowAggregate, PowerUnitAggregates
+from axiomLowLevelCommunication.unitState import UnitState, POWER_UNIT_STATE_RECORDS
+
+
+class TestWindowAggregate(TestCase):
+
+    def test_collect(self):
+        """
+        Тест проверяет, что агрегат считает количество, сумму, минимум, максимум, последнее значение
+        и взвешенное по времени среднее
+        """
+        aggregate = WindowAggregate()
+        self.assertIsNone(aggregate.collect(100.0))
+        aggregate.add(1.0, 100.0)
+        aggregate.add(3.0, 101.0)
+        aggregate.add(2.0, 104.0)
+        result = aggregate.collect(105.0)
+        self.assertEqual({key: value for key, value in result.items() if key != 'mean'},
+                         {'count': 3, 'sum': 6.0, 'min': 1.0, 'max': 3.0, 'last': 2.0})
+        # 1.0 в течение 1 с, 3.0 - 3 с, 2.0 - 1 с
+        self.assertAlmostEqual(result['mean'], (1.0 + 9.0 + 2.0) / 5)
+
+    def test_next_window(self):
+        """
+        Тест проверяет, что после сбора агрегатов начинается новое окно, в которое переносится последнее значение
+        """
+        aggregate = WindowAggregate()
+        aggregate.add(4.0, 10.0)
+        aggregate.collect(12.0)
+        self.assertEqual(aggregate.collect(14.0), {'count': 0, 'sum': 0, 'min': None, 'max': None,
+                                                   'last': 4.0, 'mean': 4.0})
+        aggregate.add(2.0, 15.0)
+        result = aggregate.collect(16.0)
+        self.assertEqual(result['count'], 1)
+        self.assertAlmostEqual(result['mean'], 3.0)
+
+
+class TestPowerUnitAggregates(TestCase):
+
+    def test_update(self):
+        """
+        Тест проверяет, что посылки "adc", "ld" и "tmpr" учитываются в агрегатах тока, мощности и температуры,
+        а мощность считается по последним значениям тока и фазового сдвига
+        """
+        unit_state = UnitState('m2', POWER_UNIT_STATE_RECORDS)
+        aggregates = PowerUnitAggregates(voltage=200)
+        parcels = ((0.0, AdcParcel('adc', '1.0', '0.5', '1', 'm2')),
+                   (1.0, LoadParcel('ld', '0', '0', '0', '40', '2', 'm2')),
+                   (2.0, TemperatureParcel('tmpr', '30', '31', '3', 'm2')),
+                   (3.0, AdcParcel('adc', '2.0', '0.5', '4', 'm2')))
+        for timestamp, parcel in parcels:
+            unit_state.update_from_parcel(parcel)
+            aggregates.update(parcel.type, unit_state, timestamp)
+        result = aggregates.collect(5.0)
+
+        self.assertEqual(result['I1']['count'], 2)
+        self.assertAlmostEqual(result['I1']['mean'], (1.0 * 3 + 2.0 * 2) / 5)
+        self.assertEqual(result['Pa1']['count'], 2)
+        self.assertEqual((result['Pa1']['min'], result['Pa1']['max']), (200.0, 400.0))
+        self.assertAlmostEqual(result['Pa1']['mean'], (200.0 * 2 + 400.0 * 2) / 4)
+        # Фазовый сдвиг 40 соответствует pi / 2
+        self.assertAlmostEqual(result['Pr2']['last'], 100.0)
+        self.assertEqual(result['T2']['last'], 31)
+        self.assertEqual(aggregates.collect(6.0)['I1']['count'], 0)
@@ -0,0 +1,95 @@
+import json
+import time
+from unittest import TestCase
+from unittest.mock import MagicMock
+from axiomLowLevelCommunication.redisWriter import RedisWriter
+
+
+class TestRedisWriter(TestCase):
+
+    def setUp(self):
+        self.redis = MagicMock()
+        self.pipeline = self.redis.pipeline.return_value
+
+    def test_batch_in_window(self):
+        """
+        Тест проверяет, что команды, поступившие в течение окна, отправляются одним пакетом в порядке поступления
+        """
+        writer = RedisWriter(self.redis, window=0.05, max_batch=100)
+        for i in range(10):
+            writer.publish('axiomLowLevelCommunication:info:state',
+                           {'addr': 'ch:m{}:1'.format(i), 'state': {'status': '5'}})
+            writer.set('ch:m{}:1'.format(i), {'status': '5'})
+        self.pipeline.execute.assert_not_called()
+        self.assertTrue(writer.flush(timeout=1))
+
+        self.redis.pipeline.assert_called_once_with(transaction=False)
+        self.pipeline.execute.assert_called_once_with()
+        self.assertEqual(self.pipeline.publish.call_count, 10)
+        self.assertEqual(self.pipeline.set.call_args_list[3][0], ('ch:m3:1', '{"status": "5"}'))
+        self.assertEqual(writer.counters, {'commands': 20, 'batches': 1, 'errors': 0})
+
+    def test_channel_prefix(self):
+        """
+        Тест проверяет, что при заданном префиксе сообщения публикуются в каналы с префиксом,
+        а ключи записываются без префикса
+        """
+        writer = RedisWriter(self.redis, channel_prefix='axiomLowLevelCommunication:replay')
+        writer.publish('axiomLowLevelCommunication:info:state', 'a')
+        writer.publish_many([('axiomLowLevelCommunication:info:metrics_data', 'b')])
+        writer.set('ch:m2:1', '{"status": "5"}')
+        self.assertTrue(writer.flush(timeout=1))
+
+        self.assertEqual([call[0] for call in self.pipeline.publish.call_args_list], [
+            ('axiomLowLevelCommunication:replay:axiomLowLevelCommunication:info:state', 'a'),
+            ('axiomLowLevelCommunication:replay:axiomLowLevelCommunication:info:metrics_data', 'b'),
+        ])
+        self.pipeline.set.assert_called_once_with('ch:m2:1', '{"status": "5"}')
+
+    def test_window_expires(self):
+        """
+        Тест проверяет, что пакет отправляется по окончании окна без вызова flush
+        """
+        writer = RedisWriter(self.redis, window=0.002, max_batch=100)
+        writer.publish('axiomLowLevelCommunication:response:insulation', 'ch:m2:1 100.0')
+        time.sleep(0.1)
+        self.pipeline.publish.assert_called_once_with('axiomLowLevelCommunication:response:insulation',
+                                                      'ch:m2:1 100.0')
+        self.pipeline.execute.assert_called_once_with()
+
+    def test_max_batch(self):
+        """
+        Тест проверяет, что пакет отправляется, не дожидаясь окончания окна, когда в нем набирается max_batch команд
+        """
+        writer = RedisWriter(self.redis, window=10, max_batch=5)
+        for i in range(5):
+            writer.set('ch:m{}:2'.format(i), '{"status": "4"}')
+        time.sleep(0.1)
+        self.pipeline.execute.assert_called_once_with()
+        self.assertEqual(writer.max_batch_seen, 5)
+
+    def test_publish_many(self):
+        """
+        Тест проверяет, что сообщения, переданные в publish_many, отправляются одним пакетом,
+        даже если их больше max_batch
+        """
+        writer = RedisWriter(self.redis, window=0.001, max_batch=4)
+        writer.publish_many([('axiomLowLevelCommunication:info:current', {'I1': 0.5, 'addr': 'm{}'.format(i)})
+                             for i in range(10)])
+        self.assertTrue(writer.flush(timeout=1))
+        self.pipeline.execute.assert_called_once_with()
+        channel, message = self.pipeline.publish.call_args_list[9][0]
+        self.assertEqual(channel, 'axiomLowLevelCommunication:info:current')
+        self.assertEqual(json.loads(message), {'I1': 0.5, 'addr': 'm9'})
+
+    def test_execute_error(self):
+        """
+        Тест проверяет, что ошибка отправки пакета учитывается в счетчиках и не останавливает поток отправки
+        """
+        self.pipeline.execute.side_effect = [ConnectionError('connection refused'), []]
+        writer = RedisWriter(self.redis, window=0.001)
+        writer.publish('axiomLowLevelCommunication:info:error', 'ошибка')
+        self.assertTrue(writer.flush(timeout=1))
+        writer.publish('axiomLowLevelCommunication:info:error', 'ошибка')
+        self.assertTrue(writer.flush(timeout=1))
+        self.assertEqual(writer.counters, {'commands': 2, 'batches': 2, 'errors': 1})
@@ -0,0 +1,93 @@
+import os
+from unittest import TestCase
+from unittest.mock import MagicMock
+from axiomLowLevelCommunication.selectorReader import SelectorReader
+
+
+class PipeTransceiver:
+    """
+    Заменяет SerialTransceiver: вместо последовательного порта использует канал ОС
+    """
+
+    def __init__(self):
+        self.port = 'pipe'
+        self.read_fd, self.write_fd = os.pipe()
+
+    def fileno(self):
+        return self.read_fd
+
+    def read_into(self, frame_buffer):
+        return frame_buffer.fill(self.read_fd) or None
+
+    def send(self, data):
+        os.write(self.write_fd, data)
+
+
+class TestSelectorReader(TestCase):
+
+    def setUp(self):
+        self.reader = SelectorReader()
+        self.transceivers = [PipeTransceiver(), PipeTransceiver()]
+        self.callbacks = [MagicMock(), MagicMock()]
+        for transceiver, callback in zip(self.transceivers, self.callbacks):
+            self.reader.register(transceiver, callback)
+
+    def tearDown(self):
+        self.reader.close()
+        for transceiver in self.transceivers:
+            os.close(transceiver.read_fd)
+            os.close(transceiver.write_fd)
+
+    def test_poll_passes_complete_frames_to_port_callback(self):
+        """
+        Тест проверяет, что SelectorReader.poll передает каждую полную посылку
+        без терминальной последовательности в обработчик порта, из которого она прочитана
+        """
+        self.transceivers[0].send(b'st 5 4 12 13 1119m2\r\nadc 0.5 0.0 1119m2\r\n')
+        self.transceivers[1].send(b'volt 220.1 50 17m3\r\n')
+        self.reader.poll(timeout=0.1)
+        self.reader.poll(timeout=0.1)
+        self.assertEqual([bytes(c[0][0]) for c in self.callbacks[0].call_args_list],
+                         [b'st 5 4 12 13 1119m2', b'adc 0.5 0.0 1119m2'])
+        self.assertEqual(bytes(self.callbacks[1].call_args[0][0]), b'volt 220.1 50 17m3')
+
+    def test_partial_frame_is_kept_until_terminator_arrives(self):
+        """
+        Тест проверяет, что неполная посылка не передается в обработчик,
+        пока не будет принята терминальная последовательность
+        """
+        self.transceivers[0].send(b'st 5 4 12')
+        self.reader.poll(timeout=0.1)
+        self.callbacks[0].assert_not_called()
+        self.transceivers[0].send(b' 13 1119m2\r\n')
+        self.reader.poll(timeout=0.1)
+        self.assertEqual(bytes(self.callbacks[0].call_args[0][0]), b'st 5 4 12 13 1119m2')
+
+    def test_callback_error_does_not_stop_processing(self):
+        """
+        Тест проверяет, что исключение в обработчике посылки не прерывает
+        обработку следующих посылок
+        """
+        self.callbacks[0].side_effect = [ValueError('some error'), None]
+        self.transceivers[0].send(b'first\r\nsecond\r\n')
+        self.reader.poll(timeout=0.1)
+        self.assertEqual(self.callbacks[0].call_count, 2)
+
+    def test_closed_port_is_unregistered(self):
+        """
+        Тест проверяет, что порт, чтение из которого завершилось ошибкой,
+        удаляется из списка опрашиваемых
+        """
+        os.close(self.transceivers[0].write_fd)
+        self.transceivers[0].write_fd = os.open(os.devnull, os.O_WRONLY)
+        self.reader.poll(timeout=0.1)
+        self.assertNotIn(self.transceivers[0].read_fd, self.reader.buffers)
+        self.assertIn(self.transceivers[1].read_fd, self.reader.buffers)
+
+    def test_register_rejects_closed_port(self):
+        """
+        Тест проверяет, что порт без открытого дескриптора не регистрируется
+        """
+        transceiver = MagicMock()
+        transceiver.fileno.return_value = None
+        self.assertFalse(self.reader.register(transceiver, MagicMock()))
@@ -2,7 +2,7 @@ import threading
 import time
 from unittest import TestCase, skip
 from unittest.mock import MagicMock, patch
-from axiomLowLevelCommunication.serialTransceiver import SerialTransceiver, logger
+from axiomLowLevelCommunication.serialTransceiver import SerialTransceiver, BaudPacer
 import serial
 
 
@@ -10,12 +10,9 @@ class TestSerialTransceiver(TestCase):
 
     def setUp(self):
 
-        from axiomLowLevelCommunication.serialTransceiver import logger
-        logger.write_log = MagicMock()
-        self.logger = logger
-
-        from axiomLowLevelCommunication.serialTransceiver import SerialTransceiver
-        self.SerialTransceiver = SerialTransceiver
+        logger_patcher = patch('axiomLowLevelCommunication.serialTransceiver.create_logger')
+        self.logger = logger_patcher.start().return_value
+        self.addCleanup(logger_patcher.stop)
 
     @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_serialTransceiver_connects_to_serial_port_with_correct_arguments(self):
@@ -25,21 +22,19 @@ class TestSerialTransceiver(TestCase):
         """
         SerialTransceiver(port='/dev/ttyS0')
         serial.Serial.assert_called_once_with(port='/dev/ttyS0', baudrate=115200, stopbits=1,
-                                              bytesize=8, parity='N', timeout=0.1, xonxoff=False, rtscts=False,
+                                              bytesize=8, parity='N', timeout=64 * 10 / 115200, xonxoff=False, rtscts=False,
                                               writeTimeout=0, dsrdtr=False, interCharTimeout=None)
 
-    @patch('axiomLowLevelCommunication.serialTransceiver.logger', MagicMock(spec=logger))
-    @patch('serial.Serial', MagicMock(spec=serial.Serial, side_effect=serial.SerialException))
+    @patch('serial.Serial', MagicMock(spec=serial.Serial, side_effect=serial.SerialException('some error')))
     def test_writes_error_to_log_if_connection_fails(self):
         """
         Тест проверяет, что в лог записывается сообщение об ошибке в случае
         возникновения исключения serial.SerialException при попытке
         подключения к последовательному порту
         """
-        from axiomLowLevelCommunication.serialTransceiver import logger
         SerialTransceiver(port='/dev/ttyS0')
 
-        logger.write_log.assert_called_once_with('Ошибка при подключении к последовательному порту', 'ERROR')
+        self.logger.error.assert_called_once_with('Ошибка при подключении к последовательному порту: some error')
 
     @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_serialTransceiver_open_returns_True_on_success(self):
@@ -69,8 +64,8 @@ class TestSerialTransceiver(TestCase):
         transceiver = SerialTransceiver(port='/dev/ttyS0')
         transceiver.ser.open.side_effect = serial.SerialException('some error')
         transceiver.open()
-        self.logger.write_log.assert_called_once_with('Ошибка при открытии последовательного порта: {}'.format(
-            'some error'), 'ERROR')
+        self.logger.error.assert_called_once_with('Ошибка при открытии последовательного порта: {}'.format(
+            'some error'))
 
     @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_calls_serial_close_to_close(self):
@@ -107,7 +102,7 @@ class TestSerialTransceiver(TestCase):
         """
         transceiver = SerialTransceiver(port='/dev/ttyS0')
         transceiver.write('test string')
-        transceiver.ser.write.assert_called_once_with(b'test string\r\n')
+        transceiver.ser.write.assert_called_once_with(b'test string\n')
 
     @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_write_returns_True_on_success(self):
@@ -129,7 +124,7 @@ class TestSerialTransceiver(TestCase):
         transceiver.ser.write.side_effect = serial.SerialException('some error')
         transceiver.write('test string')
         log_msg = 'Ошибка при записи команды {} в последовательный порт: {}'.format('test string', 'some error')
-        self.logger.write_log.assert_called_with(log_msg=log_msg, log_level='ERROR')
+        self.logger.error.assert_called_with(log_msg)
 
     @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_write_function_returns_False_on_failure(self):
@@ -142,81 +137,71 @@ class TestSerialTransceiver(TestCase):
         self.assertEqual(transceiver.write('test string'), False)
 
     @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_write_function_set_lock(self):
-        """
-        Тест проверяет, что функция SerialTransceiver.write
-        устанавливает блокировку на время записи в последовательный порт
-        """
-        transceiver = SerialTransceiver(port='/dev/ttyS0')
-        transceiver.ser_lock = MagicMock(spec=transceiver.ser_lock)
-        transceiver.write('test string')
-        transceiver.ser_lock.acquire.assert_called_once()
-        transceiver.ser_lock.release.assert_called_once()
-
-    @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_write_function_set_write_event(self):
+    def test_write_function_uses_write_slot(self):
         """
         Тест проверяет, что функция SerialTransceiver.write
-        устанавливает блокировку чтения на время записи
+        выполняет запись в слоте записи планировщика полудуплексной линии
         """
         transceiver = SerialTransceiver(port='/dev/ttyS0')
-        transceiver.write_event = MagicMock(spec=transceiver.write_event)
+        transceiver.scheduler = MagicMock(spec=transceiver.scheduler)
         transceiver.write('test string')
-        transceiver.write_event.clear.assert_called_once()
-        transceiver.write_event.set.assert_called_once()
+        transceiver.scheduler.begin_write.assert_called_once()
+        transceiver.scheduler.end_write.assert_called_once()
 
     @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_write_function_can_not_write_data_if_write_lock_is_already_acquired(self):
+    def test_write_function_can_not_write_data_during_another_write(self):
         """
         Тест проверяет, что функция SerialTransceiver.write
-        ничего не записывает в последовательный порт, если он заблокирован
+        ничего не записывает в последовательный порт, если слот записи занят
         """
         transceiver = SerialTransceiver(port='/dev/ttyS0')
-        transceiver.ser_lock.acquire()
+        transceiver.scheduler.begin_write()
         transceiver.write('test string')
         transceiver.ser.write.assert_not_called()
 
     @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_write_function_wait_for_lock_to_be_released_and_write_data(self):
+    def test_write_function_waits_for_read_window_to_end_and_write_data(self):
         """
         Тест проверяет, что функция SerialTransceiver.write
-        записывает данные в последовательный порт, после того
-        как он разблокируется, если время ожидания не превышает
-        заданный порог (3 секунды)
+        записывает данные в последовательный порт после окончания окна чтения
         """
         transceiver = SerialTransceiver(port='/dev/ttyS0')
-        transceiver.ser_lock.acquire()
-        threading.Thread(target=transceiver.write, args=('test string',)).start()
-        transceiver.ser.write.assert_not_called()
-        time.sleep(0.5)
-        transceiver.ser_lock.release()
-        time.sleep(0.5)
-        transceiver.ser.write.assert_called()
+        written = threading.Event()
+        transceiver.ser.write.side_effect = lambda data: written.set()
+        transceiver.scheduler.begin_read()
+        writer = threading.Thread(target=transceiver.write, args=('test string',))
+        writer.start()
+        self.assertFalse(written.wait(0.2))
+        transceiver.scheduler.end_read()
+        self.assertTrue(written.wait(1))
+        writer.join()
+        transceiver.ser.write.assert_called_once_with(b'test string\n')
+        self.assertEqual(transceiver.scheduler.write_timeouts, 0)
 
     @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_write_function_log_error_if_lock_is_not_released_before_timeout(self):
+    def test_write_function_log_error_if_write_slot_is_not_granted_before_timeout(self):
         """
         Тест проверяет, что функция SerialTransceiver.write
-        записывает ошибку в лог, если блокировка записи в
-        последовательный порт не снята до истечения таймаута
+        записывает ошибку в лог, если слот записи
+        не получен до истечения таймаута
         """
         transceiver = SerialTransceiver(port='/dev/ttyS0')
-        transceiver.ser_lock.acquire()
+        transceiver.scheduler.begin_write()
         transceiver.write('test string')
         log_msg = 'Невозможно записать команду "{}" в последовательный порт {}.' \
                   ' Запись заблокирована другим потоком'.format('test string', transceiver.port)
-        self.logger.write_log.assert_called_with(log_msg=log_msg, log_level='ERROR')
+        self.logger.error.assert_called_with(log_msg)
 
     @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_write_function_returns_False_if_lock_is_not_released_before_timeout(self):
+    def test_write_function_returns_False_if_write_slot_is_not_granted_before_timeout(self):
         """
         Тест проверяет, что функция SerialTransceiver.write
-        возвращает False, если блокировка записи в
-        последовательный порт не снята до истечения таймаута
+        возвращает False, если слот записи не получен до истечения таймаута
         """
         transceiver = SerialTransceiver(port='/dev/ttyS0')
-        transceiver.ser_lock.acquire()
+        transceiver.scheduler.begin_write()
         self.assertEqual(transceiver.write('test string'), False)
+        self.assertEqual(transceiver.scheduler.write_timeouts, 1)
 
     @patch('serial.Serial', MagicMock(spec=serial.Serial))
     def test_read_return_data_on_success(self):
@@ -247,31 +232,126 @@ class TestSerialTransceiver(TestCase):
         transceiver = SerialTransceiver(port='/dev/ttyS0')
         transceiver.ser.read_until.side_effect = serial.SerialException
         transceiver.read()
-        self.assertTrue('Ошибка при чтении из последовательного порта:' in self.logger.write_log.call_args[0][0])
+        self.assertTrue('Ошибка при чтении из последовательного порта:' in self.logger.error.call_args[0][0])
 
     @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_read_function_dont_read_if_write_event_isnt_set(self):
+    def test_read_function_read_after_write_slot_ends(self):
         """
         Тест проверяет, что функция SerialTransceiver.read не читает данные
-        из последовательного порта, если чтение заблоркировано в
-        потоке записи в этот последовательный порт
+        из последовательного порта во время записи и читает после окончания слота записи
         """
         transceiver = SerialTransceiver(port='/dev/ttyS0')
-        transceiver.write_event.clear()
-        transceiver.read()
-        transceiver.ser.read.assert_not_called()
+        read = threading.Event()
+        transceiver.ser.read_until.side_effect = lambda terminator: read.set() or b''
+        transceiver.scheduler.begin_write()
+        reader = threading.Thread(target=transceiver.read)
+        reader.start()
+        self.assertFalse(read.wait(0.2))
+        transceiver.scheduler.end_write()
+        self.assertTrue(read.wait(1))
+        reader.join()
+        transceiver.ser.read_until.assert_called_once()
 
     @patch('serial.Serial', MagicMock(spec=serial.Serial))
-    def test_read_function_read_after_write_event_has_been_set(self):
+    def test_read_generator_joins_frame_split_between_read_windows(self):
         """
-        Тест проверяет, что функция SerialTransceiver.read читает данные
-        после того, как блокировка чтения снимается
+        Тест проверяет, что SerialTransceiver.read_generator объединяет посылку,
+        прочитанную частями в нескольких окнах чтения
         """
         transceiver = SerialTransceiver(port='/dev/ttyS0')
-        transceiver.write_event.clear()
-        threading.Thread(target=transceiver.read).start()
-        time.sleep(0.5)
-        transceiver.ser.read.assert_not_called()
-        transceiver.write_event.set()
-        time.sleep(0.5)
-        transceiver.ser.read_until.assert_called_once()
+        transceiver.ser.read_until.side_effect = [b'st 5 4 ', b'', b'12 13 1119m2\r\n', b'adc 0.5 0.1 1119m2\r\n']
+        frames = transceiver.read_generator()
+        self.assertEqual(next(frames), b'st 5 4 12 13 1119m2\r\n')
+        self.assertEqual(next(frames), b'adc 0.5 0.1 1119m2\r\n')
+        # Каждая часть посылки прочитана в своем окне чтения
+        self.assertEqual(transceiver.ser.read_until.call_count, 4)
+        self.assertEqual(transceiver.bytes_in, len(b'st 5 4 12 13 1119m2\r\nadc 0.5 0.1 1119m2\r\n'))
+
+    @patch('serial.Serial', MagicMock(spec=serial.Serial))
+    def test_framed_write_sends_whole_command_with_single_write_call(self):
+        """
+        Тест проверяет, что в режиме 'framed' функция SerialTransceiver.write
+        записывает команду вместе с символом конца строки одним вызовом
+        serial.Serial.write и не сбрасывает входной буфер
+        """
+        transceiver = SerialTransceiver(port='/dev/ttyS0', write_mode='framed')
+        transceiver.write('adc hgrp 254 127 12 34 m1')
+        transceiver.ser.write.assert_called_once_with(b'adc hgrp 254 127 12 34 m1\n')
+        transceiver.ser.reset_input_buffer.assert_not_called()
+
+    @patch('serial.Serial', MagicMock(spec=serial.Serial))
+    def test_bytewise_write_calls_serial_write_with_each_symbol(self):
+        """
+        Тест проверяет, что в режиме 'bytewise' функция SerialTransceiver.write
+        вызывает функцию serial.Serial.write отдельно для каждого символа
+        """
+        transceiver = SerialTransceiver(port='/dev/ttyS0', write_mode='bytewise')
+        write_calls = []
+        transceiver.ser.write.side_effect = lambda symbol: write_calls.append(symbol)
+        transceiver.write('ch 1 on m1')
+        self.assertEqual(write_calls, [symbol.encode() for symbol in 'ch 1 on m1\n'])
+
+    @patch('serial.Serial', MagicMock(spec=serial.Serial))
+    def test_paced_write_keeps_inter_byte_gap(self):
+        """
+        Тест проверяет, что при заданной паузе между байтами команда
+        записывается побайтно и длительность записи не меньше
+        суммарной длительности пауз
+        """
+        transceiver = SerialTransceiver(port='/dev/ttyS0', baudrate=9600, inter_byte_gap=1)
+        write_calls = []
+        transceiver.ser.write.side_effect = lambda data: write_calls.append(data)
+        start_time = time.perf_counter()
+        transceiver.write('rst m1')
+        duration = time.perf_counter() - start_time
+        self.assertEqual(b''.join(write_calls), b'rst m1\n')
+        self.assertEqual(len(write_calls), len('rst m1\n'))
+        self.assertGreaterEqual(duration, (len('rst m1\n') - 1) * transceiver.pacer.byte_period)
+
+    def test_pacer_sleeps_until_spin_time_before_deadline(self):
+        """
+        Тест проверяет, что BaudPacer.wait_until выполняет основную часть
+        ожидания через sleep, оставляя на активное ожидание не больше
+        BaudPacer.SPIN_TIME
+        """
+        pacer = BaudPacer(115200, 1)
+        with patch('axiomLowLevelCommunication.serialTransceiver.sleep', side_effect=time.sleep) as sleep_mock:
+            deadline = time.perf_counter() + 0.01
+            pacer.wait_until(deadline)
+        self.assertGreaterEqual(time.perf_counter(), deadline)
+        sleep_mock.assert_called_once()
+        self.assertGreater(sleep_mock.call_args[0][0], 0.01 - 2 * BaudPacer.SPIN_TIME)
+
+    @patch('serial.Serial', MagicMock(spec=serial.Serial))
+    def test_write_collects_latency_statistics(self):
+        """
+        Тест проверяет, что функция SerialTransceiver.write сохраняет
+        время записи каждой успешно записанной команды
+        """
+        transceiver = SerialTransceiver(port='/dev/ttyS0')
+        transceiver.write('ch 1 on m1')
+        transceiver.write('ch 1 off m1')
+        transceiver.ser.write.side_effect = serial.SerialException('some error')
+        transceiver.write('ch 2 on m1')
+        self.assertEqual(transceiver.write_latency.count, 2)
+
+    @patch('serial.Serial', MagicMock(spec=serial.Serial))
+    def test_stats_counts_bytes_and_commands(self):
+        """
+        Тест проверяет, что SerialTransceiver.stats возвращает количество переданных байт,
+        записанных команд, ошибок записи и принятых байт
+        """
+        transceiver = SerialTransceiver(port='/dev/ttyS0')
+        transceiver.write('ch 1 on m1')
+        transceiver.ser.write.side_effect = serial.SerialException('some error')
+        transceiver.write('ch 2 on m1')
+        transceiver.ser.read_until.return_value = b'st 5 4 12 13 1119m1\r\n'
+        transceiver.read()
+
+        stats = transceiver.stats()
+        self.assertEqual(stats['bytes_out'], len('ch 1 on m1\n'))
+        self.assertEqual(stats['commands_out'], 1)
+        self.assertEqual(stats['write_errors'], 1)
+        self.assertEqual(stats['bytes_in'], len('st 5 4 12 13 1119m1\r\n'))
+        self.assertEqual(stats['write_duration']['count'], 1)
+        self.assertEqual(stats['write_slot_wait']['count'], 2)
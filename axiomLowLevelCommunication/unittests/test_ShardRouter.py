@@ -0,0 +1,49 @@
+import json
+from unittest import TestCase
+from unittest.mock import MagicMock
+from axiomLowLevelCommunication.config import INPUT_CMD_STATE_CHANNEL, INPUT_REQUEST_INSULATION_CHANNEL
+from axiomLowLevelCommunication.shardRouter import ShardRouter, shard_channel
+
+
+class TestShardRouter(TestCase):
+
+    def setUp(self):
+        self.router = ShardRouter(MagicMock(), {'m1': 0, 'm2': 0, 'm3': 1, 'm12': 2})
+
+    def test_route(self):
+        """
+        Тест проверяет, что команда пересылается в канал сегмента, к которому подключен модуль-адресат
+        """
+        state_cmd = json.dumps({'addr': 'ch:m3:1', 'state': {'status': '5'}})
+
+        self.assertEqual(self.router.route(INPUT_CMD_STATE_CHANNEL, state_cmd),
+                         shard_channel(INPUT_CMD_STATE_CHANNEL, 1))
+        self.assertEqual(self.router.route(INPUT_REQUEST_INSULATION_CHANNEL, 'ch:m12:2'),
+                         shard_channel(INPUT_REQUEST_INSULATION_CHANNEL, 2))
+        self.assertEqual(self.router.route(INPUT_REQUEST_INSULATION_CHANNEL, 'ch:m1:2'),
+                         shard_channel(INPUT_REQUEST_INSULATION_CHANNEL, 0))
+        self.assertEqual(self.router.routed, {0: 1, 1: 1, 2: 1})
+
+    def test_route_unknown_unit(self):
+        """
+        Тест проверяет, что команда для неизвестного модуля или некорректная команда пересылается сегменту 0
+        """
+        self.assertEqual(self.router.route(INPUT_CMD_STATE_CHANNEL, 'ch:m7:1'),
+                         shard_channel(INPUT_CMD_STATE_CHANNEL, 0))
+        self.assertEqual(self.router.route(INPUT_CMD_STATE_CHANNEL, 'not a command'),
+                         shard_channel(INPUT_CMD_STATE_CHANNEL, 0))
+        self.assertEqual(self.router.route(INPUT_CMD_STATE_CHANNEL, None), shard_channel(INPUT_CMD_STATE_CHANNEL, 0))
+        self.assertEqual(self.router.routed[0], 3)
+
+    def test_split_insulation_campaign(self):
+        """
+        Тест проверяет, что команда измерения сопротивления изоляции с модулями нескольких сегментов
+        разделяется по сегментам, а команда для одного сегмента пересылается без изменений
+        """
+        self.assertEqual(self.router.split(INPUT_REQUEST_INSULATION_CHANNEL, 'ch:m1:1 m3, m2 ch:m12:2'),
+                         [(shard_channel(INPUT_REQUEST_INSULATION_CHANNEL, 0), 'ch:m1:1 m2'),
+                          (shard_channel(INPUT_REQUEST_INSULATION_CHANNEL, 1), 'm3'),
+                          (shard_channel(INPUT_REQUEST_INSULATION_CHANNEL, 2), 'ch:m12:2')])
+        self.assertEqual(self.router.split(INPUT_REQUEST_INSULATION_CHANNEL, 'm3, ch:m3:2'),
+                         [(shard_channel(INPUT_REQUEST_INSULATION_CHANNEL, 1), 'm3, ch:m3:2')])
+        self.assertEqual(self.router.routed, {0: 1, 1: 2, 2: 1})
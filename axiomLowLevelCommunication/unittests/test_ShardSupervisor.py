@@ -0,0 +1,72 @@
+import signal
+from unittest import TestCase
+from unittest.mock import MagicMock, call, patch
+from axiomLowLevelCommunication.shardSupervisor import ShardSupervisor, group_units_by_port, assign_shards, \
+    shard_settings
+
+
+class TestShardSupervisor(TestCase):
+
+    def setUp(self):
+        self.settings = {
+            'hardware units': {'m5': ['m1', 'm2'], 'm6': ['m3', 'm4']},
+            'power units': {'m1': {'port': '/dev/ttyS0'}, 'm2': {'port': '/dev/ttyS0'},
+                            'm3': {'port': '/dev/ttyS1'}, 'm4': {'port': '/dev/ttyS2'}},
+            'input units': {'m5': {'port': '/dev/ttyS0'}, 'm6': {'port': '/dev/ttyS3'}},
+        }
+
+    def test_group_units_by_port(self):
+        """
+        Тест проверяет, что силовые модули и модули ввода группируются по портам
+        """
+        port_units = group_units_by_port(self.settings)
+
+        self.assertEqual({port: sorted(units) for port, units in port_units.items()},
+                         {'/dev/ttyS0': ['m1', 'm2', 'm5'], '/dev/ttyS1': ['m3'], '/dev/ttyS2': ['m4'],
+                          '/dev/ttyS3': ['m6']})
+
+    def test_assign_shards(self):
+        """
+        Тест проверяет, что каждый порт попадает ровно в один сегмент, количество модулей в сегментах
+        выравнивается, а сегментов не больше, чем портов
+        """
+        port_units = group_units_by_port(self.settings)
+
+        self.assertEqual(assign_shards(port_units, 2), [['/dev/ttyS0'], ['/dev/ttyS1', '/dev/ttyS2', '/dev/ttyS3']])
+        self.assertEqual(len(assign_shards(port_units, 8)), 4)
+        self.assertEqual(assign_shards(port_units, 1), [['/dev/ttyS0', '/dev/ttyS1', '/dev/ttyS2', '/dev/ttyS3']])
+
+    def test_shard_settings(self):
+        """
+        Тест проверяет, что конфигурация сегмента содержит только модули портов сегмента
+        """
+        settings = shard_settings(self.settings, ['/dev/ttyS1', '/dev/ttyS3'])
+
+        self.assertEqual(sorted(settings['power units']), ['m3'])
+        self.assertEqual(sorted(settings['input units']), ['m6'])
+        self.assertEqual(settings['hardware units'], {'m6': ['m3', 'm4']})
+        self.assertEqual(len(self.settings['power units']), 4)
+
+    @patch('axiomLowLevelCommunication.shardSupervisor.create_logger', MagicMock())
+    def test_worker_target_resets_signal_handlers_before_building_transceiver(self):
+        """
+        Тест проверяет, что процесс сегмента сбрасывает унаследованные от супервизора обработчики сигналов
+        до создания трансивера, а обработчик SIGTERM трансивера устанавливает после его создания
+        """
+        with patch('axiomLowLevelCommunication.shardSupervisor.HighLowTransceiver.load_settings',
+                   return_value=self.settings):
+            supervisor = ShardSupervisor(shard_count=2)
+        steps = MagicMock()
+        supervisor.worker_class = steps.worker_class
+        hlt = steps.worker_class.return_value
+
+        with patch('axiomLowLevelCommunication.shardSupervisor.signal.signal', steps.signal):
+            supervisor.worker_target(0)
+
+        self.assertEqual(steps.mock_calls, [
+            call.signal(signal.SIGTERM, signal.SIG_DFL),
+            call.signal(signal.SIGINT, signal.SIG_IGN),
+            call.worker_class(settings=shard_settings(self.settings, supervisor.shards[0]), shard=0),
+            call.signal(signal.SIGTERM, hlt.sigterm_handler),
+            call.worker_class().run(),
+        ])
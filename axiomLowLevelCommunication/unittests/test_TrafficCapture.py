@@ -0,0 +1,182 @@
+import os
+import pty
+import tempfile
+import time
+import tty
+from unittest import TestCase
+from unittest.mock import MagicMock
+import redis
+from axiomLowLevelCommunication.frameBuffer import FrameBuffer
+from axiomLowLevelCommunication.portDemultiplexer import PortDemultiplexer
+from axiomLowLevelCommunication.replayTransceiver import ReplayTransceiver
+from axiomLowLevelCommunication.serialTransceiver import SerialTransceiver
+from axiomLowLevelCommunication.trafficCapture import CaptureWriter, CaptureReader, CaptureReplay, \
+    DIRECTION_IN, DIRECTION_OUT
+from axiomLowLevelCommunication.config import OUTPUT_INFO_STATE_CHANNEL, REPLAY_CHANNEL_PREFIX
+
+
+class TestTrafficCapture(TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def read_records(self):
+        reader = CaptureReader(self.path)
+        records = [(record.port, record.direction, bytes(record.data)) for record in reader]
+        reader.close()
+        return records
+
+    def test_write_and_read(self):
+        """
+        Тест проверяет, что записи читаются в порядке записи с портом, направлением и данными,
+        а при повторном открытии файла записи добавляются в конец
+        """
+        writer = CaptureWriter(self.path)
+        writer.write('/dev/ttyS0', DIRECTION_IN, b'st 5 4 12 13 1119m2\r\n')
+        writer.write('/dev/ttyS0', DIRECTION_OUT, b'ch 1 on m2\n')
+        writer.close()
+        writer = CaptureWriter(self.path)
+        writer.write('/dev/ttyS1', DIRECTION_IN, memoryview(b'volt 220.1 50 17m3\r\n'))
+        writer.close()
+
+        self.assertEqual(self.read_records(), [
+            ('/dev/ttyS0', DIRECTION_IN, b'st 5 4 12 13 1119m2\r\n'),
+            ('/dev/ttyS0', DIRECTION_OUT, b'ch 1 on m2\n'),
+            ('/dev/ttyS1', DIRECTION_IN, b'volt 220.1 50 17m3\r\n'),
+        ])
+
+    def test_read_during_recording(self):
+        """
+        Тест проверяет, что записи буферизуются и доступны для чтения после сброса в файл,
+        до закрытия файла записи
+        """
+        writer = CaptureWriter(self.path)
+        self.assertEqual(self.read_records(), [])
+        writer.write('/dev/ttyS0', DIRECTION_IN, b'st 5 4 12 13 1119m2\r\n')
+        self.assertEqual(self.read_records(), [])
+
+        writer.flush()
+
+        self.assertEqual(self.read_records(), [('/dev/ttyS0', DIRECTION_IN, b'st 5 4 12 13 1119m2\r\n')])
+        writer.close()
+
+    def test_incomplete_record(self):
+        """
+        Тест проверяет, что незавершенная последняя запись пропускается
+        """
+        writer = CaptureWriter(self.path)
+        writer.write('/dev/ttyS0', DIRECTION_IN, b'st 5 4 12 13 1119m2\r\n')
+        writer.write('/dev/ttyS0', DIRECTION_IN, b'adc 0.5 0.1 1119m2\r\n')
+        writer.close()
+        with open(self.path, 'r+b') as capture_file:
+            capture_file.truncate(os.path.getsize(self.path) - 3)
+
+        self.assertEqual(self.read_records(), [('/dev/ttyS0', DIRECTION_IN, b'st 5 4 12 13 1119m2\r\n')])
+
+    def test_wrong_file(self):
+        """
+        Тест проверяет, что при открытии файла другого формата возникает ValueError
+        """
+        with open(self.path, 'wb') as capture_file:
+            capture_file.write(b'st 5 4 12 13 1119m2\r\n')
+
+        with self.assertRaises(ValueError):
+            CaptureReader(self.path)
+
+    def test_transceiver_records_traffic(self):
+        """
+        Тест проверяет, что SerialTransceiver записывает переданные команды и принятые данные
+        """
+        master, slave = pty.openpty()
+        tty.setraw(master)
+        tty.setraw(slave)
+        writer = CaptureWriter(self.path)
+        transceiver = SerialTransceiver(port=os.ttyname(slave), capture=writer)
+        transceiver.write('ch 1 on m2')
+        os.write(master, b'st 5 4 12 13 1119m2\r\n')
+        time.sleep(0.1)
+        transceiver.read_into(FrameBuffer())
+        transceiver.close()
+        writer.close()
+        os.close(master)
+        os.close(slave)
+
+        self.assertEqual(self.read_records(), [
+            (transceiver.port, DIRECTION_OUT, b'ch 1 on m2\n'),
+            (transceiver.port, DIRECTION_IN, b'st 5 4 12 13 1119m2\r\n'),
+        ])
+
+    def test_replay(self):
+        """
+        Тест проверяет, что при воспроизведении принятые данные разбиваются на посылки и передаются
+        обработчикам модулей, а переданные команды и данные неизвестных портов пропускаются
+        """
+        writer = CaptureWriter(self.path)
+        writer.write('/dev/ttyS0', DIRECTION_IN, b'st 5 4 12 13 1119m2\r\nvolt 220')
+        writer.write('/dev/ttyS0', DIRECTION_OUT, b'ch 1 on m2\n')
+        writer.write('/dev/ttyS0', DIRECTION_IN, b'.1 50 17m3\r\n')
+        writer.write('/dev/ttyUSB0', DIRECTION_IN, b'st 5 4 12 13 1119m4\r\n')
+        writer.close()
+
+        received = []
+        demultiplexer = PortDemultiplexer('/dev/ttyS1')
+        for unit_addr in ('m2', 'm3'):
+            demultiplexer.add_unit(unit_addr, lambda frame, addr=unit_addr: received.append((addr, bytes(frame))))
+        hlt = MagicMock()
+        hlt.port_demultiplexers = {'/dev/ttyS1': demultiplexer}
+
+        reader = CaptureReader(self.path)
+        replay = CaptureReplay(hlt, reader, ports={'/dev/ttyS0': '/dev/ttyS1'})
+        replay.run(speed=0)
+        reader.close()
+
+        self.assertEqual(received, [('m2', b'st 5 4 12 13 1119m2'), ('m3', b'volt 220.1 50 17m3')])
+        self.assertEqual(replay.frames, 2)
+        self.assertEqual(replay.skipped, 1)
+
+    def test_replay_into_replay_transceiver(self):
+        """
+        Тест проверяет, что запись воспроизводится в трансивер ReplayTransceiver: состояние модулей
+        обновляется, но порты не открываются, обмен не записывается, инициализация модуля с каналом
+        в состоянии "0" не выполняется, а сообщения публикуются в каналы с префиксом воспроизведения
+        """
+        writer = CaptureWriter(self.path)
+        writer.write('/dev/ttyS0', DIRECTION_IN, b'st 0 4 12 13 1119m2\r\nvolt 220.1 50 17m3\r\n')
+        writer.write('/dev/ttyS0', DIRECTION_IN, b'st 0 4 12 13 1120m2\r\n')
+        writer.close()
+
+        settings = {
+            'hardware units': {'m3': ['m2']},
+            'power units': {'m2': {'port': '/dev/ttyS0', 'max consumption current': [16, 8],
+                                   'max leak current': [0.02, 0.02]}},
+            'input units': {'m3': {'port': '/dev/ttyS0'}},
+        }
+        redis_client = MagicMock(spec=redis.StrictRedis)
+        hlt = ReplayTransceiver(settings, redis_client=redis_client)
+        self.addCleanup(hlt.close)
+
+        reader = CaptureReader(self.path)
+        replay = CaptureReplay(hlt, reader)
+        replay.run(speed=0)
+        reader.close()
+        self.assertTrue(hlt.redis_writer.flush(timeout=1))
+
+        self.assertEqual(replay.frames, 3)
+        self.assertEqual(hlt.power_units_state['m2']['st'].state1, '0')
+        self.assertEqual(hlt.power_units_state['m2']['st'].cnt, 1120)
+        self.assertEqual(hlt.input_units_state['m3']['volt'].Vin, 220.1)
+        self.assertIsNone(hlt.capture)
+        self.assertFalse(hlt.port_transceivers['/dev/ttyS0'].ser.is_open)
+        self.assertGreater(hlt.init_requests['m2'], 0)
+        self.assertEqual(hlt.init_coordinator.counters['requests'], 0)
+        self.assertEqual(hlt.suppressed_commands, [])
+        pipeline = redis_client.pipeline.return_value
+        pipeline.publish.assert_any_call('{}:{}'.format(REPLAY_CHANNEL_PREFIX, OUTPUT_INFO_STATE_CHANNEL),
+                                         '{"addr": "ch:m2:1", "state": {"status": "0"}}')
+        for call in pipeline.publish.call_args_list:
+            self.assertTrue(call[0][0].startswith(REPLAY_CHANNEL_PREFIX + ':'))
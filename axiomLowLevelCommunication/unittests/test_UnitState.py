@@ -0,0 +1,112 @@
+import threading
+import time
+from unittest import TestCase
+from axiomLowLevelCommunication.parcelParser import ParcelParser, POWER_UNIT_PARCELS
+from axiomLowLevelCommunication.unitState import UnitState, POWER_UNIT_STATE_RECORDS
+
+
+class TestUnitState(TestCase):
+
+    def setUp(self):
+        self.parser = ParcelParser('m2', POWER_UNIT_PARCELS)
+        self.unit_state = UnitState('m2', POWER_UNIT_STATE_RECORDS)
+
+    def test_initial_state(self):
+        """
+        Тест проверяет, что до получения посылок значения полей - None, версия записи - 0
+        """
+        st = self.unit_state['st']
+        self.assertEqual([st[name] for name in st], [None] * 5)
+        self.assertEqual(st.version, 0)
+        self.assertFalse(self.unit_state.link)
+
+    def test_update_from_parcel(self):
+        """
+        Тест проверяет, что посылка обновляет запись своего типа числовыми значениями,
+        коды состояний хранятся строками, а версия записи увеличивается на 1
+        """
+        self.unit_state.update_from_parcel(self.parser.parse(b'adc 0.5 12.25 7m2'))
+        self.unit_state.update_from_parcel(self.parser.parse(b'st 5 4 12 13 1119m2'))
+
+        adc = self.unit_state['adc']
+        self.assertEqual((adc.sample1, adc.sample2, adc.cnt), (0.5, 12.25, 7))
+        self.assertEqual(self.unit_state['st']['state1'], '5')
+        self.assertEqual(self.unit_state['st'].cnt, 1119)
+        self.assertEqual(adc.version, 1)
+        self.assertEqual(self.unit_state['ld'].version, 0)
+
+    def test_field_timestamps(self):
+        """
+        Тест проверяет, что при установке одного поля обновляется только время обновления этого поля
+        """
+        isol = self.unit_state['isol']
+        isol['isol2'] = 12.5
+        snapshot = isol.snapshot()
+        self.assertEqual(snapshot.values, {'isol1': None, 'isol2': 12.5})
+        self.assertIsNone(snapshot.timestamps['isol1'])
+        self.assertIsNotNone(snapshot.timestamps['isol2'])
+        self.assertEqual(snapshot.version, 1)
+
+    def test_unknown_field(self):
+        """
+        Тест проверяет, что при обращении к несуществующему полю возникает KeyError
+        """
+        with self.assertRaises(KeyError):
+            self.unit_state['st']['isol1']
+        self.assertIsNone(self.unit_state['st'].get('isol1'))
+
+    def test_consistent_snapshot(self):
+        """
+        Тест проверяет, что снимок записи, обновляемой в другом потоке, содержит значения одного обновления
+        """
+        ld = self.unit_state['ld']
+        stop = threading.Event()
+
+        def writer():
+            value = 0
+            while not stop.is_set():
+                value += 1
+                ld.update(load1=value, load2=value, angle1=value, angle2=value, cnt=value)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(2000):
+                values = ld.snapshot().values
+                self.assertEqual(len(set(values.values())), 1, values)
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_wait_for(self):
+        """
+        Тест проверяет, что ожидающий поток просыпается при обновлении записи, после которого выполняется условие
+        """
+        st = self.unit_state['st']
+        wake_times = []
+
+        def waiter():
+            st.wait_for(lambda record: record.state1 == '5', timeout=2)
+            wake_times.append(time.perf_counter())
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.05)
+        st.update_from_parcel(self.parser.parse(b'st 4 4 12 13 1m2'))
+        time.sleep(0.05)
+        self.assertEqual(wake_times, [])
+        update_time = time.perf_counter()
+        st.update_from_parcel(self.parser.parse(b'st 5 4 12 13 2m2'))
+        thread.join()
+
+        self.assertLess(wake_times[0] - update_time, 0.05)
+
+    def test_wait_for_timeout(self):
+        """
+        Тест проверяет, что при невыполнении условия до истечения таймаута возвращается False,
+        а при уже выполненном условии - сразу True
+        """
+        isol = self.unit_state['isol']
+        self.assertFalse(isol.wait_for(lambda record: record.isol1 is not None, timeout=0.05))
+        isol['isol1'] = 0.0
+        self.assertTrue(isol.wait_for(lambda record: record.isol1 is not None, timeout=0))
@@ -0,0 +1,52 @@
+"""
+Запуск симулятора аппаратной части
+
+Пример: 64 силовых модуля и 8 модулей ввода, по 2 модуля на порт::
+
+    python -m axiomSimulator --power-units 64 --input-units 8 --units-per-port 2 --settings /tmp/settings.json
+    AXIOM_SETTINGS=/tmp/settings.json python deploy_tools/run_scripts/run_LowLevelCommunication.py
+"""
+import argparse
+import time
+from axiomSimulator.config import SIMULATOR_PARCEL_RATE, SIMULATOR_JITTER, SIMULATOR_DROP_PROBABILITY, \
+    SIMULATOR_REBOOT_PROBABILITY
+from axiomSimulator.simulator import Simulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Симулятор силовых модулей и модулей ввода')
+    parser.add_argument('--power-units', type=int, default=1, help='количество силовых модулей')
+    parser.add_argument('--input-units', type=int, default=1, help='количество модулей ввода')
+    parser.add_argument('--units-per-port', type=int, default=1, help='количество модулей на одном порту')
+    parser.add_argument('--rate', type=float, default=SIMULATOR_PARCEL_RATE, help='циклов посылок в секунду')
+    parser.add_argument('--jitter', type=float, default=SIMULATOR_JITTER, help='отклонение периода (доля)')
+    parser.add_argument('--drop', type=float, default=SIMULATOR_DROP_PROBABILITY,
+                        help='вероятность потери байта в посылке')
+    parser.add_argument('--reboot', type=float, default=SIMULATOR_REBOOT_PROBABILITY,
+                        help='вероятность перезагрузки модуля за цикл')
+    parser.add_argument('--echo', action='store_true', help='возвращать принятые команды в порт')
+    parser.add_argument('--crc', action='store_true', help='добавлять к посылкам контрольную сумму CRC8')
+    parser.add_argument('--seed', type=int, default=None, help='начальное значение генератора случайных чисел')
+    parser.add_argument('--settings', default=None, help='файл для сохранения конфигурации модулей')
+    args = parser.parse_args()
+
+    simulator = Simulator(power_units=args.power_units, input_units=args.input_units,
+                          units_per_port=args.units_per_port, rate=args.rate, jitter=args.jitter,
+                          drop_probability=args.drop, reboot_probability=args.reboot, echo=args.echo,
+                          crc_suffix=args.crc, seed=args.seed)
+    if args.settings:
+        simulator.write_settings(args.settings)
+
+    for port in simulator.ports:
+        print('{}: {}'.format(port.name, ' '.join(port.units)))
+
+    simulator.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == '__main__':
+    main()
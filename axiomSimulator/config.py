@@ -0,0 +1,21 @@
+# Количество циклов отправки посылок каждым модулем в секунду
+SIMULATOR_PARCEL_RATE = 10
+
+# Случайное отклонение периода отправки посылок (доля от периода)
+SIMULATOR_JITTER = 0.1
+
+# Вероятность потери одного байта в посылке
+SIMULATOR_DROP_PROBABILITY = 0.0
+
+# Вероятность перезагрузки модуля за один цикл отправки посылок
+SIMULATOR_REBOOT_PROBABILITY = 0.0
+
+# Количество циклов, в течение которых силовой модуль находится в состоянии диагностики после "run start"
+SIMULATOR_DIAGNOSTICS_CYCLES = 2
+
+# Количество циклов измерения сопротивления изоляции
+SIMULATOR_INSULATION_CYCLES = 3
+
+# логирование
+LOG_FILE_NAME = '_axiomSimulator.log'
+LOG_FILE_DIRECTORY = '/var/log/axiom'
@@ -0,0 +1,293 @@
+import heapq
+import json
+import os
+import pty
+import random
+import selectors
+import threading
+import time
+import tty
+from axiomLib.loggers import create_logger
+from axiomLowLevelCommunication.crc8 import append_crc
+from axiomSimulator.config import SIMULATOR_PARCEL_RATE, SIMULATOR_JITTER, SIMULATOR_DROP_PROBABILITY, \
+    SIMULATOR_REBOOT_PROBABILITY, LOG_FILE_DIRECTORY, LOG_FILE_NAME
+from axiomSimulator.units import PowerUnitEmulator, InputUnitEmulator
+
+
+class SimulatedPort:
+    """
+    Псевдотерминал, к которому подключены эмулируемые модули
+
+    Ведомая сторона (:attr:`name`) открывается ПО верхнего уровня как последовательный порт,
+    ведущая сторона (:attr:`master`) используется симулятором
+    """
+
+    def __init__(self):
+        """
+        Инициализирует экземпляр класса
+
+        :ivar master: дескриптор ведущей стороны
+        :ivar name: имя файла ведомой стороны
+        :ivar units: эмулируемые модули порта по адресам
+        :ivar buffer: принятые, но еще не разобранные команды
+        :ivar overflows: количество посылок, потерянных из-за того, что порт не читается
+        """
+        self.master, slave = pty.openpty()
+        tty.setraw(self.master)
+        tty.setraw(slave)
+        self.name = os.ttyname(slave)
+        # Ведомая сторона остается открытой, чтобы порт не закрывался между подключениями
+        self.slave = slave
+        os.set_blocking(self.master, False)
+        self.units = {}
+        self.buffer = bytearray()
+        self.overflows = 0
+
+    def close(self):
+        """
+        Закрывает псевдотерминал
+        """
+        os.close(self.master)
+        os.close(self.slave)
+
+
+class Simulator:
+    """
+    Симулятор аппаратной части системы: силовых модулей и модулей ввода
+
+    Для каждого порта создается псевдотерминал; модули порта периодически выдают посылки
+    и отвечают на команды (см. :class:`~axiomSimulator.units.PowerUnitEmulator`,
+    :class:`~axiomSimulator.units.InputUnitEmulator`). Все порты обслуживаются одним потоком.
+
+    Для проверки устойчивости ПО верхнего уровня настраиваются частота посылок, случайное
+    отклонение периода, потеря байт и перезагрузки модулей
+    """
+
+    def __init__(self, power_units=1, input_units=0, units_per_port=1, rate=SIMULATOR_PARCEL_RATE,
+                 jitter=SIMULATOR_JITTER, drop_probability=SIMULATOR_DROP_PROBABILITY,
+                 reboot_probability=SIMULATOR_REBOOT_PROBABILITY, echo=False, crc_suffix=False, seed=None):
+        """
+        Инициализирует экземпляр класса
+
+        :type power_units: int
+        :param power_units: количество силовых модулей
+        :type input_units: int
+        :param input_units: количество модулей ввода
+        :type units_per_port: int
+        :param units_per_port: количество модулей, подключенных к одному порту
+        :type rate: float
+        :param rate: количество циклов отправки посылок каждым модулем в секунду
+        :type jitter: float
+        :param jitter: случайное отклонение периода отправки посылок (доля от периода)
+        :type drop_probability: float
+        :param drop_probability: вероятность потери одного байта в посылке
+        :type reboot_probability: float
+        :param reboot_probability: вероятность перезагрузки модуля за один цикл
+        :type echo: bool
+        :param echo: возвращать в порт принятые команды (как при включенном эхо в ПО модуля)
+        :type crc_suffix: bool
+        :param crc_suffix: добавлять к посылкам контрольную сумму (``<посылка>*<CRC8>``)
+        :type seed: int
+        :param seed: начальное значение генератора случайных чисел
+
+        :ivar units: эмулируемые модули по адресам
+        :ivar ports: порты симулятора
+        :ivar power_unit_addrs: адреса силовых модулей
+        :ivar input_unit_addrs: адреса модулей ввода
+        """
+        self.logger = create_logger(logger_name=__name__,
+                                    logfile_directory=LOG_FILE_DIRECTORY,
+                                    logfile_name=LOG_FILE_NAME)
+        self.rnd = random.Random(seed)
+        self.period = 1 / rate
+        self.jitter = jitter
+        self.drop_probability = drop_probability
+        self.reboot_probability = reboot_probability
+        self.echo = echo
+        self.crc_suffix = crc_suffix
+
+        # Адреса модулей: сначала силовые модули, затем модули ввода
+        self.power_unit_addrs = ['m{}'.format(i) for i in range(1, power_units + 1)]
+        self.input_unit_addrs = ['m{}'.format(i) for i in range(power_units + 1, power_units + input_units + 1)]
+
+        self.units = {}
+        for addr in self.power_unit_addrs:
+            self.units[addr] = PowerUnitEmulator(addr, self.rnd)
+        for addr in self.input_unit_addrs:
+            self.units[addr] = InputUnitEmulator(addr, self.rnd)
+
+        self.ports = []
+        for i, addr in enumerate(self.power_unit_addrs + self.input_unit_addrs):
+            if i % units_per_port == 0:
+                self.ports.append(SimulatedPort())
+            self.ports[-1].units[addr] = self.units[addr]
+
+        self.isRunning = False
+        self.thread = None
+
+    def settings(self):
+        """
+        Формирует конфигурацию аппаратных модулей для ПО верхнего уровня
+
+        Силовые модули равномерно распределяются между модулями ввода
+
+        :rtype: dict
+        :return: конфигурация в формате файла settings.json
+        """
+        ports = {addr: port.name for port in self.ports for addr in port.units}
+        hardware_units = {addr: [] for addr in self.input_unit_addrs}
+        for i, addr in enumerate(self.power_unit_addrs):
+            if self.input_unit_addrs:
+                hardware_units[self.input_unit_addrs[i % len(self.input_unit_addrs)]].append(addr)
+
+        return {
+            'hardware units': hardware_units,
+            'input units': {addr: {'port': ports[addr]} for addr in self.input_unit_addrs},
+            'power units': {addr: {'port': ports[addr],
+                                   'max consumption current': [16, 8],
+                                   'max leak current': [0.02, 0.02]} for addr in self.power_unit_addrs},
+        }
+
+    def write_settings(self, path):
+        """
+        Сохраняет конфигурацию аппаратных модулей в файл
+
+        :type path: str
+        :param path: путь к файлу (передается ПО верхнего уровня в переменной окружения AXIOM_SETTINGS)
+        """
+        with open(path, 'w') as settings_file:
+            json.dump(self.settings(), settings_file, indent=2)
+
+    def corrupt(self, data):
+        """
+        Удаляет из данных случайный байт с вероятностью :attr:`drop_probability`
+
+        :type data: bytes
+        :param data: посылка
+        :rtype: bytes
+        :return: посылка, возможно с потерянным байтом
+        """
+        if self.drop_probability and self.rnd.random() < self.drop_probability:
+            position = self.rnd.randrange(len(data))
+            return data[:position] + data[position + 1:]
+        return data
+
+    def send(self, port, data):
+        """
+        Записывает данные в порт; если ПО верхнего уровня не успевает читать, данные теряются
+
+        :type port: :class:`SimulatedPort`
+        :type data: bytes
+        """
+        try:
+            os.write(port.master, data)
+        except BlockingIOError:
+            port.overflows += 1
+
+    def tick(self, port, unit):
+        """
+        Выполняет цикл работы модуля и отправляет его посылки в порт
+
+        :type port: :class:`SimulatedPort`
+        :type unit: :class:`~axiomSimulator.units.UnitEmulator`
+        """
+        if self.reboot_probability and self.rnd.random() < self.reboot_probability:
+            self.logger.info('Перезагрузка модуля {}'.format(unit.addr))
+            unit.reboot()
+        data = b''.join(self.corrupt(self.frame(parcel)) for parcel in unit.tick())
+        self.send(port, data)
+
+    def frame(self, parcel):
+        """
+        :type parcel: str
+        :param parcel: посылка модуля
+        :rtype: bytes
+        :return: посылка с терминальной последовательностью и, в режиме :attr:`crc_suffix`, контрольной суммой
+        """
+        data = parcel.encode()
+        if self.crc_suffix:
+            data = append_crc(data)
+        return data + b'\r\n'
+
+    def handle_input(self, port):
+        """
+        Читает команды из порта и передает их модулям-адресатам
+
+        :type port: :class:`SimulatedPort`
+        """
+        try:
+            data = os.read(port.master, 4096)
+        except (BlockingIOError, OSError):
+            return
+        if self.echo:
+            self.send(port, data)
+        port.buffer += data
+        *lines, rest = port.buffer.split(b'\n')
+        port.buffer = bytearray(rest)
+        for line in lines:
+            cmd = line.decode(errors='replace').split()
+            if not cmd:
+                continue
+            unit = port.units.get(cmd[-1])
+            if unit is None:
+                self.logger.debug('Команда "{}" в порту {} не адресована ни одному модулю'.format(
+                    ' '.join(cmd), port.name))
+                continue
+            unit.handle_command(cmd[:-1])
+
+    def next_time(self, now):
+        """
+        :type now: float
+        :param now: время предыдущего цикла
+        :rtype: float
+        :return: время следующего цикла с учетом случайного отклонения
+        """
+        return now + self.period * (1 + self.rnd.uniform(-self.jitter, self.jitter))
+
+    def serve(self):
+        """
+        Обслуживает все порты: отправляет посылки по расписанию и обрабатывает команды
+        """
+        selector = selectors.DefaultSelector()
+        for port in self.ports:
+            selector.register(port.master, selectors.EVENT_READ, port)
+
+        # Очередь циклов модулей, упорядоченная по времени; начальное время случайно,
+        # чтобы модули не выдавали посылки одновременно
+        now = time.monotonic()
+        schedule = []
+        for port in self.ports:
+            for addr, unit in port.units.items():
+                heapq.heappush(schedule, (now + self.rnd.uniform(0, self.period), addr, port, unit))
+
+        try:
+            while self.isRunning:
+                timeout = max(0, schedule[0][0] - time.monotonic()) if schedule else 0.1
+                for key, _ in selector.select(timeout):
+                    self.handle_input(key.data)
+
+                now = time.monotonic()
+                while schedule and schedule[0][0] <= now:
+                    due, addr, port, unit = heapq.heappop(schedule)
+                    self.tick(port, unit)
+                    heapq.heappush(schedule, (self.next_time(due), addr, port, unit))
+        finally:
+            selector.close()
+
+    def start(self):
+        """
+        Запускает симулятор в отдельном потоке
+        """
+        self.isRunning = True
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Останавливает симулятор и закрывает порты
+        """
+        self.isRunning = False
+        if self.thread:
+            self.thread.join()
+        for port in self.ports:
+            port.close()
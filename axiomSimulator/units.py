@@ -0,0 +1,251 @@
+import random
+from axiomSimulator.config import SIMULATOR_DIAGNOSTICS_CYCLES, SIMULATOR_INSULATION_CYCLES
+
+
+class UnitEmulator:
+    """
+    Базовый класс эмулятора ПО низкого уровня аппаратного модуля
+
+    Модуль в каждом цикле выдает набор посылок ``<тип> <значения> <счетчик><адрес>`` с общим
+    значением счетчика, после чего счетчик увеличивается. Команды от ПО верхнего уровня
+    оканчиваются адресом модуля; ответы на них выдаются посылками типа "rply"
+    """
+
+    def __init__(self, addr, rnd=None):
+        """
+        Инициализирует экземпляр класса
+
+        :type addr: str
+        :param addr: адрес модуля (например, "m2")
+        :type rnd: random.Random
+        :param rnd: генератор случайных чисел
+
+        :ivar counter: счетчик циклов отправки посылок
+        :ivar replies: ответы на команды, ожидающие отправки
+        :ivar reboots: количество перезагрузок модуля
+        """
+        self.addr = addr
+        self.rnd = rnd or random.Random()
+        self.counter = 0
+        self.replies = []
+        self.reboots = 0
+
+    def tail(self):
+        """
+        :rtype: str
+        :return: окончание посылки ``<счетчик><адрес>``
+        """
+        return '{}{}'.format(self.counter, self.addr)
+
+    def reply(self, text):
+        """
+        Добавляет ответ на команду в очередь отправки
+
+        :type text: str
+        :param text: текст ответа без типа посылки и адреса
+        """
+        self.replies.append('rply {} {}'.format(text, self.tail()))
+
+    def reboot(self):
+        """
+        Перезагружает ПО модуля: счетчик посылок сбрасывается в 0, неотправленные ответы теряются
+        """
+        self.counter = 0
+        self.replies = []
+        self.reboots += 1
+
+    def handle_command(self, cmd):
+        """
+        Обрабатывает команду, адресованную модулю
+
+        :type cmd: list
+        :param cmd: слова команды без адреса модуля
+        """
+        if cmd == ['rst']:
+            self.reboot()
+        else:
+            self.reply(' '.join(cmd))
+
+    def tick(self):
+        """
+        Выполняет один цикл работы модуля
+
+        :rtype: list
+        :return: посылки без терминальной последовательности
+        """
+        periodic_parcels = self.parcels()
+        parcels = self.replies + periodic_parcels
+        self.replies = []
+        self.counter += 1
+        return parcels
+
+    def parcels(self):
+        """
+        :rtype: list
+        :return: периодические посылки модуля для текущего цикла
+        """
+        return []
+
+
+class PowerUnitEmulator(UnitEmulator):
+    """
+    Эмулятор ПО силового модуля
+
+    Выдает посылки "st", "adc", "ld", "tmpr". Состояния каналов изменяются так же, как в ПО
+    силового модуля:
+
+    * после включения питания и команды "rst" каналы находятся в состоянии "0";
+    * по команде "run start" каналы переходят в состояние "1" (диагностика), затем в "3";
+    * после получения порогов "adc hgrp" и "adc hlgrp" каналы переходят в состояние "4";
+    * по командам "ch <канал> on/off" канал переходит в состояние "5"/"4";
+    * по команде "resist start <канал>" через несколько циклов выдается ответ
+      ``rply isol <канал> <значение> <счетчик><адрес>``
+    """
+
+    def __init__(self, addr, rnd=None):
+        """
+        Инициализирует экземпляр класса
+
+        :type addr: str
+        :param addr: адрес модуля (например, "m2")
+        :type rnd: random.Random
+        :param rnd: генератор случайных чисел
+
+        :ivar states: состояния каналов
+        :ivar signals: сигналы перехода каналов в текущее состояние
+        :ivar loads: нагрузка в каналах [%]
+        :ivar configuration: полученные команды установки порогов
+        :ivar diagnostics: количество оставшихся циклов диагностики
+        :ivar insulation: каналы, в которых выполняется измерение сопротивления изоляции,
+         и количество оставшихся циклов измерения
+        :ivar leds: состояния светодиодов каналов
+        """
+        super().__init__(addr, rnd)
+        self.reset()
+
+    def reset(self):
+        """
+        Переводит каналы модуля в начальное состояние
+        """
+        self.states = ['0', '0']
+        self.signals = ['0', '0']
+        self.loads = [0, 0]
+        self.configuration = set()
+        self.diagnostics = 0
+        self.insulation = {}
+        self.leds = ['off', 'off']
+
+    def reboot(self):
+        super().reboot()
+        self.reset()
+
+    def set_state(self, position, state, signal):
+        """
+        :type position: int
+        :param position: индекс канала (0, 1)
+        :type state: str
+        :param state: новое состояние канала
+        :type signal: str
+        :param signal: сигнал перехода
+        """
+        self.states[position] = state
+        self.signals[position] = signal
+        if state != '5':
+            self.loads[position] = 0
+
+    def handle_command(self, cmd):
+        """
+        Обрабатывает команду, адресованную силовому модулю
+
+        :type cmd: list
+        :param cmd: слова команды без адреса модуля
+        """
+        text = ' '.join(cmd)
+
+        if cmd == ['rst']:
+            self.reboot()
+
+        elif cmd == ['run', 'start']:
+            if '0' in self.states:
+                for position in (0, 1):
+                    self.set_state(position, '1', '1')
+                self.diagnostics = SIMULATOR_DIAGNOSTICS_CYCLES
+            self.reply(text)
+
+        elif len(cmd) == 6 and cmd[:2] in (['adc', 'hgrp'], ['adc', 'hlgrp']):
+            self.configuration.add(cmd[1])
+            if self.configuration == {'hgrp', 'hlgrp'}:
+                for position in (0, 1):
+                    if self.states[position] == '3':
+                        self.set_state(position, '4', '9')
+            self.reply(text)
+
+        elif len(cmd) == 3 and cmd[0] == 'ch' and cmd[1] in ('1', '2') and cmd[2] in ('on', 'off'):
+            position = int(cmd[1]) - 1
+            if self.states[position] not in ('4', '5'):
+                self.reply('{} err'.format(text))
+                return
+            if cmd[2] == 'on':
+                self.set_state(position, '5', '12')
+                self.loads[position] = self.rnd.randint(5, 80)
+            else:
+                self.set_state(position, '4', '13')
+            self.reply(text)
+
+        elif len(cmd) == 4 and cmd[:2] == ['led', 'inst'] and cmd[2] in ('1', '2'):
+            self.leds[int(cmd[2]) - 1] = cmd[3]
+            self.reply(text)
+
+        elif len(cmd) == 3 and cmd[:2] == ['resist', 'start'] and cmd[2] in ('1', '2'):
+            self.insulation[cmd[2]] = SIMULATOR_INSULATION_CYCLES
+            self.reply(text)
+
+        else:
+            self.reply('{} err'.format(text))
+
+    def parcels(self):
+        """
+        :rtype: list
+        :return: посылки "st", "adc", "ld", "tmpr" и результаты измерения сопротивления изоляции
+        """
+        if self.diagnostics:
+            self.diagnostics -= 1
+            if not self.diagnostics:
+                for position in (0, 1):
+                    self.set_state(position, '3', '2')
+
+        for channel in list(self.insulation):
+            self.insulation[channel] -= 1
+            if not self.insulation[channel]:
+                del self.insulation[channel]
+                self.reply('isol {} {:.1f}'.format(channel, self.rnd.uniform(50, 1000)))
+
+        loads = [load + self.rnd.randint(-2, 2) if load else 0 for load in self.loads]
+        tail = self.tail()
+        return [
+            'st {} {} {} {} {}'.format(self.states[0], self.states[1], self.signals[0], self.signals[1], tail),
+            'adc {:.3f} {:.3f} {}'.format(loads[0] * 0.16, loads[1] * 0.08, tail),
+            'ld {} {} {} {} {}'.format(loads[0], loads[1], 0, 0, tail),
+            'tmpr {} {} {}'.format(self.rnd.randint(25, 40), self.rnd.randint(25, 40), tail),
+        ]
+
+
+class InputUnitEmulator(UnitEmulator):
+    """
+    Эмулятор ПО модуля ввода
+
+    Выдает посылки "st", "volt", "cur"
+    """
+
+    def parcels(self):
+        """
+        :rtype: list
+        :return: посылки "st", "volt", "cur"
+        """
+        tail = self.tail()
+        return [
+            'st 1 0 {}'.format(tail),
+            'volt {:.1f} 50 {}'.format(self.rnd.uniform(215, 225), tail),
+            'cur {:.2f} {:.2f} {:.2f} {}'.format(self.rnd.uniform(1, 10), self.rnd.uniform(1, 10),
+                                                 self.rnd.uniform(0, 0.01), tail),
+        ]
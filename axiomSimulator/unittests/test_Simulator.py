@@ -0,0 +1,74 @@
+import os
+import selectors
+import time
+from unittest import TestCase
+from axiomLowLevelCommunication.crc8 import strip_crc
+from axiomSimulator.simulator import Simulator
+
+
+class TestSimulator(TestCase):
+
+    def setUp(self):
+        self.simulator = Simulator(power_units=2, input_units=1, units_per_port=2, rate=50, seed=0)
+        self.simulator.start()
+        self.fds = [os.open(port.name, os.O_RDWR | os.O_NOCTTY) for port in self.simulator.ports]
+
+    def tearDown(self):
+        for fd in self.fds:
+            os.close(fd)
+        self.simulator.stop()
+
+    def read_lines(self, fd, duration):
+        data = b''
+        deadline = time.monotonic() + duration
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while time.monotonic() < deadline:
+                if selector.select(0.05):
+                    data += os.read(fd, 4096)
+        return data.split(b'\r\n')
+
+    def test_settings(self):
+        """
+        Тест проверяет, что конфигурация содержит все модули, а модули, подключенные к одному порту,
+        получают общий порт
+        """
+        settings = self.simulator.settings()
+
+        self.assertEqual(sorted(settings['power units']), ['m1', 'm2'])
+        self.assertEqual(list(settings['input units']), ['m3'])
+        self.assertEqual(settings['hardware units'], {'m3': ['m1', 'm2']})
+        self.assertEqual(settings['power units']['m1']['port'], settings['power units']['m2']['port'])
+        self.assertNotEqual(settings['power units']['m1']['port'], settings['input units']['m3']['port'])
+
+    def test_units_send_parcels(self):
+        """
+        Тест проверяет, что все модули порта выдают посылки
+        """
+        lines = self.read_lines(self.fds[0], 0.3)
+
+        self.assertTrue(any(line.startswith(b'st ') and line.endswith(b'm1') for line in lines))
+        self.assertTrue(any(line.startswith(b'adc ') and line.endswith(b'm2') for line in lines))
+
+    def test_command(self):
+        """
+        Тест проверяет, что команда передается модулю-адресату, а ответ выдается посылкой "rply"
+        """
+        os.write(self.fds[0], b'run start m2\n')
+        lines = self.read_lines(self.fds[0], 0.3)
+
+        self.assertTrue(any(line.startswith(b'rply run start ') and line.endswith(b'm2') for line in lines))
+        self.assertEqual(self.simulator.units['m1'].states, ['0', '0'])
+        self.assertNotEqual(self.simulator.units['m2'].states, ['0', '0'])
+
+    def test_crc_suffix(self):
+        """
+        Тест проверяет, что в режиме с контрольной суммой к посылкам добавляется контрольная сумма CRC8
+        """
+        self.assertEqual(self.simulator.frame('st 0 0 0 0 1m1'), b'st 0 0 0 0 1m1\r\n')
+        self.simulator.crc_suffix = True
+
+        self.assertEqual(self.simulator.frame('123456789'), b'123456789*F7\r\n')
+        payload, valid = strip_crc(self.simulator.frame('st 0 0 0 0 1m1')[:-2])
+        self.assertTrue(valid)
+        self.assertEqual(bytes(payload), b'st 0 0 0 0 1m1')
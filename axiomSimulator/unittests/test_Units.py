@@ -0,0 +1,109 @@
+import random
+from unittest import TestCase
+from axiomSimulator.units import PowerUnitEmulator, InputUnitEmulator
+from axiomSimulator.config import SIMULATOR_DIAGNOSTICS_CYCLES, SIMULATOR_INSULATION_CYCLES
+
+
+class TestPowerUnitEmulator(TestCase):
+
+    def setUp(self):
+        self.unit = PowerUnitEmulator('m2', random.Random(0))
+
+    def run_cycles(self, count):
+        parcels = []
+        for _ in range(count):
+            parcels.extend(self.unit.tick())
+        return parcels
+
+    def initialize(self):
+        self.unit.handle_command(['run', 'start'])
+        self.run_cycles(SIMULATOR_DIAGNOSTICS_CYCLES)
+        self.unit.handle_command(['adc', 'hgrp', '16', '8', '1', '2'])
+        self.unit.handle_command(['adc', 'hlgrp', '0.02', '0.02', '3', '4'])
+
+    def test_parcels(self):
+        """
+        Тест проверяет, что в каждом цикле выдаются посылки "st", "adc", "ld", "tmpr"
+        с общим счетчиком, который увеличивается от цикла к циклу
+        """
+        first = self.unit.tick()
+        second = self.unit.tick()
+
+        self.assertEqual([parcel.split()[0] for parcel in first], ['st', 'adc', 'ld', 'tmpr'])
+        self.assertEqual(first[0], 'st 0 0 0 0 0m2')
+        self.assertTrue(all(parcel.endswith(' 0m2') for parcel in first))
+        self.assertTrue(all(parcel.endswith(' 1m2') for parcel in second))
+
+    def test_initialization(self):
+        """
+        Тест проверяет переходы состояний при инициализации: "0" -> "1" -> "3" -> "4"
+        """
+        self.unit.handle_command(['run', 'start'])
+        self.assertEqual(self.unit.states, ['1', '1'])
+        self.run_cycles(SIMULATOR_DIAGNOSTICS_CYCLES)
+        self.assertEqual(self.unit.states, ['3', '3'])
+
+        self.unit.handle_command(['adc', 'hgrp', '16', '8', '1', '2'])
+        self.assertEqual(self.unit.states, ['3', '3'])
+        self.unit.handle_command(['adc', 'hlgrp', '0.02', '0.02', '3', '4'])
+        self.assertEqual(self.unit.states, ['4', '4'])
+        self.assertEqual(self.unit.signals, ['9', '9'])
+
+    def test_switch_channel(self):
+        """
+        Тест проверяет, что команды "ch" изменяют состояние канала и подтверждаются посылкой "rply",
+        а до инициализации отклоняются
+        """
+        self.unit.handle_command(['ch', '1', 'on'])
+        self.assertEqual(self.unit.states[0], '0')
+        self.assertIn('rply ch 1 on err 0m2', self.unit.tick())
+
+        self.initialize()
+        self.unit.handle_command(['ch', '1', 'on'])
+        self.assertEqual((self.unit.states[0], self.unit.signals[0]), ('5', '12'))
+        parcels = self.unit.tick()
+        self.assertTrue(any(parcel.startswith('rply ch 1 on ') for parcel in parcels))
+        self.assertTrue(any(parcel.startswith('st 5 4 12 9 ') for parcel in parcels))
+
+        self.unit.handle_command(['ch', '1', 'off'])
+        self.assertEqual((self.unit.states[0], self.unit.signals[0]), ('4', '13'))
+
+    def test_reset(self):
+        """
+        Тест проверяет, что по команде "rst" счетчик сбрасывается в 0, а каналы переходят в состояние "0"
+        """
+        self.initialize()
+        self.unit.handle_command(['rst'])
+
+        self.assertEqual(self.unit.tick()[0], 'st 0 0 0 0 0m2')
+        self.assertEqual(self.unit.reboots, 1)
+
+    def test_insulation(self):
+        """
+        Тест проверяет, что результат измерения сопротивления изоляции выдается посылкой "rply isol"
+        """
+        self.unit.handle_command(['resist', 'start', '2'])
+        parcels = self.run_cycles(SIMULATOR_INSULATION_CYCLES + 1)
+
+        replies = [parcel for parcel in parcels if parcel.startswith('rply isol')]
+        self.assertEqual(len(replies), 1)
+        _, _, channel, value, tail = replies[0].split(' ')
+        self.assertEqual(channel, '2')
+        self.assertTrue(tail.endswith('m2'))
+        float(value)
+
+
+class TestInputUnitEmulator(TestCase):
+
+    def test_parcels(self):
+        """
+        Тест проверяет, что модуль ввода выдает посылки "st", "volt", "cur" и сбрасывает счетчик по "rst"
+        """
+        unit = InputUnitEmulator('m3', random.Random(0))
+        unit.tick()
+        parcels = unit.tick()
+        self.assertEqual([parcel.split()[0] for parcel in parcels], ['st', 'volt', 'cur'])
+        self.assertTrue(all(parcel.endswith(' 1m3') for parcel in parcels))
+
+        unit.handle_command(['rst'])
+        self.assertTrue(unit.tick()[0].endswith(' 0m3'))
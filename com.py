@@ -8,8 +8,12 @@ import redis
 import objgraph
 import gc
 import re
+from collections import Counter
 from datetime import datetime as dt
 
+# Интервал записи счетчиков команд в redis, с
+COUNTERS_FLUSH_INTERVAL = 5
+
 class RpiSerial():
     def __init__(self, port, baudrate, stopbits, parity, bytesizes, loglevel):
 
@@ -31,6 +35,10 @@ class RpiSerial():
             self.r.set(name='{}_sended'.format(unit_addr), value=0)
             self.r.set(name='{}_failures'.format(unit_addr), value=0)
 
+        # Счетчики команд накапливаются в памяти и записываются в redis одним пакетом
+        self.counters = Counter()
+        self.counters_flush_time = time.time()
+
         self.port = port
         self.baudrate = int(baudrate)
         self.stopbits = int(stopbits)
@@ -99,6 +107,7 @@ class RpiSerial():
         return readdata
 
     def close(self):
+        self.flush_counters()
         try:
             self.ser.close()
         except Exception:
@@ -115,6 +124,32 @@ class RpiSerial():
             self.file_logger.warning('Ошибка сбросе FIFO com порта')
             pass
 
+    def count(self, name):
+        """
+        Увеличивает счетчик статистики команд
+        :param name: имя ключа redis
+        """
+        self.counters[name] += 1
+        if time.time() - self.counters_flush_time >= COUNTERS_FLUSH_INTERVAL:
+            self.flush_counters()
+
+    def flush_counters(self):
+        """
+        Записывает накопленные счетчики в redis одним пакетом команд INCRBY
+        """
+        self.counters_flush_time = time.time()
+        if not self.counters:
+            return
+        pipeline = self.r.pipeline(transaction=False)
+        for name, value in self.counters.items():
+            pipeline.incrby(name, value)
+        try:
+            pipeline.execute()
+        except redis.RedisError as e:
+            self.file_logger.error('Ошибка при записи счетчиков команд в redis: {}'.format(e))
+            return
+        self.counters.clear()
+
     def send_command(self, cmd, counter, num_of_retries=10):
         """
         Переключает ножку на запись, записывает команду,
@@ -127,7 +162,7 @@ class RpiSerial():
         search_result = re.search(r'm\d', cmd)
         unit_addr = search_result.group(0)
 
-        self.r.incr('{}_sended'.format(unit_addr))
+        self.count('{}_sended'.format(unit_addr))
 
         # self.r.incr('commands')
         gpio_wr(4, 1)
@@ -153,7 +188,7 @@ class RpiSerial():
 
         # Если получен пустой ответ, но количество повторных попыток не исчерпано
         elif output == b'' and num_of_retries > 0:
-            self.r.incr('{}_failures'.format(unit_addr))
+            self.count('{}_failures'.format(unit_addr))
             # self.r.incr('retries')
             # self.r.incr('empty answers')
             self.stream_logger.debug(debug_colors['WARNING'] % 'Нет ответа на команду "{}". Повторная отправка команды'.format(cmd))
@@ -162,7 +197,7 @@ class RpiSerial():
 
         # Если получен пустой ответ, но не осталось повторных попыток
         elif output == b'' and num_of_retries == 0:
-            self.r.incr('{}_failures'.format(unit_addr))
+            self.count('{}_failures'.format(unit_addr))
             # self.r.incr('failures')
             # self.r.incr('empty answers')
             self.stream_logger.debug(debug_colors['ERROR'] % 'Нет ответа на команду "{}". Команда не отправлена'.format(cmd))
@@ -171,7 +206,7 @@ class RpiSerial():
 
         # Если ответ был, но счетчик не совпадает, либо не может быть считан (ответ некорректный)
         elif counter != answer_counter:
-            self.r.incr('{}_failures'.format(unit_addr))
+            self.count('{}_failures'.format(unit_addr))
             # self.r.incr('failures')
             # self.r.incr('wrong counter')
             # Пишем лог, выводим debug сообщения на экран
@@ -1,12 +1,21 @@
 import signal
 import setproctitle
-from axiomLowLevelCommunication import hlt
+from axiomLowLevelCommunication import HighLowTransceiver, AsyncHighLowTransceiver, ShardSupervisor
+from axiomLowLevelCommunication.config import RUN_MODE
 
 if __name__ == '__main__':
 
     # Имя процесса
     setproctitle.setproctitle('axiom low level communication')
 
+    # Трансивер для режима работы RUN_MODE
+    if RUN_MODE == 'sharded':
+        hlt = ShardSupervisor()
+    elif RUN_MODE == 'asyncio':
+        hlt = AsyncHighLowTransceiver()
+    else:
+        hlt = HighLowTransceiver()
+
     # Обработчик сигналов SIGTERM, SIGINT
     signal.signal(signal.SIGTERM, hlt.sigterm_handler)
     signal.signal(signal.SIGINT, hlt.sigterm_handler)